@@ -0,0 +1,592 @@
+# -*- coding: utf-8 -*-
+"""
+만세력 오프라인 테이블 빌더
+
+사용법:
+    python build_tables.py solar [--first 1900] [--last 2100] [--out astro_24terms.bin]
+    python build_tables.py lunar [--check]
+    python build_tables.py kasi --dump kasi_cache.json [--out kasi_24terms.bin] [--tolerance 10]
+    python build_tables.py kasi --api --key <서비스키> [--first 1900] [--last 2100]
+    python build_tables.py bench [--charts 20] [--reruns 5]
+    python build_tables.py store [--workers 4] [--chunk 2400] [--limit 0]
+    python build_tables.py population [--samples 200000] [--seed 0] [--first 1930] [--last 2024]
+
+- solar : AstroEngine(VSOP87 축약 급수)으로 24절기 절입 시각 테이블 생성
+- lunar : 음력 월 길이/윤달 비트 패킹 테이블(_LUNAR_PACKED) 생성 및 KLC 교차 검증
+- kasi  : KASI 24절기 발표값(로컬 덤프 또는 API) -> kasi_24terms.bin + AstroEngine 대비 차이 리포트
+- bench : engine_memo 와 st.cache_data 의 페이지당 소요시간/함수별 적중 카운터 비교
+- store : 도달 가능한 사주 561,600개(야자시 포함)의 원국 정적 분석 -> analysis_store/ (메모리 매핑 열 파일)
+- population : 출생아 수 가중 표본 -> 일간점수/오행 비율 분위수 + 신강신약/격국/용신 빈도 (population_index.bin)
+"""
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+
+def _engine():
+    """manse 모듈 지연 import (Streamlit bare 모드 경고 억제)"""
+    import logging
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    import manse
+    return manse
+
+
+def cmd_solar(args):
+    m = _engine()
+    t0 = time.time()
+    minutes = m.SolarTermTable.compute(args.first, args.last)
+    blob = m.SolarTermTable.pack(args.first, minutes)
+    out = args.out or m.SolarTermTable.path()
+    with open(out, "wb") as f:
+        f.write(blob)
+    print(f"[solar] {args.first}-{args.last} {len(minutes)}개 절기 -> {out} "
+          f"({len(blob):,} bytes, {time.time() - t0:.1f}s)")
+    return 0
+
+
+# ---------------------------------------------------------------
+#  음력 테이블 (lunar)
+#  - 1900~2049: korean_lunar_calendar(KLC, KASI 기반) 데이터 그대로 사용
+#  - 2050~2100: KLC 범위 밖 -> 합삭(Meeus 49장) + 중기(SolarTermTable)로 직접 편성
+#    (1912년 이후 구간에서 KLC 와 월 길이/윤달이 완전히 일치함을 --check 로 확인)
+# ---------------------------------------------------------------
+KLC_LAST_YEAR = 2049
+
+
+def new_moon_jde(k):
+    """k 번째 합삭(2000년 1월 기준)의 역학시 JDE"""
+    T = k / 1236.85
+    jde = (2451550.09766 + 29.530588861 * k + 0.00015437 * T**2
+           - 0.000000150 * T**3 + 0.00000000073 * T**4)
+    E = 1 - 0.002516 * T - 0.0000074 * T**2
+    r, s = math.radians, math.sin
+    M = r(2.5534 + 29.10535670 * k - 0.0000014 * T**2 - 0.00000011 * T**3)
+    Mp = r(201.5643 + 385.81693528 * k + 0.0107582 * T**2 + 0.00001238 * T**3 - 0.000000058 * T**4)
+    F = r(160.7108 + 390.67050284 * k - 0.0016118 * T**2 - 0.00000227 * T**3 + 0.000000011 * T**4)
+    Om = r(124.7746 - 1.56375588 * k + 0.0020672 * T**2 + 0.00000215 * T**3)
+    corr = (-0.40720 * s(Mp) + 0.17241 * E * s(M) + 0.01608 * s(2 * Mp) + 0.01039 * s(2 * F)
+            + 0.00739 * E * s(Mp - M) - 0.00514 * E * s(Mp + M) + 0.00208 * E * E * s(2 * M)
+            - 0.00111 * s(Mp - 2 * F) - 0.00057 * s(Mp + 2 * F) + 0.00056 * E * s(2 * Mp + M)
+            - 0.00042 * s(3 * Mp) + 0.00042 * E * s(M + 2 * F) + 0.00038 * E * s(M - 2 * F)
+            - 0.00024 * E * s(2 * Mp - M) - 0.00017 * s(Om) - 0.00007 * s(Mp + 2 * M)
+            + 0.00004 * s(2 * Mp - 2 * F) + 0.00004 * s(3 * M) + 0.00003 * s(Mp + M - 2 * F)
+            + 0.00003 * s(2 * Mp + 2 * F) - 0.00003 * s(Mp + M + 2 * F) + 0.00003 * s(Mp - M + 2 * F)
+            - 0.00002 * s(Mp - M - 2 * F) - 0.00002 * s(3 * Mp + M) + 0.00002 * s(4 * Mp))
+    planet = (
+        (299.77 + 0.107408 * k - 0.009173 * T**2, 0.000325), (251.88 + 0.016321 * k, 0.000165),
+        (251.83 + 26.651886 * k, 0.000164), (349.42 + 36.412478 * k, 0.000126),
+        (84.66 + 18.206239 * k, 0.000110), (141.74 + 53.303771 * k, 0.000062),
+        (207.14 + 2.453732 * k, 0.000060), (154.84 + 7.306860 * k, 0.000056),
+        (34.52 + 27.261239 * k, 0.000047), (207.19 + 0.121824 * k, 0.000042),
+        (291.34 + 1.844379 * k, 0.000040), (161.72 + 24.198154 * k, 0.000037),
+        (239.56 + 25.513099 * k, 0.000035), (331.55 + 3.592518 * k, 0.000023),
+    )
+    return jde + corr + sum(w * math.sin(r(a)) for a, w in planet)
+
+
+def astro_lunar_years(m, first, last):
+    """
+    합삭/중기로 음력 편성: {음력년: (설날 date, [(월, 윤달여부, 일수), ...])}
+    동지가 든 달 = 11월, 동지~동지 사이 13개월이면 첫 무중월(無中月)이 윤달
+    """
+    kst = timedelta(hours=m.AstroEngine.KST_OFFSET_HOURS)
+    base = datetime(2000, 1, 1, 12)
+    starts = []
+    k = math.floor((first - 1 - 2000) * 12.3685) - 2
+    while True:
+        jde = new_moon_jde(k)
+        dt_tt = base + timedelta(days=jde - m.AstroEngine.JD_J2000)
+        d = (dt_tt - timedelta(seconds=m.AstroEngine.delta_t(dt_tt.year)) + kst).date()
+        if d.year > last + 1:
+            break
+        if d.year >= first - 1:
+            starts.append(d)
+        k += 1
+
+    zhongqi = [(m.SolarTermTable.get_datetime(y, t).date(), t)
+               for y in range(first - 1, last + 2) for t in range(1, 24, 2)]
+    months = []  # [시작일, 일수, 포함된 중기 목록]
+    for a, b in zip(starts, starts[1:]):
+        months.append((a, (b - a).days, [t for d, t in zhongqi if a <= d < b]))
+
+    winter = [i for i, mo in enumerate(months) if 23 in mo[2]]
+    years = {}
+    for w0, w1 in zip(winter, winter[1:]):
+        leap_done = (w1 - w0) == 12
+        num = 11
+        for i in range(w0, w1):
+            start, days, zq = months[i]
+            if i == w0:
+                mon, leap = 11, False
+            elif not leap_done and not zq:
+                mon, leap, leap_done = num, True, True
+            else:
+                num = num % 12 + 1
+                mon, leap = num, False
+            ly = start.year - 1 if (mon >= 11 and start.month < 6) else start.year
+            years.setdefault(ly, []).append((start, mon, leap, days))
+    out = {}
+    for ly in range(first, last + 1):
+        seq = years[ly]
+        out[ly] = (seq[0][0], [(mon, leap, days) for _, mon, leap, days in seq])
+    return out
+
+
+def klc_lunar_years(first, last):
+    """KLC 일자 순회로 음력 편성 (형식은 astro_lunar_years 와 동일)"""
+    from korean_lunar_calendar import KoreanLunarCalendar
+    c = KoreanLunarCalendar()
+    out = {}
+    d = date(first, 1, 1)
+    end = date(last + 1, 3, 1)
+    while d < end:
+        c.setSolarDate(d.year, d.month, d.day)
+        if first <= c.lunarYear <= last:
+            ny, seq = out.setdefault(c.lunarYear, (d, []))
+            if c.lunarDay == 1:
+                seq.append([c.lunarMonth, bool(c.isIntercalation), 1])
+            elif seq:
+                seq[-1][2] = c.lunarDay
+        d += timedelta(days=1)
+    return {y: (ny, [tuple(x) for x in seq]) for y, (ny, seq) in out.items()}
+
+
+def pack_lunar_year(ny, seq):
+    """bit0~12: 월별 대(30)/소(29), bit13~16: 윤달(0=없음), bit17~22: 설날의 1월1일 기준 경과일"""
+    word = 0
+    leap = 0
+    for i, (mon, is_leap, days) in enumerate(seq):
+        if days == 30:
+            word |= 1 << i
+        if is_leap:
+            leap = mon
+    return word | (leap << 13) | ((ny - date(ny.year, 1, 1)).days << 17)
+
+
+def cmd_lunar(args):
+    m = _engine()
+    first, last = m.LunarTable.FIRST_YEAR, m.LunarTable.LAST_YEAR
+    t0 = time.time()
+    klc = klc_lunar_years(first, min(last, KLC_LAST_YEAR))
+    astro = astro_lunar_years(m, max(first, 1912), last)
+
+    # 교차 검증: 1912(UTC+9 채택) 이후 KLC 와 천문 계산 편성이 일치해야 함
+    diff = [y for y in klc if y in astro and klc[y] != astro[y]]
+    print(f"[lunar] KLC vs 천문계산 불일치 연도: {diff or '없음'}")
+
+    years = {**astro, **klc}
+    packed = [pack_lunar_year(*years[y]) for y in range(first, last + 1)]
+
+    if args.check:
+        bad = [y for y, w in zip(range(first, last + 1), packed)
+               if w != m._LUNAR_PACKED[y - first]]
+        print(f"[lunar] manse._LUNAR_PACKED 불일치 연도: {bad or '없음'} ({time.time() - t0:.1f}s)")
+        return 1 if (bad or diff) else 0
+
+    print("_LUNAR_PACKED = (")
+    for i in range(0, len(packed), 8):
+        print("    " + ", ".join(f"0x{w:06x}" for w in packed[i:i + 8]) + ",")
+    print(")")
+    return 0
+
+
+# ---------------------------------------------------------------
+#  KASI 절기 테이블 (kasi)
+#  입력 덤프 형식 (파일 또는 폴더 내 *.json 모두 허용)
+#   - KasiAPI 디스크 캐시 (kasi_cache.json): {"SpcdeInfoService/get24DivInfo?solYear=2024": [항목...]}
+#   - API 원본 응답: {"response": {"body": {"items": {"item": [항목...]}}}} 또는 항목 리스트
+#   - 구형 kasi_24terms.json: {"2024": {"입춘": {"month":2,"day":4,"hour":17,"minute":27}}}
+# ---------------------------------------------------------------
+def _dump_items(obj):
+    """덤프 JSON 에서 get24DivInfo 항목(dict)들을 재귀적으로 추출"""
+    if isinstance(obj, list):
+        for x in obj:
+            yield from _dump_items(x)
+    elif isinstance(obj, dict):
+        if ("dateName" in obj or "name" in obj) and ("locdate" in obj or "solDay" in obj):
+            yield obj
+        else:
+            for v in obj.values():
+                yield from _dump_items(v)
+
+
+def read_kasi_dump(m, path):
+    """덤프 -> {(연도, 절기번호): datetime}"""
+    files = sorted(glob.glob(os.path.join(path, "*.json"))) if os.path.isdir(path) else [path]
+    out = {}
+    for fp in files:
+        with open(fp, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        legacy = isinstance(data, dict) and data and all(str(k).isdigit() for k in data)
+        if legacy:
+            for y, terms in data.items():
+                for name, info in terms.items():
+                    t_idx = m._TERM_INDEX_24.get(name)
+                    if t_idx is not None and info.get("month"):
+                        out[(int(y), t_idx)] = datetime(int(y), info["month"], info["day"],
+                                                        info["hour"], info["minute"])
+            continue
+        for item in _dump_items(data):
+            parsed = m.KasiAPI.parse_term_item(item)
+            if not parsed:
+                continue
+            name, dt = parsed
+            t_idx = next((i for n, i in m._TERM_INDEX_24.items() if n in name), None)
+            if t_idx is not None:
+                out[(dt.year, t_idx)] = dt
+    return out
+
+
+def fetch_kasi_api(m, key, first, last):
+    """풀링/디스크 캐시 KASI 클라이언트로 연도별 24절기 수집 (fallback 없이 발표값만)"""
+    m.KasiAPI.set_key(key)
+    out = {}
+    try:
+        for y in range(first, last + 1):
+            for name, dt in m.KasiAPI.get_term_datetimes(y).items():
+                t_idx = next((i for n, i in m._TERM_INDEX_24.items() if n in name), None)
+                if t_idx is not None:
+                    out[(y, t_idx)] = dt
+            if not m.KasiAPI.is_available():
+                print(f"[kasi] API 차단 상태 - {y}년에서 중단")
+                break
+    finally:
+        m.KasiAPI.flush()
+    return out
+
+
+def validate_kasi(m, terms, tolerance):
+    """
+    검증: 연도별 24절기 완비 / 절기 순서 단조 증가 / AstroEngine 대비 허용 오차(분) 이내
+    반환: (오류 목록, 차이 목록[(연도, 절기번호, 차이분)])
+    """
+    errors, diffs = [], []
+    years = sorted({y for y, _ in terms})
+    for y in years:
+        missing = [m._TERM_NAMES_24[i] for i in range(24) if (y, i) not in terms]
+        if missing:
+            errors.append(f"{y}: 누락 {','.join(missing)}")
+        prev = None
+        for i in range(24):
+            dt = terms.get((y, i))
+            if dt is None:
+                continue
+            if prev is not None and dt <= prev:
+                errors.append(f"{y} {m._TERM_NAMES_24[i]}: 이전 절기보다 이르거나 같음")
+            prev = dt
+            d = (dt - m.AstroEngine.term_instant(y, i).replace(second=0, microsecond=0)).total_seconds() / 60
+            diffs.append((y, i, d))
+            if abs(d) > tolerance:
+                errors.append(f"{y} {m._TERM_NAMES_24[i]}: AstroEngine 대비 {d:+.0f}분 (허용 {tolerance}분)")
+    return errors, diffs
+
+
+def print_diff_report(m, diffs):
+    """AstroEngine 대비 차이 요약 (분 단위)"""
+    if not diffs:
+        print("[kasi] 비교할 절기 없음")
+        return
+    absd = [abs(d) for _, _, d in diffs]
+    buckets = {"0분": 0, "1분": 0, "2~5분": 0, "6분+": 0}
+    for a in absd:
+        key = "0분" if a < 0.5 else "1분" if a < 1.5 else "2~5분" if a < 5.5 else "6분+"
+        buckets[key] += 1
+    print(f"[kasi] AstroEngine 대비: {len(diffs)}개 절기, 평균 {sum(absd) / len(absd):.2f}분, "
+          f"최대 {max(absd):.0f}분")
+    print("[kasi] 분포: " + ", ".join(f"{k} {v}" for k, v in buckets.items()))
+    worst = sorted(diffs, key=lambda x: -abs(x[2]))[:10]
+    for y, i, d in worst:
+        if abs(d) >= 1.5:
+            print(f"    {y} {m._TERM_NAMES_24[i]:<3} {d:+.0f}분")
+
+
+def cmd_kasi(args):
+    m = _engine()
+    if args.api:
+        terms = fetch_kasi_api(m, args.key, args.first, args.last)
+    elif args.dump:
+        terms = read_kasi_dump(m, args.dump)
+    else:
+        print("--dump 또는 --api 중 하나가 필요합니다.")
+        return 2
+    terms = {k: v for k, v in terms.items() if args.first <= k[0] <= args.last}
+    if not terms:
+        print("[kasi] 절기 데이터 없음")
+        return 1
+
+    errors, diffs = validate_kasi(m, terms, args.tolerance)
+    print_diff_report(m, diffs)
+    if errors:
+        print(f"[kasi] 검증 오류 {len(errors)}건:")
+        for e in errors[:30]:
+            print("    " + e)
+        if not args.force:
+            print("[kasi] 중단 (--force 로 누락/오류 칸을 비운 채 저장 가능)")
+            return 1
+
+    first = min(y for y, _ in terms)
+    last = max(y for y, _ in terms)
+    minutes = [m.SolarTermTable.MISSING] * ((last - first + 1) * 24)
+    for (y, i), dt in terms.items():
+        minutes[(y - first) * 24 + i] = m.SolarTermTable.to_minutes(dt)
+    blob = m.SolarTermTable.pack(first, minutes)
+    out = args.out or os.path.join(m._DATA_DIR, m.SolarTermTable.KASI_FILE_NAME)
+    with open(out, "wb") as f:
+        f.write(blob)
+    print(f"[kasi] {first}-{last} {len(terms)}개 절기 -> {out} ({len(blob):,} bytes)")
+    return 0
+
+
+# ---------------------------------------------------------------
+#  엔진 메모 벤치마크 (bench)
+#  - 같은 페이지 호출 묶음을 st.cache_data / engine_memo 로 각각 실행
+#  - cold = 첫 렌더, warm = Streamlit 재실행(rerun)처럼 같은 사주로 반복
+# ---------------------------------------------------------------
+def _bench_page(m, chart):
+    """메뉴 한 페이지 분량의 엔진 호출 (menu1/menu4/menu5 호출 패턴 축약)"""
+    pils, (by, bm, bd, bh, g) = chart
+    ilgan = pils[1]["cg"]
+    cy = datetime.now().year
+    for _ in range(20):
+        m.get_yongshin(pils)
+        m.calc_ohaeng_strength(ilgan, pils)
+        m.calc_sipsung(ilgan, pils)
+    for y in range(by, by + 100):
+        m.get_yearly_luck(pils, y)
+    for mo in range(1, 13):
+        m.get_monthly_luck(pils, cy, mo)
+    for y in range(cy - 5, cy + 6):
+        m.calc_luck_score(pils, by, g, bm, bd, bh, 0, y)
+    m.build_past_events(pils, by, g, bm, bd, bh, 0)
+
+
+def _bench_run(m, charts, reruns):
+    t0 = time.perf_counter()
+    for c in charts:
+        _bench_page(m, c)
+    cold = (time.perf_counter() - t0) / len(charts)
+    t0 = time.perf_counter()
+    for _ in range(reruns):
+        for c in charts:
+            _bench_page(m, c)
+    warm = (time.perf_counter() - t0) / max(1, len(charts) * reruns)
+    return cold * 1000, warm * 1000
+
+
+def cmd_bench(args):
+    import random
+    m = _engine()
+    st = m.st
+    rnd = random.Random(args.seed)
+    charts = []
+    for _ in range(args.charts):
+        by, bm, bd, bh = rnd.randint(1940, 2010), rnd.randint(1, 12), rnd.randint(1, 28), rnd.randint(0, 23)
+        g = rnd.choice("남여")
+        charts.append((m.SajuCoreEngine.get_pillars(by, bm, bd, bh, 0, g), (by, bm, bd, bh, g)))
+
+    memos = dict(m.EngineMemo.registry)
+    legacy = {}
+    for name, memo in memos.items():
+        if name == "build_past_events":
+            legacy[name] = st.cache_data(hash_funcs={dict: lambda d: json.dumps(d, sort_keys=True, default=str)})(memo.fn)
+        else:
+            legacy[name] = st.cache_data(memo.fn)
+
+    # 대운 타임라인 등 공유 캐시는 양쪽이 같은 조건이 되도록 먼저 예열
+    _bench_run(m, charts, 0)
+    for memo in memos.values():
+        memo.clear()
+
+    # 모듈 전역을 바꿔 끼워 내부 호출(calc_luck_score -> get_yongshin 등)까지 같은 방식으로 측정
+    try:
+        for name, fn in legacy.items():
+            setattr(m, name, fn)
+        old_cold, old_warm = _bench_run(m, charts, args.reruns)
+    finally:
+        for name, memo in memos.items():
+            setattr(m, name, memo)
+    for memo in memos.values():
+        memo.clear()
+    new_cold, new_warm = _bench_run(m, charts, args.reruns)
+
+    print(f"[bench] 사주 {len(charts)}개 x 재실행 {args.reruns}회 (페이지당 ms)")
+    print(f"    {'':<14}{'cold':>10}{'warm':>10}")
+    print(f"    {'st.cache_data':<14}{old_cold:>10.2f}{old_warm:>10.2f}")
+    print(f"    {'engine_memo':<14}{new_cold:>10.2f}{new_warm:>10.2f}")
+    print(f"    {'절감':<14}{old_cold - new_cold:>10.2f}{old_warm - new_warm:>10.2f}"
+          f"   (warm x{old_warm / max(new_warm, 1e-9):.1f})")
+    print()
+    print(f"    {'함수':<22}{'적중':>8}{'실패':>7}{'적중률':>8}{'적중 us':>9}{'실패 us':>10}")
+    for s in m.engine_memo_stats():
+        print(f"    {s['함수']:<22}{s['적중']:>8}{s['실패']:>7}{s['적중률']:>8.1%}"
+              f"{s['적중_us']:>9.2f}{s['실패_us']:>10.1f}")
+    return 0
+
+
+# ---------------------------------------------------------------
+#  원국 정적 분석 저장소 (manse.AnalysisStore)
+#  - 사주 번호 구간 단위로 프로세스 풀에 분배, 결과는 JSON 바이트 (AnalysisStore.encode)
+#  - 같은 결과 바이트는 1번만 기록 (blake2b 16바이트 다이제스트로 중복 판정)
+# ---------------------------------------------------------------
+def _store_worker(span):
+    """[lo, hi) 구간 사주 -> 함수별 JSON 바이트 리스트"""
+    m = _engine()
+    S = m.AnalysisStore
+    out = {name: [] for name in S.FUNCTIONS}
+    for i in range(*span):
+        for name, v in S.compute(S.chart_at(i).pils).items():
+            out[name].append(S.encode(v))
+    return out
+
+
+class _StoreColumn:
+    """
+    함수 1개 열 - 값 바이트는 파일에 바로 이어 쓰고 번호/오프셋만 메모리에 유지
+    모두 .tmp 에 쓴 뒤 close() 에서 교체 (실행 중인 앱이 매핑한 이전 파일은 그대로 유효)
+    """
+
+    def __init__(self, out_dir, name):
+        self.path = os.path.join(out_dir, name)
+        self.f = open(self.path + ".val.bin.tmp", "wb")
+        self.seen, self.ids, self.off = {}, [], [0]
+
+    def add(self, blob):
+        h = hashlib.blake2b(blob, digest_size=16).digest()
+        v = self.seen.get(h)
+        if v is None:
+            v = self.seen[h] = len(self.off) - 1
+            self.f.write(blob)
+            self.off.append(self.off[-1] + len(blob))
+        self.ids.append(v)
+
+    def close(self):
+        import numpy as np
+        self.f.close()
+        for ext, arr in ((".ids.npy", np.asarray(self.ids, dtype=np.uint32)),
+                         (".off.npy", np.asarray(self.off, dtype=np.uint64))):
+            with open(self.path + ext + ".tmp", "wb") as f:
+                np.save(f, arr)
+        for ext in (".val.bin", ".ids.npy", ".off.npy"):
+            os.replace(self.path + ext + ".tmp", self.path + ext)
+        return len(self.off) - 1, self.off[-1]
+
+
+def cmd_store(args):
+    from concurrent.futures import ProcessPoolExecutor
+    m = _engine()
+    S = m.AnalysisStore
+    out_dir = args.out or S.path()
+    n = min(args.limit or S.N_CHARTS, S.N_CHARTS)
+    os.makedirs(out_dir, exist_ok=True)
+    meta = os.path.join(out_dir, "meta.json")
+    if os.path.exists(meta):
+        os.remove(meta)      # 빌드 도중에는 앱이 불완전한 저장소를 읽지 않도록
+
+    cols = {name: _StoreColumn(out_dir, name) for name in S.FUNCTIONS}
+    spans = [(lo, min(lo + args.chunk, n)) for lo in range(0, n, args.chunk)]
+    t0 = time.perf_counter()
+    done = 0
+    with ProcessPoolExecutor(max_workers=args.workers or None) as pool:
+        for part in pool.map(_store_worker, spans):
+            for name, blobs in part.items():
+                col = cols[name]
+                for blob in blobs:
+                    col.add(blob)
+            done += len(part[S.FUNCTIONS[0]])
+            el = time.perf_counter() - t0
+            print(f"\r[store] {done:,}/{n:,}  {el:.0f}s  (남은 시간 ~{el / done * (n - done):.0f}s)",
+                  end="", flush=True)
+    print()
+
+    stats = {}
+    for name, col in cols.items():
+        distinct, nbytes = col.close()
+        stats[name] = {"distinct": distinct, "bytes": int(nbytes)}
+        print(f"    {name:<22}{distinct:>9,} 종  {nbytes / 1024 / 1024:>8.1f} MB")
+    S.write_meta(out_dir, n, built_at=datetime.now().isoformat(timespec="seconds"), columns=stats)
+    print(f"[store] {out_dir} ({time.perf_counter() - t0:.0f}s)")
+    return 0
+
+
+def cmd_population(args):
+    m = _engine()
+    P = m.PopulationIndex
+    t0 = time.perf_counter()
+
+    def progress(j, total):
+        print(f"\r[population] 사주 {j:,}/{total:,}  {time.perf_counter() - t0:.0f}s", end="", flush=True)
+
+    meta, quantiles = P.build(args.samples, args.seed, args.first, args.last, progress)
+    print()
+    out = args.out or P.path()
+    blob = P.pack(meta, quantiles)
+    with open(out, "wb") as f:
+        f.write(blob)
+    print(f"[population] 표본 {meta['samples']:,}명 / 서로 다른 사주 {meta['charts']:,}개 -> {out} "
+          f"({len(blob) / 1024:.1f} KB, {time.perf_counter() - t0:.0f}s)")
+    for name, q in zip(meta["metrics"], quantiles):
+        print(f"    {name:<6} p10 {q[100]:>6.1f}  p50 {q[500]:>6.1f}  p90 {q[900]:>6.1f}")
+    for kind, freq in meta["freq"].items():
+        top = ", ".join(f"{k} {v:.1%}" for k, v in list(freq.items())[:5])
+        print(f"    {kind}: {top}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="만세력 오프라인 테이블 빌더")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_solar = sub.add_parser("solar", help="24절기 절입 시각 테이블 생성 (AstroEngine)")
+    p_solar.add_argument("--first", type=int, default=1900)
+    p_solar.add_argument("--last", type=int, default=2100)
+    p_solar.add_argument("--out", default="")
+    p_solar.set_defaults(func=cmd_solar)
+
+    p_lunar = sub.add_parser("lunar", help="음력 비트 패킹 테이블 생성 (KLC + 천문 계산)")
+    p_lunar.add_argument("--check", action="store_true", help="manse._LUNAR_PACKED 와 대조만 수행")
+    p_lunar.set_defaults(func=cmd_lunar)
+
+    p_kasi = sub.add_parser("kasi", help="KASI 24절기 바이너리 테이블 생성 + 차이 리포트")
+    p_kasi.add_argument("--dump", default="", help="로컬 KASI 덤프 파일 또는 폴더")
+    p_kasi.add_argument("--api", action="store_true", help="KASI API 에서 직접 수집 (디스크 캐시 사용)")
+    p_kasi.add_argument("--key", default=os.environ.get("KASI_SERVICE_KEY", ""))
+    p_kasi.add_argument("--first", type=int, default=1900)
+    p_kasi.add_argument("--last", type=int, default=2100)
+    p_kasi.add_argument("--tolerance", type=float, default=10.0, help="AstroEngine 대비 허용 오차(분)")
+    p_kasi.add_argument("--force", action="store_true")
+    p_kasi.add_argument("--out", default="")
+    p_kasi.set_defaults(func=cmd_kasi)
+
+    p_bench = sub.add_parser("bench", help="engine_memo vs st.cache_data 페이지당 소요시간 비교")
+    p_bench.add_argument("--charts", type=int, default=20)
+    p_bench.add_argument("--reruns", type=int, default=5)
+    p_bench.add_argument("--seed", type=int, default=0)
+    p_bench.set_defaults(func=cmd_bench)
+
+    p_store = sub.add_parser("store", help="원국 정적 분석 저장소 생성 (사주 561,600개, 프로세스 풀)")
+    p_store.add_argument("--out", default="", help="기본: manse 데이터 폴더/analysis_store")
+    p_store.add_argument("--workers", type=int, default=0, help="0 = CPU 수")
+    p_store.add_argument("--chunk", type=int, default=2400, help="작업 1건당 사주 수")
+    p_store.add_argument("--limit", type=int, default=0, help="앞에서부터 N개만 (점검용)")
+    p_store.set_defaults(func=cmd_store)
+
+    p_pop = sub.add_parser("population", help="모집단 백분위 인덱스 생성 (출생아 수 가중 표본)")
+    p_pop.add_argument("--samples", type=int, default=200_000)
+    p_pop.add_argument("--seed", type=int, default=0)
+    p_pop.add_argument("--first", type=int, default=1930)
+    p_pop.add_argument("--last", type=int, default=2024)
+    p_pop.add_argument("--out", default="")
+    p_pop.set_defaults(func=cmd_population)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,26 @@
 # -*- coding: utf-8 -*-
 import streamlit as st
 import requests
+import numpy as np
+import atexit
+import inspect
 import json
 import os
 from datetime import date, datetime, timedelta
 import random
 import io
 import re
+import sys
+import math
+import struct
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+import threading
+import functools
+import hashlib
+import heapq
+import time
 import logging as _logging
 _saju_log = _logging.getLogger("saju")
 try:
@@ -50,107 +64,124 @@ _JJ_HOUR_SHORT = [
 
 # ==========================================================
 #  음력 ↔ 양력 변환 (내장 테이블 방식)
-#  출처: 한국천문연구원 만세력 기준 1900~2060
+#  출처: 한국천문연구원 만세력 기준 1900~2100
+#  (1900~2049: korean_lunar_calendar, 2050~2100: 합삭/중기 천문 계산
+#   -> build_tables.py lunar 로 재생성/교차 검증)
 # ==========================================================
 
-# 음력 데이터: 각 음력 연도의 1월 1일 양력 날짜 + 월별 일수(29/30)
-# 형식: {음력년: (양력월일, [월1일수, 월2일수, ..., 윤달여부포함])}
-# 간략화: 1940~2030 핵심 구간만 내장 (나머지는 근사 계산)
-_LUNAR_DATA = {
-    # year: (solar_start_mmdd, month_days_list, leap_month or 0)
-    # month_days_list: 13개면 윤달 있음 (leap_month 번째 다음이 윤달)
-    1940: ((1,27), [30,29,30,30,29,30,29,30,29,30,29,30], 0),
-    1941: ((2,15), [29,30,29,30,29,29,30,29,30,29,30,30], 0),
-    1942: ((2, 5), [29,30,29,30,29,30,29,29,30,29,30,29,30], 7),
-    1943: ((1,25), [30,30,29,30,29,30,29,30,29,30,29,30], 0),
-    1944: ((2,13), [29,30,30,29,30,29,30,29,30,29,30,29], 0),
-    1945: ((2, 2), [30,29,30,30,29,30,29,30,29,30,29,30], 0),
-    1946: ((1,22), [29,30,29,30,29,30,30,29,30,29,30,29,29], 6),
-    1947: ((2,10), [30,30,29,30,29,30,29,30,29,30,29,30], 0),
-    1948: ((1,30), [29,30,29,30,29,30,29,30,30,29,30,29], 0),
-    1949: ((2,17), [30,29,30,29,30,29,30,29,30,30,29,30,29], 7),
-    1950: ((2, 7), [30,29,30,29,30,29,30,29,30,29,30,30], 0),
-    1951: ((1,27), [29,30,29,30,29,30,29,30,29,30,29,30,30], 5),
-    1952: ((2,15), [29,30,29,30,29,30,29,30,29,30,29,30], 0),
-    1953: ((2, 4), [30,29,30,29,30,30,29,30,29,30,29,29], 0),
-    1954: ((1,24), [30,29,30,29,30,30,29,30,29,30,29,30,29], 3),
-    1955: ((2,12), [30,29,30,29,30,29,30,30,29,30,29,30], 0),
-    1956: ((2, 2), [29,30,29,30,29,30,29,30,30,29,30,29,30], 8),
-    1957: ((1,22), [29,30,29,30,29,30,29,30,29,30,30,29], 0),
-    1958: ((2,10), [30,29,30,29,30,29,30,29,30,29,30,30,29], 8),
-    1959: ((1,29), [30,29,30,29,30,29,30,29,30,29,30,30], 0),
-    1960: ((1,28), [29,30,29,30,29,30,29,30,29,30,29,30], 6),
-    1961: ((2,15), [30,29,30,29,30,29,30,29,30,29,30,29], 0),
-    1962: ((2, 5), [30,30,29,30,29,30,29,29,30,29,30,29,30], 4),
-    1963: ((1,25), [30,30,29,30,29,30,29,30,29,30,29,30], 0),
-    1964: ((2,13), [29,30,30,29,30,29,30,29,30,29,30,29,30], 4),
-    1965: ((2, 2), [30,29,30,30,29,30,29,30,29,30,29,30], 0),
-    1966: ((1,21), [29,30,29,30,30,29,30,29,30,29,30,29,30], 3),
-    1967: ((2, 9), [30,29,30,29,30,30,29,30,29,30,29,30], 0),
-    1968: ((1,30), [29,30,29,30,29,30,30,29,30,29,30,29,30], 7),
-    1969: ((2,17), [29,30,29,30,29,30,29,30,30,29,30,29], 0),
-    1970: ((2, 6), [30,29,30,29,30,29,30,29,30,30,29,30,29], 5),
-    1971: ((1,27), [30,29,30,29,30,29,30,29,30,29,30,30], 0),
-    1972: ((1,16), [29,30,29,30,29,30,29,30,29,30,29,30,30], 4),
-    1973: ((2, 3), [29,30,29,30,29,30,29,30,29,30,29,30], 0),
-    1974: ((1,23), [30,29,30,29,30,29,30,29,30,29,30,29,30], 4),
-    1975: ((2,11), [30,30,29,30,29,30,29,30,29,30,29,30], 0),
-    1976: ((1,31), [29,30,30,29,30,29,30,29,30,29,30,29,30], 8),
-    1977: ((2,18), [29,30,30,29,30,29,30,29,30,29,30,29], 0),
-    1978: ((2, 7), [30,29,30,30,29,30,29,30,29,30,29,29,30], 6),
-    1979: ((1,28), [30,29,30,30,29,30,29,30,29,30,29,30], 0),
-    1980: ((2,16), [29,30,29,30,30,29,30,29,30,29,30,29,30], 5),
-    1981: ((2, 5), [29,30,29,30,29,30,30,29,30,29,30,29], 0),
-    1982: ((1,25), [30,29,30,29,30,29,30,30,29,30,29,30,29], 4),
-    1983: ((2,13), [30,29,30,29,30,29,30,29,30,30,29,30], 0),
-    1984: ((2, 2), [29,30,29,30,29,30,29,30,29,30,30,29,30], 10),
-    1985: ((2,20), [29,30,29,30,29,30,29,30,29,30,29,30], 0),
-    1986: ((2, 9), [30,29,30,29,30,29,30,29,30,29,30,29,30], 6),
-    1987: ((1,29), [30,30,29,30,29,30,29,30,29,30,29,30], 0),
-    1988: ((2,17), [29,30,30,29,30,29,30,29,30,29,30,29,30], 5),
-    1989: ((2, 6), [29,30,29,30,30,29,30,29,30,29,30,29], 0),
-    1990: ((1,27), [30,29,30,29,30,30,29,30,29,30,29,29,30], 5),
-    1991: ((2,15), [30,29,30,29,30,29,30,30,29,30,29,30], 0),
-    1992: ((2, 4), [29,30,29,30,29,30,29,30,30,29,30,29,30], 8),
-    1993: ((1,23), [29,30,29,30,29,30,29,30,29,30,30,29], 0),
-    1994: ((2,10), [30,29,30,29,30,29,29,30,29,30,30,29,30], 3),
-    1995: ((1,31), [30,29,30,29,30,29,30,29,30,29,30,30], 0),
-    1996: ((2,19), [29,30,29,30,29,30,29,30,29,30,29,30,30], 8),
-    1997: ((2, 7), [29,30,29,30,29,30,29,30,29,30,29,30], 0),
-    1998: ((1,28), [30,29,30,29,30,29,30,29,29,30,29,30,30], 5),
-    1999: ((2,16), [29,30,30,29,30,29,30,29,30,29,30,29], 0),
-    2000: ((2, 5), [30,29,30,30,29,30,29,30,29,30,29,29,30], 4),
-    2001: ((1,24), [30,29,30,30,29,30,29,30,29,30,29,30], 0),
-    2002: ((2,12), [29,30,29,30,30,29,30,29,30,29,30,29,30], 4),
-    2003: ((2, 1), [30,29,30,29,30,30,29,30,29,30,29,30], 0),
-    2004: ((1,22), [29,30,29,30,29,30,30,29,30,29,30,29,30], 2),
-    2005: ((2, 9), [29,30,29,30,29,30,29,30,30,29,30,29], 0),
-    2006: ((1,29), [30,29,30,29,30,29,30,29,30,30,29,30,29], 7),
-    2007: ((2,18), [30,29,30,29,30,29,30,29,30,29,30,30], 0),
-    2008: ((2, 7), [29,30,29,30,29,30,29,30,29,30,29,30,30], 12),
-    2009: ((1,26), [29,30,29,30,29,30,29,30,29,30,29,30], 0),
-    2010: ((2,14), [30,29,30,29,30,29,29,30,29,30,29,30,30], 5),
-    2011: ((2, 3), [30,29,30,29,30,29,30,29,30,29,30,29], 0),
-    2012: ((1,23), [30,30,29,30,29,30,29,30,29,29,30,29,30], 4),
-    2013: ((2,10), [30,30,29,30,29,30,29,30,29,30,29,30], 0),
-    2014: ((1,31), [29,30,30,29,30,29,30,29,30,29,30,29,30], 9),
-    2015: ((2,19), [29,30,29,30,30,29,30,29,30,29,30,29], 0),
-    2016: ((2, 8), [30,29,30,29,30,30,29,30,29,30,29,29,30], 6),
-    2017: ((1,28), [30,29,30,29,30,29,30,30,29,30,29,30], 0),
-    2018: ((2,16), [29,30,29,30,29,30,29,30,30,29,30,29,30], 6),
-    2019: ((2, 5), [29,30,29,30,29,30,29,30,29,30,30,29], 0),
-    2020: ((1,25), [30,29,30,29,30,29,30,29,30,29,30,30,29], 4),
-    2021: ((2,12), [30,29,30,29,30,29,30,29,30,29,30,29], 0),
-    2022: ((2, 1), [30,29,30,29,30,30,29,29,30,29,30,29,30], 2),
-    2023: ((1,22), [30,29,30,29,30,29,30,30,29,30,29,30], 0),
-    2024: ((2,10), [29,30,29,30,29,30,29,30,30,29,30,29,30], 6),
-    2025: ((1,29), [30,29,30,29,30,29,30,29,30,30,29,30], 0),
-    2026: ((2,17), [29,30,29,30,29,30,29,30,29,30,30,29,30], 6),
-    2027: ((2, 7), [29,30,29,30,29,30,29,30,29,30,29,30], 0),
-    2028: ((1,27), [30,29,30,29,29,30,29,30,29,30,30,29,30], 5),
-    2029: ((2,13), [30,29,30,29,30,29,30,29,30,29,30,30], 0),
-    2030: ((2, 3), [29,30,29,30,29,30,29,30,29,30,29,30,30], 3),
-}
+# 음력 연도별 32bit 패킹 데이터 (인덱스 = 음력년 - 1900)
+#   bit 0~12 : 해당 연도 n번째 달(윤달 포함 순서)이 대월(30일)이면 1, 소월(29일)이면 0
+#   bit 13~16: 윤달 월 번호 (0 = 윤달 없음, 윤달은 같은 번호 정달 바로 다음)
+#   bit 17~22: 음력 1월 1일의 양력 1월 1일 기준 경과 일수
+_LUNAR_PACKED = (
+    0x3d16d2, 0x620752, 0x4c0ea5, 0x38b64a, 0x5c064b, 0x440a9b, 0x309556, 0x56056a,
+    0x400b59, 0x2a5752, 0x500752, 0x3adb25, 0x600b25, 0x480a4b, 0x32b29b, 0x580aad,
+    0x44056a, 0x2c4b69, 0x520ba9, 0x3efb52, 0x640d92, 0x4c0d25, 0x36ba4d, 0x5c0956,
+    0x4602b5, 0x2e95ad, 0x5606d4, 0x400da9, 0x2c5d92, 0x500e92, 0x3acd26, 0x5e0527,
+    0x480a57, 0x32b2b6, 0x580ada, 0x4406d4, 0x2e6ea9, 0x520749, 0x3cf693, 0x620a93,
+    0x4c052b, 0x34ca5b, 0x5a096d, 0x460b6a, 0x329b54, 0x560ba4, 0x400b49, 0x2a5a93,
+    0x500a95, 0x38f52b, 0x5e052d, 0x480aad, 0x34b56a, 0x580db2, 0x440da4, 0x2e7d49,
+    0x540d4a, 0x3d1a95, 0x620a96, 0x4c0556, 0x36cab5, 0x5a0ad5, 0x4606d2, 0x308ea5,
+    0x560ea5, 0x400e4a, 0x2a6c96, 0x4e0a9b, 0x3af556, 0x5e056a, 0x480b59, 0x34b752,
+    0x5a0752, 0x420725, 0x2c964b, 0x520a4b, 0x3d12ab, 0x6002ad, 0x4a056b, 0x36cb69,
+    0x5c0da9, 0x460d92, 0x309b25, 0x560d25, 0x415a4d, 0x640a56, 0x4e02b6, 0x38d5ad,
+    0x6006d4, 0x480da9, 0x34bd92, 0x5a0e92, 0x440d26, 0x2c6a56, 0x500a57, 0x3d12b6,
+    0x620b5a, 0x4c06d4, 0x36aec9, 0x5c0749, 0x460693, 0x2e9527, 0x54052b, 0x3e0a5b,
+    0x2a555a, 0x4e036a, 0x38fb55, 0x600ba4, 0x4a0b49, 0x32ba93, 0x580a95, 0x42052d,
+    0x2c6a5d, 0x500aad, 0x3d35aa, 0x6205d2, 0x4c0da5, 0x36bd4a, 0x5c0d4a, 0x460a95,
+    0x30952d, 0x540556, 0x3e0ab5, 0x2a55aa, 0x5006d2, 0x38cea5, 0x5e0ea5, 0x4a0e4a,
+    0x34ac96, 0x560c9b, 0x42055a, 0x2c6ad5, 0x520b69, 0x3d7752, 0x620752, 0x4c0b25,
+    0x36d64b, 0x5a0a4b, 0x4404ab, 0x2ea55b, 0x54056d, 0x3e0b69, 0x2a5b52, 0x500d92,
+    0x3afd25, 0x5e0d25, 0x480a4d, 0x32b4ad, 0x5802b6, 0x4005b5, 0x2c6da9, 0x520ea9,
+    0x3f1d92, 0x620e92, 0x4c0d26, 0x36ca56, 0x5a0a57, 0x4404d6, 0x2e86b5, 0x5406d5,
+    0x400ec9, 0x2a6e92, 0x4e0693, 0x38f52b, 0x5e052b, 0x460a5b, 0x32b55a, 0x58056a,
+    0x420b55, 0x2c9749, 0x520b49, 0x3d1a93, 0x620a95, 0x4a052d, 0x34caad, 0x5a0ab5,
+    0x4605aa, 0x2e8ba5, 0x540da5, 0x400d4a, 0x2a7a95, 0x4e0c95, 0x38f52e, 0x5e0556,
+    0x480ab5, 0x32b5b2, 0x5806d2, 0x420ea5, 0x2e9e4a, 0x52064a, 0x3b0c97, 0x600cab,
+    0x4c055a, 0x34cad5, 0x5a0b69, 0x460752, 0x3096a5, 0x540b25, 0x3e064b, 0x287497,
+    0x4e00ab,
+)
+
+
+class LunarTable:
+    """
+    _LUNAR_PACKED 를 풀어 만든 누적 일수 인덱스 (프로세스당 1회 생성)
+    - 음력 -> 양력: O(1) (연도 설날 서수 + 월 시작 오프셋)
+    - 양력 -> 음력: bisect 2회 (연도, 월)
+    """
+    FIRST_YEAR = 1900
+    LAST_YEAR = 2100
+    _SLOTS = 14  # 연도별 월 시작 오프셋 칸 수 (최대 13개월 + 종료)
+
+    _ny_ord = None     # array('l'): 연도별 설날 서수(ordinal), 마지막 칸 = 범위 종료
+    _month_off = None  # array('H'): 연도별 _SLOTS 칸 누적 일수
+    _n_months = None   # bytes: 연도별 월 개수 (12 또는 13)
+    _leap = None       # bytes: 연도별 윤달 번호
+
+    @classmethod
+    def _build_index(cls):
+        ny_ord, month_off, n_months, leaps = array("l"), array("H"), bytearray(), bytearray()
+        for i, word in enumerate(_LUNAR_PACKED):
+            leap = (word >> 13) & 0xF
+            n = 13 if leap else 12
+            ny_ord.append(date(cls.FIRST_YEAR + i, 1, 1).toordinal() + (word >> 17))
+            acc = 0
+            for slot in range(cls._SLOTS):
+                month_off.append(acc)
+                if slot < n:
+                    acc += 30 if (word >> slot) & 1 else 29
+            n_months.append(n)
+            leaps.append(leap)
+        ny_ord.append(ny_ord[-1] + month_off[-1])
+        cls._month_off, cls._n_months, cls._leap = month_off, bytes(n_months), bytes(leaps)
+        cls._ny_ord = ny_ord
+
+    @classmethod
+    def leap_month(cls, lunar_year):
+        """해당 음력년의 윤달 번호 (없으면 0, 범위 밖이면 None)"""
+        if cls._ny_ord is None:
+            cls._build_index()
+        if not cls.FIRST_YEAR <= lunar_year <= cls.LAST_YEAR:
+            return None
+        return cls._leap[lunar_year - cls.FIRST_YEAR]
+
+    @classmethod
+    def to_solar(cls, lunar_year, lunar_month, lunar_day, is_leap=False):
+        """음력 -> 양력 date. 범위 밖이거나 존재하지 않는 날짜(13월, 없는 윤달, 30일 없는 작은달)면 None"""
+        if cls._ny_ord is None:
+            cls._build_index()
+        if not cls.FIRST_YEAR <= lunar_year <= cls.LAST_YEAR:
+            return None
+        yi = lunar_year - cls.FIRST_YEAR
+        leap = cls._leap[yi]
+        if not 1 <= lunar_month <= 12 or (is_leap and lunar_month != leap):
+            return None
+        slot = lunar_month - 1
+        if leap and (lunar_month > leap or (lunar_month == leap and is_leap)):
+            slot += 1
+        lo = yi * cls._SLOTS + slot
+        if not 1 <= lunar_day <= cls._month_off[lo + 1] - cls._month_off[lo]:
+            return None
+        return date.fromordinal(cls._ny_ord[yi] + cls._month_off[lo] + lunar_day - 1)
+
+    @classmethod
+    def to_lunar(cls, solar_date):
+        """양력 date -> (음력년, 음력월, 음력일, 윤달여부). 범위 밖이면 None"""
+        if cls._ny_ord is None:
+            cls._build_index()
+        ordinal = solar_date.toordinal()
+        if not cls._ny_ord[0] <= ordinal < cls._ny_ord[-1]:
+            return None
+        yi = bisect_right(cls._ny_ord, ordinal) - 1
+        lo = yi * cls._SLOTS
+        off = ordinal - cls._ny_ord[yi]
+        slot = bisect_right(cls._month_off, off, lo, lo + cls._n_months[yi]) - 1 - lo
+        day = off - cls._month_off[lo + slot] + 1
+        leap = cls._leap[yi]
+        if leap and slot == leap:
+            return (cls.FIRST_YEAR + yi, leap, day, True)
+        month = slot if (leap and slot > leap) else slot + 1
+        return (cls.FIRST_YEAR + yi, month, day, False)
 
 
 # ==================================================
@@ -162,43 +193,140 @@ class KasiAPI:
     - 24절기 정밀 시각 조회 (초 단위)
     - 음양력 변환 (윤달 완벽 처리)
     - 음력 기준 정보 조회
+
+    네트워크 정책
+    - 공용 requests.Session (keep-alive 커넥션 풀) 재사용
+    - 응답은 endpoint+params 키로 디스크 캐시(kasi_cache.json)에 영구 저장
+      (메모리에 모았다가 FLUSH_EVERY 건마다/종료 시 1회 기록 - 임시 파일 + os.replace)
+    - 통신 실패는 NEGATIVE_TTL 동안 재요청하지 않음 (네거티브 캐시)
+    - 연속 BREAKER_THRESHOLD 회 실패 시 BREAKER_COOLDOWN 초간 차단 -> 로컬 테이블 사용
     """
     BASE_URL = "http://apis.data.go.kr/B090041/openapi/service"
     _SERVICE_KEY: str = ""  # 사이드바에서 주입
 
+    TIMEOUT = (2.0, 4.0)          # (연결, 응답) 초
+    CACHE_FILE = "kasi_cache.json"
+    NEGATIVE_TTL = 600.0          # 실패 응답 재시도 대기(초)
+    BREAKER_THRESHOLD = 3         # 연속 실패 허용 횟수
+    BREAKER_COOLDOWN = 300.0      # 차단 유지 시간(초)
+    FLUSH_EVERY = 50              # 디스크에 아직 쓰지 않은 응답이 이만큼 쌓이면 기록
+
+    _session = None
+    _cache = None                 # {캐시키: [items]} - 디스크 캐시 메모리 사본
+    _dirty = 0                    # 디스크에 아직 쓰지 않은 응답 수
+    _negative = {}                # {캐시키: 실패 시각}
+    _year_terms = {}              # {연도: {절기명: datetime}}
+    _fail_count = 0
+    _open_until = 0.0
+    _lock = threading.Lock()
+    _flush_lock = threading.Lock()
+
     @classmethod
     def set_key(cls, key: str):
         cls._SERVICE_KEY = key.strip()
 
     @classmethod
-    def _get(cls, endpoint: str, params: dict) -> dict | None:
-        """공통 GET 요청. 실패 시 None 반환."""
-        if not cls._SERVICE_KEY:
+    def configure(cls, base_url: str = None, cache_file: str = None):
+        """접속 대상/캐시 파일 교체 (로컬 스텁 서버 테스트용). 미기록 응답 저장 후 메모리 상태 초기화"""
+        cls.flush()
+        with cls._lock:
+            if base_url is not None:
+                cls.BASE_URL = base_url.rstrip("/")
+            if cache_file is not None:
+                cls.CACHE_FILE = cache_file
+            cls._cache = None
+            cls._dirty = 0
+            cls._negative = {}
+            cls._year_terms = {}
+            cls._fail_count = 0
+            cls._open_until = 0.0
+
+    @classmethod
+    def flush(cls):
+        """미기록 응답을 디스크 캐시에 반영 (연도 일괄 조회 후/프로세스 종료 시)"""
+        with cls._flush_lock:
+            with cls._lock:
+                if not cls._dirty or cls._cache is None:
+                    return
+                snapshot, path = dict(cls._cache), cls.CACHE_FILE
+                cls._dirty = 0
+            _save_json_cache(path, snapshot, indent=None)
+
+    @classmethod
+    def _get_session(cls):
+        if cls._session is None:
+            s = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            cls._session = s
+        return cls._session
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """키가 있고 서킷 브레이커가 열려 있지 않으면 True"""
+        return bool(cls._SERVICE_KEY) and time.time() >= cls._open_until
+
+    @classmethod
+    def _record_failure(cls, key: str):
+        with cls._lock:
+            now = time.time()
+            cls._negative[key] = now
+            cls._fail_count += 1
+            if cls._fail_count >= cls.BREAKER_THRESHOLD:
+                cls._open_until = now + cls.BREAKER_COOLDOWN
+                cls._fail_count = 0
+                _saju_log.warning("KASI API 연속 실패 - %ds 동안 로컬 테이블 사용", cls.BREAKER_COOLDOWN)
+
+    @classmethod
+    def _get(cls, endpoint: str, params: dict) -> list | None:
+        """공통 GET 요청 (디스크 캐시 -> 네거티브 캐시 -> 브레이커 -> 네트워크). 실패 시 None 반환."""
+        key = endpoint + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+        with cls._lock:
+            if cls._cache is None:
+                cls._cache = _load_json_cache(cls.CACHE_FILE)
+            if key in cls._cache:
+                return cls._cache[key] or None
+            failed_at = cls._negative.get(key)
+        if failed_at is not None and time.time() - failed_at < cls.NEGATIVE_TTL:
             return None
+        if not cls.is_available():
+            return None
+
+        query = dict(params, serviceKey=cls._SERVICE_KEY, _type="json", numOfRows=30)
         try:
-            import requests
-            params["serviceKey"] = cls._SERVICE_KEY
-            params["_type"] = "json"
-            params["numOfRows"] = 10
-            url = f"{cls.BASE_URL}/{endpoint}"
-            resp = requests.get(url, params=params, timeout=5)
+            resp = cls._get_session().get(f"{cls.BASE_URL}/{endpoint}", params=query, timeout=cls.TIMEOUT)
             resp.raise_for_status()
             data = resp.json()
-            items = (data.get("response", {})
-                        .get("body", {})
-                        .get("items", {})
-                        .get("item"))
-            if items is None:
-                return None
-            return items if isinstance(items, list) else [items]
         except Exception:
+            cls._record_failure(key)
             return None
 
+        header = data.get("response", {}).get("header", {})
+        if str(header.get("resultCode", "00")) != "00":
+            # 인증키 오류/트래픽 초과 등: 확정 데이터가 아니므로 디스크에 남기지 않음
+            cls._record_failure(key)
+            return None
+        items = data.get("response", {}).get("body", {}).get("items")
+        items = items.get("item") if isinstance(items, dict) else None
+        if items is not None and not isinstance(items, list):
+            items = [items]
+        with cls._lock:
+            cls._fail_count = 0
+            # 정상 응답(빈 결과 포함)은 확정 데이터이므로 영구 저장 (FLUSH_EVERY 건마다 기록)
+            cls._cache[key] = items or []
+            cls._dirty += 1
+            flush = cls._dirty >= cls.FLUSH_EVERY
+        if flush:
+            cls.flush()
+        return items or None
+
     @classmethod
     def get_24division(cls, year: int) -> list | None:
         """
         해당 연도의 24절기 목록과 정밀 시각(초 단위) 조회
-        반환: [{"solDay":"20260205","solTime":"170000","name":"입춘"}, ...]
+        반환: [{"dateName":"입춘","locdate":20260204,"kst":"0502", ...}, ...]
+        (연도 단위 1회 조회 - get_term_datetimes 가 파싱 결과를 재사용)
         """
         items = cls._get(
             "SpcdeInfoService/get24DivInfo",
@@ -252,157 +380,377 @@ class KasiAPI:
             return None
         return items[0]
 
+    @staticmethod
+    def parse_term_item(item: dict):
+        """
+        get24DivInfo 항목 -> (절기명, datetime). 해석 불가 시 None
+        API 필드(dateName/locdate/kst="1727")와 구형 덤프 필드(name/solDay/solTime) 모두 지원
+        """
+        name = str(item.get("dateName") or item.get("name") or "").strip()
+        sol_day = str(item.get("locdate") or item.get("solDay") or "").strip()
+        sol_time = str(item.get("kst") or item.get("solTime") or "").strip()
+        sol_time = (sol_time + "00") if len(sol_time) == 4 else sol_time.zfill(6)
+        try:
+            return name, datetime(
+                int(sol_day[:4]), int(sol_day[4:6]), int(sol_day[6:8]),
+                int(sol_time[:2]), int(sol_time[2:4]), int(sol_time[4:6])
+            )
+        except Exception:
+            return None
+
+    @classmethod
+    def get_term_datetimes(cls, year: int) -> dict:
+        """연도별 {절기명: datetime} (get_24division 1회 조회 후 연도 단위 재사용)"""
+        terms = cls._year_terms.get(year)
+        if terms is not None:
+            return terms
+        terms = dict(filter(None, (cls.parse_term_item(it) for it in cls.get_24division(year) or [])))
+        if terms:
+            cls._year_terms[year] = terms
+        return terms
+
     @classmethod
-    def get_term_datetime(cls, year: int, term_name: str) -> datetime | None:
+    def get_term_datetime(cls, year: int, term_name: str, fallback: bool = True) -> datetime | None:
         """
         특정 연도의 절기 이름 -> 정밀 시각(초 단위) 반환
         term_name 예: "입춘", "경칩", "청명" ...
+        KASI 조회 불가(키 없음/장애 차단) 시 fallback=True 면 로컬 절기 테이블 값 반환
         """
-        items = cls.get_24division(year)
-        if not items:
-            return None
-        for item in items:
-            if term_name in str(item.get("name", "")):
-                sol_day = str(item.get("solDay", ""))
-                sol_time = str(item.get("solTime", "000000")).zfill(6)
-                try:
-                    return datetime(
-                        int(sol_day[:4]), int(sol_day[4:6]), int(sol_day[6:8]),
-                        int(sol_time[:2]), int(sol_time[2:4]), int(sol_time[4:6])
-                    )
-                except Exception:
-                    return None
+        for name, dt in cls.get_term_datetimes(year).items():
+            if term_name in name:
+                return dt
+        t_idx = _TERM_INDEX_24.get(term_name)
+        if fallback and t_idx is not None:
+            return SolarTermTable.get_datetime(year, t_idx)
         return None
 
+
+atexit.register(KasiAPI.flush)
+
+# 24절기 이름 (양력 1월 소한부터 12월 동지까지, 인덱스 = 황경 순서)
+_TERM_NAMES_24 = ["소한","대한","입춘","우수","경칩","춘분","청명","곡우","입하","소만","망종","하지",
+                  "소서","대서","입추","처서","백로","추분","한로","상강","입동","소설","대설","동지"]
+_TERM_INDEX_24 = {name: i for i, name in enumerate(_TERM_NAMES_24)}
+
+# 배포용 데이터 파일 위치 (manse.py 와 같은 폴더)
+_DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
 class AstroEngine:
     """
-    고정밀 천문 계산 엔진 (1940-2040 범위 보정)
-    Jean Meeus 알고리즘 기반의 태양 황도 계산 보조
+    고정밀 천문 계산 엔진 (1900-2100 절기 테이블 생성용)
+    Jean Meeus 알고리즘: VSOP87 축약 급수 + 장동/광행차 보정으로 태양 시황경 계산
+    - 절입 시각 오차: 약 1분 이내 (KASI 발표치와 분 단위 일치)
     """
+    # VSOP87 지구 일심황경 급수 (Meeus, Astronomical Algorithms 부록 III 축약본)
+    # (A, B, C) -> A * cos(B + C*tau), 단위 1e-8 rad
+    _L0 = (
+        (175347046, 0, 0), (3341656, 4.6692568, 6283.07585), (34894, 4.6261, 12566.1517),
+        (3497, 2.7441, 5753.3849), (3418, 2.8289, 3.5231), (3136, 3.6277, 77713.7715),
+        (2676, 4.4181, 7860.4194), (2343, 6.1352, 3930.2097), (1324, 0.7425, 11506.7698),
+        (1273, 2.0371, 529.691), (1199, 1.1096, 1577.3435), (990, 5.233, 5884.927),
+        (902, 2.045, 26.298), (857, 3.508, 398.149), (780, 1.179, 5223.694),
+        (753, 2.533, 5507.553), (505, 4.583, 18849.228), (492, 4.205, 775.523),
+        (357, 2.92, 0.067), (317, 5.849, 11790.629), (284, 1.899, 796.298),
+        (271, 0.315, 10977.079), (243, 0.345, 5486.778), (206, 4.806, 2544.314),
+        (205, 1.869, 5573.143), (202, 2.458, 6069.777), (156, 0.833, 213.299),
+        (132, 3.411, 2942.463), (126, 1.083, 20.775), (115, 0.645, 0.98),
+        (103, 0.636, 4694.003), (102, 0.976, 15720.839), (102, 4.267, 7.114),
+        (99, 6.21, 2146.17), (98, 0.68, 155.42), (86, 5.98, 161000.69),
+        (85, 1.3, 6275.96), (85, 3.67, 71430.7), (80, 1.81, 17260.15),
+        (79, 3.04, 12036.46), (75, 1.76, 5088.63), (74, 3.5, 3154.69),
+        (74, 4.68, 801.82), (70, 0.83, 9437.76), (62, 3.98, 8827.39),
+        (61, 1.82, 7084.9), (57, 2.78, 6286.6), (56, 4.39, 14143.5),
+        (56, 3.47, 6279.55), (52, 0.19, 12139.55), (52, 1.33, 1748.02),
+        (51, 0.28, 5856.48), (49, 0.49, 1194.45), (41, 5.37, 8429.24),
+        (41, 2.4, 19651.05), (39, 6.17, 10447.39), (37, 6.04, 10213.29),
+        (37, 2.57, 1059.38), (36, 1.71, 2352.87), (36, 1.78, 6812.77),
+        (33, 0.59, 17789.85), (30, 0.44, 83996.85), (30, 2.74, 1349.87),
+        (25, 3.16, 4690.48),
+    )
+    _L1 = (
+        (628331966747, 0, 0), (206059, 2.678235, 6283.07585), (4303, 2.6351, 12566.1517),
+        (425, 1.59, 3.523), (119, 5.796, 26.298), (109, 2.966, 1577.344),
+        (93, 2.59, 18849.23), (72, 1.14, 529.69), (68, 1.87, 398.15),
+        (67, 4.41, 5507.55), (59, 2.89, 5223.69), (56, 2.17, 155.42),
+        (45, 0.4, 796.3), (36, 0.47, 775.52), (29, 2.65, 7.11),
+        (21, 5.34, 0.98), (19, 1.85, 5486.78), (19, 4.97, 213.3),
+        (17, 2.99, 6275.96), (16, 0.03, 2544.31), (16, 1.43, 2146.17),
+        (15, 1.21, 10977.08), (12, 2.83, 1748.02), (12, 3.26, 5088.63),
+        (12, 5.27, 1194.45), (12, 2.08, 4694.0), (11, 0.77, 553.57),
+        (10, 1.3, 6286.6), (10, 4.24, 1349.87), (9, 2.7, 242.73),
+        (9, 5.64, 951.72), (8, 5.3, 2352.87), (6, 2.65, 9437.76),
+        (6, 4.67, 4690.48),
+    )
+    _L2 = (
+        (52919, 0, 0), (8720, 1.0721, 6283.0758), (309, 0.867, 12566.152),
+        (27, 0.05, 3.52), (16, 5.19, 26.3), (16, 3.68, 155.42),
+        (10, 0.76, 18849.23), (9, 2.06, 77713.77), (7, 0.83, 775.52),
+        (5, 4.66, 1577.34), (4, 1.03, 7.11), (4, 3.44, 5573.14),
+        (3, 5.14, 796.3), (3, 6.05, 5507.55), (3, 1.19, 242.73),
+        (3, 6.12, 529.69), (3, 0.31, 398.15), (3, 2.28, 553.57),
+        (2, 4.38, 5223.69), (2, 3.75, 0.98),
+    )
+    _L3 = ((289, 5.844, 6283.076), (35, 0, 0), (17, 5.49, 12566.15),
+           (3, 5.2, 155.42), (1, 4.72, 3.52), (1, 5.3, 18849.23), (1, 5.97, 242.73))
+    _L4 = ((114, 3.142, 0), (8, 4.13, 6283.08), (1, 3.84, 12566.15))
+    _L5 = ((1, 3.14, 0),)
+    # 동경반경 (광행차 보정용, 주요 3항)
+    _R0 = ((100013989, 0, 0), (1670700, 3.0984635, 6283.07585), (13956, 3.05525, 12566.1517))
+
+    JD_J2000 = 2451545.0
+    TROPICAL_YEAR = 365.24219
+    KST_OFFSET_HOURS = 9  # 절입 시각은 한국 표준시(UTC+9) 기준
+
+    @staticmethod
+    def _series(terms, tau):
+        return sum(a * math.cos(b + c * tau) for a, b, c in terms)
+
+    @staticmethod
+    def solar_longitude(jde):
+        """역학시(JDE) 기준 태양의 겉보기 황경(도, 0~360)"""
+        s = AstroEngine._series
+        tau = (jde - AstroEngine.JD_J2000) / 365250.0
+        L = (s(AstroEngine._L0, tau) + tau * (s(AstroEngine._L1, tau) + tau * (s(AstroEngine._L2, tau)
+             + tau * (s(AstroEngine._L3, tau) + tau * (s(AstroEngine._L4, tau) + tau * s(AstroEngine._L5, tau)))))) / 1e8
+        R = s(AstroEngine._R0, tau) / 1e8
+        lon = math.degrees(L) + 180.0  # 일심 -> 지심
+
+        # 장동(Δψ) 근사 + FK5 보정 + 광행차 (단위: 각초)
+        T = tau * 10.0
+        omega = math.radians(125.04452 - 1934.136261 * T)
+        l_sun = math.radians(280.4665 + 36000.7698 * T)
+        l_moon = math.radians(218.3165 + 481267.8813 * T)
+        dpsi = (-17.20 * math.sin(omega) - 1.32 * math.sin(2 * l_sun)
+                - 0.23 * math.sin(2 * l_moon) + 0.21 * math.sin(2 * omega))
+        lon += (-0.09033 + dpsi - 20.4898 / R) / 3600.0
+        return lon % 360.0
+
+    @staticmethod
+    def delta_t(year):
+        """ΔT = TT - UT (초). Espenak & Meeus(2006) 다항식, 1900~2150 구간"""
+        y = year
+        if y < 1920:
+            t = y - 1900
+            return -2.79 + 1.494119 * t - 0.0598939 * t**2 + 0.0061966 * t**3 - 0.000197 * t**4
+        if y < 1941:
+            t = y - 1920
+            return 21.20 + 0.84493 * t - 0.0761 * t**2 + 0.0020936 * t**3
+        if y < 1961:
+            t = y - 1950
+            return 29.07 + 0.407 * t - t**2 / 233 + t**3 / 2547
+        if y < 1986:
+            t = y - 1975
+            return 45.45 + 1.067 * t - t**2 / 260 - t**3 / 718
+        if y < 2005:
+            t = y - 2000
+            return (63.86 + 0.3345 * t - 0.060374 * t**2 + 0.0017275 * t**3
+                    + 0.000651814 * t**4 + 0.00002373599 * t**5)
+        if y < 2050:
+            t = y - 2000
+            return 62.92 + 0.32217 * t + 0.005589 * t**2
+        return -20 + 32 * ((y - 1820) / 100) ** 2 - 0.5628 * (2150 - y)
+
+    @staticmethod
+    def term_instant(year, term_idx):
+        """
+        해당 연도 term_idx 번째 절기(0=소한 ... 23=동지)의 절입 시각 (KST, 초 단위 naive datetime)
+        태양 황경이 목표 각도에 도달하는 순간을 뉴턴 반복으로 구함
+        """
+        target = (285 + 15 * term_idx) % 360
+        # 초기값: J2000(1월 1.5일, 황경 약 280도)에서 선형 외삽
+        jde = (AstroEngine.JD_J2000 + (year - 2000) * AstroEngine.TROPICAL_YEAR
+               + ((target - 280.0) % 360) * AstroEngine.TROPICAL_YEAR / 360.0)
+        for _ in range(20):
+            diff = (target - AstroEngine.solar_longitude(jde) + 180.0) % 360.0 - 180.0
+            jde += diff * AstroEngine.TROPICAL_YEAR / 360.0
+            if abs(diff) < 1e-7:
+                break
+        jd_ut = jde - AstroEngine.delta_t(year + (term_idx + 0.5) / 24.0) / 86400.0
+        return (datetime(2000, 1, 1, 12)
+                + timedelta(days=jd_ut - AstroEngine.JD_J2000, hours=AstroEngine.KST_OFFSET_HOURS))
+
     @staticmethod
     def get_solar_term_precision(year, month, day, term_name):
         """
-        KASI 데이터가 없는 경우(1940-1999, 2028-2040) 사용하는 정밀 계산식
-        오차 범위: 약 1~2분 이내
+        절입 시각 (월, 일, 시, 분) 즉석 계산 - 분 단위 절사
+        (1900-2100 조회는 SolarTermTable 이 담당, 이 함수는 범위 밖/검증용)
         """
-        # 24절기별 태양 황경 (입춘=315도, 우수=330도, ..., 하지=90도, ...)
-        TERM_LONGITUDES = {
-            "소한": 285, "대한": 300, "입춘": 315, "우수": 330, "경칩": 345, "춘분": 0,
-            "청명": 15, "곡우": 30, "입하": 45, "소만": 60, "망종": 75, "하지": 90,
-            "소서": 105, "대서": 120, "입추": 135, "처서": 150, "백로": 165, "추분": 180,
-            "한로": 195, "상강": 210, "입동": 225, "소설": 240, "대설": 255, "동지": 270
-        }
-        
-        target_long = TERM_LONGITUDES.get(term_name)
-        if target_long is None: return None
-        
-        # 기준 시각 (2000년 입춘: 2월 4일 17:40경 = JD 2451579.236)
-        # 매우 단순화된 선형 근사 + 보정항
-        # 365.24219일마다 같은 황경이 돌아옴
-        from datetime import datetime as py_datetime, timedelta
-        
-        # 대략적인 절기 날짜 (manse.py SOLAR_TERMS 기준)
-        # SajuCoreEngine.SOLAR_TERMS 인덱스 활용
-        term_list = ["소한","대한","입춘","우수","경칩","춘분","청명","곡우","입하","소만","망종","하지",
-                     "소서","대서","입추","처서","백로","추분","한로","상강","입동","소설","대설","동지"]
-        t_idx = term_list.index(term_name)
-        
-        # 기준연도(2000) 기준 해당 절기 시각 (분 단위 정밀도 반영)
-        ref_times = {
-            "입춘": (2, 4, 17, 40), "경칩": (3, 5, 15, 43), "청명": (4, 4, 20, 32), 
-            "입하": (5, 5, 13, 50), "망종": (6, 5, 17, 59), "소서": (7, 7, 4, 14),
-            "입추": (8, 7, 14, 3), "백로": (9, 7, 16, 59), "한로": (10, 8, 8, 38),
-            "입동": (11, 7, 11, 48), "대설": (12, 7, 4, 37), "소한": (1, 6, 10, 1)
-        }
-        # 짝수 절기(중기) 포함
-        ref_times_all = {
-            "소한": (1, 6, 10, 1),   "대한": (1, 21, 3, 23),
-            "입춘": (2, 4, 17, 40),  "우수": (2, 19, 13, 13),
-            "경칩": (3, 5, 15, 43),  "춘분": (3, 20, 16, 35),
-            "청명": (4, 4, 20, 32),  "곡우": (4, 20, 3, 40),
-            "입하": (5, 5, 13, 50),  "소만": (5, 21, 2, 49),
-            "망종": (6, 5, 17, 59),  "하지": (6, 21, 10, 48),
-            "소서": (7, 7, 4, 14),   "대서": (7, 22, 21, 43),
-            "입추": (8, 7, 14, 3),   "처서": (8, 23, 4, 49),
-            "백로": (9, 7, 16, 59),  "추분": (9, 23, 2, 28),
-            "한로": (10, 8, 8, 38),  "상강": (10, 23, 11, 47),
-            "입동": (11, 7, 11, 48), "소설": (11, 22, 9, 19),
-            "대설": (12, 7, 4, 37),  "동지": (12, 21, 22, 37)
-        }
-        
-        m, d, h, mi = ref_times_all.get(term_name, (month, 15, 12, 0))
-        ref_dt = py_datetime(2000, m, d, h, mi)
-        
-        # 경과년도에 따른 회귀년(Tropical Year) 보정
-        diff_years = year - 2000
-        # 1회귀년 = 365.24219일
-        shift_days = diff_years * 365.24219
-        target_dt = ref_dt + timedelta(days=shift_days)
-        
-        # 윤년 보정 등 세부 사항은 timedelta가 내부적으로 처리함
-        return target_dt.month, target_dt.day, target_dt.hour, target_dt.minute
+        t_idx = _TERM_INDEX_24.get(term_name)
+        if t_idx is None:
+            return None
+        dt = AstroEngine.term_instant(year, t_idx)
+        return dt.month, dt.day, dt.hour, dt.minute
 
 
-@st.cache_data
-def lunar_to_solar(lunar_year, lunar_month, lunar_day, is_leap=False):
-    """음력 -> 양력 변환. KASI API 우선 사용, 실패 시 로컬 데이터 fallback."""
-    # 1. KASI API 시도 (키가 설정된 경우)
-    kasi_res = KasiAPI.lunar_to_solar_kasi(lunar_year, lunar_month, lunar_day, is_leap)
-    if kasi_res:
-        return kasi_res
+class SolarTermTable:
+    """
+    1900~2100 24절기 절입 시각 테이블 (분 단위)
+    - 값: 1900-01-01 00:00 KST 기준 경과 분(int32), 인덱스 = (연도-1900)*24 + 절기번호
+    - 파일 형식: MAGIC(4) + 시작연도(uint16) + 연도수(uint16) + int32 little-endian 배열
+      (값이 없는 칸은 MISSING)
+    - 프로세스당 1회 로드: astro_24terms.bin(천문 계산) 위에 kasi_24terms.bin(KASI 발표값)을 덮어씀
+      (astro 파일이 없으면 AstroEngine 으로 메모리에서만 계산 - 파일은 build_tables.py solar 로만 생성)
+    """
+    MAGIC = b"STT1"
+    MISSING = -2**31
+    FIRST_YEAR = 1900
+    LAST_YEAR = 2100
+    EPOCH = datetime(1900, 1, 1)
+    _EPOCH_ORD = date(1900, 1, 1).toordinal()
+    FILE_NAME = "astro_24terms.bin"
+    KASI_FILE_NAME = "kasi_24terms.bin"
+    KASI_LEGACY_JSON = "kasi_24terms.json"  # 구형 포맷: {"연도": {"절기": {month, day, hour, minute}}}
+
+    _minutes = None      # array('i') - 로드 전에는 None
+    _first_year = FIRST_YEAR
+    _n_years = 0
+    kasi_count = 0       # KASI 값으로 덮어쓴 칸 수
+
+    @classmethod
+    def path(cls):
+        return os.path.join(_DATA_DIR, cls.FILE_NAME)
+
+    @staticmethod
+    def pack(first_year, minutes):
+        """테이블 바이너리 직렬화 (빌더 공용)"""
+        arr = array("i", minutes)
+        if sys.byteorder != "little":
+            arr.byteswap()
+        return (SolarTermTable.MAGIC + struct.pack("<HH", first_year, len(arr) // 24)
+                + arr.tobytes())
+
+    @staticmethod
+    def unpack(blob):
+        """바이너리 -> (시작연도, array('i')). 형식 오류 시 ValueError"""
+        if blob[:4] != SolarTermTable.MAGIC or len(blob) < 8:
+            raise ValueError("잘못된 절기 테이블 형식")
+        first_year, n_years = struct.unpack("<HH", blob[4:8])
+        arr = array("i")
+        arr.frombytes(blob[8:8 + n_years * 24 * 4])
+        if sys.byteorder != "little":
+            arr.byteswap()
+        if len(arr) != n_years * 24:
+            raise ValueError("절기 테이블 길이 불일치")
+        return first_year, arr
+
+    @classmethod
+    def compute(cls, first_year=FIRST_YEAR, last_year=LAST_YEAR):
+        """AstroEngine 으로 전 구간 절입 시각(분) 생성"""
+        out = []
+        for y in range(first_year, last_year + 1):
+            for t_idx in range(24):
+                out.append(cls.to_minutes(AstroEngine.term_instant(y, t_idx)))
+        return out
+
+    @classmethod
+    def load(cls):
+        """테이블 로드 (프로세스당 1회)"""
+        if cls._minutes is not None:
+            return cls._minutes
+        try:
+            with open(cls.path(), "rb") as f:
+                first_year, minutes = cls.unpack(f.read())
+        except (OSError, ValueError):
+            first_year, minutes = cls.FIRST_YEAR, array("i", cls.compute())
+        cls._first_year, cls._n_years = first_year, len(minutes) // 24
+        cls.kasi_count = cls._overlay_kasi(minutes)
+        cls._minutes = minutes
+        return minutes
+
+    @classmethod
+    def _load_kasi(cls):
+        """KASI 테이블 -> (시작연도, array('i')). 바이너리 우선, 구형 JSON 은 1회 변환. 없으면 None"""
+        try:
+            with open(os.path.join(_DATA_DIR, cls.KASI_FILE_NAME), "rb") as f:
+                return cls.unpack(f.read())
+        except (OSError, ValueError):
+            pass
+        legacy = _load_json_cache(os.path.join(_DATA_DIR, cls.KASI_LEGACY_JSON)) or \
+            _load_json_cache(cls.KASI_LEGACY_JSON)
+        years = sorted(int(y) for y in legacy if str(y).isdigit())
+        if not years:
+            return None
+        out = array("i", [cls.MISSING]) * ((years[-1] - years[0] + 1) * 24)
+        for y in years:
+            for name, info in (legacy.get(str(y)) or {}).items():
+                t_idx = _TERM_INDEX_24.get(name)
+                try:
+                    dt = datetime(y, info["month"], info["day"], info["hour"], info["minute"])
+                except (TypeError, KeyError, ValueError):
+                    continue
+                if t_idx is not None:
+                    out[(y - years[0]) * 24 + t_idx] = cls.to_minutes(dt)
+        return years[0], out
+
+    @classmethod
+    def _overlay_kasi(cls, minutes):
+        """KASI 발표값을 천문 계산 테이블 위에 덮어씀. 반영 칸 수 반환"""
+        kasi = cls._load_kasi()
+        if kasi is None:
+            return 0
+        k_first, k_minutes = kasi
+        count = 0
+        for i, v in enumerate(k_minutes):
+            pos = (k_first - cls._first_year) * 24 + i
+            if v != cls.MISSING and 0 <= pos < len(minutes):
+                minutes[pos] = v
+                count += 1
+        return count
+
+    @classmethod
+    def to_minutes(cls, dt):
+        """datetime -> 1900 기준 경과 분 (초 절사)"""
+        delta = dt - cls.EPOCH
+        return delta.days * 1440 + delta.seconds // 60
+
+    @classmethod
+    def minutes(cls, year, term_idx):
+        """절입 시각(1900 기준 경과 분). 범위 밖이면 None"""
+        arr = cls._minutes if cls._minutes is not None else cls.load()
+        y_off = year - cls._first_year
+        if 0 <= y_off < cls._n_years:
+            return arr[y_off * 24 + term_idx]
+        return None
 
-    # 2. 로컬 데이터 Fallback
-    if lunar_year not in _LUNAR_DATA:
-        return date(lunar_year, lunar_month, lunar_day)
+    @classmethod
+    def get(cls, year, term_idx):
+        """절입 시각 (월, 일, 시, 분). 범위 밖이면 None"""
+        v = cls.minutes(year, term_idx)
+        if v is None:
+            return None
+        days, rem = divmod(v, 1440)
+        d = date.fromordinal(cls._EPOCH_ORD + days)
+        return d.month, d.day, rem // 60, rem % 60
 
-    solar_start_mmdd, month_days, leap_month = _LUNAR_DATA[lunar_year]
-    solar_start = date(lunar_year, solar_start_mmdd[0], solar_start_mmdd[1])
+    @classmethod
+    def get_datetime(cls, year, term_idx):
+        """절입 시각 datetime (범위 밖이면 즉석 계산, 분 단위 절사)"""
+        v = cls.minutes(year, term_idx)
+        if v is None:
+            return AstroEngine.term_instant(year, term_idx).replace(second=0, microsecond=0)
+        return cls.EPOCH + timedelta(minutes=v)
 
-    # 경과 일수 계산
-    elapsed = 0
-    for m in range(1, lunar_month):
-        # 윤달 처리: 해당 달 앞에 윤달이 있으면 +1
-        idx = m - 1
-        if leap_month > 0 and m > leap_month:
-            idx += 1
-        elapsed += month_days[idx]
 
-    # 요청한 달이 윤달인 경우
-    if is_leap and leap_month == lunar_month:
-        elapsed += month_days[lunar_month - 1]  # 정달 넘기고
+def lunar_to_solar(lunar_year, lunar_month, lunar_day, is_leap=False):
+    """음력 -> 양력 변환. 내장 테이블(1900-2100) 우선, 범위 밖만 KASI API 조회.
+    테이블 범위 안에서 존재하지 않는 날짜는 None."""
+    # 1. 로컬 테이블 (네트워크 없이 O(1))
+    if LunarTable.leap_month(lunar_year) is not None:
+        return LunarTable.to_solar(lunar_year, lunar_month, lunar_day, is_leap)
 
-    elapsed += lunar_day - 1
-    return solar_start + timedelta(days=elapsed)
+    # 2. 범위 밖: KASI API 시도 (키가 설정된 경우)
+    kasi_res = KasiAPI.lunar_to_solar_kasi(lunar_year, lunar_month, lunar_day, is_leap)
+    if kasi_res:
+        return kasi_res
+    return date(lunar_year, lunar_month, lunar_day)
 
 
-@st.cache_data
 def solar_to_lunar(solar_date):
     """양력 -> 음력 변환. 반환: (음력년, 음력월, 음력일, 윤달여부)"""
-    for ly in sorted(_LUNAR_DATA.keys()):
-        solar_start_mmdd, month_days, leap_month = _LUNAR_DATA[ly]
-        solar_start = date(ly, solar_start_mmdd[0], solar_start_mmdd[1])
-        total_days = sum(month_days)
-        solar_end = solar_start + timedelta(days=total_days - 1)
-
-        if solar_start <= solar_date <= solar_end:
-            diff = (solar_date - solar_start).days
-            lm = 1
-            is_leap = False
-            for m_idx, days in enumerate(month_days):
-                if diff < days:
-                    # 윤달 판별
-                    if leap_month > 0 and m_idx > leap_month:
-                        actual_m = m_idx  # 윤달 이후 조정
-                        if m_idx == leap_month:
-                            is_leap = True
-                            actual_m = leap_month
-                        else:
-                            actual_m = m_idx
-                    else:
-                        actual_m = m_idx + 1
-                    return (ly, actual_m, diff + 1, is_leap)
-                diff -= days
-                lm += 1
+    res = LunarTable.to_lunar(solar_date)
+    if res:
+        return res
     # 범위 밖
     return (solar_date.year, solar_date.month, solar_date.day, False)
 
@@ -753,16 +1101,13 @@ class PersonalityEngine:
 
 def _local_saju_engine(pils, name, birth_year, gender, query):
     """만세력/격국/용신/대운 엔진 기반 로컬 사주 상담 (무당 말투) — 재사용 가능 모듈"""
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
     import re as _re
     from datetime import date as _d_today
     q = query or ""
     current_year = datetime.now().year
     ilgan = pils[1]["cg"] if len(pils) > 1 else "?"
-    _ss = st.session_state
-    bm  = _ss.get("birth_month",  1)
-    bd  = _ss.get("birth_day",    1)
-    bh  = _ss.get("birth_hour",  12)
-    bmn = _ss.get("birth_minute", 0)
+    bm, bd, bh, bmn = ctx.birth_month, ctx.birth_day, ctx.birth_hour, ctx.birth_minute
 
     is_today = bool(_re.search(r'오늘|일진|내일|이번주', q))
     is_year  = bool(_re.search(r'올해|세운|금년|올해운세|2025|2026|2027', q)) or is_today
@@ -786,7 +1131,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
     try:
         if is_today:
             today = _d_today.today()
-            sw = get_yearly_luck(pils, current_year)
+            sw = ctx.yearly_luck(current_year)
             sw_ss = sw.get("십성_천간","") or "-"
             sw_gh = sw.get("길흉","평")
             sw_gan= sw.get("세운","")
@@ -882,7 +1227,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
                 }
                 out.append(f"\n{_GH_TODAY.get(sw_gh, '오늘 하루 평온한 기운이니라.')}\n")
 
-            sw_n = get_yearly_luck(pils, current_year + 1)
+            sw_n = ctx.yearly_luck(current_year + 1)
             sw_n_ss = sw_n.get("십성_천간","")
             sw_n_kr = _SS_KR2.get(sw_n_ss, sw_n_ss)
             out.append(f"\n내년 {current_year+1}년은 {sw_n.get('세운','')} [{sw_n_ss}/{sw_n_kr}] 기운이 다가오고 있으니 미리 내다보게.\n")
@@ -890,7 +1235,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
 
 
         elif is_year:
-            sw    = get_yearly_luck(pils, current_year)
+            sw    = ctx.yearly_luck(current_year)
             sw_ss = sw.get("십성_천간",""); sw_gh = sw.get("길흉",""); sw_gan = sw.get("세운","")
             try: tp = calc_turning_point(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
             except Exception: tp = {}
@@ -931,15 +1276,15 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             elif "주요" in tp_int or "변화" in tp_int:
                 out.append(f"\n**🔄 중요한 변화 감지** 운세 변화폭 {tp_sc:+d}점 — {tp_int}\n")
                 for r in tp_rsn[:2]: out.append(f"• {r}\n")
-            sw_n  = get_yearly_luck(pils, current_year+1)
-            sw_n2 = get_yearly_luck(pils, current_year+2)
+            sw_n  = ctx.yearly_luck(current_year+1)
+            sw_n2 = ctx.yearly_luck(current_year+2)
             out.append(f"\n**[내년 미리보기]** {current_year+1}년: {sw_n.get('세운','')} [{sw_n.get('십성_천간','')}] {sw_n.get('길흉','')}\n")
             out.append(f"**[후년 미리보기]** {current_year+2}년: {sw_n2.get('세운','')} [{sw_n2.get('십성_천간','')}] {sw_n2.get('길흉','')}")
 
         elif is_lotto:
-            sw    = get_yearly_luck(pils, current_year)
+            sw    = ctx.yearly_luck(current_year)
             ys    = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
-            si    = get_ilgan_strength(ilgan, pils)
+            si    = ctx.strength
             sw_ss = sw.get("십성_천간","")
             sw_gh = sw.get("길흉","")
             sw_gan= sw.get("세운","")
@@ -974,7 +1319,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
 
             gold_lotto = []
             for yr in range(current_year, current_year + 6):
-                sw_l = get_yearly_luck(pils, yr)
+                sw_l = ctx.yearly_luck(yr)
                 ss_l = sw_l.get("십성_천간","")
                 yo_l = OH.get(sw_l.get("세운","")[:1], "")
                 if ss_l == "偏財" and sw_l.get("길흉","") in ("길","+"):
@@ -992,7 +1337,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
 
         elif is_money:
 
-            gk  = get_gyeokguk(pils)
+            gk  = ctx.gyeokguk
             ys  = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
             gkn = gk["격국명"] if gk else "미정격"
             y1  = ys.get("용신_1순위","-"); y2 = ys.get("용신_2순위","-")
@@ -1016,7 +1361,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             gold_ohs = {o for o in [y1, y2] if o in ("木","火","土","金","水")}
             gold_yrs = []
             for yr in range(current_year, current_year+11):
-                sw_g = get_yearly_luck(pils, yr)
+                sw_g = ctx.yearly_luck(yr)
                 if OH.get((sw_g.get("세운","")[:1]),"") in gold_ohs:
                     sw_g_ss = sw_g.get("십성_천간","")
                     star = "★★★" if sw_g_ss in ("偏財","正財","食神") else "★★" if sw_g_ss in ("正官","正印") else "★"
@@ -1035,7 +1380,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             except Exception: pass
             # 기신 대운 경고
             try:
-                dw_list_m = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmn, gender)
+                dw_list_m = ctx.daewoon
                 gisin_ohs = set(ys.get("기신",[]))
                 gisin_dws = [dw for dw in dw_list_m
                              if OH.get(dw.get("cg",""),"") in gisin_ohs and dw["종료연도"] >= current_year]
@@ -1052,7 +1397,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             out.append(f"**{name}의 인연·결혼운 완전 분석**\n허어, 인연의 실타래를 신안으로 살펴보겠느니라.\n")
 
             # 1. 배우자 자리(정재/편재 또는 정관/편관) 분석
-            yk = get_yukjin(ilgan, pils, gender)
+            yk = ctx.yukjin
             spouse_keys = (["아내","처","正財","妻"] if gender == "남" else ["남편","夫","正官","情夫","편관"])
             for rel in yk:
                 rn = rel.get("관계","")
@@ -1086,7 +1431,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
 
             # 3. 대운에서 재성/관성운 들어오는 시기
             try:
-                daewoon = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmn, gender)
+                daewoon = ctx.daewoon
                 love_dw_ss = {"偏財","正財"} if gender == "남" else {"偏官","正官"}
                 love_dws = [dw for dw in daewoon
                             if TEN_GODS_MATRIX.get(ilgan,{}).get(dw["cg"],"") in love_dw_ss
@@ -1104,7 +1449,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             love_yr_ss = {"偏財","正財"} if gender == "남" else {"偏官","正官"}
             love_yrs = []
             for yr in range(current_year, current_year + 4):
-                sw_l = get_yearly_luck(pils, yr)
+                sw_l = ctx.yearly_luck(yr)
                 sw_ss_l = sw_l.get("십성_천간","")
                 if sw_ss_l in love_yr_ss:
                     love_yrs.append(f"**{yr}년**({yr-birth_year+1}세): {sw_l.get('세운','')} [{sw_ss_l}] {sw_l.get('길흉','')} ← 이성 인연 기운이 강하느니라!")
@@ -1113,14 +1458,14 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
                 for ly in love_yrs: out.append(f"* {ly}\n")
                 out.append("이 해들에 적극적으로 인연을 찾아 나서게. 하늘이 돕는 시기니라!\n")
             else:
-                sw_now = get_yearly_luck(pils, current_year)
+                sw_now = ctx.yearly_luck(current_year)
                 out.append(f"\n올해 {sw_now.get('세운','')} [{sw_now.get('십성_천간','')}] — 향후 3년은 이성 세운이 약하니 자기계발로 내실을 다지는 시기니라. 인연은 준비된 자에게 오느니라.\n")
 
             # 5. 도화살 확인
             try:
                 sinsal = get_special_stars(pils)
                 dohwa_found = [s for s in sinsal if "도화" in s.get("name","")]
-                ss12 = get_12sinsal(pils)
+                ss12 = ctx.sinsal
                 dohwa12 = [s for s in ss12 if "도화" in s.get("이름","") or "년살" in s.get("이름","")]
                 if dohwa_found or dohwa12:
                     out.append("\n**[신살 — 도화살(桃花殺)]** 도화살이 사주에 있구먼!\n이성의 인기를 한몸에 받는 매력의 기운이니라. 이성이 먼저 다가오는 팔자이나, 감정에 휩쓸려 경솔한 선택을 하지 않도록 명심하게.\n")
@@ -1132,7 +1477,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             current_age = current_year - birth_year + 1
             out.append(f"\n**[결혼 적령기 — 현재 {current_age}세]**\n")
             try:
-                daewoon2 = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmn, gender)
+                daewoon2 = ctx.daewoon
                 love_ss2 = {"偏財","正財"} if gender == "남" else {"偏官","正官"}
                 future_dws = [dw for dw in daewoon2
                               if TEN_GODS_MATRIX.get(ilgan,{}).get(dw["cg"],"") in love_ss2
@@ -1146,7 +1491,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
                         out.append(f"**{bd2['시작연도']}년({bd2['시작나이']}세)**부터 {bd2['str']} **{bd2_ss}** 대운이 열리느니라. 그 무렵 결혼 결실이 맺어질 가능성이 높느니라.\n")
                 else:
                     for yr in range(current_year, current_year + 10):
-                        sw_y = get_yearly_luck(pils, yr)
+                        sw_y = ctx.yearly_luck(yr)
                         if sw_y.get("십성_천간","") in ({"偏財","正財"} if gender == "남" else {"偏官","正官"}):
                             out.append(f"**{yr}년({yr-birth_year+1}세)** 세운에 인연 기운이 들어오느니라. 그 무렵 준비하게.\n")
                             break
@@ -1165,13 +1510,13 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             out.append(f"타고난 취약 신체: **{_OHB.get(ilgan_oh,'전반적 건강')}**\n")
             out.append(_OHA.get(ilgan_oh,'규칙적인 생활이 핵심이니라.') + "\n")
             # 오행 과다/부족 건강 경고
-            oh_s = calc_ohaeng_strength(ilgan, pils)
+            oh_s = ctx.ohaeng
             for o, v in oh_s.items():
                 if v >= 35: out.append(f"\n⚠️ **{OHN.get(o,'')}({o}) 과다({v}%):** {_OHB.get(o,'')} 계통 특히 조심하게. 과다한 오행이 해당 장기를 혹사시키느니라.")
                 elif v <= 5: out.append(f"\n💊 **{OHN.get(o,'')}({o}) 부족({v}%):** {_OHB.get(o,'')} 계통 보강하게. 부족한 오행이 해당 장기를 약하게 만드느니라.")
             # 현재 대운 건강 영향
             try:
-                dw_list_h = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmn, gender)
+                dw_list_h = ctx.daewoon
                 cdw_h = next((d for d in dw_list_h if d["시작연도"] <= current_year <= d["종료연도"]), None)
                 if cdw_h:
                     cdw_ss_h = TEN_GODS_MATRIX.get(ilgan,{}).get(cdw_h["cg"],"-")
@@ -1193,7 +1538,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
                     out.append(f"이 대운 오행: **{OHN.get(cdw_oh_h,'')}({cdw_oh_h})** — {_OHB.get(cdw_oh_h,'')} 계통에 영향을 주느니라.\n")
             except Exception: pass
             # 올해 세운 건강 경보
-            sw_hlt = get_yearly_luck(pils, current_year)
+            sw_hlt = ctx.yearly_luck(current_year)
             sw_hlt_ss = sw_hlt.get("십성_천간","")
             if sw_hlt_ss == "偏官":
                 out.append(f"\n⚠️ 올해({current_year}년) {sw_hlt.get('세운','')} [偏官] 세운 — 건강 사고 위험 높은 해니라. 무리한 활동·수술 신중하게.\n")
@@ -1201,7 +1546,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
                 out.append(f"\n올해({current_year}년) {sw_hlt.get('세운','')} [傷官] 세운 — 과로와 신경 소모가 심한 해니라. 충분한 휴식이 최우선이니라.\n")
 
         elif is_dw:
-            daewoon = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmn, gender)
+            daewoon = ctx.daewoon
             cdw = next((d for d in daewoon if d["시작연도"] <= current_year <= d["종료연도"]), None)
             out.append(f"**{name}의 대운 흐름 완전 분석**\n")
             # 용신 기반 황금기/주의기 판별
@@ -1265,11 +1610,11 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
                     for d in past_dz[:2]: out.append(f"* {d.get('age','')}: {d.get('desc','')}\n")
 
         elif is_job:
-            gk  = get_gyeokguk(pils)
+            gk  = ctx.gyeokguk
             gkn = gk["격국명"] if gk else "미정격"
             ys2 = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
             y1j = ys2.get("용신_1순위", "-")
-            si_j = get_ilgan_strength(ilgan, pils)
+            si_j = ctx.strength
             sn_j = si_j.get("신강신약","중화")
             _JOB = {
                 "정관격":"조직·공직·행정·관리직·법조가 천직이니라. 안정된 조직 안에서 명예와 재물이 함께 오느니라. 공무원·대기업·공공기관이 최적이니라.",
@@ -1302,7 +1647,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             out.append(_JOB.get(gkn, f"{gkn}의 독특한 기운을 살려 자신만의 길을 개척해야 하느니라.") + "\n")
             # 십성 분포 분석
             try:
-                ss_list_j = calc_sipsung(ilgan, pils)
+                ss_list_j = ctx.sipsung
                 _GRP = {"비견":"비겁","겁재":"비겁","식신":"식상","상관":"식상","정재":"재성",
                         "편재":"재성","정관":"관성","편관":"관성","정인":"인성","편인":"인성"}
                 sc_cnt = {}
@@ -1325,21 +1670,21 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             elif "신약" in sn_j:
                 out.append(f"\n**신약({sn_j})** — 안정된 조직·전문직 안에서 귀인의 도움을 받는 것이 최적이니라. 창업보다 전문성 강화가 우선이니라.\n")
             # 올해 진로 세운
-            sw_j = get_yearly_luck(pils, current_year)
+            sw_j = ctx.yearly_luck(current_year)
             sw_j_ss = sw_j.get("십성_천간","")
             out.append(f"\n올해({current_year}년) {sw_j.get('세운','')} [{sw_j_ss}] {sw_j.get('길흉','')} — {_SWJOB.get(sw_j_ss, sw_j_ss + ' 기운의 해이니 흐름을 잘 읽고 움직이게.')}\n")
             out.append(f"\n용신 **{y1j}** 오행이 강한 해에 진로 결정을 내리면 가장 유리하느니라. 명심하게!\n")
 
         elif is_char:
-            gk  = get_gyeokguk(pils)
-            si  = get_ilgan_strength(ilgan, pils)
+            gk  = ctx.gyeokguk
+            si  = ctx.strength
             gkn = gk["격국명"] if gk else "미정격"
             sn  = si.get("신강신약", "중화")
             sc  = si.get("일간점수", 50)
             _CG_KR = {'甲':'갑','乙':'을','丙':'병','丁':'정','戊':'무','己':'기','庚':'경','辛':'신','壬':'임','癸':'계'}
             _ilgan_k = f"{ilgan}({_CG_KR.get(ilgan, '')})"
             _CHR = ILGAN_CHAR_DESC.get(_ilgan_k, ILGAN_CHAR_DESC.get(ilgan, {}))
-            oh_s_c = calc_ohaeng_strength(ilgan, pils)
+            oh_s_c = ctx.ohaeng
             out.append(f"**{name}의 성격·기질 완전 분석**\n일간 **{ilgan}** | 격국 **{gkn}** | **{sn}**(점수 {sc}/100)\n")
             out.append(_CHR.get("성격_핵심", f"일간 {ilgan}의 기운이 삶 전반을 이끄느니라.") + "\n")
             if _CHR.get("장점"): out.append(f"\n**[장점]** {_CHR['장점']}\n")
@@ -1364,13 +1709,13 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             }
             for o, v in oh_s_c.items():
                 if v >= 35: out.append(f"\n{_OHC.get(o,'')}\n")
-            sw = get_yearly_luck(pils, current_year)
+            sw = ctx.yearly_luck(current_year)
             out.append(f"\n올해({current_year}년)는 {sw.get('세운','')} [{sw.get('십성_천간','')}] {sw.get('길흉','')} 기운이니 그 흐름을 잘 타게.\n")
 
         elif is_avoid:
-            sw   = get_yearly_luck(pils, current_year)
+            sw   = ctx.yearly_luck(current_year)
             ys   = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
-            si   = get_ilgan_strength(ilgan, pils)
+            si   = ctx.strength
             sw_ss= sw.get("십성_천간","")
             sw_gh= sw.get("길흉","")
             y1   = ys.get("용신_1순위","-")
@@ -1410,7 +1755,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
                 out.append(f"\n신약 팔자는 타인에게 쉽게 끌려다니니 중요한 결정은 혼자 성급히 내리지 말게.\n")
 
         elif is_lucky:
-            sw   = get_yearly_luck(pils, current_year)
+            sw   = ctx.yearly_luck(current_year)
             ys   = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
             y1   = ys.get("용신_1순위","-")
             heui = ys.get("희신","-")
@@ -1428,7 +1773,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             out.append(_OH_DAY.get(heui, "") + "\n" if heui in _OH_DAY else "")
             gold_yrs2 = []
             for yr in range(current_year, current_year + 5):
-                sw_g2 = get_yearly_luck(pils, yr)
+                sw_g2 = ctx.yearly_luck(yr)
                 ss_g2 = sw_g2.get("십성_천간","")
                 yo_g2 = OH.get(sw_g2.get("세운","")[:1],"")
                 if yo_g2 in {y1, heui}:
@@ -1438,9 +1783,9 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
                 for gyr in gold_yrs2: out.append(gyr + "\n")
 
         elif is_move:
-            sw   = get_yearly_luck(pils, current_year)
+            sw   = ctx.yearly_luck(current_year)
             ys   = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
-            si   = get_ilgan_strength(ilgan, pils)
+            si   = ctx.strength
             sw_ss= sw.get("십성_천간","")
             y1   = ys.get("용신_1순위","-")
             heui = ys.get("희신","-")
@@ -1465,7 +1810,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
                 out.append("\n신약형이니 귀인의 소개·추천을 통한 이직이 단독 도전보다 훨씬 유리하느니라.\n")
 
         elif is_study:
-            sw   = get_yearly_luck(pils, current_year)
+            sw   = ctx.yearly_luck(current_year)
             ys   = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
             sw_ss= sw.get("십성_천간","")
             y1   = ys.get("용신_1순위","-")
@@ -1488,12 +1833,12 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             out.append(f"\n용신 **{y1}** — {_OH_STUDY.get(y1, f'{y1} 오행 기운을 활용하여 학습 전략을 세우게.')}\n")
 
         elif is_family:
-            sw   = get_yearly_luck(pils, current_year)
+            sw   = ctx.yearly_luck(current_year)
             ys   = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
-            si   = get_ilgan_strength(ilgan, pils)
+            si   = ctx.strength
             sw_ss= sw.get("십성_천간","")
             sn   = si.get("신강신약","중화")
-            yk   = get_yukjin(ilgan, pils, gender)
+            yk   = ctx.yukjin
             out.append(f"**{name}의 가족·인연운 분석**\n허허, 가족은 사주의 거울이니라. 신안으로 살펴보겠느니라.\n")
             _FAM_REL = {"인성": "부모·윗사람과의 관계가 사주의 핵심이니라.", "재성": "배우자·자녀와의 인연이 재물과 직결되느니라.",
                         "관성": "자녀(특히 아들)와 직장이 연결된 팔자니라.", "비겁": "형제·동료 관계가 운의 핵심이니라."}
@@ -1512,10 +1857,10 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
 
         else:
             # ─── 스마트 catch-all: 어떤 질문이든 용신·세운 기반으로 실질 답변 ───
-            gk  = get_gyeokguk(pils)
+            gk  = ctx.gyeokguk
             ys  = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
-            si  = get_ilgan_strength(ilgan, pils)
-            sw  = get_yearly_luck(pils, current_year)
+            si  = ctx.strength
+            sw  = ctx.yearly_luck(current_year)
             gkn = gk["격국명"] if gk else "미정격"
             sn  = si.get("신강신약","중화"); sc = si.get("일간점수",50)
             y1  = ys.get("용신_1순위","-"); heui = ys.get("희신","-")
@@ -1552,7 +1897,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
             # 향후 최선의 시기
             best_yrs = []
             for yr in range(current_year, current_year + 5):
-                sw_b = get_yearly_luck(pils, yr)
+                sw_b = ctx.yearly_luck(yr)
                 yo_b = OH.get(sw_b.get("세운","")[:1],"")
                 if yo_b in {y1, heui}:
                     best_yrs.append(f"  * **{yr}년**({yr-birth_year+1}세): {sw_b.get('세운','')} [{sw_b.get('십성_천간','')}] ← 용신 기운의 황금기!")
@@ -1564,7 +1909,7 @@ def _local_saju_engine(pils, name, birth_year, gender, query):
     except Exception as _le:
         out.append(f"\n허어, 기운이 잠시 흔들렸느니라. 기본 팔자로 답을 드리겠네.\n")
         try:
-            sw = get_yearly_luck(pils, current_year)
+            sw = ctx.yearly_luck(current_year)
             out.append(f"올해 {sw.get('세운','')} [{sw.get('십성_천간','')}] {sw.get('길흉','')} 기운이니라.\n")
         except Exception:
             pass
@@ -1636,7 +1981,7 @@ def quick_consult_bar(pils, name, birth_year, gender, api_key, groq_key):
 
             # 5. 전환점 감지
             try:
-                luck_score = calc_luck_score(pils, birth_year, gender, current_year)
+                luck_score = LifeEventIndex.from_session(pils, birth_year, gender).luck_score(current_year)
                 pivot_info = ChangeRadarEngine.detect_pivot(name, luck_score)
                 if pivot_info["is_pivot"]:
                     st.info(f"🛰️ **전환점 감지:** {pivot_info['message']}")
@@ -1878,19 +2223,21 @@ class BatchSimulationEngine:
         
         import time
         start_t = time.time()
-        
-        for u in users:
-            # 엔진 계산만 수행 (AI 호출 제외로 부하 방지)
-            if u["calendar"] == "양력":
-                pils = SajuCoreEngine.get_pillars(u["year"], u["month"], u["day"], u["hour"], 0, "남" if u["gender"]=="남성" else "여")
-            else:
-                s_date = lunar_to_solar(u["year"], u["month"], u["day"], False)
-                pils = SajuCoreEngine.get_pillars(s_date.year, s_date.month, s_date.day, u["hour"], 0, "남" if u["gender"]=="남성" else "여")
-            
+
+        # 음력 입력은 양력으로 변환 후 팔자는 한 번에 일괄 계산 (엔진 계산만, AI 호출 제외)
+        solar = [(u["year"], u["month"], u["day"]) if u["calendar"] == "양력"
+                 else (lambda s: (s.year, s.month, s.day))(lunar_to_solar(u["year"], u["month"], u["day"], False))
+                 for u in users]
+        genders = ["남" if u["gender"] == "남성" else "여" for u in users]
+        batch = SajuCoreEngine.get_pillars_batch([s[0] for s in solar], [s[1] for s in solar], [s[2] for s in solar],
+                                                 [u["hour"] for u in users], 0, genders)
+
+        for i, u in enumerate(users):
+            pils = SajuCoreEngine.pillars_from_indices(batch["cg"][i], batch["jj"][i])
             ilgan = pils[1]["cg"]
             stats["ilgan_dist"][ilgan] = stats["ilgan_dist"].get(ilgan, 0) + 1
-            
-            luck_s = calc_luck_score(pils, u["year"], "남" if u["gender"]=="남성" else "여", 2026)
+
+            luck_s = calc_luck_score(pils, u["year"], genders[i], target_year=2026)
             stats["luck_scores"].append(luck_s)
             
             if luck_s >= 85:
@@ -2014,10 +2361,11 @@ def build_saju_context_dict(pils, birth_year, gender, current_year, topic):
     # [시(0), 일(1), 월(2), 년(3)] 순서 반영 
     # (주의: PillarEngine에 따라 인덱스가 다를 수 있으나 현재 manse.py 관례 준수)
     try:
+        ctx = ChartContext.of(pils, birth_year, gender=gender)
         ilgan = pils[1]["cg"] if len(pils) > 1 else "?"
-        gyeok_data = get_gyeokguk(pils)
+        gyeok_data = ctx.gyeokguk
         # 용신 엔진은 multilayer 또는 단일 호출 가능. 여기서는 단일 호출 래퍼 사용
-        ys_data = get_yongshin(pils)
+        ys_data = ctx.yongshin
         
         return {
             "내담자_일간": ilgan,
@@ -2692,6 +3040,354 @@ OH_COLOR = {"목":"초록, 청색","화":"빨강, 주황","토":"노랑, 갈색"
 OH_NUM = {"木":"1, 3","火":"2, 7","土":"5, 0","金":"4, 9","水":"1, 6"}
 OH_FOOD = {"木":"신맛, 푸른 채소","火":"쓴맛, 붉은 과일","土":"단맛, 뿌리 채소","金":"매운맛, 흰색 육류","水":"짠맛, 해조류/검은콩"}
 
+# ==================================================
+#  엔진 메모 (st.cache_data 경량 대체)
+#  - st.cache_data 는 pils(dict 리스트)를 pickle 해 해시하고 적중 때마다 결과를 deepcopy 함
+#    -> 페이지당 수백 번 불리는 작은 순수 함수에서는 계산보다 해시/복사가 더 비쌈
+#  - engine_memo : pils 정수 지문 + 나머지 인수로 키, 결과는 1회 동결해 사본 없이 반환
+# ==================================================
+_FP_CG = {**{c: i for i, c in enumerate(CG)},
+          **{f"{c}({k})": i | 16 for i, (c, k) in enumerate(zip(CG, CG_KR))}}
+_FP_JJ = {**{j: i for i, j in enumerate(JJ)},
+          **{f"{j}({k})": i | 16 for i, (j, k) in enumerate(zip(JJ, JJ_KR))}}
+
+
+def pils_fingerprint(pils):
+    """
+    pils dict 리스트 -> 정수 지문 (기둥마다 천간/지지 4비트 + 표기 비트)
+    - "甲" / "甲(갑)" 표기를 구분 (결과 문자열 표기가 입력을 따르는 함수가 있음)
+    - 해석할 수 없는 입력이면 None
+    """
+    code = 1
+    try:
+        for p in pils:
+            code = (code << 10) | (_FP_CG[p["cg"]] << 5) | _FP_JJ[p["jj"]]
+    except (KeyError, TypeError):
+        return None
+    return code
+
+
+class _FrozenDict(dict):
+    """메모 결과용 읽기 전용 dict (json/pickle/isinstance 호환)"""
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("engine_memo 결과는 읽기 전용입니다 - dict(...) 로 사본을 만들어 수정하세요")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class _FrozenList(list):
+    """메모 결과용 읽기 전용 list"""
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("engine_memo 결과는 읽기 전용입니다 - list(...) 로 사본을 만들어 수정하세요")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = clear = extend = insert = pop = remove = reverse = sort = _readonly
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def _freeze(v):
+    """dict/list 결과를 재귀적으로 읽기 전용 컨테이너로 변환"""
+    if isinstance(v, dict):
+        return _FrozenDict((k, _freeze(x)) for k, x in v.items())
+    if isinstance(v, list):
+        return _FrozenList(_freeze(x) for x in v)
+    if isinstance(v, tuple):
+        return tuple(_freeze(x) for x in v)
+    if isinstance(v, set):
+        return frozenset(v)
+    return v
+
+
+# 함수별 캐시 정책 (최대 항목수, TTL 초 | None)
+#   - 장기 구동 서버에서 사용자 수와 무관하게 메모리 상한이 정해지도록 모든 엔진 캐시에 상한을 둠
+#   - 내부에서 datetime.now() 를 쓰는 함수는 TTL 로 날짜/연도 경계를 넘기지 않게 함
+ENGINE_CACHE_POLICY = {
+    "get_pillars":                (8192, None),
+    "get_gyeokguk":               (2048, None),
+    "get_yukjin":                 (2048, None),
+    "get_ilgan_strength":         (2048, None),
+    "get_yongshin":               (2048, None),
+    "calc_sipsung":               (2048, None),
+    "calc_ohaeng_strength":       (2048, None),
+    "get_special_stars":          (2048, None),
+    "get_12sinsal":               (2048, None),
+    "get_yearly_luck":            (16384, None),
+    "get_monthly_luck":           (8192, None),
+    "calc_luck_score":            (8192, 6 * 3600),
+    "build_past_events":          (256, 6 * 3600),
+    "generate_engine_highlights": (256, 6 * 3600),
+    "get_yongshin_multilayer":    (1024, 6 * 3600),
+}
+_DEFAULT_CACHE_POLICY = (1024, None)
+
+
+def approx_size(obj, _seen=None):
+    """컨테이너를 따라가며 sys.getsizeof 합산 (같은 객체는 1회만)"""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(approx_size(k, _seen) + approx_size(v, _seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(approx_size(x, _seen) for x in obj)
+    elif isinstance(obj, np.ndarray):
+        size = obj.nbytes + 112
+    elif hasattr(obj, "__slots__"):
+        size += sum(approx_size(getattr(obj, a, None), _seen) for a in obj.__slots__)
+    return size
+
+
+class EngineMemo:
+    """
+    순수 엔진 함수 메모 (함수별 LRU + TTL + 메모리 추정 + 카운터)
+    - 키: 인수 중 pils 리스트는 pils_fingerprint, 나머지는 값 그대로 (해시 불가면 메모 우회)
+    - 결과는 _freeze 로 동결해 저장 -> 적중 시 사본 없이 같은 객체 반환
+    - 상한/TTL 은 ENGINE_CACHE_POLICY[함수명] (없으면 _DEFAULT_CACHE_POLICY)
+    """
+    registry = {}
+
+    def __init__(self, fn, maxsize=None, ttl=None):
+        functools.update_wrapper(self, fn)
+        policy = ENGINE_CACHE_POLICY.get(fn.__name__, _DEFAULT_CACHE_POLICY)
+        self.fn = fn
+        self.maxsize = maxsize or policy[0]
+        self.ttl = ttl if ttl is not None else policy[1]
+        self._cache = OrderedDict()     # key -> (결과, 만료 monotonic | None, 추정 바이트)
+        self._lock = threading.Lock()
+        self._reset_counters()
+        EngineMemo.registry[fn.__name__] = self
+
+    def _reset_counters(self):
+        self.hits = self.misses = self.bypass = 0
+        self.evictions = self.expirations = 0
+        self.hit_ns = self.miss_ns = 0
+        self.nbytes = 0
+
+    def _key(self, args, kwargs):
+        key = []
+        for a in args:
+            if isinstance(a, list):
+                a = pils_fingerprint(a)
+                if a is None:
+                    return None
+            key.append(a)
+        if kwargs:
+            key.append(tuple(sorted(kwargs.items())))
+        return tuple(key)
+
+    def __call__(self, *args, **kwargs):
+        t0 = time.perf_counter_ns()
+        key = self._key(args, kwargs)
+        if key is not None:
+            try:
+                with self._lock:
+                    entry = self._cache.get(key)
+                    if entry is not None:
+                        if entry[1] is None or entry[1] > time.monotonic():
+                            self._cache.move_to_end(key)
+                            self.hits += 1
+                            self.hit_ns += time.perf_counter_ns() - t0
+                            return entry[0]
+                        del self._cache[key]
+                        self.nbytes -= entry[2]
+                        self.expirations += 1
+            except TypeError:   # 해시 불가 인수 (dict 등)
+                key = None
+        if key is None:
+            self.bypass += 1
+            return self.fn(*args, **kwargs)
+        value = _freeze(self.fn(*args, **kwargs))
+        nbytes = approx_size(value)
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            old = self._cache.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            self._cache[key] = (value, expires, nbytes)
+            self.nbytes += nbytes
+            while len(self._cache) > self.maxsize:
+                self.nbytes -= self._cache.popitem(last=False)[1][2]
+                self.evictions += 1
+            self.misses += 1
+            self.miss_ns += time.perf_counter_ns() - t0
+        return value
+
+    def __get__(self, obj, objtype=None):
+        return self if obj is None else functools.partial(self, obj)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._reset_counters()
+
+    def stats(self):
+        """항목수/추정 메모리/적중·축출 카운터와 평균 소요시간(us)"""
+        n = len(self._cache)
+        return {
+            "함수": self.__name__,
+            "항목수": n,
+            "최대": self.maxsize,
+            "TTL초": self.ttl or 0,
+            "메모리KB": round(self.nbytes / 1024, 1),
+            "상한추정KB": round(self.nbytes / max(1, n) * self.maxsize / 1024, 1),
+            "적중": self.hits,
+            "실패": self.misses,
+            "우회": self.bypass,
+            "축출": self.evictions,
+            "만료": self.expirations,
+            "적중률": round(self.hits / max(1, self.hits + self.misses), 3),
+            "적중_us": round(self.hit_ns / max(1, self.hits) / 1000, 2),
+            "실패_us": round(self.miss_ns / max(1, self.misses) / 1000, 2),
+        }
+
+
+def engine_memo(fn=None, *, maxsize=None, ttl=None):
+    """@engine_memo / @engine_memo(maxsize=..., ttl=...) 데코레이터 (기본값은 ENGINE_CACHE_POLICY)"""
+    if fn is None:
+        return lambda f: EngineMemo(f, maxsize, ttl)
+    return EngineMemo(fn, maxsize, ttl)
+
+
+def engine_memo_stats():
+    """등록된 모든 engine_memo 함수의 카운터"""
+    return [m.stats() for m in EngineMemo.registry.values()]
+
+
+def engine_memo_clear():
+    """모든 engine_memo 캐시 비우기 (카운터 포함)"""
+    for m in EngineMemo.registry.values():
+        m.clear()
+
+
+class ClassLRU:
+    """
+    클래스 단위 LRU 믹스인 - 상속 클래스마다 _cache/_lock/_counters 를 따로 만들고 캐시 현황 보고서에 등록
+    - CACHE_SIZE  : 최대 항목수 (클래스 본문에 CACHE_SIZE 를 둔 클래스만 보고서에 등록)
+    - REPORT_NAME : engine_cache_report 표시 이름 (기본 "<클래스>.of")
+    """
+    __slots__ = ()
+    CACHE_SIZE = 128
+    REPORT_NAME = None
+    registry = {}        # 표시 이름 -> 클래스
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._cache = OrderedDict()
+        cls._lock = threading.Lock()
+        cls._counters = {"적중": 0, "실패": 0, "축출": 0}
+        if "CACHE_SIZE" in cls.__dict__:
+            ClassLRU.registry[cls.REPORT_NAME or f"{cls.__name__}.of"] = cls
+
+    @classmethod
+    def _memo(cls, key, build):
+        """key 가 있으면 재사용, 없으면 build() 결과를 넣고 오래된 항목 축출"""
+        with cls._lock:
+            v = cls._cache.get(key)
+            if v is not None:
+                cls._cache.move_to_end(key)
+                cls._counters["적중"] += 1
+                return v
+        v = build()
+        with cls._lock:
+            cls._cache[key] = v
+            cls._cache.move_to_end(key)
+            cls._counters["실패"] += 1
+            cls._evict()
+        return v
+
+    @classmethod
+    def _evict(cls):
+        """CACHE_SIZE 초과분 축출 (_lock 을 잡은 상태에서 호출)"""
+        while len(cls._cache) > cls.CACHE_SIZE:
+            cls._cache.popitem(last=False)
+            cls._counters["축출"] += 1
+
+
+def _session_birth():
+    """세션에 저장된 (생월, 생일, 생시, 생분) - 없으면 1월 1일 12:00"""
+    ss = st.session_state
+    return (ss.get("birth_month", 1), ss.get("birth_day", 1),
+            ss.get("birth_hour", 12), ss.get("birth_minute", 0))
+
+
+class BirthKeyedLRU(ClassLRU):
+    """
+    사주+출생시각+성별 키 LRU - of()/from_session() 공용 구현
+    상속 클래스는 __init__(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender) 를 가짐
+    """
+    __slots__ = ()
+
+    @staticmethod
+    def _chart_key(pils):
+        """사주 키 (표기 무관 pils_code). 해석 불가면 None -> 메모 없이 생성"""
+        try:
+            return Chart.from_pils(pils).pils_code
+        except (ValueError, IndexError, KeyError, TypeError):
+            return None
+
+    @classmethod
+    def of(cls, pils, birth_year, birth_month=1, birth_day=1, birth_hour=12, birth_minute=0, gender="남"):
+        """메모된 객체 (같은 사주/출생시각/성별이면 같은 객체)"""
+        args = (pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender)
+        ck = cls._chart_key(pils)
+        if ck is None:
+            return cls(*args)
+        return cls._memo((ck,) + args[1:], lambda: cls(*args))
+
+    @classmethod
+    def from_session(cls, pils, birth_year, gender="남"):
+        """세션에 저장된 생월/일/시/분으로 조회"""
+        return cls.of(pils, birth_year, *_session_birth(), gender)
+
+
+# 운영 화면(캐시 현황/전체 비우기) 노출 스위치 - 설정 패널은 모든 방문자가 보므로 환경변수로만 켬
+#   MANSE_ENGINE_ADMIN=1 streamlit run manse.py
+ENGINE_ADMIN = os.environ.get("MANSE_ENGINE_ADMIN", "") not in ("", "0")
+
+
+def engine_cache_report():
+    """운영 화면용 캐시 현황 - engine_memo 전체 + ClassLRU 등록 클래스 + 정적 분석 저장소(파일 매핑, 메모리 0)"""
+    rows = engine_memo_stats()
+    for name, cls in ClassLRU.registry.items():
+        maxsize = cls.CACHE_SIZE
+        with cls._lock:
+            items = list(cls._cache.values())
+            c = dict(cls._counters)
+        nbytes = sum(approx_size(v) for v in items)
+        rows.append({
+            "함수": name, "항목수": len(items), "최대": maxsize, "TTL초": 0,
+            "메모리KB": round(nbytes / 1024, 1),
+            "상한추정KB": round(nbytes / max(1, len(items)) * maxsize / 1024, 1),
+            "적중": c["적중"], "실패": c["실패"], "우회": 0, "축출": c["축출"], "만료": 0,
+            "적중률": round(c["적중"] / max(1, c["적중"] + c["실패"]), 3),
+            "적중_us": 0.0, "실패_us": 0.0,
+        })
+    cols = AnalysisStore.load()
+    c = dict(AnalysisStore._counters)
+    rows.append({
+        "함수": "AnalysisStore.get", "항목수": len(next(iter(cols.values()))[0]) if cols else 0, "최대": AnalysisStore.N_CHARTS,
+        "TTL초": 0, "메모리KB": 0.0,
+        "상한추정KB": round(sum(a.nbytes for col in cols.values() for a in col) / 1024, 1),
+        "적중": c["적중"], "실패": c["실패"], "우회": 0, "축출": 0, "만료": 0,
+        "적중률": round(c["적중"] / max(1, c["적중"] + c["실패"]), 3),
+        "적중_us": 0.0, "실패_us": 0.0,
+    })
+    return rows
+
+
 # 📖 만신(萬神) 통합 사주 용어 사전 (Lexicon)
 SAJU_LEXICON = {
     "공망": "🌓 공망(空亡): '비어 있다'는 뜻으로, 해당 장소의 기운이 약해지거나 실속이 없어짐을 의미합니다. 하지만 예술, 종교, 철학 등 정신적 영역에서는 오히려 큰 성취의 기반이 되기도 합니다.",
@@ -3110,7 +3806,7 @@ GYEOKGUK_DESC = {
 }
 
 # * BUG2 FIX: 일간=pils[1]["cg"], 월지=pils[2]["jj"] (pillar order: [시(0),일(1),월(2),년(3)])
-@st.cache_data
+@engine_memo
 def get_gyeokguk(pils):
     if len(pils) < 4: return None
     ilgan = pils[1]["cg"]   # ✅ 일간 (day stem)
@@ -3210,7 +3906,13 @@ YONGSHIN_JOKHU = {
     "丑(축)": {"hot":False,"need":["丙(병)","甲(갑)","丁(정)"],"avoid":["壬(임)","癸(계)"],"desc":"丑(축)月 극한 冬土. 丙(병)火와 丁(정)火로 溫氣를, 甲(갑)木으로 土氣를 소통시켜야 합니다."},
 }
 
-@st.cache_data
+def _yongshin_list(ys):
+    """get_yongshin 결과 -> 종합 용신 오행 리스트 (없거나 형식이 다르면 [])"""
+    v = ys.get("종합_용신") if ys else None
+    return v if isinstance(v, list) else []
+
+
+@engine_memo
 def get_yongshin(pils):
     """용신(用神) 종합 분석 - 억부+조후+통관"""
     ilgan = pils[1]["cg"]
@@ -3306,37 +4008,130 @@ TG_HAP_MAP = {
     frozenset(["戊","癸"]): ("戊癸合","火","無情之合"),
 }
 
+# ==================================================
+#  🔢 관계 행렬 (정수 인덱스) - 충/합/형/파/해/천간합/십성
+#  위 문자열 맵들을 천간(0~9)/지지(0~11) 인덱스 표로 1회 전개
+#  JJ_REL[a, b] / CG_REL[a, b] 는 관계 비트 합, 배열 인덱싱으로 일괄 조회 가능
+# ==================================================
+
+REL_CHUNG, REL_HAP, REL_HYUNG, REL_PA, REL_HAE = 1, 2, 4, 8, 16   # 지지 관계 비트
+REL_CG_HAP = 1                                                      # 천간 관계 비트
+OH_ORDER = ["木", "火", "土", "金", "水"]
+
+def cg_index(v):
+    """천간 -> 0~9 ("甲" / "甲(갑)" / 정수 모두 허용)"""
+    return v if isinstance(v, (int, np.integer)) else CG.index(v[0])
+
+def jj_index(v):
+    """지지 -> 0~11 ("子" / "子(자)" / 정수 모두 허용)"""
+    return v if isinstance(v, (int, np.integer)) else JJ.index(v[0])
+
+def jj_mask(jjs):
+    """지지 목록 -> 12비트 마스크"""
+    m = 0
+    for j in jjs:
+        m |= 1 << jj_index(j)
+    return m
+
+def _build_relation_tables():
+    jj_rel = np.zeros((12, 12), dtype=np.uint8)
+    for bit, table in ((REL_CHUNG, CHUNG_MAP), (REL_PA, PA_MAP), (REL_HAE, HAE_MAP)):
+        for k in table:
+            a, b = (jj_index(x) for x in k)
+            jj_rel[a, b] |= bit; jj_rel[b, a] |= bit
+    for a, b in HAP_MAP.items():
+        jj_rel[jj_index(a), jj_index(b)] |= REL_HAP
+    for combo in HYUNG_MAP:                      # 삼형/상형: 묶음 안의 모든 쌍
+        for a in combo:
+            for b in combo:
+                if a != b:
+                    jj_rel[jj_index(a), jj_index(b)] |= REL_HYUNG
+    for s in SELF_HYUNG:                         # 자형: 같은 지지끼리
+        jj_rel[jj_index(s), jj_index(s)] |= REL_HYUNG
+
+    cg_rel = np.zeros((10, 10), dtype=np.uint8)
+    for k in TG_HAP_MAP:
+        a, b = (cg_index(x) for x in k)
+        cg_rel[a, b] |= REL_CG_HAP; cg_rel[b, a] |= REL_CG_HAP
+
+    # 십성: TEN_GOD_IDX[일간, 천간] -> SIPSUNG_LIST 인덱스
+    ten_god = np.array([[SIPSUNG_LIST.index(TEN_GODS_MATRIX[_CG_FULL[a]][_CG_FULL[b]]) for b in range(10)]
+                        for a in range(10)], dtype=np.int8)
+    # 지지 정기(지장간 마지막) 천간, 그리고 일간 기준 지지 십성
+    jj_main = np.array([cg_index(JIJANGGAN[j][-1]) for j in JJ], dtype=np.int8)
+    return jj_rel, cg_rel, ten_god, jj_main, ten_god[:, jj_main]
+
+JJ_REL, CG_REL, TEN_GOD_IDX, JJ_MAIN_CG, JJ_TEN_GOD_IDX = _build_relation_tables()
+CG_OH_IDX = np.arange(10, dtype=np.int8) // 2                      # 木火土金水 = 0~4
+JJ_OH_IDX = np.array([OH_ORDER.index(OH[f]) for f in
+                      ["子(자)","丑(축)","寅(인)","卯(묘)","辰(진)","巳(사)","午(오)","未(미)","申(신)","酉(유)","戌(술)","亥(해)"]],
+                     dtype=np.int8)
+
+# 천을귀인 지지 (일간 기준) - 12비트 마스크
+CHEONUL_GUIIN = {"甲":"丑未","乙":"子申","丙":"亥酉","丁":"亥酉","戊":"丑未","己":"子申","庚":"丑未","辛":"寅午","壬":"卯巳","癸":"卯巳"}
+GUIIN_MASK = [jj_mask(CHEONUL_GUIIN[c]) for c in CG]
+# 삼합/삼형 묶음 마스크 - (mask, 원래 맵 값)
+SAM_HAP_MASKS = [(jj_mask(k), v) for k, v in SAM_HAP_MAP.items()]
+HYUNG_MASKS = [(jj_mask(k), v) for k, v in HYUNG_MAP.items()]
+
+_PAIR_I, _PAIR_J = np.triu_indices(4, k=1)
+
+def pair_relations(xs, ys=None, table=JJ_REL):
+    """
+    관계 비트 합 - ys 없으면 xs 내부 쌍(i<j), 있으면 xs*ys 교차 쌍
+    예) pair_relations(jjs) & REL_CHUNG -> 원국에 충이 하나라도 있는지
+    """
+    if ys is None:
+        m = 0
+        for i in range(len(xs)):
+            row = table[xs[i]]
+            for j in range(i + 1, len(xs)):
+                m |= int(row[xs[j]])
+        return m
+    return int(np.bitwise_or.reduce(table[np.ix_(xs, ys)], axis=None))
+
+def chart_relation_masks(jj_rows, table=JJ_REL):
+    """(N,4) 지지 인덱스 배열 -> (N,) 원국 내부 관계 비트 (get_pillars_batch 결과용)"""
+    jj_rows = np.asarray(jj_rows)
+    return np.bitwise_or.reduce(table[jj_rows[:, _PAIR_I], jj_rows[:, _PAIR_J]], axis=1)
+
+def covers_mask(mask, combo_mask):
+    """combo_mask 의 지지가 모두 mask 에 들어 있는지 (삼합/삼형 판정)"""
+    return mask & combo_mask == combo_mask
+
 def get_chung_hyung(pils):
     """충/형/파/해/천간합 분석"""
-    jjs = [p["jj"] for p in pils]
-    cgs = [p["cg"] for p in pils]
+    jjs = [jj_index(p["jj"]) for p in pils]
+    cgs = [cg_index(p["cg"]) for p in pils]
     result = {"충":[],"형":[],"파":[],"해":[],"천간합":[],"자형":[]}
-    pairs_jj = [(jjs[i],jjs[j]) for i in range(len(jjs)) for j in range(i+1,len(jjs))]
-    pairs_cg = [(cgs[i],cgs[j]) for i in range(len(cgs)) for j in range(i+1,len(cgs))]
-    jj_set = set(jjs)
 
-    for a,b in pairs_jj:
-        k = frozenset([a,b])
-        if k in CHUNG_MAP:
-            n,rel,desc = CHUNG_MAP[k]
-            result["충"].append({"name":n,"rel":rel,"desc":desc})
-        if k in PA_MAP:
-            n,desc = PA_MAP[k]; result["파"].append({"name":n,"desc":desc})
-        if k in HAE_MAP:
-            n,desc = HAE_MAP[k]; result["해"].append({"name":n,"desc":desc})
-
-    for combo,(n,htype,desc) in HYUNG_MAP.items():
-        if combo.issubset(jj_set):
+    for i in range(len(jjs)):
+        for j in range(i+1, len(jjs)):
+            a, b = jjs[i], jjs[j]
+            rel = JJ_REL[a, b]
+            if not rel: continue
+            k = frozenset([JJ[a], JJ[b]])
+            if rel & REL_CHUNG:
+                n,rel_s,desc = CHUNG_MAP[k]
+                result["충"].append({"name":n,"rel":rel_s,"desc":desc})
+            if rel & REL_PA:
+                n,desc = PA_MAP[k]; result["파"].append({"name":n,"desc":desc})
+            if rel & REL_HAE:
+                n,desc = HAE_MAP[k]; result["해"].append({"name":n,"desc":desc})
+
+    mask = jj_mask(jjs)
+    for combo_mask,(n,htype,desc) in HYUNG_MASKS:
+        if covers_mask(mask, combo_mask):
             result["형"].append({"name":n,"type":htype,"desc":desc})
-    for jj in jjs:
-        if jjs.count(jj)>=2 and jj in SELF_HYUNG:
-            result["자형"].append({"name":f"{jj} 자형","desc":"자책/자학 경향 주의"})
+    for j in sorted(set(jjs), key=jjs.index):
+        if jjs.count(j)>=2 and JJ_REL[j, j] & REL_HYUNG:
+            result["자형"].append({"name":f"{pils[jjs.index(j)]['jj']} 자형","desc":"자책/자학 경향 주의"})
 
-    for a,b in pairs_cg:
-        k = frozenset([a,b])
-        if k in TG_HAP_MAP:
-            n,oh,htype = TG_HAP_MAP[k]
-            result["천간합"].append({"name":n,"oh":oh,"type":htype,"desc":f"{oh}({OHN.get(oh,'')})으로 화(化) - {htype}"})
+    for i in range(len(cgs)):
+        for j in range(i+1, len(cgs)):
+            if CG_REL[cgs[i], cgs[j]] & REL_CG_HAP:
+                n,oh,htype = TG_HAP_MAP[frozenset([CG[cgs[i]], CG[cgs[j]]])]
+                result["천간합"].append({"name":n,"oh":oh,"type":htype,"desc":f"{oh}({OHN.get(oh,'')})으로 화(化) - {htype}"})
 
     return result
 
@@ -3499,7 +4294,7 @@ def get_nabjin(cg, jj):
 #  육친론(六親論)
 # ==================================================
 
-@st.cache_data
+@engine_memo
 def get_yukjin(ilgan, pils, gender="남"):
     ss_to_family = {
         "남":{"정인":"母親(正印)","편인":"繼母(偏印)","정재":"妻(正財)","편재":"父親(偏財)","정관":"女(正官)","편관":"男(偏官)","비견":"兄弟(比肩)","겁재":"異腹(劫財)","식신":"孫(食神)","상관":"祖母(傷官)"},
@@ -3588,6 +4383,118 @@ def _get_extra_sinsal_v1(pils):
     return result
 
 
+# ==================================================
+#  🧮 60갑자 벡터 엔진 (GanjiEngine)
+#  일/월/년주 60갑자 인덱스를 NumPy 배열 단위로 일괄 계산
+# ==================================================
+
+class GanjiEngine:
+    """
+    60갑자 벡터 계산 엔진 (일진/월건/세차 공통 기준)
+    - 입력: 서수(date.toordinal) 배열, date/datetime 리스트, numpy datetime64 배열
+    - 출력: 60갑자 인덱스 배열 (0=甲子 ... 59=癸亥, 천간=idx%10, 지지=idx%12)
+    - 월주/년주는 SolarTermTable 절입 시각(분 단위, 1900-2100) 기준
+      (입춘/절입 '시각 이후'부터 새 연/월 - SajuCoreEngine 과 동일 규칙)
+    """
+    DAY_BASE_ORD = date(2000, 1, 1).toordinal()
+    DAY_BASE_IDX = 54                       # 2000-01-01 = 戊午일
+    _ORD_1970 = date(1970, 1, 1).toordinal()
+    _EPOCH_M = np.datetime64("1900-01-01T00:00", "m")
+
+    _jeol = None     # 12절(소한, 입춘, 경칩 ... 대설) 절입 분, 시간순 평탄화
+    _ipchun = None   # 연도별 입춘 절입 분
+
+    @classmethod
+    def _load_terms(cls):
+        arr = np.frombuffer(SolarTermTable.load(), dtype=np.int32).astype(np.int64)
+        cls._first_year = SolarTermTable._first_year
+        cls._jeol = arr.reshape(-1, 24)[:, 0::2].ravel()
+        cls._ipchun = arr.reshape(-1, 24)[:, 2].copy()
+
+    @staticmethod
+    def ganji_index(cg_idx, jj_idx):
+        """천간/지지 인덱스 -> 60갑자 인덱스 (음양이 같은 조합만 유효)"""
+        return (6 * np.asarray(cg_idx) - 5 * np.asarray(jj_idx)) % 60
+
+    @classmethod
+    def to_ordinals(cls, values):
+        """날짜류 입력 -> int64 서수 배열"""
+        arr = np.asarray(values)
+        if np.issubdtype(arr.dtype, np.datetime64):
+            return arr.astype("datetime64[D]").astype(np.int64) + cls._ORD_1970
+        if np.issubdtype(arr.dtype, np.integer):
+            return arr.astype(np.int64)
+        return np.fromiter((v.toordinal() for v in arr.ravel()), dtype=np.int64,
+                           count=arr.size).reshape(arr.shape)
+
+    @classmethod
+    def to_minutes(cls, values):
+        """시각 입력(datetime 리스트/datetime64 배열) -> 1900-01-01 00:00 기준 경과 분 (KST)"""
+        arr = np.asarray(values, dtype="datetime64[m]")
+        return (arr - cls._EPOCH_M).astype(np.int64)
+
+    @classmethod
+    def ordinals_from_ymd(cls, years, months, days):
+        """연/월/일 정수 배열 -> int64 서수 배열 (datetime64 달력 연산)"""
+        d64 = ((np.asarray(years, dtype=np.int64) - 1970).astype("datetime64[Y]")
+               + (np.asarray(months, dtype=np.int64) - 1).astype("timedelta64[M]")).astype("datetime64[D]")
+        d64 = d64 + (np.asarray(days, dtype=np.int64) - 1).astype("timedelta64[D]")
+        return d64.astype(np.int64) + cls._ORD_1970
+
+    @staticmethod
+    def date_range(start, end):
+        """start~end(포함) 날짜의 서수 배열"""
+        return np.arange(start.toordinal(), end.toordinal() + 1, dtype=np.int64)
+
+    @classmethod
+    def day_index(cls, ordinals):
+        """일주(日柱) 60갑자 인덱스 - 달력 날짜 기준 (자시 일자 변경 없음)"""
+        return (np.asarray(ordinals, dtype=np.int64) - cls.DAY_BASE_ORD + cls.DAY_BASE_IDX) % 60
+
+    @classmethod
+    def day_index_of(cls, year, month, day):
+        """단일 날짜 일주 인덱스 (스칼라 경로)"""
+        return (date(year, month, day).toordinal() - cls.DAY_BASE_ORD + cls.DAY_BASE_IDX) % 60
+
+    @classmethod
+    def saju_year(cls, minutes):
+        """입춘 기준 사주 연도 배열 (입춘 시각 이전 출생은 전년도)"""
+        if cls._ipchun is None:
+            cls._load_terms()
+        k = np.searchsorted(cls._ipchun, np.asarray(minutes, dtype=np.int64), side="right") - 1
+        return cls._first_year + k
+
+    @classmethod
+    def year_index(cls, minutes):
+        """연주(年柱) 60갑자 인덱스"""
+        return (cls.saju_year(minutes) - 4) % 60
+
+    @classmethod
+    def month_index(cls, minutes):
+        """
+        월주(月柱) 60갑자 인덱스 - 12절 절입 시각 기준
+        월지: 소한->丑, 입춘->寅 ... 대설->子 / 월간: 연간 기준 오호둔(甲己年 丙寅月 ...)
+        """
+        if cls._jeol is None:
+            cls._load_terms()
+        k = np.searchsorted(cls._jeol, np.asarray(minutes, dtype=np.int64), side="right") - 1
+        term = k % 12                                    # 0=소한 ... 11=대설
+        year = cls._first_year + k // 12 - (term == 0)   # 소한~입춘 전은 전년도 간지
+        lunar_num = (term - 1) % 12                      # 寅월=0
+        cg = (2 * ((year - 4) % 10) + 2 + lunar_num) % 10
+        jj = (2 + lunar_num) % 12
+        return cls.ganji_index(cg, jj)
+
+    @classmethod
+    def covers(cls, minutes):
+        """절기 테이블 범위(1900 소한 ~ 2100 말) 안에 있는지 여부 배열"""
+        if cls._jeol is None:
+            cls._load_terms()
+        m = np.asarray(minutes, dtype=np.int64)
+        last = SolarTermTable.to_minutes(datetime(cls._first_year + len(cls._ipchun), 1, 1))
+        return (m >= cls._jeol[0]) & (m < last)
+
+
 # ==================================================
 #  🗓️ 만세력 엔진 (ManseCalendarEngine)
 #  일진 / 절기 / 길일흉일 계산
@@ -3614,28 +4521,112 @@ _GIL_CG  = {"甲(갑)","丙(병)","戊(무)","庚(경)","壬(임)"}          # 
 _HYUNG_JJ = {"丑(축)","刑","巳(사)","申(신)","寅(인)"}          # 삼형살 지지
 _GIL_JJ  = {"子(자)","卯(묘)","午(오)","酉(유)","亥(해)","寅(인)"}      # 귀인 지지 포함
 
-class ManseCalendarEngine:
+# 일진별 특수 길일 (천을귀인)
+_SPECIAL_GIL = {"甲(갑)子(자)", "甲(갑)午(오)", "丙(병)子(자)", "庚(경)子(자)", "壬(임)子(자)",
+                "甲(갑)申(신)", "丙(병)寅(인)", "庚(경)午(오)", "壬(임)申(신)"}
+
+_GIL_GRADES = (
+    {"grade": "보통", "reason": "무난한 하루", "color": "#444444", "bg": "#ffffff"},
+    {"grade": "길일 -", "reason": "양기 충만", "color": "#1a7a1a", "bg": "#f0fff0"},
+    {"grade": "주의", "reason": "삼형 주의", "color": "#cc0000", "bg": "#fff0f0"},
+)
+_GIL_REASONS = ("귀인운", "삼형주의", "천을귀인")
+
+
+class ManseYear:
+    """
+    연 단위 만세력 (1년치 일진/길흉/절기 입절 시각을 한 번에 계산해 보관)
+    - day_idx : 1/1부터 날짜순 60갑자 인덱스 (int8)
+    - grade   : 0=보통 / 1=길일 / 2=주의,  reason_bits : _GIL_REASONS 비트
+    - terms   : 24절기 [{month, day, name, date_str, time_str, dt}] (0=소한)
+    """
+    __slots__ = ("year", "ord0", "day_idx", "grade", "reason_bits", "terms")
+
+    _CG_GIL = np.isin(np.arange(10), [cg_index(c) for c in _GIL_CG])
+    _JJ_GIL = np.isin(np.arange(12), [jj_index(j) for j in _GIL_JJ])
+    _JJ_HYUNG = np.isin(np.arange(12), [jj_index(j) for j in _HYUNG_JJ if j[0] in JJ])
+    _SPECIAL = np.isin(np.arange(60), [GANJI_60.index(g[0] + g[4]) for g in _SPECIAL_GIL])
+
+    def __init__(self, year: int):
+        self.year = year
+        self.ord0 = date(year, 1, 1).toordinal()
+        idx = GanjiEngine.day_index(GanjiEngine.date_range(date(year, 1, 1), date(year, 12, 31)))
+        cg, jj = idx % 10, idx % 12
+        gil_jj, hyung, special = (a.astype(np.int8) for a in (self._JJ_GIL[jj], self._JJ_HYUNG[jj], self._SPECIAL[idx]))
+        score = self._CG_GIL[cg] + gil_jj - 2 * hyung + 2 * special
+        self.day_idx = idx.astype(np.int8)
+        self.grade = np.where(score >= 2, 1, np.where(score <= -1, 2, 0)).astype(np.int8)
+        self.reason_bits = gil_jj | (hyung << 1) | (special << 2)
+        self.terms = []
+        for k, (_, _, name) in enumerate(_JEOLGI_BASE):
+            dt = SolarTermTable.get_datetime(year, k)
+            self.terms.append({"month": dt.month, "day": dt.day, "name": name,
+                               "date_str": f"{year}.{dt.month:02d}.{dt.day:02d}",
+                               "time_str": f"{dt.hour:02d}:{dt.minute:02d}", "dt": dt})
+
+    def _offset(self, month: int, day: int) -> int:
+        return date(self.year, month, day).toordinal() - self.ord0
+
+    def iljin(self, month: int, day: int) -> dict:
+        idx = int(self.day_idx[self._offset(month, day)])
+        cg = CG[idx % 10]
+        return {"cg": cg, "jj": JJ[idx % 12], "str": GANJI_60[idx], "oh": OH.get(cg, ""), "idx": idx}
+
+    def gil_hyung(self, month: int, day: int) -> dict:
+        return self._gil_at(self._offset(month, day))
+
+    def _gil_at(self, off: int) -> dict:
+        g, bits = int(self.grade[off]), int(self.reason_bits[off])
+        out = dict(_GIL_GRADES[g])
+        if g:
+            reasons = [r for b, r in enumerate(_GIL_REASONS) if bits >> b & 1]
+            out["reason"] = " / ".join(reasons) or out["reason"]
+        return out
+
+    def month_jeolgi(self, month: int) -> list:
+        return [dict(t) for t in self.terms if t["month"] == month]
+
+    def month(self, month: int) -> list:
+        """get_month_calendar 형식 [{day, iljin, gil, jeolgi}]"""
+        import calendar as _cal
+        _, days_in_month = _cal.monthrange(self.year, month)
+        jeolgi = {t["day"]: t["name"] for t in self.terms if t["month"] == month}
+        off0 = self._offset(month, 1)
+        result = []
+        for day in range(1, days_in_month + 1):
+            idx = int(self.day_idx[off0 + day - 1])
+            cg = CG[idx % 10]
+            result.append({
+                "day":    day,
+                "iljin":  {"cg": cg, "jj": JJ[idx % 12], "str": GANJI_60[idx], "oh": OH.get(cg, ""), "idx": idx},
+                "gil":    self._gil_at(off0 + day - 1),
+                "jeolgi": jeolgi.get(day),
+            })
+        return result
+
+
+class ManseCalendarEngine(ClassLRU):
     """
     만세력 부가 기능 엔진
     - 일진(日辰(진)) 계산
     - 24절기 달력
     - 길일/흉일 판별
+    연 단위 ManseYear 를 LRU(CACHE_SIZE)로 보관 - 월 이동 시 재계산 없음
     """
 
+    CACHE_SIZE = 12
+    REPORT_NAME = "ManseCalendarEngine.get_year"
+
+    @classmethod
+    def get_year(cls, year: int) -> "ManseYear":
+        """연도별 만세력 (LRU 캐시)"""
+        return cls._memo(year, lambda: ManseYear(year))
+
     # -- 일진 계산 -------------------------------------
     @staticmethod
     def get_iljin(year: int, month: int, day: int) -> dict:
         """특정 날짜의 일진(日辰(진)) 반환 {cg, jj, str, oh}"""
-        from datetime import date as _date
-        base = _date(2000, 1, 1)   # 甲(갑)子(자)일 기준점 (2000-01-01 = 甲(갑)辰(진)년 庚(경)戌(술)월 甲(갑)子(자)일)
-        target = _date(year, month, day)
-        diff = (target - base).days
-        # 2000-01-01은 甲子일 - 60갑자 인덱스 0
-        idx = (diff + 0) % 60
-        cg = CG[idx % 10]
-        jj = JJ[idx % 12]
-        oh = OH.get(cg, "")
-        return {"cg": cg, "jj": jj, "str": cg + jj, "oh": oh, "idx": idx}
+        return ManseCalendarEngine.get_year(year).iljin(month, day)
 
     @staticmethod
     def get_today_iljin() -> dict:
@@ -3647,33 +4638,15 @@ class ManseCalendarEngine:
     @staticmethod
     def get_jeolgi_calendar(year: int) -> list:
         """
-        해당 연도의 24절기 목록 반환
-        [{month, day, name, date_str}, ...]
-        A단계 라이브러리 있으면 정밀 시각 포함
+        해당 연도의 24절기 목록 반환 (입절 시각 포함, 날짜순)
+        [{month, day, name, date_str, time_str, dt}, ...]
         """
-        result = []
-        for (m, d, name) in _JEOLGI_BASE:
-            # 연도별 절기 날짜는 1~2일 오차 있음 (A단계에서 정밀화)
-            try:
-                dt = datetime(year, m, d)
-                result.append({
-                    "month": m,
-                    "day":   d,
-                    "name":  name,
-                    "date_str": f"{year}.{m:02d}.{d:02d}",
-                    "dt": dt,
-                })
-            except ValueError:
-                pass
-        # 날짜순 정렬
-        result.sort(key=lambda x: (x["month"], x["day"]))
-        return result
+        return sorted((dict(t) for t in ManseCalendarEngine.get_year(year).terms), key=lambda x: x["dt"])
 
     @staticmethod
     def get_month_jeolgi(year: int, month: int) -> list:
         """특정 월의 절기만 반환"""
-        return [j for j in ManseCalendarEngine.get_jeolgi_calendar(year)
-                if j["month"] == month]
+        return ManseCalendarEngine.get_year(year).month_jeolgi(month)
 
     # -- 길흉 판별 --------------------------------------
     @staticmethod
@@ -3682,37 +4655,7 @@ class ManseCalendarEngine:
         날짜의 길흉 판별
         {grade: '길일'/'보통'/'주의', reason: str, color: '#...'}
         """
-        iljin = ManseCalendarEngine.get_iljin(year, month, day)
-        cg, jj = iljin["cg"], iljin["jj"]
-
-        score = 0
-        reasons = []
-
-        if cg in _GIL_CG:
-            score += 1
-        if jj in _GIL_JJ:
-            score += 1
-            reasons.append("귀인운")
-        if jj in _HYUNG_JJ:
-            score -= 2
-            reasons.append("삼형주의")
-
-        # 일진별 특수 길일
-        special_gil = {"甲(갑)子(자)", "甲(갑)午(오)", "丙(병)子(자)", "庚(경)子(자)", "壬(임)子(자)",
-                       "甲(갑)申(신)", "丙(병)寅(인)", "庚(경)午(오)", "壬(임)申(신)"}
-        if iljin["str"] in special_gil:
-            score += 2
-            reasons.append("천을귀인")
-
-        if score >= 2:
-            return {"grade": "길일 -", "reason": " / ".join(reasons) or "양기 충만",
-                    "color": "#1a7a1a", "bg": "#f0fff0"}
-        elif score <= -1:
-            return {"grade": "주의", "reason": " / ".join(reasons) or "삼형 주의",
-                    "color": "#cc0000", "bg": "#fff0f0"}
-        else:
-            return {"grade": "보통", "reason": "무난한 하루",
-                    "color": "#444444", "bg": "#ffffff"}
+        return ManseCalendarEngine.get_year(year).gil_hyung(month, day)
 
     # -- 월별 달력 데이터 생성 --------------------------
     @staticmethod
@@ -3721,22 +4664,7 @@ class ManseCalendarEngine:
         해당 월의 전체 날짜별 데이터 반환
         [{date, iljin, gil_hyung, jeolgi_name or None}, ...]
         """
-        import calendar as _cal
-        _, days_in_month = _cal.monthrange(year, month)
-        jeolgi_this_month = {j["day"]: j["name"]
-                             for j in ManseCalendarEngine.get_month_jeolgi(year, month)}
-        result = []
-        for day in range(1, days_in_month + 1):
-            iljin    = ManseCalendarEngine.get_iljin(year, month, day)
-            gil      = ManseCalendarEngine.get_gil_hyung(year, month, day)
-            jeolgi   = jeolgi_this_month.get(day)
-            result.append({
-                "day":      day,
-                "iljin":    iljin,
-                "gil":      gil,
-                "jeolgi":   jeolgi,
-            })
-        return result
+        return ManseCalendarEngine.get_year(year).month(month)
 
 
 # ==================================================
@@ -3744,37 +4672,36 @@ class ManseCalendarEngine:
 # ==================================================
 
 def calc_gunghap(pils_a, pils_b, name_a="나", name_b="상대"):
-    # [년, 월, 일, 시] 순서에서 일간은 index 2
-    ilgan_a = pils_a[2]["cg"]; ilgan_b = pils_b[2]["cg"]
-    jj_a = [p["jj"] for p in pils_a]; jj_b = [p["jj"] for p in pils_b]
-    oh_a = OH.get(ilgan_a,""); oh_b = OH.get(ilgan_b,"")
-    gen_map = {"木":"火","火":"土","土":"金","金":"水","水":"木"}
-    ctrl_map = {"木":"土","火":"金","土":"수","金":"木","水":"火"}
-    
-    if gen_map.get(oh_a)==oh_b: ilgan_rel=("생(生)",f"{name_a}({ilgan_a})이 {name_b}({ilgan_b})를 지극히 생하는 인연이로다.","💚",80)
-    elif gen_map.get(oh_b)==oh_a: ilgan_rel=("생(生)",f"{name_b}({ilgan_b})이 {name_a}({ilgan_a})를 자애롭게 생하는 인연이로다.","💚",80)
-    elif ctrl_map.get(oh_a)==oh_b: ilgan_rel=("극(克)",f"{name_a}({ilgan_a})이 {name_b}({ilgan_b})를 강렬히 극하니, 통제가 따를 것이로다.","🔴",40)
-    elif ctrl_map.get(oh_b)==oh_a: ilgan_rel=("극(克)",f"{name_b}({ilgan_b})이 {name_a}({ilgan_a})를 서슬 퍼렇게 극하니, 인내가 필요하도다.","🔴",40)
-    elif oh_a==oh_b: ilgan_rel=("비(比)",f"두 분 모두 {OHN.get(oh_a,'')}의 기운. 같은 길을 걷는 동반자이자 경쟁자로다.","🟡",60)
+    # [시, 일, 월, 년] 순서에서 일간은 index 1
+    ilgan_a = pils_a[1]["cg"]; ilgan_b = pils_b[1]["cg"]
+    ca, cb = cg_index(ilgan_a), cg_index(ilgan_b)
+    jj_a = [jj_index(p["jj"]) for p in pils_a]; jj_b = [jj_index(p["jj"]) for p in pils_b]
+    oa, ob = int(CG_OH_IDX[ca]), int(CG_OH_IDX[cb])
+    oh_a = OH_ORDER[oa]; oh_b = OH_ORDER[ob]
+
+    if (oa+1)%5==ob: ilgan_rel=("생(生)",f"{name_a}({ilgan_a})이 {name_b}({ilgan_b})를 지극히 생하는 인연이로다.","💚",80)
+    elif (ob+1)%5==oa: ilgan_rel=("생(生)",f"{name_b}({ilgan_b})이 {name_a}({ilgan_a})를 자애롭게 생하는 인연이로다.","💚",80)
+    elif (oa+2)%5==ob: ilgan_rel=("극(克)",f"{name_a}({ilgan_a})이 {name_b}({ilgan_b})를 강렬히 극하니, 통제가 따를 것이로다.","🔴",40)
+    elif (ob+2)%5==oa: ilgan_rel=("극(克)",f"{name_b}({ilgan_b})이 {name_a}({ilgan_a})를 서슬 퍼렇게 극하니, 인내가 필요하도다.","🔴",40)
+    elif oa==ob: ilgan_rel=("비(比)",f"두 분 모두 {OHN.get(oh_a,'')}의 기운. 같은 길을 걷는 동반자이자 경쟁자로다.","🟡",60)
     else: ilgan_rel=("평(平)","상생상극 없는 중립적 관계. 깊은 인연보다는 스치는 인연에 가까운 법.","🟢",65)
 
-    all_jj_set = set(jj_a+jj_b); hap_score=0; hap_found=[]
-    for combo,(name,oh,desc) in SAM_HAP_MAP.items():
-        if combo.issubset(all_jj_set): hap_found.append(f"삼합 {name}"); hap_score+=20
+    all_mask = jj_mask(jj_a+jj_b); hap_score=0; hap_found=[]
+    for combo_mask,(name,oh,desc) in SAM_HAP_MASKS:
+        if covers_mask(all_mask, combo_mask): hap_found.append(f"삼합 {name}"); hap_score+=20
     
     chung_found=[]
-    for ja in jj_a:
-        for jb in jj_b:
-            k=frozenset([ja,jb])
-            if k in CHUNG_MAP: 
-                chung_desc = CHUNG_MAP[k][0]
-                if (oh_a == "火" and oh_b == "水") or (oh_a == "水" and oh_b == "火"):
-                    chung_desc += " (상충살: 산불을 끌 비가 될지 모든 것을 태울 안개가 될지는 오직 참는 자만이 알 것이로다)"
-                chung_found.append(chung_desc)
-                
-    chunl={"甲(갑)":["丑(축)","未(미)"],"乙(을)":["子(자)","申(신)"],"丙(병)":["亥(해)","酉(유)"],"丁(정)":["亥(해)","酉(유)"],"戊(무)":["丑(축)","未(미)"],"己(기)":["子(자)","申(신)"],"庚(경)":["丑(축)","未(미)"],"辛(신)":["寅(인)","午(오)"],"壬(임)":["卯(묘)","巳(사)"],"癸(계)":["卯(묘)","巳(사)"]}
-    gui_a = any(jj in chunl.get(ilgan_a,[]) for jj in jj_b)
-    gui_b = any(jj in chunl.get(ilgan_b,[]) for jj in jj_a)
+    if pair_relations(jj_a, jj_b) & REL_CHUNG:
+        for ja in jj_a:
+            for jb in jj_b:
+                if JJ_REL[ja, jb] & REL_CHUNG:
+                    chung_desc = CHUNG_MAP[frozenset([JJ[ja],JJ[jb]])][0]
+                    if {oh_a, oh_b} == {"火", "水"}:
+                        chung_desc += " (상충살: 산불을 끌 비가 될지 모든 것을 태울 안개가 될지는 오직 참는 자만이 알 것이로다)"
+                    chung_found.append(chung_desc)
+
+    gui_a = bool(GUIIN_MASK[ca] & jj_mask(jj_b))
+    gui_b = bool(GUIIN_MASK[cb] & jj_mask(jj_a))
     
     total = ilgan_rel[3]+hap_score-len(chung_found)*10+(10 if gui_a else 0)+(10 if gui_b else 0)
     total = max(0,min(100,total))
@@ -3793,35 +4720,362 @@ def calc_gunghap(pils_a, pils_b, name_a="나", name_b="상대"):
     return {"총점":total,"등급":grade,"일간관계":ilgan_rel,"합":hap_found,"충":chung_found,"귀인_a":gui_a,"귀인_b":gui_b,"name_a":name_a,"name_b":name_b,"ilgan_a":ilgan_a,"ilgan_b":ilgan_b}
 
 
+# 일간 오행(0~4) x 상대 일간 오행 -> calc_gunghap 일간관계 점수 (생 80 / 극 40 / 비 60)
+_GH_REL_SCORE = np.array([[60 if a == b else 80 if (a + 1) % 5 == b or (b + 1) % 5 == a else 40
+                           for b in range(5)] for a in range(5)], dtype=np.int16)
+_GUIIN_MASK_ARR = np.array(GUIIN_MASK, dtype=np.int32)
+_SAM_HAP_MASK_ARR = np.array([m for m, _ in SAM_HAP_MASKS], dtype=np.int32)
+
+
+class GunghapPool:
+    """
+    궁합 후보 풀 - 사주별 궁합 특징을 열 배열로 보관 (한 사람 vs 전체 풀 1회 벡터 채점)
+    - cg   : 일간 인덱스 (N,)        - oh : 일간 오행 (N,)
+    - jj   : 지지 인덱스 (N,4) [시, 일, 월, 년]
+    - mask : 지지 12비트 마스크 (N,)  - gui : 일간의 천을귀인 지지 마스크 (N,)
+    - pils_cg : 4주 천간 인덱스 (N,4) - 상위 k 건의 calc_gunghap 상세 재구성용
+    """
+    __slots__ = ("ids", "pils_cg", "cg", "oh", "jj", "mask", "gui")
+
+    def __init__(self, cg, jj, ids=None):
+        self.pils_cg = np.asarray(cg, dtype=np.int8).reshape(-1, 4)
+        self.jj = np.asarray(jj, dtype=np.int8).reshape(-1, 4)
+        self.ids = list(ids) if ids is not None else list(range(len(self.jj)))
+        self.cg = self.pils_cg[:, 1].astype(np.int64)
+        self.oh = CG_OH_IDX[self.cg].astype(np.int64)
+        self.mask = np.bitwise_or.reduce(np.left_shift(1, self.jj.astype(np.int32)), axis=1)
+        self.gui = _GUIIN_MASK_ARR[self.cg]
+
+    @classmethod
+    def from_pils_list(cls, pils_list, ids=None):
+        """pils dict 리스트 목록 -> 풀 ("甲" / "甲(갑)" 표기 모두 허용)"""
+        cg = [[cg_index(p["cg"]) for p in pils] for pils in pils_list]
+        jj = [[jj_index(p["jj"]) for p in pils] for pils in pils_list]
+        return cls(cg, jj, ids)
+
+    @classmethod
+    def from_batch(cls, batch, ids=None):
+        """get_pillars_batch 결과 -> 풀"""
+        return cls(batch["cg"], batch["jj"], ids)
+
+    def __len__(self):
+        return len(self.jj)
+
+    def pils_at(self, i):
+        """i 번째 후보의 pils dict 리스트"""
+        return [{"cg": CG[c], "jj": JJ[j], "str": CG[c] + JJ[j]}
+                for c, j in zip(self.pils_cg[i].tolist(), self.jj[i].tolist())]
+
+    def scores(self, pils, idx=None):
+        """
+        pils 한 건 vs 풀 전체(또는 idx 행만) 궁합 점수 (calc_gunghap 총점과 동일)
+        Returns dict: 총점, 일간점수, 삼합수, 충수, 귀인_a, 귀인_b  - 모두 (N,) 배열
+        """
+        sel = slice(None) if idx is None else idx
+        oh, jj, mask, gui = self.oh[sel], self.jj[sel], self.mask[sel], self.gui[sel]
+        ca = cg_index(pils[1]["cg"])
+        jj_a = [jj_index(p["jj"]) for p in pils]
+        mask_a = jj_mask(jj_a)
+        rel = _GH_REL_SCORE[int(CG_OH_IDX[ca])][oh]
+        all_mask = mask | mask_a
+        n_hap = ((all_mask[:, None] & _SAM_HAP_MASK_ARR) == _SAM_HAP_MASK_ARR).sum(axis=1)
+        chung_cnt = (JJ_REL[jj_a] & REL_CHUNG).astype(bool).sum(axis=0)   # 지지별 나와 충인 내 지지 수
+        n_chung = chung_cnt[jj].sum(axis=1)
+        gui_a = (GUIIN_MASK[ca] & mask) != 0
+        gui_b = (gui & mask_a) != 0
+        total = np.clip(rel + 20 * n_hap - 10 * n_chung + 10 * gui_a + 10 * gui_b, 0, 100)
+        return {"총점": total, "일간점수": rel, "삼합수": n_hap, "충수": n_chung,
+                "귀인_a": gui_a, "귀인_b": gui_b}
+
+    def rank(self, pils, k=10, name="나", exclude_ids=()):
+        """
+        궁합 상위 k 건 - 각 항목은 calc_gunghap 반환 필드 + id, 순위
+        동점은 풀 순서 유지
+        """
+        total = self.scores(pils)["총점"]
+        if exclude_ids:
+            total = np.where(np.isin(np.asarray(self.ids, dtype=object), list(exclude_ids)), -1, total)
+        order = np.argsort(-total, kind="stable")[:k]
+        out = []
+        for r, i in enumerate(order.tolist(), 1):
+            if total[i] < 0:
+                break
+            gh = calc_gunghap(pils, self.pils_at(i), name, str(self.ids[i]))
+            gh.update({"id": self.ids[i], "순위": r})
+            out.append(gh)
+        return out
+
+
+class GroupGunghap(ClassLRU):
+    """
+    그룹 궁합 N x N 점수 행렬 (calc_gunghap 총점 기준)
+    - 궁합 점수는 대칭 -> 순서 없는 쌍(pils_code 2개)마다 1회 계산
+    - 쌍 점수는 요청 간 LRU 공유 (정수 키 -> 점수)
+    """
+    # 쌍 1건 ~140 bytes (OrderedDict 항목 + int 키, 점수 0~100 은 공유 int) -> 2만 쌍 ~2.7 MB
+    # = 20명 그룹(대각 포함 210쌍) 약 95개 분량. 쌍 1건 재채점은 벡터 연산 1칸이라 축출돼도 비용 작음
+    CACHE_SIZE = 20_000
+    REPORT_NAME = "GroupGunghap.matrix"
+
+    @staticmethod
+    def _pair_key(a, b):
+        return (a << 24) | b if a <= b else (b << 24) | a
+
+    @staticmethod
+    def _unique_names(names):
+        """같은 이름이 여러 명이면 두 번째부터 "김(2)", "김(3)" ... (행/열 라벨 중복 방지)"""
+        seen, out = set(), []
+        for name in map(str, names):
+            label, k = name, 1
+            while label in seen:
+                k += 1
+                label = f"{name}({k})"
+            seen.add(label)
+            out.append(label)
+        return out
+
+    @classmethod
+    def matrix(cls, members, names=None):
+        """
+        members: pils 리스트 목록 -> pandas DataFrame (행/열 = 이름, 대각선 NaN) - 히트맵용
+        같은 사주가 여러 명이면 1번만 채점, 같은 이름은 "(2)" 를 붙여 구분
+        """
+        import pandas as pd
+        n = len(members)
+        names = cls._unique_names([f"{i + 1}번" for i in range(n)] if names is None else names)
+        codes = [Chart.from_pils(p).pils_code for p in members]
+        uniq = list(dict.fromkeys(codes))
+        pos = {c: i for i, c in enumerate(uniq)}
+        first = {}
+        for p, c in zip(members, codes):
+            first.setdefault(c, p)
+        u = len(uniq)
+        mat = np.zeros((u, u), dtype=np.int16)
+
+        # 1) 캐시 조회 - 위 삼각(대각 포함)만
+        missing = [[] for _ in range(u)]
+        with cls._lock:
+            for i in range(u):
+                for j in range(i, u):
+                    key = cls._pair_key(uniq[i], uniq[j])
+                    v = cls._cache.get(key)
+                    if v is None:
+                        missing[i].append(j)
+                    else:
+                        cls._cache.move_to_end(key)
+                        mat[i, j] = mat[j, i] = v
+                        cls._counters["적중"] += 1
+
+        # 2) 빠진 쌍만 행 단위 벡터 채점
+        if any(missing):
+            pool = GunghapPool.from_pils_list([first[c] for c in uniq])
+            fresh = {}
+            for i, js in enumerate(missing):
+                if not js:
+                    continue
+                tot = pool.scores(first[uniq[i]], np.asarray(js))["총점"]
+                mat[i, js] = tot
+                mat[js, i] = tot
+                for j, v in zip(js, tot.tolist()):
+                    fresh[cls._pair_key(uniq[i], uniq[j])] = v
+            with cls._lock:
+                cls._cache.update(fresh)
+                cls._counters["실패"] += len(fresh)
+                cls._evict()
+
+        inv = np.array([pos[c] for c in codes])
+        full = mat[np.ix_(inv, inv)].astype(np.float64)
+        np.fill_diagonal(full, np.nan)
+        return pd.DataFrame(full, index=names, columns=names)
+
+    @staticmethod
+    def summary(df):
+        """행렬 -> 사람별 평균 궁합 + 최고/최저 짝"""
+        rows = []
+        for i, name in enumerate(df.index):
+            s = df.iloc[i].dropna()
+            if s.empty:
+                continue
+            rows.append({"이름": name, "평균": round(float(s.mean()), 1),
+                         "최고_짝": s.idxmax(), "최고": int(s.max()),
+                         "최저_짝": s.idxmin(), "최저": int(s.min())})
+        return rows
+
+
 # ==================================================
 #  택일(擇日)
 # ==================================================
 
+_TAEIL_SS_KR = ["비견", "겁재", "식신", "상관", "편재", "정재", "편관", "정관", "편인", "정인"]
+# 일진 천간 십성 -> 택일 가감 (식신/정재/정관/정인 +10, 편관/겁재 -15)
+_TAEIL_SS_POINTS = np.array([0, -15, 10, 0, 0, 10, -15, 10, 0, 10], dtype=np.int16)
+
+
+def _taeil_level(score):
+    return "- 길일 - 🌟최길" if score>=80 else "-길" if score>=65 else "〇보통" if score>=45 else "[-]주의"
+
+
+def _taeil_ss_codes(names):
+    """십성 이름(한자/한글) 목록 -> 0~9 코드 배열"""
+    return np.array([SIPSUNG_LIST.index(n) if n in SIPSUNG_LIST else _TAEIL_SS_KR.index(n) for n in names],
+                    dtype=np.int8)
+
+
+def _taeil_date_mask(ords, weekdays_only=False, exclude=()):
+    """날짜 서수 배열 -> 요일/제외일 조건 통과 마스크"""
+    ok = np.ones(len(ords), dtype=bool)
+    if weekdays_only:
+        ok &= (ords - 1) % 7 < 5                     # 서수 1 = 0001-01-01 월요일
+    if exclude:
+        ok &= ~np.isin(ords, [d.toordinal() for d in exclude])
+    return ok
+
+
+@engine_memo
+def good_day_table(pils):
+    """
+    사주 1건의 60갑자 일진 택일 표 (사주당 1회 - 공망/충/삼합/귀인 판정을 일진 60개에 미리 적용)
+    Returns: (score int16[60], ss int8[60], reasons tuple[60])  - 배열은 읽기 전용
+    """
+    ilgan = cg_index(pils[1]["cg"]); il_jj = jj_index(pils[1]["jj"])
+    gui_mask = GUIIN_MASK[ilgan]
+    gm = get_gongmang(pils); bad_mask = jj_mask(j for j in gm["공망_지지"] if j)
+    sam_hap = [(m, name) for m,(name,oh,desc) in SAM_HAP_MASKS if m >> il_jj & 1]
+    gz = np.arange(60)
+    dcs, djs = gz % 10, gz % 12
+    ss = TEN_GOD_IDX[ilgan, dcs].astype(np.int8)
+    score = 50 + _TAEIL_SS_POINTS[ss]
+    reasons = []
+    for g in range(60):
+        dj, s = int(djs[g]), int(ss[g])
+        r = []
+        if gui_mask >> dj & 1: score[g] += 25; r.append("천을귀인일 🌟")
+        if bad_mask >> dj & 1: score[g] -= 30; r.append("공망일 [!]️")
+        if JJ_REL[il_jj, dj] & REL_CHUNG: score[g] -= 20; r.append("일주충일 [!]️")
+        for m,name in sam_hap:
+            if m >> dj & 1: score[g] += 15; r.append(f"삼합{name}일 -"); break
+        if _TAEIL_SS_POINTS[s] > 0: r.append(f"{SIPSUNG_LIST[s]}일 -")
+        elif _TAEIL_SS_POINTS[s] < 0: r.append(f"{SIPSUNG_LIST[s]}일 [!]️")
+        reasons.append(tuple(r))
+    score.flags.writeable = False
+    ss.flags.writeable = False
+    return score, ss, tuple(reasons)
+
+
+def search_good_days(pils, start, end, k=10, min_score=60, weekdays_only=False, exclude=(),
+                     require_ss=None, forbid_ss=None):
+    """
+    택일 검색 - start~end(포함) 임의 구간 (예: 앞으로 12개월)
+    일진은 GanjiEngine.day_index 벡터 계산, 점수는 good_day_table 인덱싱, 상위 k 는 힙으로 선별
+    - weekdays_only : 월~금만
+    - exclude       : 제외할 날짜 목록 (date)
+    - require_ss / forbid_ss : 일진 천간 십성 필수/제외 (한자 또는 한글 이름)
+    Returns list[dict]: date, day, jj, cg, pillar, score, level, reasons, ss (점수 내림차순, 동점은 날짜순)
+    """
+    table, table_ss, table_reasons = good_day_table(pils)
+    ords = GanjiEngine.date_range(start, end)
+    day_idx = GanjiEngine.day_index(ords)
+    scores = table[day_idx]
+    ss = table_ss[day_idx]
+
+    ok = (scores >= min_score) & _taeil_date_mask(ords, weekdays_only, exclude)
+    if require_ss:
+        ok &= np.isin(ss, _taeil_ss_codes(require_ss))
+    if forbid_ss:
+        ok &= ~np.isin(ss, _taeil_ss_codes(forbid_ss))
+
+    cand = np.flatnonzero(ok).tolist()
+    top = heapq.nlargest(k, cand, key=lambda i: int(scores[i]))
+    out = []
+    for i in top:
+        g, d = int(day_idx[i]), date.fromordinal(int(ords[i]))
+        score = int(scores[i])
+        out.append({"date": d, "day": d.day, "jj": JJ[g % 12], "cg": CG[g % 10], "pillar": GANJI_60[g],
+                    "score": score, "level": _taeil_level(score), "reasons": list(table_reasons[g]),
+                    "ss": SIPSUNG_LIST[int(ss[i])]})
+    return out
+
+
 def get_good_days(pils, year, month):
+    """한 달 택일 상위 10일 (search_good_days 월 단위 호출)"""
     import calendar
-    ilgan = pils[1]["cg"]; il_jj = pils[1]["jj"]
-    chunl = {"甲(갑)":["丑(축)","未(미)"],"乙(을)":["子(자)","申(신)"],"丙(병)":["亥(해)","酉(유)"],"丁(정)":["亥(해)","酉(유)"],"戊(무)":["丑(축)","未(미)"],"己(기)":["子(자)","申(신)"],"庚(경)":["丑(축)","未(미)"],"辛(신)":["寅(인)","午(오)"],"壬(임)":["卯(묘)","巳(사)"],"癸(계)":["卯(묘)","巳(사)"]}
-    gui_jjs = chunl.get(ilgan,[])
-    gm = get_gongmang(pils); bad_jjs = list(gm["공망_지지"])
-    chung_jjs = [list(k)[0] if list(k)[1]==il_jj else list(k)[1] for k in CHUNG_MAP if il_jj in k]
-    days_in_month = calendar.monthrange(year,month)[1]
-    idx = (year-4)%60; month_base = (idx+(month-1)*2)%12
-    good_days = []
-    for day in range(1,days_in_month+1):
-        day_jj = JJ[(month_base+day-1)%12]; day_cg = CG[((idx+(month-1)*2)+day-1)%10]
-        score=50; reasons=[]
-        if day_jj in gui_jjs: score+=25; reasons.append("천을귀인일 🌟")
-        if day_jj in bad_jjs: score-=30; reasons.append("공망일 [!]️")
-        if day_jj in chung_jjs: score-=20; reasons.append("일주충일 [!]️")
-        for k,(name,oh,desc) in SAM_HAP_MAP.items():
-            if day_jj in k and il_jj in k: score+=15; reasons.append(f"삼합{name}일 -"); break
-        day_ss = TEN_GODS_MATRIX.get(ilgan,{}).get(day_cg,"-")
-        if day_ss in ["식신","정재","정관","정인"]: score+=10; reasons.append(f"{day_ss}일 -")
-        elif day_ss in ["편관","겁재"]: score-=15; reasons.append(f"{day_ss}일 [!]️")
-        level = "- 길일 - 🌟최길" if score>=80 else "-길" if score>=65 else "〇보통" if score>=45 else "[-]주의"
-        if score>=60:
-            good_days.append({"day":day,"jj":day_jj,"cg":day_cg,"pillar":day_cg+day_jj,"score":score,"level":level,"reasons":reasons})
-    return sorted(good_days,key=lambda x:-x["score"])[:10]
+    days_in_month = calendar.monthrange(year, month)[1]
+    return search_good_days(pils, date(year, month, 1), date(year, month, days_in_month))
+
+
+def _joint_pair_table(pils_a, pils_b):
+    """
+    두 사람 짝의 일진 지지(0~11) 가감표 - 궁합식 관계 판정
+    - 공동 삼합 +10 : 그날 지지가 두 사람 일지와 삼합을 완성
+    - 해충(解沖) +5  : 두 일지가 서로 충인 짝에서 그날 지지가 한쪽 일지와 육합
+    Returns: (bonus int16[12], notes tuple[12])
+    """
+    ja, jb = jj_index(pils_a[1]["jj"]), jj_index(pils_b[1]["jj"])
+    bonus = np.zeros(12, dtype=np.int16)
+    notes = []
+    for dj in range(12):
+        n = []
+        three = jj_mask([ja, jb, dj])
+        for combo_mask, (name, _, _) in SAM_HAP_MASKS:
+            if ja != jb and dj not in (ja, jb) and covers_mask(three, combo_mask):
+                bonus[dj] += 10; n.append(f"공동 삼합{name}일"); break
+        if JJ_REL[ja, jb] & REL_CHUNG and (JJ_REL[ja, dj] | JJ_REL[jb, dj]) & REL_HAP:
+            bonus[dj] += 5; n.append("충을 푸는 합일")
+        notes.append(tuple(n))
+    return bonus, tuple(notes)
+
+
+def search_joint_days(charts, start, end, k=10, agg="min", weights=None, min_score=60, min_each=None,
+                      weekdays_only=False, exclude=(), names=None):
+    """
+    여러 사람 공동 택일 (결혼/계약일) - 날짜 x 사람 점수 행렬을 한 번에 계산
+    - charts  : pils 리스트 (2명 이상)
+    - agg     : "min"(가장 불리한 사람 기준) / "mean" / "weighted"(weights 비율)
+    - 짝마다 _joint_pair_table 가감의 평균을 더함
+    - min_each: 각자 점수 하한 (None 이면 미적용)
+    Returns list[dict]: date, day, pillar, score, level, scores(사람별), reasons(사람별), pair_notes
+    """
+    n = len(charts)
+    if n < 2:
+        raise ValueError("search_joint_days: 2명 이상의 사주가 필요합니다")
+    if names is None:
+        names = [f"{i + 1}번" for i in range(n)]
+    tables = [good_day_table(p) for p in charts]
+    ords = GanjiEngine.date_range(start, end)
+    day_idx = GanjiEngine.day_index(ords)
+    per = np.stack([t[0] for t in tables])[:, day_idx]          # (사람, 날짜)
+
+    if agg == "min":
+        base = per.min(axis=0).astype(np.float64)
+    elif agg == "mean":
+        base = per.mean(axis=0)
+    elif agg == "weighted":
+        w = np.asarray(weights if weights is not None else np.ones(n), dtype=np.float64)
+        base = (w[:, None] * per).sum(axis=0) / w.sum()
+    else:
+        raise ValueError(f"search_joint_days: 알 수 없는 집계 방식 {agg!r}")
+
+    pairs = [(a, b) for a in range(n) for b in range(a + 1, n)]
+    pair_tabs = [_joint_pair_table(charts[a], charts[b]) for a, b in pairs]
+    pair_bonus = np.stack([t[0] for t in pair_tabs])[:, day_idx % 12].mean(axis=0)
+    scores = np.rint(np.clip(base + pair_bonus, 0, 100)).astype(np.int16)
+
+    ok = (scores >= min_score) & _taeil_date_mask(ords, weekdays_only, exclude)
+    if min_each is not None:
+        ok &= (per >= min_each).all(axis=0)
+    top = heapq.nlargest(k, np.flatnonzero(ok).tolist(), key=lambda i: int(scores[i]))
+    out = []
+    for i in top:
+        g, d = int(day_idx[i]), date.fromordinal(int(ords[i]))
+        score = int(scores[i])
+        out.append({
+            "date": d, "day": d.day, "pillar": GANJI_60[g], "score": score, "level": _taeil_level(score),
+            "scores": {names[p]: int(per[p, i]) for p in range(n)},
+            "reasons": {names[p]: list(tables[p][2][g]) for p in range(n)},
+            "pair_notes": [f"{names[a]}·{names[b]}: {note}" for (a, b), t in zip(pairs, pair_tabs)
+                           for note in t[1][g % 12]],
+        })
+    return out
 
 
 # ==================================================
@@ -3830,15 +5084,22 @@ def get_good_days(pils, year, month):
 # ==================================================
 
 class TimeCorrection:
-    """한국 표준시 및 경도 보정 데이터"""
-    
-    # 한국 표준시 변경 이력
-    # 1. 1908.04.01 - 1911.12.31: GMT+8:30 (127.5도)
-    # 2. 1912.01.01 - 1954.03.20: GMT+9:00 (135도)
-    # 3. 1954.03.21 - 1961.08.09: GMT+8:30 (127.5도)
-    # 4. 1961.08.10 - 현재: GMT+9:00 (135도)
-    
-    # 서머타임(DST) 시행 이력
+    """
+    한국 표준시/서머타임/경도 보정 -> 진태양시(지방평균시)
+    표준시·DST 변경 시각을 구간 인덱스(_bounds)로 만들어 bisect / np.searchsorted 로 조회
+    보정량(분) = 당시 시계 UTC 오프셋(표준시+DST) - 출생지 경도 * 4
+    """
+
+    # 한국 표준시 변경 이력 (적용 시작, UTC 오프셋 분)
+    # 1908.04.01 이전은 지방평균시 사용 -> 경도 보정 없음
+    STANDARD_ERAS = [
+        (datetime(1908, 4, 1), 510),    # GMT+8:30 (127.5도)
+        (datetime(1912, 1, 1), 540),    # GMT+9:00 (135도)
+        (datetime(1954, 3, 21), 510),   # GMT+8:30 (127.5도)
+        (datetime(1961, 8, 10), 540),   # GMT+9:00 (135도) - 현재
+    ]
+
+    # 서머타임(DST) 시행 이력 [시작, 종료) - 시행 중 +60분
     DST_PERIODS = [
         (datetime(1948, 6, 1), datetime(1948, 9, 13)),
         (datetime(1949, 4, 3), datetime(1949, 9, 11)),
@@ -3854,35 +5115,101 @@ class TimeCorrection:
         (datetime(1988, 5, 8), datetime(1988, 10, 9)),
     ]
 
+    # 출생지 경도 (동경, 도) - 시/도청 소재지 및 주요 도시
+    CITY_LONGITUDES = {
+        "서울": 126.98, "인천": 126.71, "수원": 127.03, "경기": 127.03, "춘천": 127.73, "강원": 127.73,
+        "강릉": 128.90, "원주": 127.95, "청주": 127.49, "충북": 127.49, "대전": 127.38, "세종": 127.29,
+        "천안": 127.15, "충남": 126.67, "전주": 127.15, "전북": 127.15, "광주": 126.85, "전남": 126.46,
+        "목포": 126.39, "여수": 127.66, "대구": 128.60, "경북": 128.51, "안동": 128.73, "포항": 129.37,
+        "부산": 129.08, "울산": 129.31, "창원": 128.68, "경남": 128.68, "진주": 128.08, "제주": 126.53,
+        "서귀포": 126.56, "울릉도": 130.90, "백령도": 124.72, "평양": 125.75, "개성": 126.55,
+        "신의주": 124.40, "함흥": 127.54, "청진": 129.78,
+    }
+    DEFAULT_PLACE = "서울"
+
+    _bounds = None      # 구간 경계 (1900-01-01 기준 분, 오름차순)
+    _offsets = None     # 구간별 시계 UTC 오프셋(분), 0번 = 1908 이전(NaN: 지방평균시)
+    _bounds_arr = None
+
+    @classmethod
+    def _build_index(cls):
+        to_m = SolarTermTable.to_minutes
+        eras = [(to_m(t), off) for t, off in cls.STANDARD_ERAS]
+        dst = [(to_m(a), to_m(b)) for a, b in cls.DST_PERIODS]
+        bounds = sorted({m for m, _ in eras} | {m for pair in dst for m in pair})
+        offsets = [np.nan]
+        for b in bounds:
+            k = bisect_right([m for m, _ in eras], b) - 1
+            off = eras[k][1] if k >= 0 else np.nan
+            if any(a <= b < e for a, e in dst):
+                off += 60
+            offsets.append(off)
+        cls._offsets = np.array(offsets, dtype=np.float64)
+        cls._bounds = bounds
+        cls._bounds_arr = np.array(bounds, dtype=np.int64)
+
+    @classmethod
+    def longitude_of(cls, place=None):
+        """출생지 이름(또는 경도 숫자) -> 동경(도). 모르는 지명은 서울"""
+        if place is None or place == "":
+            place = cls.DEFAULT_PLACE
+        if isinstance(place, (int, float, np.integer, np.floating)):
+            return float(place)
+        return cls.CITY_LONGITUDES.get(place, cls.CITY_LONGITUDES[cls.DEFAULT_PLACE])
+
+    @classmethod
+    def clock_offset(cls, dt):
+        """해당 시각 한국 시계의 UTC 오프셋(분), 1908 이전은 None"""
+        if cls._bounds is None:
+            cls._build_index()
+        off = cls._offsets[bisect_right(cls._bounds, SolarTermTable.to_minutes(dt))]
+        return None if np.isnan(off) else int(off)
+
+    @classmethod
+    def correction_minutes(cls, dt, place=None):
+        """시계 시각 -> 진태양시 보정량(분, 빼줄 값)"""
+        off = cls.clock_offset(dt)
+        if off is None:
+            return 0
+        return int(round(off - cls.longitude_of(place) * 4))
+
     @staticmethod
-    def get_corrected_time(year, month, day, hour, minute):
-        """입력된 시간을 '진태양시'로 보정"""
+    def get_corrected_time(year, month, day, hour, minute, place=None):
+        """입력된 시간을 '진태양시'로 보정 (서머타임 + 표준시 + 출생지 경도)"""
         dt = datetime(year, month, day, hour, minute)
-        
-        # 1. 서머타임 보정 (-1시간)
-        is_dst = False
-        for start, end in TimeCorrection.DST_PERIODS:
-            if start <= dt <= end:
-                is_dst = True
-                break
-        
-        if is_dst:
-            dt -= timedelta(hours=1)
-            
-        # 2. 표준시 보정
-        # 1954.03.21 ~ 1961.08.09 기간은 GMT+8.5 (135도 기준 -30분)
-        if datetime(1954, 3, 21) <= dt <= datetime(1961, 8, 9, 23, 59):
-            # 이 시기 표준시는 이미 127.5도 기준이므로, 
-            # 135도 기준 만세력 계산 시에는 30분을 더해주거나 빼주는 처리가 필요할 수 있으나
-            # 보통 사주에서는 135도(GMT+9)를 기준으로 역산함.
-            pass
+        return dt - timedelta(minutes=TimeCorrection.correction_minutes(dt, place))
 
-        # 3. 경도 보정 (서울 기준 127.0도 vs 표준 135.0도)
-        # 1도 = 4분 차이 -> 8도 차이 = 32분 차이
-        # 한국은 동경 135도보다 서쪽에 있으므로 실제 태양은 32분 늦게 뜸 -> 32분을 빼야 진태양시
-        dt -= timedelta(minutes=32)
-        
-        return dt
+    @classmethod
+    def correct_minutes(cls, minutes, places=None):
+        """
+        일괄 보정 - 1900-01-01 기준 분 배열 -> 진태양시 분 배열
+        places: 지명/경도 스칼라 또는 배열 (None = 서울)
+        """
+        if cls._bounds is None:
+            cls._build_index()
+        m = np.asarray(minutes, dtype=np.int64)
+        if places is None or np.ndim(places) == 0:
+            lon = cls.longitude_of(places)
+        else:   # 지명 종류만큼만 조회 후 역인덱스로 펼침
+            uniq, inv = np.unique(np.asarray(places), return_inverse=True)
+            lon = np.array([cls.longitude_of(p) for p in uniq.tolist()], dtype=np.float64)[inv.ravel()]
+        off = cls._offsets[np.searchsorted(cls._bounds_arr, m, side="right")]
+        corr = np.where(np.isnan(off), 0.0, off - lon * 4)
+        return m - np.rint(corr).astype(np.int64)
+
+    @classmethod
+    def correct_batch(cls, years, months, days, hours, minutes, places=None):
+        """일괄 보정 - 생년월일시 배열 -> 보정된 (년, 월, 일, 시, 분) 배열 (get_pillars_batch 입력용)"""
+        y, mo, d, h, mi = np.broadcast_arrays(*(np.asarray(v, dtype=np.int64) for v in
+                                                (years, months, days, hours, minutes)))
+        ords = GanjiEngine.ordinals_from_ymd(y, mo, d)
+        m = cls.correct_minutes((ords - SolarTermTable._EPOCH_ORD) * 1440 + h * 60 + mi, places)
+        day_num, tod = np.divmod(m, 1440)
+        dates = np.datetime64("1900-01-01") + day_num.astype("timedelta64[D]")
+        cy = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+        cm = dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+        cd = (dates - dates.astype("datetime64[M]")).astype(np.int64) + 1
+        return cy, cm, cd, tod // 60, tod % 60
 
 class SajuPrecisionEngine:
     """고정밀 사주 엔진 (KASI 데이터 및 초단위 보정 반영)"""
@@ -3901,9 +5228,9 @@ class SajuPrecisionEngine:
     }
 
     @staticmethod
-    def get_pillars(year, month, day, hour, minute, gender="남"):
-        """정밀 보정된 사주팔자 계산"""
-        corrected_dt = TimeCorrection.get_corrected_time(year, month, day, hour, minute)
+    def get_pillars(year, month, day, hour, minute, gender="남", place=None):
+        """정밀 보정된 사주팔자 계산 (place: 출생지 이름 또는 경도, 기본 서울)"""
+        corrected_dt = TimeCorrection.get_corrected_time(year, month, day, hour, minute, place)
         cy, cm, cd = corrected_dt.year, corrected_dt.month, corrected_dt.day
         ch, cmin = corrected_dt.hour, corrected_dt.minute
         
@@ -3917,6 +5244,14 @@ class SajuPrecisionEngine:
             
         return pils
 
+    @staticmethod
+    def get_pillars_batch(birth_years, birth_months, birth_days, birth_hours=12, birth_minutes=0,
+                          genders="남", places=None):
+        """정밀 보정 일괄 계산 - TimeCorrection.correct_batch 후 SajuCoreEngine.get_pillars_batch"""
+        fields = TimeCorrection.correct_batch(birth_years, birth_months, birth_days,
+                                              birth_hours, birth_minutes, places)
+        return SajuCoreEngine.get_pillars_batch(*fields, genders=genders)
+
 
 # ==================================================
 #  사주 계산 엔진 (SajuCoreEngine)
@@ -3939,36 +5274,21 @@ class SajuCoreEngine:
         (11,7),(11,22),(12,7),(12,22),(1,6),(1,20)
     ]
 
-    KASI_DATA = {}
-    _KASI_LOADED = False
-
     @staticmethod
     def _load_kasi_data():
-        """KASI 절기 JSON 데이터를 로드함"""
-        if SajuCoreEngine._KASI_LOADED:
-            return
-        
-        json_path = "kasi_24terms.json"
-        if os.path.exists(json_path):
-            try:
-                with open(json_path, "r", encoding="utf-8") as f:
-                    SajuCoreEngine.KASI_DATA = json.load(f)
-                SajuCoreEngine._KASI_LOADED = True
-            except Exception:
-                pass
+        """KASI 절기 테이블 로드 (SolarTermTable 에 KASI 발표값이 덮어써진 상태로 1회 로드)"""
+        SolarTermTable.load()
 
     @staticmethod
     def _get_term_precision_time(year, term_name):
-        """특정 연도/절기의 정밀 시각(시, 분)을 반환 (KASI -> AstroEngine Fallback)"""
-        SajuCoreEngine._load_kasi_data()
-        y_str = str(year)
-        # 1. KASI JSON 확인 (2000-2027 우선)
-        if y_str in SajuCoreEngine.KASI_DATA:
-            term_info = SajuCoreEngine.KASI_DATA[y_str].get(term_name)
-            if term_info and term_info.get("month"):
-                return term_info["month"], term_info["day"], term_info["hour"], term_info["minute"]
-        
-        # 2. AstroEngine 정밀 계산 (1940-2040 전구간 정밀 보정)
+        """특정 연도/절기의 정밀 시각(월, 일, 시, 분)을 반환 (KASI -> 천문 계산 테이블, O(1))"""
+        t_idx = _TERM_INDEX_24.get(term_name)
+        if t_idx is None:
+            return None
+        hit = SolarTermTable.get(year, t_idx)
+        if hit is not None:
+            return hit
+        # 1900-2100 범위 밖: AstroEngine 즉석 계산
         return AstroEngine.get_solar_term_precision(year, 1, 1, term_name)
 
     @staticmethod
@@ -3991,15 +5311,12 @@ class SajuCoreEngine:
         return {"cg": CG[idx % 10], "jj": JJ[idx % 12], "str": CG[idx % 10]+JJ[idx % 12]}
 
     @staticmethod
-    def _get_month_pillar(year, month, day, hour=12, minute=0):
-        """월주 계산 (절기 경계 정밀 보정)"""
+    def _get_month_pillar(year, month, day, hour=12, minute=0, year_p=None):
+        """월주 계산 (절기 경계 정밀 보정) - year_p 를 넘기면 입춘 조회를 재사용"""
         terms = SajuCoreEngine.SOLAR_TERMS
         term_idx = (month - 1) * 2
         # 해당 월의 '절기' (예: 2월이면 입춘, 3월이면 경칩...)
-        term_names = ["소한","대한","입춘","우수","경칩","춘분","청명","곡우","입하","소만","망종","하지",
-                      "소서","대서","입추","처서","백로","추분","한로","상강","입동","소설","대설","동지"]
-        
-        term_name = term_names[term_idx]
+        term_name = _TERM_NAMES_24[term_idx]
         total_min = hour * 60 + minute
         
         # KASI 정밀 데이터 시도
@@ -4022,7 +5339,7 @@ class SajuCoreEngine:
         
         if solar_month < 1: solar_month = 12
         
-        y_p = SajuCoreEngine._get_year_pillar(year, month, day, hour, minute)
+        y_p = year_p or SajuCoreEngine._get_year_pillar(year, month, day, hour, minute)
         y_str = y_p["str"]
         # 연간의 천간 인덱스로 월간 도출 (60갑자 기반 정밀화)
         y_cg_idx = CG.index(y_str[0]) 
@@ -4041,15 +5358,9 @@ class SajuCoreEngine:
         from datetime import datetime as py_datetime
         birth_dt = py_datetime(year, month, day, hour, minute)
         
-        term_names = ["소한","대한","입춘","우수","경칩","춘분","청명","곡우","입하","소만","망종","하지",
-                      "소서","대서","입추","처서","백로","추분","한로","상강","입동","소설","대설","동지"]
-        
-        # 현재 월의 절기 이름 (예: 2월 -> 입춘)
-        term_idx = (month - 1) * 2
-        
         def get_best_term_dt(y, m):
             t_idx = (m - 1) * 2
-            t_name = term_names[t_idx]
+            t_name = _TERM_NAMES_24[t_idx]
             k_info = SajuCoreEngine._get_term_precision_time(y, t_name)
             if k_info:
                 return py_datetime(y, k_info[0], k_info[1], k_info[2], k_info[3])
@@ -4081,11 +5392,8 @@ class SajuCoreEngine:
     def _get_day_pillar(year, month, day):
         """일주 계산"""
         try:
-            ref_date = date(2000, 1, 1)
-            target_date = date(year, month, day)
-            delta = (target_date - ref_date).days
-            # ✅ BUG FIX: 2000년 1월 1일 = 戊午일 (인덱스 54)
-            idx = (54 + delta) % 60
+            # ✅ BUG FIX: 2000년 1월 1일 = 戊午일 (인덱스 54) - GanjiEngine 공통 기준
+            idx = GanjiEngine.day_index_of(year, month, day)
             cg = CG[idx % 10]
             jj = JJ[idx % 12]
             return {"cg": cg, "jj": jj, "str": cg+jj}
@@ -4117,79 +5425,604 @@ class SajuCoreEngine:
         else:
             target_ilgan_idx = ilgan_idx % 10
 
-        day_cg_idx_for_si = target_ilgan_idx % 5
-        hour_cg_starts = [0, 2, 4, 6, 8]  # 甲(갑)己(기)=甲(갑), 乙(을)庚(경)=丙(병), 丙(병)辛(신)=戊(무), 丁(정)壬(임)=庚(경), 戊(무)癸(계)=壬(임)
-        cg_start = hour_cg_starts[day_cg_idx_for_si]
+        day_cg_idx_for_si = target_ilgan_idx % 5
+        hour_cg_starts = [0, 2, 4, 6, 8]  # 甲(갑)己(기)=甲(갑), 乙(을)庚(경)=丙(병), 丙(병)辛(신)=戊(무), 丁(정)壬(임)=庚(경), 戊(무)癸(계)=壬(임)
+        cg_start = hour_cg_starts[day_cg_idx_for_si]
+
+        cg_idx = (cg_start + si_num) % 10
+        jj_idx = si_num % 12
+
+        cg = CG[cg_idx]
+        jj = JJ[jj_idx]
+        return {"cg": cg, "jj": jj, "str": cg+jj}
+
+    @staticmethod
+    @engine_memo
+    def get_pillars(birth_year, birth_month, birth_day, birth_hour=12, birth_minute=0, gender="남"):
+        """사주팔자 계산 - 반환: [시주, 일주, 월주, 년주]"""
+        year_p = SajuCoreEngine._get_year_pillar(birth_year, birth_month, birth_day, birth_hour, birth_minute)
+        month_p = SajuCoreEngine._get_month_pillar(birth_year, birth_month, birth_day, birth_hour, birth_minute, year_p)
+        day_p = SajuCoreEngine._get_day_pillar(birth_year, birth_month, birth_day)
+        hour_p = SajuCoreEngine._get_hour_pillar(birth_hour, birth_minute, day_p["cg"])
+        return [hour_p, day_p, month_p, year_p]
+
+    @staticmethod
+    def get_pillars_batch(birth_years, birth_months, birth_days, birth_hours=12, birth_minutes=0, genders="남"):
+        """
+        사주팔자 일괄 계산 (NumPy) - get_pillars 와 동일 규칙
+        입력: 정수 배열(또는 스칼라 브로드캐스트), genders 는 "남"/"여" 배열
+        반환: {"cg": (N,4) int8 천간 인덱스, "jj": (N,4) int8 지지 인덱스, "male": (N,) bool}
+              열 순서는 [시주, 일주, 월주, 년주]  (dict 변환: SajuCoreEngine.pillars_from_indices)
+        """
+        y, mo, d, h, mi = np.broadcast_arrays(*(np.asarray(v, dtype=np.int64) for v in
+                                                (birth_years, birth_months, birth_days, birth_hours, birth_minutes)))
+        ords = GanjiEngine.ordinals_from_ymd(y, mo, d)
+        tod = h * 60 + mi
+        minutes = (ords - SolarTermTable._EPOCH_ORD) * 1440 + tod
+
+        day_idx = GanjiEngine.day_index(ords)
+        year_idx = GanjiEngine.year_index(minutes)
+        month_idx = GanjiEngine.month_index(minutes)
+
+        # 시주: 자시(23:00~01:00)=0, 야자시는 다음날 일간 기준 시두법
+        yaja = tod >= 1380
+        si_num = np.where(yaja | (tod < 60), 0, ((tod + 60) // 120) % 12)
+        hour_cg = (2 * (((day_idx % 10) + yaja) % 10 % 5) + si_num) % 10
+
+        cg = np.stack([hour_cg, day_idx % 10, month_idx % 10, year_idx % 10], axis=1).astype(np.int8)
+        jj = np.stack([si_num, day_idx % 12, month_idx % 12, year_idx % 12], axis=1).astype(np.int8)
+
+        # 절기 테이블 범위 밖(1900 이전/2100 이후)은 스칼라 엔진으로 보정
+        for i in np.flatnonzero(~GanjiEngine.covers(minutes)):
+            pils = SajuCoreEngine.get_pillars(int(y[i]), int(mo[i]), int(d[i]), int(h[i]), int(mi[i]))
+            cg[i] = [CG.index(p["cg"]) for p in pils]
+            jj[i] = [JJ.index(p["jj"]) for p in pils]
+
+        male = np.broadcast_to(np.asarray(genders) == "남", y.shape).copy()
+        return {"cg": cg, "jj": jj, "male": male}
+
+    @staticmethod
+    def pillars_from_indices(cg_row, jj_row):
+        """get_pillars_batch 한 행 -> get_pillars 와 동일한 dict 리스트 [시, 일, 월, 년]"""
+        return [{"cg": CG[c], "jj": JJ[j], "str": CG[c] + JJ[j]} for c, j in zip(cg_row.tolist(), jj_row.tolist())]
+
+    @staticmethod
+    def get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour=12, birth_minute=0, gender="남"):
+        """대운 계산 - 정밀 모드 (DaewoonTimeline 메모 공유)"""
+        return DaewoonTimeline.of(pils, birth_year, birth_month, birth_day,
+                                  birth_hour, birth_minute, gender).as_list()
+
+# ==================================================
+#  🧬 정수 코드 사주 원국 (Chart)
+#  pils(list[dict]) 대신 60갑자 인덱스 4개 + 성별 + 출생시각만 보관
+# ==================================================
+
+class Chart:
+    """
+    정수 코드 사주 원국 - [시주, 일주, 월주, 년주] 60갑자 인덱스(0~59)
+    - 해시/비교는 (인덱스 4개, 성별, 출생시각) 튜플 기준
+    - pils_code : 4주만 6비트씩 묶은 24비트 정수 (성별/시각 제외 - 사주 동일성 키)
+    - key       : pils_code + 성별 1비트 + 출생 분(1900-01-01 기준) 을 묶은 64비트 정수
+    - .pils     : get_pillars 와 동일한 dict 리스트 (필요할 때 1회 생성)
+    """
+    __slots__ = ("idx", "male", "birth", "_pils")
+
+    def __init__(self, hour, day, month, year, male=True, birth=None):
+        self.idx = (hour, day, month, year)
+        self.male = bool(male)
+        self.birth = birth
+        self._pils = None
+
+    # -- 생성 --
+    @classmethod
+    def from_pils(cls, pils, gender="남", birth=None):
+        """pils dict 리스트 -> Chart ("甲" / "甲(갑)" 표기 모두 허용)"""
+        idx = [(6 * CG.index(p["cg"][0]) - 5 * JJ.index(p["jj"][0])) % 60 for p in pils]
+        return cls(*idx, male=(gender == "남"), birth=birth)
+
+    @classmethod
+    def from_birth(cls, year, month, day, hour=12, minute=0, gender="남"):
+        """생년월일시 -> Chart (SajuCoreEngine.get_pillars 기준)"""
+        pils = SajuCoreEngine.get_pillars(year, month, day, hour, minute, gender)
+        return cls.from_pils(pils, gender, datetime(year, month, day, hour, minute))
+
+    @classmethod
+    def from_batch(cls, batch, i, birth=None):
+        """get_pillars_batch 결과의 i 번째 행 -> Chart"""
+        cg, jj = batch["cg"][i].tolist(), batch["jj"][i].tolist()
+        male = batch["male"][i] if np.ndim(batch["male"]) else batch["male"]
+        idx = [(6 * c - 5 * j) % 60 for c, j in zip(cg, jj)]
+        return cls(*idx, male=bool(male), birth=birth)
+
+    @classmethod
+    def from_code(cls, code, gender="남"):
+        """pils_code(정수 또는 cache_key 16진 문자열) -> Chart"""
+        if isinstance(code, str):
+            code = int(code, 16)
+        return cls(code & 63, (code >> 6) & 63, (code >> 12) & 63, (code >> 18) & 63,
+                   male=(gender == "남"))
+
+    # -- 정수 키 --
+    @property
+    def pils_code(self):
+        h, d, m, y = self.idx
+        return h | (d << 6) | (m << 12) | (y << 18)
+
+    @property
+    def cache_key(self):
+        """파일 캐시용 사주 키 (6자리 16진)"""
+        return f"{self.pils_code:06x}"
+
+    @property
+    def key(self):
+        """출생시각/성별까지 포함한 64비트 키 (출생시각 없으면 상위 필드 0)"""
+        t = 0 if self.birth is None else SolarTermTable.to_minutes(self.birth) + (1 << 31)
+        return self.pils_code | (int(self.male) << 24) | (t << 25)
+
+    # -- 인덱스 뷰 --
+    @property
+    def cg(self):
+        return tuple(i % 10 for i in self.idx)
+
+    @property
+    def jj(self):
+        return tuple(i % 12 for i in self.idx)
+
+    @property
+    def ilgan(self):
+        return self.idx[1] % 10
+
+    @property
+    def gender(self):
+        return "남" if self.male else "여"
+
+    @property
+    def pils(self):
+        """legacy dict 뷰 [시, 일, 월, 년] - get_pillars 반환과 동일"""
+        if self._pils is None:
+            self._pils = [{"cg": CG[i % 10], "jj": JJ[i % 12], "str": GANJI_60[i]} for i in self.idx]
+        return [dict(p) for p in self._pils]
+
+    # -- 비교/해시 --
+    def _tuple(self):
+        return (self.idx, self.male, self.birth)
+
+    def __eq__(self, other):
+        return isinstance(other, Chart) and self._tuple() == other._tuple()
+
+    def __hash__(self):
+        return hash(self._tuple())
+
+    def __reduce__(self):
+        return (Chart, (*self.idx, self.male, self.birth))
+
+    def __repr__(self):
+        return f"Chart({' '.join(GANJI_60[i] for i in self.idx)}, {self.gender}, {self.birth})"
+
+# ==================================================
+#  🧭 대운 타임라인 (DaewoonTimeline)
+#  사주 1건당 1회 계산 - 정확한 입운 시각 + 연도->대운 인덱스
+# ==================================================
+
+class DaewoonTimeline(BirthKeyedLRU):
+    """
+    대운 타임라인 (사주+출생시각+성별 기준 LRU 메모)
+    - cycles   : get_daewoon 과 같은 dict 리스트 (10개)
+    - starts   : 각 대운의 정확한 입운 시각 (절입까지 일수 3일=1년 환산)
+    - year_idx : birth_year 부터 연도별 대운 인덱스 (int8, -1 = 입운 전)
+    """
+    __slots__ = ("cycles", "starts", "direction", "days_to_term", "start_age",
+                 "birth_year", "year_idx")
+
+    CACHE_SIZE = 256
+    _DAYS_PER_TERM_DAY = 365.2422 / 3    # 절입까지 1일 = 실제 약 121.7일
+
+    def __init__(self, pils, birth_year, birth_month, birth_day, birth_hour=12, birth_minute=0, gender="남"):
+        self.birth_year = birth_year
+        self.cycles, self.starts = [], []
+        self.direction, self.days_to_term, self.start_age = 0, None, None
+        self.year_idx = np.full(0, -1, dtype=np.int8)
+
+        try:
+            # 연간의 음양 (년주의 천간 기준) + 성별 -> 순행/역행
+            is_yang = cg_index(pils[3]["cg"]) % 2 == 0
+            self.direction = 1 if (gender == "남") == is_yang else -1
+            wolgan_idx, wolji_idx = cg_index(pils[2]["cg"]), jj_index(pils[2]["jj"])   # 월주가 대운의 출발점
+            days = SajuCoreEngine._get_days_to_term(birth_year, birth_month, birth_day,
+                                                    birth_hour, birth_minute, self.direction)
+        except Exception:      # 잘못된 pils/출생시각 -> 빈 타임라인 (get_daewoon 은 [] 반환)
+            return
+        # 3일 = 1년. ✅ 정밀 대운수: 반올림 적용 (나머지가 0.5년(1.5일) 이상이면 올림)
+        start_age = int(round(days / 3.0)) or 1
+        self.days_to_term, self.start_age = days, start_age
+
+        first = datetime(birth_year, birth_month, birth_day, birth_hour, birth_minute) \
+            + timedelta(days=days * self._DAYS_PER_TERM_DAY)
+        for i in range(10):  # 100년 대운
+            step = i + 1
+            d_cg_idx = (wolgan_idx + self.direction * step) % 10
+            d_jj_idx = (wolji_idx + self.direction * step) % 12
+            age_start = start_age + i * 10
+            year_start = birth_year + age_start
+            self.cycles.append({
+                "순번": i + 1,
+                "cg": CG[d_cg_idx],
+                "jj": JJ[d_jj_idx],
+                "str": CG[d_cg_idx] + JJ[d_jj_idx],
+                "시작나이": age_start,
+                "시작연도": year_start,
+                "종료연도": year_start + 9,
+            })
+            self.starts.append(first + timedelta(days=3652.422 * i))
+
+        idx = np.full(start_age + 100, -1, dtype=np.int8)
+        idx[start_age:] = np.arange(100) // 10
+        self.year_idx = idx
+
+    def as_list(self):
+        """get_daewoon 호환 리스트 (호출자 수정이 메모를 오염시키지 않도록 사본)"""
+        return [dict(c) for c in self.cycles]
+
+    def index_at(self, year):
+        """해당 연도의 대운 인덱스 (입운 전/범위 밖 = -1)"""
+        off = year - self.birth_year
+        return int(self.year_idx[off]) if 0 <= off < len(self.year_idx) else -1
+
+    def at(self, year):
+        """해당 연도의 대운 dict (없으면 None)"""
+        i = self.index_at(year)
+        return dict(self.cycles[i]) if i >= 0 else None
+
+    def prev_of(self, year):
+        """해당 연도 대운의 직전 대운"""
+        i = self.index_at(year)
+        return dict(self.cycles[i - 1]) if i > 0 else None
+
+    def next_of(self, year):
+        """해당 연도 대운의 다음 대운 (입운 전이면 첫 대운)"""
+        i = self.index_at(year)
+        if i < 0:
+            return dict(self.cycles[0]) if self.cycles and year < self.cycles[0]["시작연도"] else None
+        return dict(self.cycles[i + 1]) if i + 1 < len(self.cycles) else None
+
+    def start_of(self, year):
+        """해당 연도 대운의 정확한 입운 시각"""
+        i = self.index_at(year)
+        return self.starts[i] if i >= 0 else None
+
+# ==================================================
+#  🗄️ 원국 정적 분석 저장소 (AnalysisStore)
+#  도달 가능한 사주 561,600개(야자시 포함) 전부를 오프라인 계산 (build_tables.py store)
+# ==================================================
+
+class AnalysisStore:
+    """
+    원국 정적 분석 오프라인 저장소 - 함수별 열(column) 파일을 메모리 매핑해 1회 인덱스 조회
+    - 사주 번호 = ((년주*12 + 월지)*60 + 일주)*13 + 시 슬롯
+      (월간은 년간 기준 오호둔, 시간은 일간 기준 오서둔 규칙으로 결정 -> 60*12*60*12 = 518,400
+       + 시 슬롯 12 = 야자시(23시 子시, 다음 날 일간 기준 시간) 43,200 -> 561,600)
+    - <함수>.ids.npy : 사주 번호 -> 값 번호 (uint32)
+    - <함수>.off.npy : 값 번호 -> 값 바이트 시작 위치 (uint64, 마지막 칸 = 전체 길이)
+    - <함수>.val.bin : 값 JSON(UTF-8) 바이트를 이어 붙인 파일 (같은 결과는 1번만 저장, 튜플은 리스트로)
+    - meta.json      : digest = ANALYSIS_VERSION + 저장 함수 소스의 해시 -> 코드와 다르면 저장소 무시
+    저장소가 없거나 규칙 밖 사주/한글 병기 표기면 None -> 호출자가 직접 계산
+    저장소 생성/교체는 RECHECK_SEC 마다 meta.json 수정 시각으로 확인 (재시작 불필요)
+    """
+    DIR_NAME = "analysis_store"
+    MAGIC = "ANS2"
+    ANALYSIS_VERSION = 1     # 저장 함수가 쓰는 보조 테이블(OH, JIJANGGAN 등)만 바꿨을 때 올림
+    RECHECK_SEC = 60.0
+    N_CHARTS = 60 * 12 * 60 * 13
+    FUNCTIONS = ("get_ilgan_strength", "calc_ohaeng_strength", "get_yongshin", "get_gyeokguk",
+                 "get_12sinsal", "get_gongmang", "calc_sipsung", "calc_12unsung")
+    _ILGAN_ARG = frozenset(("get_ilgan_strength", "calc_ohaeng_strength", "calc_sipsung", "calc_12unsung"))
+
+    _cols = None      # {함수: (ids, off, val)} - 저장소가 없거나 코드와 다르면 {}
+    _meta_mtime = None
+    _checked_at = 0.0
+    _digest = None
+    _lock = threading.Lock()
+    _counters = {"적중": 0, "실패": 0}
+
+    @classmethod
+    def path(cls):
+        return os.path.join(_DATA_DIR, cls.DIR_NAME)
+
+    # -- 사주 번호 --
+    @staticmethod
+    def chart_index(pils):
+        """pils -> 사주 번호 (도달 불가 조합이거나 "甲" 단일 글자 표기가 아니면 None)"""
+        try:
+            (hc, hj), (dc, dj), (mc, mj), (yc, yj) = ((CG.index(p["cg"]), JJ.index(p["jj"])) for p in pils)
+        except (ValueError, KeyError, TypeError):
+            return None
+        if (yc - yj) % 2 or (dc - dj) % 2:
+            return None
+        if mc != ((yc % 5) * 2 + 2 + (mj - 2) % 12) % 10:
+            return None
+        if hc != ((dc % 5) * 2 + hj) % 10:
+            if hj or hc != ((dc + 1) % 5) * 2:
+                return None
+            hj = 12      # 야자시
+        y, d = (6 * yc - 5 * yj) % 60, (6 * dc - 5 * dj) % 60
+        return ((y * 12 + mj) * 60 + d) * 13 + hj
+
+    @staticmethod
+    def chart_at(i):
+        """사주 번호 -> Chart (빌더 순회용)"""
+        i, hj = divmod(i, 13)
+        i, d = divmod(i, 60)
+        y, mj = divmod(i, 12)
+        mc = ((y % 10 % 5) * 2 + 2 + (mj - 2) % 12) % 10
+        if hj == 12:
+            hj, hc = 0, ((d % 10 + 1) % 5) * 2
+        else:
+            hc = ((d % 10 % 5) * 2 + hj) % 10
+        return Chart((6 * hc - 5 * hj) % 60, d, (6 * mc - 5 * mj) % 60, y)
+
+    # -- 빌더 공용 (build_tables.py store) --
+    @classmethod
+    def compute(cls, pils):
+        """사주 1건의 정적 분석 전부 -> {함수: 결과} (메모 우회, 빌더 작업 단위)"""
+        ilgan, out = pils[1]["cg"], {}
+        for name in cls.FUNCTIONS:
+            fn = globals()[name]
+            fn = getattr(fn, "__wrapped__", fn)
+            out[name] = fn(ilgan, pils) if name in cls._ILGAN_ARG else fn(pils)
+        return out
+
+    @staticmethod
+    def encode(value):
+        """분석 결과 -> 저장 바이트 (JSON, 튜플은 리스트가 됨)"""
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def code_digest(cls):
+        """ANALYSIS_VERSION + 저장 함수 소스 해시 - 빌드 당시 코드와 같은지 판정"""
+        if cls._digest is None:
+            h = hashlib.blake2b(f"{cls.MAGIC}:{cls.ANALYSIS_VERSION}".encode(), digest_size=8)
+            for name in cls.FUNCTIONS:
+                fn = globals()[name]
+                try:
+                    h.update(inspect.getsource(getattr(fn, "__wrapped__", fn)).encode("utf-8"))
+                except (OSError, TypeError):
+                    h.update(name.encode())
+            cls._digest = h.hexdigest()
+        return cls._digest
+
+    @classmethod
+    def write_meta(cls, out_dir, n_built, **extra):
+        """meta.json 기록 (임시 파일 후 교체 - 마지막에 써야 앱이 완성된 저장소만 읽음)"""
+        path = os.path.join(out_dir, "meta.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"magic": cls.MAGIC, "digest": cls.code_digest(), "n_charts": cls.N_CHARTS,
+                       "n_built": n_built, "functions": list(cls.FUNCTIONS), **extra},
+                      f, ensure_ascii=False, indent=1)
+        os.replace(path + ".tmp", path)
+
+    # -- 조회 --
+    @classmethod
+    def _open(cls, base):
+        """meta.json 검증 후 열 파일 메모리 매핑 (형식/코드 불일치면 빈 dict)"""
+        try:
+            with open(os.path.join(base, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if meta.get("magic") != cls.MAGIC or meta.get("n_charts") != cls.N_CHARTS:
+            return {}
+        if meta.get("digest") != cls.code_digest():
+            _saju_log.warning("분석 저장소(%s)가 현재 코드와 다릅니다 - 무시하고 직접 계산 "
+                              "(build_tables.py store 로 다시 생성)", base)
+            return {}
+        cols = {}
+        try:
+            for name in meta.get("functions", []):
+                p = os.path.join(base, name)
+                # numpy 스칼라 변환을 피하려고 타입 memoryview 로 보관 (조회 1회 ~6us 절감)
+                cols[name] = (memoryview(np.load(p + ".ids.npy", mmap_mode="r")).cast("B").cast("I"),
+                              memoryview(np.load(p + ".off.npy", mmap_mode="r")).cast("B").cast("Q"),
+                              memoryview(np.memmap(p + ".val.bin", dtype=np.uint8, mode="r")))
+        except (OSError, ValueError):
+            return {}
+        return cols
+
+    @classmethod
+    def load(cls):
+        """열 파일 메모리 매핑 - RECHECK_SEC 마다 meta.json 이 생기거나 바뀌었는지 확인해 다시 엶"""
+        now = time.monotonic()
+        if cls._cols is not None and now - cls._checked_at < cls.RECHECK_SEC:
+            return cls._cols
+        with cls._lock:
+            if cls._cols is None or now - cls._checked_at >= cls.RECHECK_SEC:
+                cls._checked_at = now
+                base = cls.path()
+                try:
+                    mtime = os.stat(os.path.join(base, "meta.json")).st_mtime_ns
+                except OSError:
+                    mtime = None
+                if cls._cols is None or mtime != cls._meta_mtime:
+                    cls._cols = cls._open(base) if mtime is not None else {}
+                    cls._meta_mtime = mtime
+        return cls._cols
+
+    @classmethod
+    def get(cls, name, pils):
+        """저장된 분석 결과 (없으면 None) - engine_memo 결과처럼 읽기 전용 컨테이너"""
+        col = cls.load().get(name)
+        i = cls.chart_index(pils) if col is not None else None
+        if i is None or i >= len(col[0]):
+            cls._counters["실패"] += 1
+            return None
+        ids, off, val = col
+        v = ids[i]
+        cls._counters["적중"] += 1
+        return _freeze(json.loads(bytes(val[off[v]:off[v + 1]])))
+
+    @classmethod
+    def fetch(cls, name, pils, compute):
+        """
+        저장소 우선, 없으면 compute() (분석 함수는 None 을 반환하지 않음)
+        계산값도 저장 형식(JSON - 튜플은 리스트)을 거쳐 읽기 전용으로 반환
+        -> 저장소 적중/실패와 관계없이 같은 값, 같은 타입
+        """
+        v = cls.get(name, pils)
+        if v is None:
+            v = _freeze(json.loads(cls.encode(compute())))
+        return v
 
-        cg_idx = (cg_start + si_num) % 10
-        jj_idx = si_num % 12
+# ==================================================
+#  🗂️ 사주 컨텍스트 (ChartContext)
+#  메뉴/AI 프롬프트가 공유하는 파생 분석 - 첫 접근 시 1회 계산
+# ==================================================
 
-        cg = CG[cg_idx]
-        jj = JJ[jj_idx]
-        return {"cg": cg, "jj": jj, "str": cg+jj}
+class ChartContext:
+    """
+    사주 1건의 파생 분석 묶음 (불변)
+    - strength / ohaeng / yongshin / gyeokguk / sipsung / unsung / sinsal / extra_sinsal
+      gongmang / yukjin / chung_hyung / timeline / daewoon : 첫 접근 시 계산 후 보관
+    - 원국 정적 분석은 AnalysisStore(오프라인 저장소) 우선 조회
+    - ChartContext.of(...) : 세션 안에서 같은 사주/출생시각이면 같은 객체
+    """
+    __slots__ = ("pils", "chart", "birth_year", "birth_month", "birth_day",
+                 "birth_hour", "birth_minute", "gender", "_memo")
 
-    @staticmethod
-    @st.cache_data
-    def get_pillars(birth_year, birth_month, birth_day, birth_hour=12, birth_minute=0, gender="남"):
-        """사주팔자 계산 - 반환: [시주, 일주, 월주, 년주]"""
-        year_p = SajuCoreEngine._get_year_pillar(birth_year, birth_month, birth_day, birth_hour, birth_minute)
-        month_p = SajuCoreEngine._get_month_pillar(birth_year, birth_month, birth_day, birth_hour, birth_minute)
-        day_p = SajuCoreEngine._get_day_pillar(birth_year, birth_month, birth_day)
-        hour_p = SajuCoreEngine._get_hour_pillar(birth_hour, birth_minute, day_p["cg"])
-        return [hour_p, day_p, month_p, year_p]
+    SESSION_KEY = "_chart_ctx"
+    MAX_PER_SESSION = 8
 
-    @staticmethod
-    def get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour=12, birth_minute=0, gender="남"):
-        """대운 계산 - 정밀 모드"""
-        # 연간의 음양 (년주의 천간 기준)
-        year_cg = pils[3]["cg"]
-        year_cg_idx = CG.index(year_cg)
-        is_yang = year_cg_idx % 2 == 0
-
-        # 성별+음양 순행/역행
-        if (gender == "남" and is_yang) or (gender == "여" and not is_yang):
-            direction = 1  # 순행
-        else:
-            direction = -1  # 역행
+    def __init__(self, pils, birth_year, birth_month=1, birth_day=1, birth_hour=12, birth_minute=0, gender="남"):
+        chart = Chart.from_pils(pils, gender)
+        # pils 는 get_pillars 표기로 정규화 - 같은 사주면 입력 표기("甲"/"甲(갑)")와 무관하게 같은 결과
+        for k, v in (("pils", chart.pils), ("chart", chart),
+                     ("birth_year", birth_year), ("birth_month", birth_month), ("birth_day", birth_day),
+                     ("birth_hour", birth_hour), ("birth_minute", birth_minute), ("gender", gender),
+                     ("_memo", {})):
+            object.__setattr__(self, k, v)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ChartContext is immutable")
 
-        # 절입일 찾기 및 대운 시작 나이 계산
+    @classmethod
+    def of(cls, pils, birth_year, birth_month=None, birth_day=None, birth_hour=None, birth_minute=None, gender="남"):
+        """세션 공유 컨텍스트 (인수 순서는 BirthKeyedLRU.of 와 같음) - 생월/일/시/분 생략 시 세션 값 사용"""
+        given = (birth_month, birth_day, birth_hour, birth_minute)
+        birth = tuple(s if g is None else g for g, s in zip(given, _session_birth()))
+        key = (Chart.from_pils(pils).pils_code, birth_year) + birth + (gender,)
         try:
-            days_to_term = SajuCoreEngine._get_days_to_term(birth_year, birth_month, birth_day, birth_hour, birth_minute, direction)
-            # 3일 = 1년, 1일 = 4개월 자투리. 
-            # ✅ 정밀 대운수: 반올림 적용 (나머지가 0.5년(1.5일) 이상이면 올림)
-            start_age = int(round(days_to_term / 3.0))
-            if start_age == 0: start_age = 1 
-
-            daewoon_list = []
-            month_p = pils[2]  # 월주가 대운의 출발점
-            wolgan_idx = CG.index(month_p["cg"])
-            wolji_idx = JJ.index(month_p["jj"])
-
-            for i in range(10): # 100년 대운
-                step = i + 1
-                d_cg_idx = (wolgan_idx + direction * step) % 10
-                d_jj_idx = (wolji_idx + direction * step) % 12
-                age_start = start_age + (i * 10)
-                year_start = birth_year + age_start
-
-                daewoon_list.append({
-                    "순번": i+1,
-                    "cg": CG[d_cg_idx],
-                    "jj": JJ[d_jj_idx],
-                    "str": CG[d_cg_idx] + JJ[d_jj_idx],
-                    "시작나이": age_start,
-                    "시작연도": year_start,
-                    "종료연도": year_start + 9
-                })
-        except Exception as e:
-            daewoon_list = []
+            store = st.session_state.setdefault(cls.SESSION_KEY, {})
+        except Exception:      # 세션 밖(배치/스크립트) 호출
+            store = {}
+        ctx = store.get(key)
+        if ctx is None:
+            ctx = cls(pils, birth_year, *birth, gender)
+            if len(store) >= cls.MAX_PER_SESSION:
+                store.pop(next(iter(store)))
+            store[key] = ctx
+        return ctx
 
-        return daewoon_list
+    def _get(self, name, fn):
+        memo = self._memo
+        if name not in memo:
+            memo[name] = fn()
+        return memo[name]
+
+    # -- 원국 --
+    @property
+    def ilgan(self):
+        return self.pils[1]["cg"]
+
+    @property
+    def ilgan_oh(self):
+        return OH.get(self.ilgan, "")
+
+    @property
+    def strength(self):
+        return self._get("strength", lambda: AnalysisStore.fetch(
+            "get_ilgan_strength", self.pils, lambda: get_ilgan_strength(self.ilgan, self.pils)))
+
+    @property
+    def ohaeng(self):
+        return self._get("ohaeng", lambda: AnalysisStore.fetch(
+            "calc_ohaeng_strength", self.pils, lambda: calc_ohaeng_strength(self.ilgan, self.pils)))
+
+    @property
+    def yongshin(self):
+        return self._get("yongshin", lambda: AnalysisStore.fetch(
+            "get_yongshin", self.pils, lambda: get_yongshin(self.pils)))
+
+    @property
+    def yongshin_ohs(self):
+        return _yongshin_list(self.yongshin)
+
+    @property
+    def gyeokguk(self):
+        return self._get("gyeokguk", lambda: AnalysisStore.fetch(
+            "get_gyeokguk", self.pils, lambda: get_gyeokguk(self.pils)))
+
+    @property
+    def sipsung(self):
+        return self._get("sipsung", lambda: AnalysisStore.fetch(
+            "calc_sipsung", self.pils, lambda: calc_sipsung(self.ilgan, self.pils)))
+
+    @property
+    def unsung(self):
+        return self._get("unsung", lambda: AnalysisStore.fetch(
+            "calc_12unsung", self.pils, lambda: calc_12unsung(self.ilgan, self.pils)))
+
+    @property
+    def sinsal(self):
+        return self._get("sinsal", lambda: AnalysisStore.fetch(
+            "get_12sinsal", self.pils, lambda: get_12sinsal(self.pils)))
+
+    @property
+    def extra_sinsal(self):
+        return self._get("extra_sinsal", lambda: get_extra_sinsal(self.pils))
+
+    @property
+    def gongmang(self):
+        return self._get("gongmang", lambda: AnalysisStore.fetch(
+            "get_gongmang", self.pils, lambda: get_gongmang(self.pils)))
+
+    @property
+    def yukjin(self):
+        return self._get("yukjin", lambda: get_yukjin(self.ilgan, self.pils, self.gender))
+
+    @property
+    def chung_hyung(self):
+        return self._get("chung_hyung", lambda: get_chung_hyung(self.pils))
+
+    # -- 시간축 --
+    @property
+    def timeline(self):
+        return self._get("timeline", lambda: DaewoonTimeline.of(
+            self.pils, self.birth_year, self.birth_month, self.birth_day,
+            self.birth_hour, self.birth_minute, self.gender))
+
+    @property
+    def daewoon(self):
+        """get_daewoon 호환 리스트 (사본)"""
+        return self.timeline.as_list()
+
+    @property
+    def fingerprint(self):
+        """정규 사주 지문 (8글자 + 성별 + 대운 방향/대운수) - 분석/AI 캐시 키"""
+        return self._get("fingerprint", lambda: chart_fingerprint(
+            self.chart, start_age=self.timeline.start_age, direction=self.timeline.direction))
+
+    @property
+    def life(self):
+        """평생 사건/전환점 인덱스"""
+        return self._get("life", lambda: LifeEventIndex.of(
+            self.pils, self.birth_year, self.birth_month, self.birth_day,
+            self.birth_hour, self.birth_minute, self.gender))
+
+    def yearly_luck(self, year):
+        return self._get(("yearly_luck", year), lambda: get_yearly_luck(self.pils, year))
 
 # ==================================================
 #  십성(十星) 및 12운성 계산 (Bug 5 Fix)
 # ==================================================
-@st.cache_data
+@engine_memo
 def calc_sipsung(ilgan, pils):
     """십성 계산"""
     result = []
@@ -4243,7 +6076,7 @@ def calc_12unsung(ilgan, pils):
     return result
 
 
-@st.cache_data
+@engine_memo
 def calc_ohaeng_strength(ilgan, pils):
     '''
     오행 세력 점수화 v2 (정밀 엔진)
@@ -4399,7 +6232,7 @@ STRENGTH_DESC = {
 }
 
 
-@st.cache_data
+@engine_memo
 def get_ilgan_strength(ilgan, pils):
     """
     일간 신강신약 v2 | 5단계 점수화 (0~100)
@@ -4569,36 +6402,13 @@ YEARLY_LUCK_NARRATIVE = {
 }
 
 
-@st.cache_data
+@engine_memo
 def get_yearly_luck(pils, current_year):
-    """세운 계산"""
-    idx = (current_year - 4) % 60
-    cg = CG[idx % 10]
-    jj = JJ[idx % 12]
-
-    # ✅ BUG 6 FIX: pils[1]["cg"] (일주 천간) - [시, 일, 월, 년] 순서
-    ilgan = pils[1]["cg"]
-    se_ss_cg = TEN_GODS_MATRIX.get(ilgan, {}).get(cg, "-")
-    jijang = JIJANGGAN.get(jj, [])
-    se_ss_jj = TEN_GODS_MATRIX.get(ilgan, {}).get(jijang[-1] if jijang else "", "-")
-
-    oh_cg = OH.get(cg, "")
-    oh_jj = OH.get(jj, "")
-
-    narr = YEARLY_LUCK_NARRATIVE.get(se_ss_cg, YEARLY_LUCK_NARRATIVE["-"])
-
-    return {
-        "연도": current_year,
-        "세운": cg + jj,
-        "cg": cg, "jj": jj,
-        "십성_천간": se_ss_cg,
-        "십성_지지": se_ss_jj,
-        "오행_천간": oh_cg,
-        "오행_지지": oh_jj,
-        "길흉": narr["level"],
-        "아이콘": narr["icon"],
-        "narrative": narr,
-    }
+    """세운 계산 (LuckSeries 와 같은 행 생성기)"""
+    i = _luck_ilgan_idx(pils[1]["cg"])
+    gz = (current_year - 4) % 60
+    return _yearly_luck_row(current_year, gz % 10, gz % 12,
+                            int(_LUCK_SS[i, gz % 10]), int(_LUCK_SS_JJ[i, gz % 12]))
 
 
 
@@ -4694,35 +6504,71 @@ MONTHLY_LUCK_DESC = {
 }
 
 
-@st.cache_data
+@engine_memo
 def get_monthly_luck(pils, year, month):
-    """월운 계산 - 오호둔월법으로 월간(천간) 계산 후 십성 산출"""
+    """월운 계산 - 오호둔월법으로 월간(천간) 계산 후 십성 산출 (LuckSeries 와 같은 행 생성기)"""
     if not pils: return None
-    ilgan = pils[1]["cg"]
+    i = _luck_ilgan_idx(pils[1]["cg"])
+    cg = int(_MONTH_CG[(year - 4) % 10, (month - 1) % 12])
+    jj = month % 12
+    return _monthly_luck_row(month, cg, jj, int(_LUCK_SS[i, cg]), int(_LUCK_SS_JJ[i, jj]))
 
-    # 월지(月支): 1월=丑, 2월=寅, ..., 12월=子
-    jj_list = ["丑(축)","寅(인)","卯(묘)","辰(진)","巳(사)","午(오)","未(미)","申(신)","酉(유)","戌(술)","亥(해)","子(자)"]
-    target_jj = jj_list[(month - 1) % 12]
-
-    # [BUG FIX] 월간(月干) 계산 - 오호둔월법
-    # TEN_GODS_MATRIX는 천간 키만 가짐 → 지지(target_jj)를 직접 조회하면 항상 "-" 반환이 버그 원인
-    CG_LIST = ["甲(갑)","乙(을)","丙(병)","丁(정)","戊(무)","己(기)","庚(경)","辛(신)","壬(임)","癸(계)"]
-    year_cg = CG_LIST[(year - 4) % 10]
-    # 연간 기준 寅月(2월) 시작 천간 인덱스 (오호둔월법)
-    OHHO_IDX = {"甲(갑)":2,"己(기)":2,"乙(을)":4,"庚(경)":4,"丙(병)":6,"辛(신)":6,"丁(정)":8,"壬(임)":8,"戊(무)":0,"癸(계)":0}
-    start_idx = OHHO_IDX.get(year_cg, 0)
-    # month 2(寅)=offset 0, month 3(卯)=offset 1, ..., month 1(丑)=offset 11
-    month_offset = (month - 2) % 12
-    target_cg = CG_LIST[(start_idx + month_offset) % 10]
-
-    # 천간 기준 십성 (정확한 계산)
-    sipsung = TEN_GODS_MATRIX.get(ilgan, {}).get(target_cg, "-")
-    # 지지 정기(본기) 기준 보조 십성
-    jj_junggi = JIJANGGAN.get(target_jj, ["-"])[-1]
-    sipsung_jj = TEN_GODS_MATRIX.get(ilgan, {}).get(jj_junggi, "-")
 
-    luck_data = MONTHLY_LUCK_DESC.get(sipsung) or MONTHLY_LUCK_DESC.get(sipsung_jj) or MONTHLY_LUCK_DESC["-"]
+# ==================================================
+#  평생 세운/월운 시계열 (LuckSeries)
+#  - 세운/월운은 일간과 연·월 간지로만 정해짐 -> 일간(10) x 천간/지지 십성표 + 60년 주기 월주표로
+#    120년 세운 / 1,440개월 월운을 인덱스 연산 한 번으로 펼침
+#  - get_yearly_luck / get_monthly_luck 도 같은 표와 행 생성기를 사용 (결과 동일)
+# ==================================================
+_SS_LABEL = SIPSUNG_LIST + ["-"]                       # 인덱스 -1 = "-"
+# 일간 인덱스 -1(해석 불가) 은 마지막 행 = 전부 "-"
+_LUCK_SS = np.vstack([TEN_GOD_IDX, np.full((1, 10), -1, dtype=np.int8)])
+_LUCK_SS_JJ = np.vstack([JJ_TEN_GOD_IDX, np.full((1, 12), -1, dtype=np.int8)])
+# 연간(0~9) x 월(1~12) -> 월간 인덱스 (오호둔월법: 甲己=丙寅, 乙庚=戊寅, 丙辛=庚寅, 丁壬=壬寅, 戊癸=甲寅)
+_MONTH_CG = ((np.arange(10)[:, None] % 5) * 2 + 2 + (np.arange(1, 13)[None, :] - 2) % 12) % 10
+_MONTH_JJ = np.arange(1, 13) % 12                      # 1월=丑 ... 11월=亥, 12월=子
+
+YEAR_GRADES = ["대길(大吉)", "길(吉)", "평길(平吉)", "평(平)", "흉(凶)", "흉흉(凶凶)"]
+YEAR_GRADE_POINTS = {"대길(大吉)": 20, "길(吉)": 10, "평길(平吉)": 5, "평(平)": 0, "흉(凶)": -15, "흉흉(凶凶)": -25}
+MONTH_GRADES = ["대길", "길", "평길", "평", "흉", "흉흉"]
+_Y_GRADE_IDX = np.array([YEAR_GRADES.index(YEARLY_LUCK_NARRATIVE.get(s, YEARLY_LUCK_NARRATIVE["-"])["level"])
+                         for s in _SS_LABEL], dtype=np.int8)
+_Y_POINTS = np.array([YEAR_GRADE_POINTS[YEAR_GRADES[g]] for g in _Y_GRADE_IDX], dtype=np.int16)
+_M_GRADE_IDX = np.array([MONTH_GRADES.index(MONTHLY_LUCK_DESC.get(s, MONTHLY_LUCK_DESC["-"])["길흉"])
+                         for s in _SS_LABEL], dtype=np.int8)
+
+
+def _luck_ilgan_idx(ilgan):
+    """일간 -> 0~9 (해석 불가면 -1 = '-' 행)"""
+    try:
+        return cg_index(ilgan)
+    except (ValueError, IndexError, TypeError):
+        return -1
+
+
+def _yearly_luck_row(year, cg, jj, ss, ss_jj):
+    """세운 dict 한 행 (get_yearly_luck 반환 형식)"""
+    se_ss_cg = _SS_LABEL[ss]
+    narr = YEARLY_LUCK_NARRATIVE.get(se_ss_cg, YEARLY_LUCK_NARRATIVE["-"])
+    return {
+        "연도": year,
+        "세운": CG[cg] + JJ[jj],
+        "cg": CG[cg], "jj": JJ[jj],
+        "십성_천간": se_ss_cg,
+        "십성_지지": _SS_LABEL[ss_jj],
+        "오행_천간": OH_ORDER[CG_OH_IDX[cg]],
+        "오행_지지": OH_ORDER[JJ_OH_IDX[jj]],
+        "길흉": narr["level"],
+        "아이콘": narr["icon"],
+        "narrative": narr,
+    }
+
 
+def _monthly_luck_row(month, cg, jj, ss, ss_jj):
+    """월운 dict 한 행 (get_monthly_luck 반환 형식)"""
+    sipsung, sipsung_jj = _SS_LABEL[ss], _SS_LABEL[ss_jj]
+    target_cg, target_jj = _CG_FULL[cg], f"{JJ[jj]}({JJ_KR[jj]})"
+    luck_data = MONTHLY_LUCK_DESC.get(sipsung) or MONTHLY_LUCK_DESC.get(sipsung_jj) or MONTHLY_LUCK_DESC["-"]
     return {
         "월": month, "간": target_cg, "지": target_jj,
         "십성": sipsung, "십성_지지": sipsung_jj,
@@ -4737,6 +6583,99 @@ def get_monthly_luck(pils, year, month):
     }
 
 
+class LuckSeries(ClassLRU):
+    """
+    평생 세운/월운 시계열 (일간 + 시작 연도 기준 LRU 메모)
+    - years            : first_year 부터 n_years 개 연도
+    - y_gz/y_cg/y_jj   : 세운 60갑자/천간/지지 인덱스
+    - y_ss/y_ss_jj     : 세운 천간/지지 십성 (SIPSUNG_LIST 인덱스, -1 = "-")
+    - y_grade/y_points : YEAR_GRADES 인덱스 / calc_luck_score 가감점
+    - m_*              : (n_years, 12) 월운 배열 (1월~12월), m_grade 는 MONTH_GRADES 인덱스
+    """
+    __slots__ = ("ilgan", "first_year", "years", "y_gz", "y_cg", "y_jj", "y_ss", "y_ss_jj",
+                 "y_grade", "y_points", "m_gz", "m_cg", "m_jj", "m_ss", "m_ss_jj", "m_grade")
+
+    N_YEARS = 120
+    CACHE_SIZE = 64
+
+    def __init__(self, ilgan, first_year, n_years=N_YEARS):
+        i = self.ilgan = _luck_ilgan_idx(ilgan)
+        self.first_year = first_year
+        self.years = np.arange(first_year, first_year + n_years, dtype=np.int32)
+        self.y_gz = (self.years - 4) % 60
+        self.y_cg, self.y_jj = self.y_gz % 10, self.y_gz % 12
+        self.y_ss, self.y_ss_jj = _LUCK_SS[i][self.y_cg], _LUCK_SS_JJ[i][self.y_jj]
+        self.y_grade, self.y_points = _Y_GRADE_IDX[self.y_ss], _Y_POINTS[self.y_ss]
+
+        self.m_cg = _MONTH_CG[(self.years - 4) % 10]
+        self.m_jj = np.broadcast_to(_MONTH_JJ, self.m_cg.shape)
+        self.m_gz = (6 * self.m_cg - 5 * self.m_jj) % 60
+        self.m_ss, self.m_ss_jj = _LUCK_SS[i][self.m_cg], _LUCK_SS_JJ[i][self.m_jj]
+        self.m_grade = _M_GRADE_IDX[self.m_ss]
+
+    @classmethod
+    def of(cls, pils, first_year, n_years=N_YEARS):
+        """메모된 시계열 (세운/월운은 일간만 보므로 일간이 같은 사주끼리 공유)"""
+        ilgan = pils[1]["cg"] if isinstance(pils, list) else pils
+        key = (_luck_ilgan_idx(ilgan), first_year, n_years)
+        return cls._memo(key, lambda: cls(ilgan, first_year, n_years))
+
+    def span(self, y0, y1):
+        """[y0, y1) 연도 구간 -> 배열 slice (시계열 범위로 잘라냄)"""
+        n = len(self.years)
+        return slice(min(n, max(0, y0 - self.first_year)), min(n, max(0, y1 - self.first_year)))
+
+    def yearly(self, y0, y1):
+        """[y0, y1) 세운 dict 리스트 (시계열 범위 밖 연도는 같은 표로 바로 계산)"""
+        i, n, out = self.ilgan, len(self.years), []
+        for y in range(y0, y1):
+            k = y - self.first_year
+            if 0 <= k < n:
+                c, j, ss, ss_jj = self.y_cg[k], self.y_jj[k], self.y_ss[k], self.y_ss_jj[k]
+            else:
+                gz = (y - 4) % 60
+                c, j = gz % 10, gz % 12
+                ss, ss_jj = _LUCK_SS[i, c], _LUCK_SS_JJ[i, j]
+            out.append(_yearly_luck_row(y, int(c), int(j), int(ss), int(ss_jj)))
+        return out
+
+    def year(self, y):
+        """한 해 세운 dict"""
+        return self.yearly(y, y + 1)[0]
+
+    def monthly(self, year):
+        """해당 연도 1~12월 월운 dict 리스트"""
+        k = year - self.first_year
+        if 0 <= k < len(self.years):
+            cgs, jjs, ss, ss_jj = self.m_cg[k], self.m_jj[k], self.m_ss[k], self.m_ss_jj[k]
+        else:
+            cgs, jjs = _MONTH_CG[(year - 4) % 10], _MONTH_JJ
+            ss, ss_jj = _LUCK_SS[self.ilgan][cgs], _LUCK_SS_JJ[self.ilgan][jjs]
+        return [_monthly_luck_row(m + 1, int(cgs[m]), int(jjs[m]), int(ss[m]), int(ss_jj[m]))
+                for m in range(12)]
+
+    def frame(self, monthly=False):
+        """pandas DataFrame (연도별 또는 연도x월별) - 표/차트용"""
+        import pandas as pd
+        if not monthly:
+            return pd.DataFrame({
+                "연도": self.years,
+                "세운": [GANJI_60[g] for g in self.y_gz],
+                "십성_천간": [_SS_LABEL[s] for s in self.y_ss],
+                "십성_지지": [_SS_LABEL[s] for s in self.y_ss_jj],
+                "길흉": [YEAR_GRADES[g] for g in self.y_grade],
+                "점수": self.y_points,
+            })
+        return pd.DataFrame({
+            "연도": np.repeat(self.years, 12),
+            "월": np.tile(np.arange(1, 13), len(self.years)),
+            "월주": [GANJI_60[g] for g in self.m_gz.ravel()],
+            "십성": [_SS_LABEL[s] for s in self.m_ss.ravel()],
+            "십성_지지": [_SS_LABEL[s] for s in self.m_ss_jj.ravel()],
+            "길흉": [MONTH_GRADES[g] for g in self.m_grade.ravel()],
+        })
+
+
 def tab_monthly(pils, birth_year, gender):
     """월별 세운 표시 (단순화 버전 - 오류 해결용)"""
     import calendar
@@ -4746,7 +6685,7 @@ def tab_monthly(pils, birth_year, gender):
     LEVEL_COLOR = {"대길":"#4caf50","길":"#8bc34a","평길":"#ffc107","평":"#9e9e9e","흉":"#f44336","흉흉":"#b71c1c"}
     LEVEL_EMOJI = {"대길":"🌟","길":"✅","평길":"🟡","평":"⬜","흉":"[!]️","흉흉":"🔴"}
     
-    months_data = [get_monthly_luck(pils, sel_year, m) for m in range(1, 13)]
+    months_data = LuckSeries.of(pils, birth_year).monthly(sel_year)
     
     for ml in months_data:
         m = ml["월"]
@@ -4766,19 +6705,14 @@ def tab_monthly(pils, birth_year, gender):
 
 def get_10year_luck_table(pils, birth_year, gender="남"):
     """10년 운세 테이블"""
-    # 대운 호출 시 실제 생년월일시 반영
-    birth_month = st.session_state.get('birth_month', 1)
-    birth_day = st.session_state.get('birth_day', 1)
-    birth_hour = st.session_state.get('birth_hour', 12)
-    birth_minute = st.session_state.get('birth_minute', 0)
-    daewoon = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender=gender)
+    # 대운 호출 시 실제 생년월일시 반영 (ChartContext 가 세션 생월/일/시/분 사용)
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
+    daewoon = ctx.daewoon
+    luck = LuckSeries.of(pils, birth_year)
     result = []
     current_year = datetime.now().year
     for dw in daewoon:
-        yearly = []
-        for y in range(dw["시작연도"], dw["시작연도"] + 10):
-            ye = get_yearly_luck(pils, y)
-            yearly.append(ye)
+        yearly = luck.yearly(dw["시작연도"], dw["시작연도"] + 10)
         result.append({**dw, "yearly": yearly, "is_current": dw["시작연도"] <= current_year <= dw["종료연도"]})
     return result
 
@@ -4971,9 +6905,8 @@ def get_ai_interpretation(prompt_text, api_key="", system="당신은 40년 경
     return ""
 
 
-# ✅ BUG 3 FIX: hash_funcs를 사용하여 dict 인수 해싱 가능하게 처리
-@st.cache_data(hash_funcs={dict: lambda d: json.dumps(d, sort_keys=True, default=str)})
-def build_past_events(pils, birth_year, gender):
+@engine_memo
+def build_past_events(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0):
     """
     과거 사건 자동 생성 v2 — 천간충+지지충 동시 감지, 도메인 7개 세분화, 구체적 문구
     정확도 향상 포인트:
@@ -4986,12 +6919,8 @@ def build_past_events(pils, birth_year, gender):
     orig_jjs = [p["jj"] for p in pils]
     orig_cgs = [p["cg"] for p in pils]
     current_year = datetime.now().year
-    birth_month  = st.session_state.get('birth_month', 1)
-    birth_day    = st.session_state.get('birth_day', 1)
-    birth_hour   = st.session_state.get('birth_hour', 12)
-    birth_minute = st.session_state.get('birth_minute', 0)
-    daewoon = SajuCoreEngine.get_daewoon(
-        pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender=gender)
+    daewoon = DaewoonTimeline.of(pils, birth_year, bm, bd, bh, bmi, gender).cycles
+    luck = LuckSeries.of(pils, birth_year)
 
     # ① 천간충 쌍 (甲-庚, 乙-辛, 丙-壬, 丁-癸)
     TG_CHUNG = [
@@ -5140,11 +7069,11 @@ def build_past_events(pils, birth_year, gender):
                 })
 
         # 대운 내 세운별 교차 분석
-        for y in range(dw["시작연도"], min(dw["종료연도"] + 1, current_year)):
+        for sw in luck.yearly(dw["시작연도"], min(dw["종료연도"] + 1, current_year)):
+            y = sw["연도"]
             age = y - birth_year + 1
             if age < 5:
                 continue
-            sw    = get_yearly_luck(pils, y)
             sw_cg = sw.get("cg", "")
             sw_ss = sw.get("십성_천간", "-")
             sw_domain = SS_DOMAIN.get(gender, SS_DOMAIN["남"]).get(sw_ss, "변화")
@@ -5280,12 +7209,8 @@ def build_life_event_timeline(pils, birth_year, gender):
     """
     ilgan = pils[1]["cg"]
     current_year = datetime.now().year
-    birth_month  = st.session_state.get('birth_month', 1)
-    birth_day    = st.session_state.get('birth_day', 1)
-    birth_hour   = st.session_state.get('birth_hour', 12)
-    birth_minute = st.session_state.get('birth_minute', 0)
-    daewoon = SajuCoreEngine.get_daewoon(
-        pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender=gender)
+    daewoon = DaewoonTimeline.from_session(pils, birth_year, gender).cycles
+    luck = LuckSeries.of(pils, birth_year)
     orig_jjs = [p["jj"] for p in pils]
 
     # 7개 도메인 트리거 십성
@@ -5405,11 +7330,11 @@ def build_life_event_timeline(pils, birth_year, gender):
             continue
         dw_ss = TEN_GODS_MATRIX.get(ilgan, {}).get(dw["cg"], "-")
 
-        for y in range(dw["시작연도"], min(dw["종료연도"] + 1, current_year)):
+        for sw in luck.yearly(dw["시작연도"], min(dw["종료연도"] + 1, current_year)):
+            y = sw["연도"]
             age = y - birth_year + 1
             if age < 5:  # 최소 5세부터 시작
                 continue
-            sw    = get_yearly_luck(pils, y)
             sw_ss = sw.get("십성_천간", "-")
             combo = (dw_ss, sw_ss)
 
@@ -5822,7 +7747,7 @@ OH_COMBO_DB = {
 }
 
 
-@st.cache_data
+@engine_memo
 def generate_engine_highlights(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0):
     """
     * 핵심 엔진 *
@@ -5840,13 +7765,14 @@ def generate_engine_highlights(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=
     ilgan = pils[1]["cg"]
     ilgan_oh = OH.get(ilgan, "")
     current_year = datetime.now().year
-    daewoon = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmi, gender=gender)
+    daewoon = DaewoonTimeline.of(pils, birth_year, bm, bd, bh, bmi, gender).cycles
+    luck = LuckSeries.of(pils, birth_year)
     strength_info = get_ilgan_strength(ilgan, pils)
     sn = strength_info["신강신약"]
     oh_strength = strength_info["oh_strength"]
 
     # -- 과거 사건 (기존 엔진 활용) -----------------------
-    past_events = build_past_events(pils, birth_year, gender)
+    past_events = build_past_events(pils, birth_year, gender, bm, bd, bh, bmi)
 
     # -- 성향 - 조합 공식으로 생성 ------------------------
     personality = build_personality_detail_v2(pils, gender, sn, oh_strength)
@@ -5866,8 +7792,8 @@ def generate_engine_highlights(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=
             })
         # 세운 중 재물 피크 (현재+5년)
         if dw["시작연도"] <= current_year + 5 and dw["종료연도"] >= current_year - 2:
-            for y in range(max(dw["시작연도"], current_year-2), min(dw["종료연도"]+1, current_year+6)):
-                sw = get_yearly_luck(pils, y)
+            for sw in luck.yearly(max(dw["시작연도"], current_year-2), min(dw["종료연도"]+1, current_year+6)):
+                y = sw["연도"]
                 if sw["십성_천간"] in MONEY_SS and dw_ss in MONEY_SS:
                     age = y - birth_year + 1
                     money_peak.append({
@@ -5884,8 +7810,8 @@ def generate_engine_highlights(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=
         dw_ss = TEN_GODS_MATRIX.get(ilgan, {}).get(dw["cg"], "-")
         if dw_ss in MARRIAGE_SS:
             # 대운 내에서 가장 강한 세운 탐색
-            for y in range(dw["시작연도"], min(dw["종료연도"]+1, current_year+10)):
-                sw = get_yearly_luck(pils, y)
+            for sw in luck.yearly(dw["시작연도"], min(dw["종료연도"]+1, current_year+10)):
+                y = sw["연도"]
                 if sw["십성_천간"] in MARRIAGE_SS:
                     age = y - birth_year + 1
                     marriage_peak.append({
@@ -5921,8 +7847,8 @@ def generate_engine_highlights(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=
                 "age": f"{age_start}~{age_start+2}세",
                 "desc": f"대운 진입시 월지 충({name_c}) - {desc}. 이 시기 {suffix}"
             })
-        for y in range(dw["시작연도"], min(dw["종료연도"]+1, current_year)):
-            sw = get_yearly_luck(pils, y)
+        for sw in luck.yearly(dw["시작연도"], min(dw["종료연도"]+1, current_year)):
+            y = sw["연도"]
             k2 = frozenset([sw["jj"], wol_jj])
             if k2 in CHUNG_MAP:
                 age = y - birth_year + 1
@@ -6136,10 +8062,16 @@ def get_cached_ai_interpretation(pils_hashable, prompt_type="general", api_key="
     - 동일 사주 + 동일 prompt_type -> 캐시에서 즉시 반환 (API 재호출 없음)
     - 캐시 미스 -> Sandbox로 AI 호출 -> 결과 검증 -> 캐시 저장
     """
-    saju_key = pils_hashable
-    cache_key = f"{saju_key}_{prompt_type}"
+    if isinstance(pils_hashable, Chart):
+        pils = pils_hashable.pils
+    elif isinstance(pils_hashable, str):
+        pils = json.loads(pils_hashable) if pils_hashable.startswith("[") else Chart.from_code(pils_hashable).pils
+    else:
+        pils = pils_hashable
 
-    # 1. 파일 캐시 조회
+    # 1. 파일 캐시 조회 (정규 사주 지문 - 같은 8글자/성별/대운이면 출생 시각이 달라도 공유)
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
+    saju_key = ctx.fingerprint
     cached = get_ai_cache(saju_key, prompt_type)
     if cached:
         cached = cached.replace("~", "～")  # 마크다운 취소선 방지 (캐시 호출 시에도 적용)
@@ -6149,31 +8081,19 @@ def get_cached_ai_interpretation(pils_hashable, prompt_type="general", api_key="
             return cached_stream()
         return cached
 
-    # 2. 캐시 미스 -> 사주 데이터 구성 후 AI 호웉
-    pils = json.loads(pils_hashable) if isinstance(pils_hashable, str) else pils_hashable
+    # 2. 캐시 미스 -> 사주 데이터 구성 후 AI 호출
     ilgan = pils[1]["cg"] if len(pils) > 1 else "甲(갑)"
     saju_str = ' '.join([p['str'] for p in pils])
 
-    # * Brain 2 AI 캐시 확인 (동일 사주 재요청 시 즉시 반환)
-    saju_key = pils_to_cache_key(pils)
-    cached_ai = get_ai_cache(saju_key, prompt_type)
-    if cached_ai:
-        return cached_ai
-
-    # 사주 데이터 계산
-    strength_info = get_ilgan_strength(ilgan, pils)
-    gyeokguk = get_gyeokguk(pils)
+    # 사주 데이터 계산 (대운은 세션의 실제 생년월일시 반영)
+    strength_info = ctx.strength
+    gyeokguk = ctx.gyeokguk
     oh_strength = strength_info["oh_strength"]
     current_year = datetime.now().year
     current_age = current_year - birth_year + 1
-    # 대운 호출 시 실제 생년월일시 반영
-    birth_month = st.session_state.get('birth_month', 1)
-    birth_day = st.session_state.get('birth_day', 1)
-    birth_hour = st.session_state.get('birth_hour', 12)
-    birth_minute = st.session_state.get('birth_minute', 0)
-    daewoon = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender=gender)
-    current_dw = next((dw for dw in daewoon if dw["시작연도"] <= current_year <= dw["종료연도"]), None)
-    yearly = get_yearly_luck(pils, current_year)
+    daewoon = ctx.daewoon
+    current_dw = ctx.timeline.at(current_year)
+    yearly = ctx.yearly_luck(current_year)
 
     gname = gyeokguk["격국명"] if gyeokguk else "미정격"
     sn = strength_info["신강신약"]
@@ -6250,7 +8170,7 @@ def get_cached_ai_interpretation(pils_hashable, prompt_type="general", api_key="
 {ctx_data}
 --------------------------------------------------"""
 
-    _tp = calc_turning_point(pils, birth_year, gender, current_year) if 'calc_turning_point' in dir() else {}
+    _tp = ctx.life.year_turning(current_year)
     _yl = get_yearly_luck(pils, current_year)
     _ys = get_yongshin_multilayer(pils, birth_year, gender, current_year)
     _tp_label = _tp.get('fate_label', '분석중') if _tp else '분석중'
@@ -6300,14 +8220,14 @@ def get_cached_ai_interpretation(pils_hashable, prompt_type="general", api_key="
   -> 30 이하=극신약 / 30~45=신약 / 45~55=중화 / 55~70=신강 / 70+=극신강
 ■ 오행 세력(정밀): {' '.join([f"{o}:{v}%" for o,v in oh_strength.items()])}
   -> 가장 강한 오행: {max(oh_strength, key=oh_strength.get)} / 가장 약한 오행: {min(oh_strength, key=oh_strength.get)}
-■ 종합 운세 점수: {calc_luck_score(pils, birth_year, gender, current_year)}/100
+■ 종합 운세 점수: {ctx.life.luck_score(current_year)}/100
   -> 70+= 상승기 / 50~70= 안정 / 30~50= 변화기 / 30-= 하락기
 ■ 인생 전환점 감지:
-{chr(10).join(["  " + r for r in calc_turning_point(pils, birth_year, gender, current_year)["reason"]]) or "  (안정적 흐름)"}
-■ 전환점 강도: {calc_turning_point(pils, birth_year, gender, current_year)["intensity"]}
+{chr(10).join(["  " + r for r in _tp["reason"]]) or "  (안정적 흐름)"}
+■ 전환점 강도: {_tp["intensity"]}
 
 ■ 사건 트리거 (확률 순):
-{chr(10).join(["  ["+t["type"]+"] "+t["title"]+" ("+str(t["prob"])+"%): "+t["detail"] for t in sorted(detect_event_triggers(pils, birth_year, gender, current_year), key=lambda x: -x["prob"])]) or "  (주요 트리거 없음)"}
+{chr(10).join(["  ["+t["type"]+"] "+t["title"]+" ("+str(t["prob"])+"%): "+t["detail"] for t in sorted(ctx.life.year_triggers(current_year), key=lambda x: -x["prob"])]) or "  (주요 트리거 없음)"}
 
 ■ 다층 용신 분석:
   1순위 용신: {get_yongshin_multilayer(pils, birth_year, gender, current_year).get("용신_1순위", "-")}
@@ -6325,26 +8245,26 @@ def get_cached_ai_interpretation(pils_hashable, prompt_type="general", api_key="
 """
 
     # ── 과거 프롬프트 강화: 원국 분석 + 연도별 대운×세운 교차 ──────────────
-    _sipsung_list = calc_sipsung(ilgan, pils)
+    _sipsung_list = ctx.sipsung
     _sip_labels = ["시주", "일주", "월주", "년주"]
     _sipsung_str = " / ".join([
         f"{_sip_labels[i]}: 천간{s['cg_ss']} 지지{s['jj_ss']}"
         for i, s in enumerate(_sipsung_list)
     ])
 
-    _sinsal_12 = get_12sinsal(pils)
+    _sinsal_12 = ctx.sinsal
     _sinsal_detail = "\n".join([
         f"  - {s['이름']}({s['icon']}): {s['desc']} (주의: {s['caution']})"
         for s in _sinsal_12
     ]) or "  없음"
     _sinsal_str = ", ".join([f"{s['이름']}({s['icon']})" for s in _sinsal_12]) or "없음"
 
-    _extra_sins = get_extra_sinsal(pils)
+    _extra_sins = ctx.extra_sinsal
     _extra_str = ", ".join([s.get("name", s.get("이름", "")) for s in _extra_sins]) or "없음"
     _has_yangin = any("양인" in s.get("name", "") or "羊刃" in s.get("name", "") for s in _extra_sins)
     _has_yukma = any("역마" in s.get("이름", "") or "驛馬" in s.get("이름", "") for s in _sinsal_12)
 
-    _yukjin = get_yukjin(ilgan, pils, gender)
+    _yukjin = ctx.yukjin
     _yukjin_str = "\n".join([
         f"  {y['관계']}: {y['위치']} - {y['desc']}"
         for y in _yukjin
@@ -6581,7 +8501,7 @@ def get_cached_ai_interpretation(pils_hashable, prompt_type="general", api_key="
                 f"사주: {saju_str} | 일간: {ilgan} | 격국: {gname} | {sn} | "
                 f"오행: {' '.join([f'{o}:{v}%' for o,v in oh_strength.items()])} | "
                 f"현재운: {yearly.get('세운','-')} {yearly.get('길흉','-')} | "
-                f"사건트리거: {', '.join([t['title'][:15] for t in detect_event_triggers(pils, birth_year, gender)[:3]])}"
+                f"사건트리거: {', '.join([t['title'][:15] for t in ctx.life.year_triggers(current_year)[:3]])}"
             )
             try:
                 result = self_check_ai(result, analysis_summary, api_key, groq_key)
@@ -6625,7 +8545,29 @@ def get_cached_ai_interpretation(pils_hashable, prompt_type="general", api_key="
 
 # 사주 입력값을 캐시 키로 변환
 def pils_to_cache_key(pils):
-    return json.dumps(pils, ensure_ascii=False, sort_keys=True)
+    """사주 캐시 키 - Chart.pils_code 16진 6자리 (JSON 직렬화 대신 정수 코드)"""
+    chart = pils if isinstance(pils, Chart) else Chart.from_pils(pils)
+    return chart.cache_key
+
+
+def chart_fingerprint(pils, gender="남", start_age=None, direction=None):
+    """
+    정규 사주 지문 (12자리 16진) - 분석 결과 캐시 공용 키
+    4주 60갑자 인덱스 + 성별 + 대운 방향 + 대운수만 담으므로, 같은 시(時) 안의 다른 분이나
+    절입 사이 다른 날에 태어나도 8글자/대운이 같으면 같은 지문
+    direction 생략 시 년간 음양+성별로 판정, start_age 생략 시 0
+    """
+    chart = pils if isinstance(pils, Chart) else Chart.from_pils(pils, gender)
+    if direction is None:
+        direction = 1 if chart.male == (chart.cg[3] % 2 == 0) else -1
+    code = (chart.pils_code | (int(chart.male) << 24) | (int(direction > 0) << 25)
+            | (min(max(start_age or 0, 0), 127) << 26))
+    return hashlib.blake2b(code.to_bytes(8, "little"), digest_size=6).hexdigest()
+
+
+def chart_cache_key(pils, birth_year, gender="남"):
+    """세션 출생 정보 기준 정규 사주 지문 (ChartContext 공유)"""
+    return ChartContext.of(pils, birth_year, gender=gender).fingerprint
 
 
 # -- Brain 1 + Brain 2 캐싱 시스템 --------------------------------------------
@@ -6654,17 +8596,21 @@ def _load_json_cache(filepath: str) -> dict:
         pass
     return {}
 
-def _save_json_cache(filepath: str, cache: dict):
-    """JSON 파일 캐시 저장"""
+def _save_json_cache(filepath: str, cache: dict, indent=2):
+    """JSON 파일 캐시 저장 (임시 파일에 쓴 뒤 교체 - 기록 도중 중단돼도 기존 파일 유지)"""
+    tmp = f"{filepath}.tmp"
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(cache, f, ensure_ascii=False, indent=2)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, ensure_ascii=False, indent=indent)
+        _os.replace(tmp, filepath)
     except Exception:
         pass
 
 def create_saju_cache_key(year: int, month: int, day: int, hour: int, gender: str) -> str:
-    """사주 캐시 키 생성 - 생년월일시+성별로 고유 ID"""
-    return f"{year}-{month:02d}-{day:02d}-{hour:02d}-{gender}"
+    """사주 캐시 키 생성 - 생년월일시+성별 -> 정규 사주 지문 (같은 8글자/대운이면 같은 키)"""
+    pils = SajuCoreEngine.get_pillars(year, month, day, hour, 0, gender)
+    tl = DaewoonTimeline.of(pils, year, month, day, hour, 0, gender)
+    return chart_fingerprint(pils, gender, tl.start_age, tl.direction)
 
 def get_saju_cache(year: int, month: int, day: int, hour: int, gender: str):
     """Brain 1 계산 결과 캐시 조회"""
@@ -6798,8 +8744,7 @@ def render_ai_deep_analysis(prompt_type, pils, name, birth_year, gender, api_key
         with st.spinner("사주 데이터를 정밀 분석 중입니다..."):
             result = None
             if api_key or groq_key:
-                pils_hash = pils_to_cache_key(pils)
-                result = get_cached_ai_interpretation(pils_hash, prompt_type, api_key, birth_year, gender, name, groq_key)
+                result = get_cached_ai_interpretation(pils, prompt_type, api_key, birth_year, gender, name, groq_key)
             # API 키 없을 때 → 로컬 엔진 완전 해설로 대체
             if not result or result.startswith("["):
                 _sec_map = {
@@ -6963,20 +8908,21 @@ def format_saju_text(pils, name=""):
 
 def generate_saju_summary(pils, name, birth_year, gender):
     """사주 종합 총평 자동 생성"""
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
     ilgan = pils[1]["cg"]
     ilgan_kr = CG_KR[CG.index(ilgan)]
     oh = OH.get(ilgan, "")
     oh_emoji = {"木": "🌳", "火": "🔥", "土": "🏔️", "金": "⚔️", "水": "🌊"}.get(oh, "-")
 
-    strength_info = get_ilgan_strength(ilgan, pils)
+    strength_info = ctx.strength
     strength = strength_info["신강신약"]
     oh_strength = strength_info["oh_strength"]
 
-    gyeokguk = get_gyeokguk(pils)
+    gyeokguk = ctx.gyeokguk
     gname = gyeokguk["격국명"] if gyeokguk else "미정격"
     grade = gyeokguk["격의_등급"] if gyeokguk else ""
 
-    unsung = calc_12unsung(ilgan, pils)
+    unsung = ctx.unsung
     il_unsung = unsung[1] if len(unsung) > 1 else ""
 
     # 오행 분석
@@ -6986,16 +8932,12 @@ def generate_saju_summary(pils, name, birth_year, gender):
 
     # 대운 현재
     current_year = datetime.now().year
-    # 대운 호출 시 실제 생년월일시 반영
-    birth_month = st.session_state.get('birth_month', 1)
-    birth_day = st.session_state.get('birth_day', 1)
-    birth_hour = st.session_state.get('birth_hour', 12)
-    birth_minute = st.session_state.get('birth_minute', 0)
-    daewoon = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender=gender)
+    # 대운 호출 시 실제 생년월일시 반영 (ChartContext 가 세션 생월/일/시/분 사용)
+    daewoon = ctx.daewoon
     current_dw = next((dw for dw in daewoon if dw["시작연도"] <= current_year <= dw["종료연도"]), None)
 
     # 세운
-    yearly = get_yearly_luck(pils, current_year)
+    yearly = ctx.yearly_luck(current_year)
 
     # 신살
     special = get_special_stars(pils)
@@ -7054,7 +8996,7 @@ def generate_saju_summary(pils, name, birth_year, gender):
     return "\n".join(lines)
 
 
-@st.cache_data
+@engine_memo
 def get_special_stars(pils):
     """신살 계산 (tab_special_stars에서 분리)"""
     ilgan = pils[1]["cg"]
@@ -7309,16 +9251,13 @@ def tab_daewoon(pils, birth_year, gender):
     """대운 탭 - 용신 하이라이트 + 합충 경고 + 처방"""
     st.markdown('<div class="gold-section">🔄 대운(大運) | 10년 주기 운명의 큰 흐름</div>', unsafe_allow_html=True)
 
-    # 대운 호출 시 실제 생년월일시 반영
-    birth_month = st.session_state.get('birth_month', 1)
-    birth_day = st.session_state.get('birth_day', 1)
-    birth_hour = st.session_state.get('birth_hour', 12)
-    birth_minute = st.session_state.get('birth_minute', 0)
-    daewoon = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender=gender)
+    # 대운 호출 시 실제 생년월일시 반영 (ChartContext 가 세션 생월/일/시/분 사용)
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
+    daewoon = ctx.daewoon
     current_year = datetime.now().year
     ilgan = pils[1]["cg"]
     ilgan_oh = OH.get(ilgan, "")
-    ys = get_yongshin(pils)
+    ys = ctx.yongshin
     yongshin_ohs = ys["종합_용신"]
 
     # -- 타임라인 요약 바 --------------------------------
@@ -7575,6 +9514,62 @@ def tab_gunghap(pils, name="나"):
         except Exception as e:
             st.error(f"분석 오류: {e}")
 
+    # -- 그룹 궁합 (팀/가족 N명 전원 쌍)
+    with st.expander("👨‍👩‍👧 그룹 궁합 - 여러 명 한 번에", expanded=False):
+        st.caption("한 줄에 한 명씩 '이름, 생년, 생월, 생일, 생시' 형식으로 입력하세요. 본인은 자동 포함됩니다.")
+        raw = st.text_area("구성원", placeholder="김철수, 1988, 3, 14, 9\n이영희, 1991, 11, 2, 22", key="group_gunghap_raw")
+        if st.button("👥 그룹 궁합 분석", key="btn_group_gunghap"):
+            members, names, bad = [pils], [name], []
+            for line in raw.splitlines():
+                parts = [x.strip() for x in line.split(",")]
+                if not line.strip():
+                    continue
+                try:
+                    y, m, d = int(parts[1]), int(parts[2]), int(parts[3])
+                    h = int(parts[4]) if len(parts) > 4 and parts[4] else 12
+                    members.append(SajuCoreEngine.get_pillars(y, m, d, h))
+                    names.append(parts[0] or f"{len(names) + 1}번")
+                except (ValueError, IndexError):
+                    bad.append(line)
+            if bad:
+                st.warning("형식 오류로 제외: " + " / ".join(bad))
+            if len(members) < 2:
+                st.info("구성원을 1명 이상 입력하세요.")
+            else:
+                df = GroupGunghap.matrix(members, names)
+                st.dataframe(df, use_container_width=True)
+                st.dataframe(GroupGunghap.summary(df), use_container_width=True, hide_index=True)
+
+    # -- 공동 택일 (결혼/계약일) - 위에서 궁합 분석한 상대와 함께
+    with st.expander("💍 공동 택일 - 두 사람 모두에게 좋은 날 (결혼/계약일)", expanded=False):
+        partner = st.session_state.get("last_gunghap")
+        if not partner:
+            st.info("먼저 위에서 상대방과의 궁합 분석을 실행하세요.")
+        else:
+            pname = partner["name"] if partner["name"] != name else f"{partner['name']}(상대)"
+            c1, c2 = st.columns(2)
+            with c1:
+                j_months = st.selectbox("검색 기간", [1, 3, 6, 12], index=2, format_func=lambda m: f"{m}개월",
+                                        key="joint_months")
+            with c2:
+                j_agg = st.selectbox("점수 기준", ["min", "mean"], key="joint_agg",
+                                     format_func=lambda a: {"min": "더 불리한 사람 기준", "mean": "두 사람 평균"}[a])
+            if st.button(f"💍 {name} · {pname} 공동 택일", key="btn_joint_taeil"):
+                try:
+                    j_start = datetime.now().date()
+                    found = search_joint_days([pils, partner["pils"]], j_start,
+                                              j_start + timedelta(days=round(30.44 * j_months)),
+                                              agg=j_agg, names=[name, pname])
+                    if found:
+                        st.dataframe([{"날짜": f"{g['date']:%Y-%m-%d} ({'月火水木金土日'[g['date'].weekday()]})",
+                                       "일진": g["pillar"], "점수": g["score"], "등급": g["level"],
+                                       **g["scores"], "비고": ", ".join(g["pair_notes"])} for g in found],
+                                     use_container_width=True, hide_index=True)
+                    else:
+                        st.info("검색 기간 안에 두 사람 모두에게 좋은 날이 없습니다. 기간을 늘려 보세요.")
+                except Exception as e:
+                    st.warning(f"공동 택일 오류: {e}")
+
 
 # ==================================================
 #  월령(月令) 심화 - 왕상휴수사
@@ -7738,7 +9733,7 @@ EXTRA_SINSAL = {
     },
 }
 
-@st.cache_data
+@engine_memo
 def get_12sinsal(pils):
     nyon_jj = pils[3]["jj"]
     pil_jjs = [p["jj"] for p in pils]
@@ -7778,36 +9773,16 @@ def get_12sinsal(pils):
 # * 사건 트리거 감지 엔진 v2 *
 # 충/형/합 + 십성활성 + 대운전환점 -> "소름 포인트" 생성
 # ==================================================
-
-_JIJI_CHUNG = {
-    "子(자)":"午(오)","午(오)":"子(자)","丑(축)":"未(미)","未(미)":"丑(축)",
-    "寅(인)":"申(신)","申(신)":"寅(인)","卯(묘)":"酉(유)","酉(유)":"卯(묘)",
-    "辰(진)":"戌(술)","戌(술)":"辰(진)","巳(사)":"亥(해)","亥(해)":"巳(사)",
-}
-_JIJI_HYEONG = {
-    "子(자)":"卯(묘)","卯(묘)":"子(자)",
-    "寅(인)":"巳(사)","巳(사)":"申(신)","申(신)":"寅(인)",
-    "丑(축)":"戌(술)","戌(술)":"未(미)","未(미)":"丑(축)",
-    "辰(진)":"辰(진)","午(오)":"午(오)","酉(유)":"酉(유)","亥(해)":"亥(해)",
-}
-_TG_HAP_PAIRS = [{"甲(갑)","己(기)"},{"乙(을)","庚(경)"},{"丙(병)","辛(신)"},{"丁(정)","壬(임)"},{"戊(무)","癸(계)"}]
-_SAM_HAP = [
-    (frozenset({"寅(인)","午(오)","戌(술)"}),"火"),(frozenset({"申(신)","子(자)","辰(진)"}),"水"),
-    (frozenset({"亥(해)","卯(묘)","未(미)"}),"木"),(frozenset({"巳(사)","酉(유)","丑(축)"}),"金"),
-]
 _BIRTH_F2 = {"木":"火","火":"土","土":"金","金":"水","水":"木"}
 _CTRL2    = {"木":"土","火":"金","土":"水","金":"木","水":"火"}
 
 
-@st.cache_data
-def detect_event_triggers(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0, target_year=None):
+def _year_event_triggers(pils, dw_tl, yong_ohs, target_year):
     """
-    사건 트리거 감지 - 충/형/합/십성활성/대운전환
+    사건 트리거 감지 본체 (연도 1개) - 충/형/합/십성활성/대운전환
+    대운 타임라인/용신 오행은 호출자가 사주당 1회 구해 전달
     Returns list[dict]: type, title, detail, prob(0~100)
     """
-    if target_year is None:
-        target_year = datetime.now().year
-
     ilgan  = pils[1]["cg"]
     il_jj  = pils[1]["jj"]
     wol_jj = pils[2]["jj"]
@@ -7816,47 +9791,42 @@ def detect_event_triggers(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0, ta
     year_jj = JJ[y_idx % 12]
     year_cg = CG[y_idx % 10]
 
-    # 대운 호출 시 실제 생년월일시 반영 (사용자 지침 준수)
-    dw_list = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmi, gender=gender)
-    cur_dw  = next((d for d in dw_list if d["시작연도"]<=target_year<=d["종료연도"]), None)
+    cur_dw  = dw_tl.at(target_year)
     dw_jj   = cur_dw["jj"] if cur_dw else ""
     dw_cg   = cur_dw["cg"] if cur_dw else ""
 
-    ys       = get_yongshin(pils)
-    yong_ohs = ys.get("종합_용신", []) if isinstance(ys.get("종합_용신"), list) else []
-    all_jjs  = frozenset(p["jj"] for p in pils)
+    il_j, wol_j, year_j = jj_index(il_jj), jj_index(wol_jj), jj_index(year_jj)
+    dw_j     = jj_index(dw_jj) if dw_jj else None
     triggers = []
 
     def add(type_, title, detail, prob):
         triggers.append({"type":type_,"title":title,"detail":detail,"prob":prob})
 
     # ① 충
-    if _JIJI_CHUNG.get(il_jj) == year_jj:
+    if JJ_REL[il_j, year_j] & REL_CHUNG:
         add("충","⚡ 일지 충(세운) - 삶의 터전 격변",
             "이사/직장변화/관계분리 확률이 높습니다. 기존 환경이 흔들리는 해입니다.",85)
-    if dw_jj and _JIJI_CHUNG.get(il_jj) == dw_jj:
+    if dw_j is not None and JJ_REL[il_j, dw_j] & REL_CHUNG:
         add("충","⚡ 일지 충(대운) | 10년 환경 변화",
             "대운 수준의 큰 환경 변화. 이사/직업 전환의 대운입니다.",80)
-    if _JIJI_CHUNG.get(wol_jj) == year_jj:
+    if JJ_REL[wol_j, year_j] & REL_CHUNG:
         add("충","🌊 월지 충 - 가족/직업 변동",
             "부모/형제 관계 변화, 직업 환경의 급격한 변화가 예상됩니다.",75)
 
     # ② 형
-    if _JIJI_HYEONG.get(il_jj) == year_jj or _JIJI_HYEONG.get(year_jj) == il_jj:
+    if JJ_REL[il_j, year_j] & REL_HYUNG:
         add("형","[!]️ 일지 형(刑) - 스트레스/사고",
             "건강/사고/법적 문제에 주의. 인간관계 갈등이 생깁니다.",70)
 
     # ③ 천간합
-    for pair in _TG_HAP_PAIRS:
-        if dw_cg in pair and year_cg in pair:
-            add("합","💑 천간합 - 새 인연/파트너십",
-                "새로운 인연/결혼/동업/계약 인연이 찾아옵니다.",65)
-            break
+    if dw_cg and CG_REL[cg_index(dw_cg), cg_index(year_cg)] & REL_CG_HAP:
+        add("합","💑 천간합 - 새 인연/파트너십",
+            "새로운 인연/결혼/동업/계약 인연이 찾아옵니다.",65)
 
     # ④ 삼합국
-    check_jjs = all_jjs | frozenset([dw_jj, year_jj])
-    for combo, oh in _SAM_HAP:
-        if combo.issubset(check_jjs):
+    check_mask = jj_mask([p["jj"] for p in pils] + [year_j] + ([dw_j] if dw_j is not None else []))
+    for combo_mask, (_, oh, _) in SAM_HAP_MASKS:
+        if covers_mask(check_mask, combo_mask):
             kind = "용신" if oh in yong_ohs else "기신"
             add("삼합","🌟 삼합국 - 강력한 기운 형성",
                 f"대운/세운/원국이 {oh}({OHN.get(oh,'')}) 삼합. {kind} 오행이므로 {'크게 발복' if kind=='용신' else '조심 필요'}합니다.",80)
@@ -7873,13 +9843,12 @@ def detect_event_triggers(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0, ta
                 "확장보다 수성(守成)이 최선. 큰 결정은 신중히 하십시오.",80)
 
     # ⑥ 대운 전환점 (2년 이내)
-    for i, dw_item in enumerate(dw_list[:-1]):
-        if dw_item["시작연도"] <= target_year <= dw_item["종료연도"]:
-            yrs_left = dw_item["종료연도"] - target_year
-            if yrs_left <= 2:
-                next_dw = dw_list[i+1]
-                add("전환","🔄 대운 전환점 - 흐름 역전",
-                    f"{yrs_left+1}년 안에 대운이 {next_dw['str']}로 전환됩니다. 이전과 다른 인생 국면이 펼쳐집니다.",85)
+    next_dw = dw_tl.next_of(target_year) if cur_dw else None
+    if next_dw:
+        yrs_left = cur_dw["종료연도"] - target_year
+        if yrs_left <= 2:
+            add("전환","🔄 대운 전환점 - 흐름 역전",
+                f"{yrs_left+1}년 안에 대운이 {next_dw['str']}로 전환됩니다. 이전과 다른 인생 국면이 펼쳐집니다.",85)
 
     # ⑦ 십성 활성화
     year_ss = TEN_GODS_MATRIX.get(ilgan,{}).get(year_cg,"-")
@@ -7893,47 +9862,37 @@ def detect_event_triggers(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0, ta
     return triggers
 
 
-@st.cache_data
+def _daewoon_luck_bonus(dw_cg, yong_ohs):
+    """대운 천간 오행 vs 용신 -> 운세 점수 가감 (용신 +25 / 용신 생 +12 / 상극 -20)"""
+    dw_oh = OH.get(dw_cg, "")
+    if dw_oh in yong_ohs: return 25
+    if any(_BIRTH_F2.get(dw_oh)==y for y in yong_ohs): return 12
+    if any(_CTRL2.get(dw_oh)==y or _CTRL2.get(y)==dw_oh for y in yong_ohs): return -20
+    return 0
+
+
+@engine_memo
 def calc_luck_score(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0, target_year=None):
     """대운+세운 종합 운세 점수 (0~100)"""
     if target_year is None:
         target_year = datetime.now().year
     ys       = get_yongshin(pils)
-    yong_ohs = ys.get("종합_용신",[]) if isinstance(ys.get("종합_용신"),list) else []
-    dw_list = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmi, gender=gender)
-    cur_dw   = next((d for d in dw_list if d["시작연도"]<=target_year<=d["종료연도"]),None)
-    score    = 50
-    if cur_dw:
-        dw_oh = OH.get(cur_dw["cg"],"")
-        if dw_oh in yong_ohs: score += 25
-        elif any(_BIRTH_F2.get(dw_oh)==y for y in yong_ohs): score += 12
-        elif any(_CTRL2.get(dw_oh)==y or _CTRL2.get(y)==dw_oh for y in yong_ohs): score -= 20
-    _LV = {"대길(大吉)":20,"길(吉)":10,"평길(平吉)":5,"평(平)":0,"흉(凶)":-15,"흉흉(凶凶)":-25}
+    yong_ohs = _yongshin_list(ys)
+    cur_dw   = DaewoonTimeline.of(pils, birth_year, bm, bd, bh, bmi, gender).at(target_year)
+    score    = 50 + (_daewoon_luck_bonus(cur_dw["cg"], yong_ohs) if cur_dw else 0)
     yl = get_yearly_luck(pils, target_year)
-    score += _LV.get(yl.get("길흉","평(平)"),0)
+    score += YEAR_GRADE_POINTS.get(yl.get("길흉","평(平)"),0)
     return max(0, min(100, score))
 
 
-@st.cache_data
-def calc_turning_point(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0, target_year=None):
+def _year_turning_point(pils, dw_tl, yong_ohs, target_year, prev_score, curr_score, next_score, triggers):
     """
-    인생 전환점 감지 엔진 (정밀 v2)
-    대운 점수 차이 + 세운 트리거 + 충합 종합
+    인생 전환점 판정 본체 (정밀 v2) - 연도 1개
+    대운 점수 차이 + 세운 트리거 + 충합 종합. 전/당/다음 해 점수와 트리거는 호출자가 전달
     Returns dict: {is_turning:bool, intensity:str, reason:list, score_change:int}
     """
-    if target_year is None:
-        target_year = datetime.now().year
-    prev_score = calc_luck_score(pils, birth_year, gender, bm, bd, bh, bmi, target_year - 1)
-    curr_score = calc_luck_score(pils, birth_year, gender, bm, bd, bh, bmi, target_year)
-    next_score = calc_luck_score(pils, birth_year, gender, bm, bd, bh, bmi, target_year + 1)
-
-    dw_list = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmi, gender=gender)
-    cur_dw  = next((d for d in dw_list if d["시작연도"] <= target_year <= d["종료연도"]), None)
-    prev_dw = None
-    for i, d in enumerate(dw_list):
-        if d["시작연도"] <= target_year <= d["종료연도"] and i > 0:
-            prev_dw = dw_list[i-1]
-            break
+    cur_dw  = dw_tl.at(target_year)
+    prev_dw = dw_tl.prev_of(target_year)
 
     reasons = []
     diff = curr_score - prev_score
@@ -7951,8 +9910,6 @@ def calc_turning_point(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0, targe
         # 이전 대운과 오행 관계
         prev_oh = OH.get(prev_dw["cg"], "")
         curr_oh = OH.get(cur_dw["cg"], "")
-        ys = get_yongshin(pils)
-        yong_ohs = ys.get("종합_용신", []) if isinstance(ys.get("종합_용신"), list) else []
         if prev_oh not in yong_ohs and curr_oh in yong_ohs:
             reasons.append(f"- 기신 대운->용신 대운 전환 - 인생 역전의 기회")
         elif prev_oh in yong_ohs and curr_oh not in yong_ohs:
@@ -7967,7 +9924,6 @@ def calc_turning_point(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0, targe
         reasons.append(f"📈 운세 {direction} ({diff:+d}점) - 변화 감지")
 
     # 사건 트리거 (충/합 있으면 강화)
-    triggers = detect_event_triggers(pils, birth_year, gender, bm, bd, bh, bmi, target_year)
     high_triggers = [t for t in triggers if t["prob"] >= 80]
     if high_triggers:
         reasons.append(f"🔴 고확률 사건 트리거 {len(high_triggers)}개 - {high_triggers[0]['title']}")
@@ -8008,7 +9964,202 @@ def calc_turning_point(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0, targe
     }
 
 
-@st.cache_data
+def luck_score_series(pils, dw_tl, y0, y1):
+    """[y0, y1) 연도별 운세 점수 int16 배열 - calc_luck_score 와 같은 값을 연도 축으로 한 번에"""
+    ys = get_yongshin(pils)
+    yong_ohs = _yongshin_list(ys)
+    luck = LuckSeries.of(pils, y0, y1 - y0)
+    dw_bonus = np.array([_daewoon_luck_bonus(c["cg"], yong_ohs) for c in dw_tl.cycles] + [0], dtype=np.int16)
+    off = luck.years.astype(np.int64) - dw_tl.birth_year
+    ok = (off >= 0) & (off < len(dw_tl.year_idx))
+    dw_idx = np.full(len(off), -1, dtype=np.int64)      # -1 -> dw_bonus 마지막 칸(0) = 입운 전
+    dw_idx[ok] = dw_tl.year_idx[off[ok]]
+    return np.clip(50 + dw_bonus[dw_idx] + luck.y_points, 0, 100).astype(np.int16)
+
+
+# ==================================================
+#  🗓️ 평생 사건 인덱스 (LifeEventIndex)
+#  출생연도~+100년 운세 점수는 사주당 1회, 트리거/전환점은 조회한 해만 계산
+# ==================================================
+
+
+class LifeEventIndex(BirthKeyedLRU):
+    """
+    사주별 평생 사건 인덱스 (사주 지문+출생시각+성별 기준 LRU 메모)
+    - score    : first_year-1 ~ 마지막 해+1 운세 점수 (전환점 판정의 전/다음 해를 이웃 칸으로 재사용)
+    - triggers : 연도별 detect_event_triggers 결과 (읽기 전용, 처음 조회한 해만 채움)
+    - turning  : 연도별 calc_turning_point 결과 (읽기 전용, 처음 조회한 해만 채움)
+    점수는 배열 연산 한 번이라 전 구간을 미리 두지만, 트리거/전환점은 연도별로 필요할 때 만듦
+    (화면은 대개 올해 한두 해만 보므로 101년을 한꺼번에 만들지 않음 -> 인스턴스당 메모리 최소)
+    범위 밖 연도는 같은 본체 함수로 즉석 계산 (메모하지 않음)
+    """
+    __slots__ = ("first_year", "n_years", "pils", "dw_tl", "yong_ohs", "score", "triggers", "turning")
+
+    N_YEARS = 101
+    CACHE_SIZE = 128
+
+    def __init__(self, pils, birth_year, birth_month=1, birth_day=1, birth_hour=12, birth_minute=0, gender="남"):
+        self.pils = [dict(p) for p in pils]
+        self.first_year, self.n_years = birth_year, self.N_YEARS
+        self.dw_tl = DaewoonTimeline.of(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender)
+        ys = get_yongshin(pils)
+        self.yong_ohs = _yongshin_list(ys)
+        self.score = luck_score_series(pils, self.dw_tl, birth_year - 1, birth_year + self.n_years + 1)
+        self.triggers = [None] * self.n_years
+        self.turning = [None] * self.n_years
+
+    @staticmethod
+    def _chart_key(pils):
+        """사주 표기까지 구분하는 지문 (인덱스가 pils 사본을 보관하므로)"""
+        return pils_fingerprint(pils)
+
+    def _k(self, year):
+        k = year - self.first_year
+        return k if 0 <= k < self.n_years else None
+
+    def _fill(self, k):
+        """k 번째 해의 트리거/전환점 생성 (이미 있으면 그대로)"""
+        if self.triggers[k] is None:
+            y = self.first_year + k
+            trig = _year_event_triggers(self.pils, self.dw_tl, self.yong_ohs, y)
+            prev_s, curr_s, next_s = (int(s) for s in self.score[k:k + 3])
+            tp = _year_turning_point(self.pils, self.dw_tl, self.yong_ohs, y, prev_s, curr_s, next_s, trig)
+            self.turning[k] = _freeze(tp)
+            self.triggers[k] = _freeze(trig)
+        return k
+
+    def _window(self, y0, y1):
+        """[y0, y1) 를 인덱스 범위로 잘라 해당 연도만 생성한 k 목록"""
+        k0 = 0 if y0 is None else max(0, y0 - self.first_year)
+        k1 = self.n_years if y1 is None else min(self.n_years, y1 - self.first_year)
+        return [self._fill(k) for k in range(k0, k1)]
+
+    def luck_score(self, year):
+        """연도 운세 점수 (calc_luck_score 와 동일)"""
+        k = year - self.first_year + 1
+        if 0 <= k < len(self.score):
+            return int(self.score[k])
+        return int(luck_score_series(self.pils, self.dw_tl, year, year + 1)[0])
+
+    def year_triggers(self, year):
+        """연도 사건 트리거 리스트"""
+        k = self._k(year)
+        if k is not None:
+            return self.triggers[self._fill(k)]
+        return _freeze(_year_event_triggers(self.pils, self.dw_tl, self.yong_ohs, year))
+
+    def year_turning(self, year):
+        """연도 전환점 판정 dict"""
+        k = self._k(year)
+        if k is not None:
+            return self.turning[self._fill(k)]
+        prev_s, curr_s, next_s = (int(s) for s in luck_score_series(self.pils, self.dw_tl, year - 1, year + 2))
+        trig = self.year_triggers(year)
+        return _freeze(_year_turning_point(self.pils, self.dw_tl, self.yong_ohs, year,
+                                           prev_s, curr_s, next_s, trig))
+
+    def query(self, y0=None, y1=None, types=None, min_prob=0):
+        """
+        [y0, y1) 구간 트리거 조회 (종류/최소 확률 필터, 연도->확률 내림차순)
+        구간을 생략하면 인덱스 전 구간(101년)을 생성하므로 가능하면 구간을 지정할 것
+        Returns list[dict]: 연도 + type, title, detail, prob
+        """
+        out = []
+        for k in self._window(y0, y1):
+            rows = [t for t in self.triggers[k]
+                    if t["prob"] >= min_prob and (types is None or t["type"] in types)]
+            rows.sort(key=lambda t: -t["prob"])
+            out.extend({"연도": self.first_year + k, **t} for t in rows)
+        return out
+
+    def turning_years(self, min_change=0, y0=None, y1=None):
+        """[y0, y1) 구간 전환점(is_turning) 연도 리스트 (전년 대비 점수 변화 절댓값 min_change 이상)"""
+        return [self.first_year + k for k in self._window(y0, y1)
+                if self.turning[k]["is_turning"] and abs(self.turning[k]["score_change"]) >= min_change]
+
+
+def detect_event_triggers(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0, target_year=None):
+    """
+    사건 트리거 감지 - 충/형/합/십성활성/대운전환 (LifeEventIndex 조회)
+    Returns list[dict]: type, title, detail, prob(0~100)
+    """
+    if target_year is None:
+        target_year = datetime.now().year
+    return LifeEventIndex.of(pils, birth_year, bm, bd, bh, bmi, gender).year_triggers(target_year)
+
+
+def calc_turning_point(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0, target_year=None):
+    """
+    인생 전환점 감지 엔진 (정밀 v2) - LifeEventIndex 조회
+    Returns dict: {is_turning:bool, intensity:str, reason:list, score_change:int}
+    """
+    if target_year is None:
+        target_year = datetime.now().year
+    return LifeEventIndex.of(pils, birth_year, bm, bd, bh, bmi, gender).year_turning(target_year)
+
+
+# ==================================================
+#  ⏱️ 전환점 인덱스 (TurningIndex)
+#  대운 입운 시각 + 점수 급변 해의 입춘 시각 -> 정렬 배열, 조회는 이분 탐색
+# ==================================================
+
+class TurningIndex(BirthKeyedLRU):
+    """
+    사주별 인생 전환 시각 인덱스 (DaewoonTimeline 과 같은 키로 LRU 메모)
+    - when   : 전환 시각 (1900 기준 경과 분, 오름차순 int64)
+    - kind   : "대운" (정확한 입운 시각) / "세운" (입춘 절입 시각 - 전년 대비 점수 ±SCORE_JUMP 이상)
+    - year   : 전환이 속한 연도 (대운 시작연도 / 세운 연도)
+    - label  : 대운 또는 세운 간지
+    - change : 전년 대비 운세 점수 변화
+    - score  : birth_year 부터 연도별 운세 점수 (calc_luck_score 와 동일, int16)
+    """
+    __slots__ = ("birth_year", "when", "kind", "year", "label", "change", "score")
+
+    SCORE_JUMP = 15
+    CACHE_SIZE = 256
+
+    def __init__(self, pils, birth_year, birth_month=1, birth_day=1, birth_hour=12, birth_minute=0, gender="남"):
+        self.birth_year = birth_year
+        tl = DaewoonTimeline.of(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender)
+        n = LuckSeries.N_YEARS
+        self.score = luck_score_series(pils, tl, birth_year, birth_year + n)
+        diff = np.diff(self.score)
+
+        events = []
+        for c, t in zip(tl.cycles, tl.starts):
+            k = c["시작연도"] - birth_year
+            chg = int(diff[k - 1]) if 0 < k < n else 0
+            events.append((SolarTermTable.to_minutes(t), "대운", c["시작연도"], c["str"], chg))
+        for k in (np.flatnonzero(np.abs(diff) >= self.SCORE_JUMP) + 1).tolist():
+            y = birth_year + k
+            ipchun = SolarTermTable.get_datetime(y, 2)
+            events.append((SolarTermTable.to_minutes(ipchun), "세운", y, GANJI_60[(y - 4) % 60], int(diff[k - 1])))
+        events.sort()
+        self.when = np.array([e[0] for e in events], dtype=np.int64)
+        self.kind, self.year, self.label, self.change = (
+            [e[i] for e in events] for i in range(1, 5))
+
+    def __len__(self):
+        return len(self.when)
+
+    def event(self, i):
+        """i 번째 전환점 dict"""
+        return {
+            "시각": SolarTermTable.EPOCH + timedelta(minutes=int(self.when[i])),
+            "종류": self.kind[i], "연도": self.year[i],
+            "간지": self.label[i], "점수변화": self.change[i],
+        }
+
+    def next_after(self, when, kinds=None):
+        """when 이후 첫 전환점 dict (kinds 로 종류 제한, 없으면 None)"""
+        i = int(np.searchsorted(self.when, SolarTermTable.to_minutes(when), side="right"))
+        for j in range(i, len(self.when)):
+            if kinds is None or self.kind[j] in kinds:
+                return self.event(j)
+        return None
+
+
+@engine_memo
 def get_yongshin_multilayer(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0, target_year=None):
     """
     다층 용신 분석 (1순위~3순위 + 희신 + 기신 + 대운별 용신)
@@ -8018,7 +10169,7 @@ def get_yongshin_multilayer(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0,
         target_year = datetime.now().year
 
     ys = get_yongshin(pils)
-    yong_list = ys.get("종합_용신", []) if isinstance(ys.get("종합_용신"), list) else []
+    yong_list = _yongshin_list(ys)
     # [년, 월, 일, 시] 순서에서 일간은 index 2
     oh_strength = calc_ohaeng_strength(pils[1]["cg"], pils)
     ilgan = pils[1]["cg"]
@@ -8045,8 +10196,7 @@ def get_yongshin_multilayer(pils, birth_year, gender, bm=1, bd=1, bh=12, bmi=0,
     yong_2 = yong_list[1] if len(yong_list) > 1 else ""
 
     # 대운별 용신 변화
-    dw_list = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmi, gender=gender)
-    cur_dw  = next((d for d in dw_list if d["시작연도"] <= target_year <= d["종료연도"]), None)
+    cur_dw  = DaewoonTimeline.of(pils, birth_year, bm, bd, bh, bmi, gender).at(target_year)
     dw_yong = ""
     dw_note  = ""
     if cur_dw:
@@ -8096,7 +10246,7 @@ def build_rich_ai_context(pils, birth_year, gender, target_year=None, focus="종
     ilgan = pils[1]["cg"]
     strength_info = get_ilgan_strength(ilgan, pils)
     ys_multi = get_yongshin_multilayer(pils, birth_year, gender, target_year)
-    turning = calc_turning_point(pils, birth_year, gender, target_year)
+    turning = LifeEventIndex.from_session(pils, birth_year, gender).year_turning(target_year)
     pillars_str = " ".join([p["str"] for p in pils])
 
     # 순수 데이터 구조화 (Skill 2: Structuring)
@@ -8157,29 +10307,31 @@ def goosebump_engine(pils, birth_year, gender, target_year=None):
     if target_year is None:
         target_year = datetime.now().year
 
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
     ilgan = pils[1]["cg"]
     il_jj = pils[1]["jj"]
     wol_jj = pils[2]["jj"]
     ilgan_oh = OH.get(ilgan, "")
-    strength_info = get_ilgan_strength(ilgan, pils)
+    strength_info = ctx.strength
     oh_str  = strength_info["oh_strength"]
     sn      = strength_info["신강신약"]
     score   = strength_info.get("일간점수", 50)
     TGM = TEN_GODS_MATRIX.get(ilgan, {})
     all_ss = [TGM.get(p["cg"], "-") for p in pils]
 
-    ys       = get_yongshin(pils)
-    yong_ohs = ys.get("종합_용신", []) if isinstance(ys.get("종합_용신"), list) else []
-    luck_s   = calc_luck_score(pils, birth_year, gender, target_year)
-    triggers = detect_event_triggers(pils, birth_year, gender, target_year)
-    turning  = calc_turning_point(pils, birth_year, gender, target_year)
+    yong_ohs = ctx.yongshin_ohs
+    life     = ctx.life
+    luck_s   = life.luck_score(target_year)
+    triggers = life.year_triggers(target_year)
+    turning  = life.year_turning(target_year)
 
     # ① 과거 적중 문장 - 사주 패턴 -> 이미 겪은 일
     past_sentences = []
 
     # 관성 충 감지
+    _jjs = [jj_index(q["jj"]) for q in pils]
     officer_clash = any(TGM.get(p["cg"], "") in ("정관","편관") and
-                        _JIJI_CHUNG.get(p["jj"]) in {q["jj"] for q in pils} for p in pils)
+                        pair_relations([j], _jjs) & REL_CHUNG for p, j in zip(pils, _jjs))
     if officer_clash or any(s in ("정관","편관") for s in all_ss):
         past_sentences.append(
             "직장이나 책임 문제로 크게 고민하고 홀로 힘들었던 시기가 분명히 있었습니다."
@@ -8200,15 +10352,11 @@ def goosebump_engine(pils, birth_year, gender, target_year=None):
         )
 
     # 일지 충 (과거)
-    # 대운 호출 시 실제 생년월일시 반영 (사용자 지침 준수)
-    birth_month = st.session_state.get('birth_month', 1)
-    birth_day = st.session_state.get('birth_day', 1)
-    birth_hour = st.session_state.get('birth_hour', 12)
-    birth_minute = st.session_state.get('birth_minute', 0)
-    past_dw = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender=gender)
+    # 대운 호출 시 실제 생년월일시 반영 (사용자 지침 준수 - ChartContext 가 세션 생월/일/시/분 사용)
+    past_dw = ctx.daewoon
     for dw in past_dw:
         if dw["종료연도"] < target_year:
-            if _JIJI_CHUNG.get(il_jj) == dw["jj"]:
+            if JJ_REL[jj_index(il_jj), jj_index(dw["jj"])] & REL_CHUNG:
                 age = dw["시작나이"]
                 past_sentences.append(
                     f"{age}대에 환경이 크게 바뀌거나 중요한 관계가 변한 일이 있었습니다."
@@ -8593,6 +10741,7 @@ def save_saju_state():
         "in_marriage":           _ss.get("in_marriage", "미혼"),
         "in_occupation":         _ss.get("in_occupation", "선택 안 함"),
         "in_premium_correction": _ss.get("in_premium_correction", True),
+        "in_birth_place":        _ss.get("in_birth_place", "서울"),
         # -- 계산 결과 --
         "saju_pils":     _ss.get("saju_pils"),
         "birth_year":    _ss.get("birth_year"),
@@ -8633,7 +10782,7 @@ def load_saju_state():
         "in_name", "in_gender", "in_cal_type",
         "in_lunar_year", "in_lunar_month", "in_lunar_day", "in_is_leap",
         "in_birth_hour", "in_birth_minute", "in_unknown_time",
-        "in_marriage", "in_occupation", "in_premium_correction",
+        "in_marriage", "in_occupation", "in_premium_correction", "in_birth_place",
         "saju_pils", "birth_year", "birth_month", "birth_day",
         "birth_hour", "birth_minute", "gender", "saju_name",
         "marriage_status", "occupation", "cal_type", "lunar_info",
@@ -8692,6 +10841,7 @@ def save_to_favorites(label: str):
         "in_marriage":       _ss.get("in_marriage", "미혼"),
         "in_occupation":     _ss.get("in_occupation", "선택 안 함"),
         "in_premium_correction": _ss.get("in_premium_correction", True),
+        "in_birth_place":        _ss.get("in_birth_place", "서울"),
         "saju_pils":         _ss.get("saju_pils"),
         "birth_year":        _ss.get("birth_year"),
         "birth_month":       _ss.get("birth_month"),
@@ -8728,7 +10878,7 @@ def load_from_favorite(idx: int):
         "in_name", "in_gender", "in_cal_type",
         "in_lunar_year", "in_lunar_month", "in_lunar_day", "in_is_leap",
         "in_birth_hour", "in_birth_minute", "in_unknown_time",
-        "in_marriage", "in_occupation", "in_premium_correction",
+        "in_marriage", "in_occupation", "in_premium_correction", "in_birth_place",
         "saju_pils", "birth_year", "birth_month", "birth_day",
         "birth_hour", "birth_minute", "gender", "saju_name",
         "marriage_status", "occupation", "cal_type", "lunar_info",
@@ -8905,6 +11055,180 @@ def render_ai_opening_ment(saju_key: str, name: str):
     st.markdown(html, unsafe_allow_html=True)
 
 
+# ==============================================================
+#  📈 모집단 백분위 인덱스 (PopulationIndex)
+#  출생아 수 가중 표본(get_pillars_batch) -> 분위수/빈도 테이블 (population_index.bin)
+# ==============================================================
+
+# 연도별 국내 출생아 수 근사치(천 명) - 사이 연도는 선형 보간
+_KR_BIRTHS_K = {
+    1930: 600, 1940: 650, 1950: 650, 1955: 900, 1960: 1080, 1965: 1000, 1970: 1007, 1975: 875,
+    1980: 863, 1985: 655, 1990: 650, 1995: 715, 2000: 635, 2005: 435, 2010: 470, 2015: 438,
+    2020: 272, 2024: 238,
+}
+
+
+class PopulationIndex:
+    """
+    모집단 대비 위치 - 일간점수/오행 비율 분위수 + 신강신약/격국/용신 빈도
+    - 분위수: 지표별 N_QUANTILES 개(0~100%) float32 -> 백분위 조회는 이진 탐색 O(log n)
+    - 파일 형식: MAGIC(4) + 메타 길이(uint32) + 분위수 개수(uint16) + 메타 JSON(UTF-8)
+                 + float32 little-endian 분위수 배열 (지표 순서 = 메타 "metrics")
+    - 빌드: build_tables.py population (파일이 없으면 조회 결과 None)
+    """
+    MAGIC = b"PPI1"
+    FILE_NAME = "population_index.bin"
+    N_QUANTILES = 1001
+    METRICS = ("일간점수", "木", "火", "土", "金", "水")
+    FIRST_YEAR = 1930
+    LAST_YEAR = 2024
+
+    _index = None        # {"meta": dict, "q": {지표: ndarray}} - 파일이 없으면 {}
+
+    @classmethod
+    def path(cls):
+        return os.path.join(_DATA_DIR, cls.FILE_NAME)
+
+    @staticmethod
+    def pack(meta, quantiles):
+        """인덱스 바이너리 직렬화 (빌더 공용) - quantiles: (지표 수, N) 배열"""
+        body = json.dumps(meta, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        q = np.ascontiguousarray(quantiles, dtype="<f4")
+        return PopulationIndex.MAGIC + struct.pack("<IH", len(body), q.shape[1]) + body + q.tobytes()
+
+    @staticmethod
+    def unpack(blob):
+        """바이너리 -> (메타, {지표: 분위수}). 형식 오류 시 ValueError"""
+        if blob[:4] != PopulationIndex.MAGIC or len(blob) < 10:
+            raise ValueError("잘못된 백분위 인덱스 형식")
+        n_meta, n_q = struct.unpack("<IH", blob[4:10])
+        meta = json.loads(blob[10:10 + n_meta].decode("utf-8"))
+        q = np.frombuffer(blob, dtype="<f4", offset=10 + n_meta).astype(np.float32)
+        metrics = meta.get("metrics", [])
+        if len(q) != len(metrics) * n_q:
+            raise ValueError("백분위 인덱스 길이 불일치")
+        return meta, dict(zip(metrics, q.reshape(len(metrics), n_q)))
+
+    @classmethod
+    def load(cls):
+        """인덱스 로드 (프로세스당 1회)"""
+        if cls._index is None:
+            try:
+                with open(cls.path(), "rb") as f:
+                    meta, q = cls.unpack(f.read())
+                cls._index = {"meta": meta, "q": q}
+            except (OSError, ValueError):
+                cls._index = {}
+        return cls._index
+
+    # -- 빌더 공용 --
+    @classmethod
+    def birth_weights(cls, first=FIRST_YEAR, last=LAST_YEAR):
+        """연도별 출생아 수 가중치 (합 1)"""
+        years = np.arange(first, last + 1)
+        anchors = sorted(_KR_BIRTHS_K.items())
+        w = np.interp(years, [a for a, _ in anchors], [b for _, b in anchors])
+        return years, w / w.sum()
+
+    @classmethod
+    def sample(cls, n, seed=0, first=FIRST_YEAR, last=LAST_YEAR):
+        """출생아 수 가중 출생 시각 표본 -> get_pillars_batch 결과 (연도 가중, 연내 날짜/분은 균등)"""
+        rng = np.random.default_rng(seed)
+        years, w = cls.birth_weights(first, last)
+        y = rng.choice(years, size=n, p=w)
+        jan1 = np.array([date(int(v), 1, 1).toordinal() for v in range(first, last + 2)], dtype=np.int64)
+        days = np.diff(jan1)
+        k = y - first
+        ords = jan1[k] + (rng.random(n) * days[k]).astype(np.int64)
+        ymd = [date.fromordinal(int(o)) for o in ords]
+        tod = rng.integers(0, 1440, size=n)
+        return SajuCoreEngine.get_pillars_batch(
+            y, [d.month for d in ymd], [d.day for d in ymd], tod // 60, tod % 60,
+            np.where(rng.random(n) < 0.5, "남", "여"))
+
+    @classmethod
+    def build(cls, n=200_000, seed=0, first=FIRST_YEAR, last=LAST_YEAR, progress=None):
+        """표본 -> (메타, 분위수 배열). 같은 사주는 1번만 분석 (AnalysisStore 우선)"""
+        batch = cls.sample(n, seed, first, last)
+        gz = (6 * batch["cg"].astype(np.int64) - 5 * batch["jj"]) % 60
+        keys = ((gz[:, 0] * 60 + gz[:, 1]) * 60 + gz[:, 2]) * 60 + gz[:, 3]
+        _, first_i, counts = np.unique(keys, return_index=True, return_counts=True)
+
+        vals = np.zeros((len(first_i), len(cls.METRICS)))
+        freq = {"신강신약": {}, "격국": {}, "용신": {}}
+        for j, (i, c) in enumerate(zip(first_i.tolist(), counts.tolist())):
+            pils = SajuCoreEngine.pillars_from_indices(batch["cg"][i], batch["jj"][i])
+            ilgan = pils[1]["cg"]
+            s = AnalysisStore.fetch("get_ilgan_strength", pils, lambda: get_ilgan_strength(ilgan, pils))
+            gk = AnalysisStore.fetch("get_gyeokguk", pils, lambda: get_gyeokguk(pils))
+            ys = AnalysisStore.fetch("get_yongshin", pils, lambda: get_yongshin(pils))
+            vals[j] = [s["일간점수"]] + [s["oh_strength"].get(oh, 0.0) for oh in cls.METRICS[1:]]
+            for kind, labels in (("신강신약", [s["신강신약"]]),
+                                 ("격국", [gk["격국명"] if gk else "미정격"]),
+                                 ("용신", ys.get("종합_용신") or [])):
+                for lb in labels:
+                    freq[kind][lb] = freq[kind].get(lb, 0) + c
+            if progress and j % 5000 == 0:
+                progress(j, len(first_i))
+
+        probs = np.linspace(0.0, 1.0, cls.N_QUANTILES)
+        quantiles = np.stack([np.quantile(np.repeat(vals[:, m], counts), probs)
+                              for m in range(len(cls.METRICS))])
+        meta = {
+            "metrics": list(cls.METRICS), "samples": int(n), "charts": int(len(first_i)),
+            "seed": seed, "years": [first, last], "weights": "국내 연도별 출생아 수 근사치",
+            "built_at": datetime.now().isoformat(timespec="seconds"),
+            "freq": {kind: {lb: round(c / n, 5) for lb, c in sorted(d.items(), key=lambda x: -x[1])}
+                     for kind, d in freq.items()},
+        }
+        return meta, quantiles
+
+    # -- 조회 --
+    @classmethod
+    def percentile(cls, metric, value):
+        """지표 값의 모집단 백분위(0~100, 값 이하 비율) - 동점 구간은 중간 순위, 인덱스 없으면 None"""
+        q = cls.load().get("q", {}).get(metric)
+        if q is None or value is None:
+            return None
+        value = np.float32(value)        # 저장 정밀도(float32)로 맞춰야 동점 판정이 정확
+        lo = int(np.searchsorted(q, value, "left"))
+        hi = int(np.searchsorted(q, value, "right"))
+        last = len(q) - 1
+        if hi == 0:
+            return 0.0
+        if lo > last:
+            return 100.0
+        if lo < hi:                      # 분위수와 같은 값 (동점)
+            pos = (lo + hi - 1) / 2
+        else:                            # q[lo-1] < value < q[lo] 선형 보간
+            pos = lo - 1 + float(value - q[lo - 1]) / float(q[lo] - q[lo - 1])
+        return round(pos / last * 100, 1)
+
+    @classmethod
+    def frequency(cls, kind, label):
+        """신강신약/격국/용신 라벨의 모집단 비율(0~1, 용신은 해당 오행 포함 비율) - 인덱스 없으면 None"""
+        freq = cls.load().get("meta", {}).get("freq", {}).get(kind)
+        return None if freq is None else freq.get(label, 0.0)
+
+    @classmethod
+    def position(cls, pils, strength_info=None):
+        """사주 1건의 모집단 내 위치 요약 - 인덱스 없으면 None"""
+        if not cls.load():
+            return None
+        ilgan = pils[1]["cg"]
+        s = strength_info or get_ilgan_strength(ilgan, pils)
+        gk = get_gyeokguk(pils)
+        gk_name = gk["격국명"] if gk else "미정격"
+        oh_str = s.get("oh_strength", {})
+        return {
+            "일간점수": (s.get("일간점수"), cls.percentile("일간점수", s.get("일간점수"))),
+            "오행": {oh: (oh_str.get(oh, 0.0), cls.percentile(oh, oh_str.get(oh, 0.0))) for oh in cls.METRICS[1:]},
+            "신강신약": (s.get("신강신약"), cls.frequency("신강신약", s.get("신강신약"))),
+            "격국": (gk_name, cls.frequency("격국", gk_name)),
+            "용신": {oh: cls.frequency("용신", oh) for oh in (get_yongshin(pils).get("종합_용신") or [])},
+        }
+
+
 # ==============================================================
 #  📊 STATISTICAL CORRECTION ENGINE - 통계 보정 시스템
 #  사주 패턴 x 실제 데이터 -> 확률 기반 해석
@@ -8927,9 +11251,10 @@ _STATISTICAL_PATTERNS = {
 def get_statistical_insights(pils, strength_info) -> list:
     """
     통계 보정 인사이트 생성
-    Returns: list[dict] - {pattern, prob, insight, advice}
+    Returns: list[dict] - {pattern, prob, percentile, insight, advice}
+    (percentile: 과다 오행 비율의 모집단 백분위 - PopulationIndex, 없으면 None)
     """
-    sn       = strength_info.get("신강신약", "중화")
+    sn       = strength_info.get("신강신약", "중화").split("(")[0]   # "신강(身强)" -> "신강"
     oh_str   = strength_info.get("oh_strength", {})
     insights = []
 
@@ -8942,10 +11267,13 @@ def get_statistical_insights(pils, strength_info) -> list:
             topic, prob, desc = _STATISTICAL_PATTERNS[key]
             # 과다 강도에 따라 확률 보정
             adjusted_prob = min(95, int(prob + (val - 35) * 0.5))
+            pct = PopulationIndex.percentile(oh, val)
+            rank = f" · 상위 {max(0.1, 100 - pct):.1f}%" if pct is not None else ""
             insights.append({
-                "pattern": f"{sn} + {oh}과다({val:.0f}%)",
+                "pattern": f"{sn} + {oh}과다({val:.0f}%){rank}",
                 "topic": topic,
                 "prob": adjusted_prob,
+                "percentile": pct,
                 "insight": desc,
                 "advice": _get_pattern_advice(sn, oh),
             })
@@ -9003,13 +11331,27 @@ def _get_pattern_advice(sn: str, oh: str) -> str:
 def render_statistical_insights(pils, strength_info):
     """통계 인사이트 UI 렌더링"""
     insights = get_statistical_insights(pils, strength_info)
-    if not insights:
+    pos = PopulationIndex.position(pils, strength_info)
+    if not insights and not pos:
         return
 
     st.markdown('<div class="gold-section">📊 데이터 기반 패턴 분석</div>',
                 unsafe_allow_html=True)
     st.caption("사주 패턴별 실증 통계 기반 분석입니다")
 
+    if pos:
+        def rank(p):
+            return f"상위 {max(0.1, 100 - p):.1f}%" if p >= 50 else f"하위 {max(0.1, p):.1f}%"
+        score, pct = pos["일간점수"]
+        gk_name, gk_share = pos["격국"]
+        top_oh = max(pos["오행"].items(), key=lambda x: x[1][0])
+        cols = st.columns(3)
+        cols[0].metric("일간 힘", f"{score:.1f}", rank(pct), delta_color="off")
+        cols[1].metric(f"최강 오행 {top_oh[0]}", f"{top_oh[1][0]:.0f}%", rank(top_oh[1][1]), delta_color="off")
+        cols[2].metric("격국", gk_name, f"전체의 {gk_share * 100:.1f}%", delta_color="off")
+        meta = PopulationIndex.load()["meta"]
+        st.caption(f"{meta['years'][0]}~{meta['years'][1]}년 출생아 수 가중 표본 {meta['samples']:,}명 기준")
+
     for ins in insights:
         prob  = ins["prob"]
         color = ("#f44336" if prob >= 75 else "#ff9800" if prob >= 60 else "#4caf50")
@@ -9091,6 +11433,63 @@ def update_streak() -> dict:
             "is_new_day": is_new_day, "message": msg}
 
 
+# 일운 등급 (점수 하한, 라벨, 추세) - 위에서부터 첫 번째로 넘는 구간
+DAILY_LUCK_LABELS = [(75, "대길(Dae-Gil)", "UP-UP"), (60, "길(Gil)", "UP"), (45, "평(Normal)", "MID"),
+                     (30, "흉(Bad)", "DOWN"), (0, "흉흉(Very Bad)", "DOWN-DOWN")]
+_DAILY_CUTS = np.array([c for c, _, _ in DAILY_LUCK_LABELS[:-1]], dtype=np.float64)
+# 세운/월운 등급 인덱스(YEAR_GRADES / MONTH_GRADES 순서 동일) -> 일운 가감
+_DAILY_GRADE_MOD = np.array([8, 4, 2, 0, -6, -12], dtype=np.int16)
+# 원국 일지(0~11) x 그날 일지(0~11) -> 일운 가감 (충 -8 > 육합 +6 > 같은 오행 +4)
+_DAILY_BRANCH_MOD = np.where(JJ_REL & REL_CHUNG, -8,
+                    np.where(JJ_REL & REL_HAP, 6,
+                    np.where(JJ_OH_IDX[:, None] == JJ_OH_IDX[None, :], 4, 0))).astype(np.int16)
+
+
+def get_daily_luck_series(chart, start, end) -> dict:
+    """
+    start~end(포함) 일별 운세 점수 - 한 번의 벡터 연산
+    - 기본운(대운+세운) 은 연도별 1회, 세운/월운 가감은 LuckSeries 표에서 인덱싱
+    - 일지는 실제 일주(GanjiEngine.day_index) 기준
+    chart : Chart (birth 필수 - 대운 입운 계산용)
+    Returns: {ord, day_gz, base, year_mod, month_mod, day_mod, score, grade} numpy 배열
+             grade 는 DAILY_LUCK_LABELS 인덱스
+    """
+    if chart.birth is None:
+        raise ValueError("get_daily_luck_series: chart.birth 가 필요합니다")
+    b = chart.birth
+    pils = chart.pils
+    ords = GanjiEngine.date_range(start, end)
+    d64 = (ords - GanjiEngine._ORD_1970).astype("datetime64[D]")
+    years = d64.astype("datetime64[Y]").astype(np.int64) + 1970
+    months = d64.astype("datetime64[M]").astype(np.int64) % 12
+
+    y0 = start.year
+    n_years = end.year - y0 + 1
+    luck = LuckSeries.of(pils, y0, n_years)
+    k = years - y0
+    base_y = np.array([calc_luck_score(pils, b.year, chart.gender, b.month, b.day, b.hour, b.minute, y0 + i)
+                       for i in range(n_years)], dtype=np.int16)
+
+    day_gz = GanjiEngine.day_index(ords)
+    base = base_y[k]
+    year_mod = _DAILY_GRADE_MOD[luck.y_grade[k]]
+    month_mod = _DAILY_GRADE_MOD[luck.m_grade[k, months]]
+    day_mod = _DAILY_BRANCH_MOD[chart.idx[1] % 12][day_gz % 12]
+
+    final = np.clip(base + year_mod * 0.4 + month_mod * 0.3 + day_mod, 0, 100)
+    return {
+        "ord": ords, "day_gz": day_gz, "base": base,
+        "year_mod": year_mod, "month_mod": month_mod, "day_mod": day_mod,
+        "score": final.astype(np.int16),
+        "grade": (final < _DAILY_CUTS[:, None]).sum(axis=0).astype(np.int8),
+    }
+
+
+def _session_chart(pils, birth_year, gender):
+    """pils + 세션 생월/일/시/분 -> Chart (일운 시계열용)"""
+    return Chart.from_pils(pils, gender, datetime(birth_year, *_session_birth()))
+
+
 def get_daily_luck_score(pils, birth_year, gender, target_date=None) -> dict:
     """
     일별 운세 점수 (기본운 * 대운 * 세운 * 월운 합산)
@@ -9098,102 +11497,63 @@ def get_daily_luck_score(pils, birth_year, gender, target_date=None) -> dict:
     """
     if target_date is None:
         target_date = datetime.now()
-    y = target_date.year
-    m = target_date.month
-    d = target_date.day
-
-    base    = calc_luck_score(pils, birth_year, gender, y)
-    yearly  = get_yearly_luck(pils, y)
-    monthly = get_monthly_luck(pils, y, m)
-
-    # 일별 미세 변동 (일지 기반 결정론적 계산)
-    ilgan = pils[1]["cg"]
-    il_jj = pils[1]["jj"]
-    day_jj_idx = (d - 1) % 12
-    day_jj = JJ[day_jj_idx]
-
-    # 일간과 일지 조화 점수
-    day_mod = 0
-    if _JIJI_CHUNG.get(il_jj) == day_jj:
-        day_mod = -8
-    elif HAP_MAP.get(il_jj) == day_jj:
-        day_mod = +6
-    elif OH.get(il_jj) == OH.get(day_jj):
-        day_mod = +4
-
-    _GH = {"대길(大吉)":8,"길(吉)":4,"평길(平吉)":2,"평(平)":0,"흉(凶)":-6,"흉흉(凶凶)":-12}
-    year_mod   = _GH.get(yearly.get("길흉","평(平)"), 0)
-    month_mod  = _GH.get(monthly.get("길흉","평(平)") if isinstance(monthly.get("길흉"), str) else "평(平)", 0)
-
-    final = max(0, min(100, base + year_mod * 0.4 + month_mod * 0.3 + day_mod))
-
-    if final >= 75:
-        label, trend = "대길(Dae-Gil)", "UP-UP"
-    elif final >= 60:
-        label, trend = "길(Gil)", "UP"
-    elif final >= 45:
-        label, trend = "평(Normal)", "MID"
-    elif final >= 30:
-        label, trend = "흉(Bad)", "DOWN"
-    else:
-        label, trend = "흉흉(Very Bad)", "DOWN-DOWN"
-
-    return {"score": int(final), "label": label, "trend": trend,
-            "year_mod": year_mod, "month_mod": month_mod, "day_mod": day_mod}
+    s = get_daily_luck_series(_session_chart(pils, birth_year, gender), target_date, target_date)
+    _, label, trend = DAILY_LUCK_LABELS[s["grade"][0]]
+    return {"score": int(s["score"][0]), "label": label, "trend": trend,
+            "year_mod": int(s["year_mod"][0]), "month_mod": int(s["month_mod"][0]),
+            "day_mod": int(s["day_mod"][0])}
 
 
 def get_7day_luck_graph(pils, birth_year, gender) -> list:
     """7일 운세 점수 그래프 데이터"""
     today = datetime.now()
+    s = get_daily_luck_series(_session_chart(pils, birth_year, gender),
+                              today - timedelta(days=3), today + timedelta(days=3))
     result = []
-    for delta in range(-3, 4):
-        d = today + timedelta(days=delta)
-        s = get_daily_luck_score(pils, birth_year, gender, d)
+    for i, o in enumerate(s["ord"].tolist()):
+        d = date.fromordinal(o)
         result.append({
             "date": d.strftime("%m/%d"),
             "day": ["월","화","수","목","금","토","일"][d.weekday()],
-            "score": s["score"],
-            "label": s["label"],
-            "is_today": delta == 0,
+            "score": int(s["score"][i]),
+            "label": DAILY_LUCK_LABELS[s["grade"][i]][1],
+            "is_today": i == 3,
         })
     return result
 
 
+def get_daily_heatmap(pils, birth_year, gender, year=None):
+    """한 해 일운 점수 히트맵 (주 x 요일) -> (scores[54,7] - 빈칸 -1, 1월1일 요일)"""
+    if year is None:
+        year = datetime.now().year
+    s = get_daily_luck_series(_session_chart(pils, birth_year, gender), date(year, 1, 1), date(year, 12, 31))
+    first_wd = date(year, 1, 1).weekday()
+    grid = np.full(54 * 7, -1, dtype=np.int16)
+    grid[first_wd:first_wd + len(s["score"])] = s["score"]
+    return grid.reshape(54, 7), first_wd
+
+
 def get_turning_countdown(pils, birth_year, gender) -> dict:
     """
-    다음 인생 전환점까지 남은 날짜 계산
-    Returns: {days_left: int, date: str, description: str}
+    다음 인생 전환점까지 남은 날짜 (TurningIndex 이분 탐색, 1년 이내)
+    Returns: {days_left: int, date: str, description: str, intensity: str, when: datetime}
     """
-    today = datetime.now()
-    # 최대 365일 앞을 스캔
-    for delta in range(1, 366):
-        future = today + timedelta(days=delta)
-        t = calc_turning_point(pils, birth_year, gender, future.year)
-        if t["is_turning"] and abs(t["score_change"]) >= 15:
-            # 대운 전환 시점 더 정확히
-            # 대운 호출 시 실제 생년월일시 반영
-            _bm = st.session_state.get("birth_month", 1)
-            _bd = st.session_state.get("birth_day", 1)
-            _bh = st.session_state.get("birth_hour", 12)
-            _bmi = st.session_state.get("birth_minute", 0)
-            dw_list = SajuCoreEngine.get_daewoon(pils, birth_year, _bm, _bd, _bh, _bmi, gender)
-            for dw in dw_list:
-                if dw["시작연도"] == future.year:
-                    change_date = f"{future.year}년 {birth_year % 100 + dw['시작나이'] % 10}월경"
-                    return {
-                        "days_left": delta,
-                        "date": change_date,
-                        "description": f"새 대운 {dw['str']} 시작 - 인생 국면 전환",
-                        "intensity": t["intensity"],
-                    }
-            # 세운 전환점
-            return {
-                "days_left": delta,
-                "date": future.strftime("%Y년 %m월"),
-                "description": t["reason"][0] if t["reason"] else "흐름 변화",
-                "intensity": t["intensity"],
-            }
-    return {"days_left": None, "date": "-", "description": "대운 안정기", "intensity": "⬜"}
+    now = datetime.now()
+    ev = TurningIndex.from_session(pils, birth_year, gender).next_after(now)
+    if ev is None or ev["시각"] > now + timedelta(days=365):
+        return {"days_left": None, "date": "-", "description": "대운 안정기", "intensity": "⬜"}
+    t = calc_turning_point(pils, birth_year, gender, *_session_birth(), ev["연도"])
+    if ev["종류"] == "대운":
+        description = f"새 대운 {ev['간지']} 시작 - 인생 국면 전환"
+    else:
+        description = t["reason"][0] if t["reason"] else f"{ev['간지']}년 흐름 변화"
+    return {
+        "days_left": (ev["시각"].date() - now.date()).days,
+        "date": ev["시각"].strftime("%Y년 %m월 %d일 %H:%M"),
+        "description": description,
+        "intensity": t["intensity"],
+        "when": ev["시각"],
+    }
 
 
 def render_retention_widget(pils, birth_year, gender):
@@ -9274,6 +11634,21 @@ def render_retention_widget(pils, birth_year, gender):
     
 """, unsafe_allow_html=True)
 
+    # -- 1년 일운 히트맵 (같은 일운 시계열에서 365일 한 번에)
+    with st.expander("📆 올해 일운 히트맵", expanded=False):
+        grid, _ = get_daily_heatmap(pils, birth_year, gender)
+        cells = ""
+        for wd in range(7):
+            cells += "<div style='display:flex;gap:2px;margin-bottom:2px'>"
+            cells += f"<div style='width:14px;font-size:9px;color:#000000'>{'월화수목금토일'[wd]}</div>"
+            for s in grid[:, wd].tolist():
+                bg = "#f5f5f5" if s < 0 else ("#4caf50" if s >= 60 else "#ff9800" if s >= 45 else "#f44336")
+                op = 1 if s < 0 else max(0.35, s / 100)
+                tip = "" if s < 0 else f"{s}점"
+                cells += f"<div title='{tip}' style='width:9px;height:9px;border-radius:2px;background:{bg};opacity:{op}'></div>"
+            cells += "</div>"
+        st.markdown(f"<div style='overflow-x:auto;padding:6px 0'>{cells}</div>", unsafe_allow_html=True)
+
     # -- 전환점 카운트다운 배너
     if countdown["days_left"] and countdown["days_left"] <= 60:
         ic = "#f44336" if "강력" in countdown["intensity"] else "#ff9800"
@@ -9292,12 +11667,7 @@ def get_daewoon_sewoon_cross(pils, birth_year, gender, target_year=None):
     if target_year is None:
         target_year = datetime.now().year
     # 대운 호출 시 실제 생년월일시 반영
-    _bm = st.session_state.get("birth_month", 1)
-    _bd = st.session_state.get("birth_day", 1)
-    _bh = st.session_state.get("birth_hour", 12)
-    _bmi = st.session_state.get("birth_minute", 0)
-    daewoon_list = SajuCoreEngine.get_daewoon(pils, birth_year, _bm, _bd, _bh, _bmi, gender)
-    cur_dw = next((d for d in daewoon_list if d["시작연도"]<=target_year<=d["종료연도"]),None)
+    cur_dw = DaewoonTimeline.from_session(pils, birth_year, gender).at(target_year)
     if not cur_dw: return None
     sewoon = get_yearly_luck(pils, target_year)
     dw_cg_ss = TEN_GODS_MATRIX.get(ilgan,{}).get(cur_dw["cg"],"-")
@@ -9307,16 +11677,15 @@ def get_daewoon_sewoon_cross(pils, birth_year, gender, target_year=None):
     sw_jj_cg = JIJANGGAN.get(sewoon["jj"], [""])[-1]
     sw_jj_ss = TEN_GODS_MATRIX.get(ilgan, {}).get(sw_jj_cg, "-")
     cross_events = []
-    TG_HAP_PAIRS = [{"甲(갑)","己(기)"},{"乙(을)","庚(경)"},{"丙(병)","辛(신)"},{"丁(정)","壬(임)"},{"戊(무)","癸(계)"}]
-    for pair in TG_HAP_PAIRS:
-        if cur_dw["cg"] in pair and sewoon["cg"] in pair:
-            cross_events.append({"type":"천간합","desc":f"대운 천간({cur_dw['cg']})과 세운 천간({sewoon['cg']})이 합(合). 변화와 기회의 해."})
-    for k,(name,oh,desc) in CHUNG_MAP.items():
-        if cur_dw["jj"] in k and sewoon["jj"] in k:
-            cross_events.append({"type":"지지충","desc":f"대운 지지({cur_dw['jj']})와 세운 지지({sewoon['jj']})가 충(沖). {desc}"})
-    for combo,(hname,hoh,hdesc) in SAM_HAP_MAP.items():
-        all_jj = {cur_dw["jj"],sewoon["jj"]}|{p["jj"] for p in pils}
-        if combo.issubset(all_jj):
+    dw_jj, sw_jj = jj_index(cur_dw["jj"]), jj_index(sewoon["jj"])
+    if CG_REL[cg_index(cur_dw["cg"]), cg_index(sewoon["cg"])] & REL_CG_HAP:
+        cross_events.append({"type":"천간합","desc":f"대운 천간({cur_dw['cg']})과 세운 천간({sewoon['cg']})이 합(合). 변화와 기회의 해."})
+    if JJ_REL[dw_jj, sw_jj] & REL_CHUNG:
+        desc = CHUNG_MAP[frozenset([JJ[dw_jj], JJ[sw_jj]])][2]
+        cross_events.append({"type":"지지충","desc":f"대운 지지({cur_dw['jj']})와 세운 지지({sewoon['jj']})가 충(沖). {desc}"})
+    all_mask = jj_mask([dw_jj, sw_jj] + [p["jj"] for p in pils])
+    for combo_mask,(hname,hoh,hdesc) in SAM_HAP_MASKS:
+        if covers_mask(all_mask, combo_mask):
             cross_events.append({"type":"삼합","desc":f"대운/세운/원국 삼합({hname}) - 강력한 발복의 기운."})
     ss_combo = f"{dw_cg_ss}+{sw_cg_ss}"
     interp = {
@@ -9399,9 +11768,10 @@ def get_health_analysis(pils, gender="남"):
 # ==================================================
 
 def get_jaemul_analysis(pils, birth_year, gender="남"):
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
     ilgan = pils[1]["cg"]
-    oh_strength = calc_ohaeng_strength(ilgan, pils)
-    strength_info = get_ilgan_strength(ilgan, pils)
+    oh_strength = ctx.ohaeng
+    strength_info = ctx.strength
     sn = strength_info["신강신약"]
     CTRL = {"木":"土","火":"金","土":"水","金":"木","水":"火"}
     ilgan_oh = OH.get(ilgan,"")
@@ -9416,12 +11786,8 @@ def get_jaemul_analysis(pils, birth_year, gender="남"):
         lbl = ["시주","일주","월주","년주"][i]
         if ss_cg in ["正財","偏財"]: jae_pos.append(f"{lbl} 천간({ss_cg})")
         if ss_jj in ["正財","偏財"]: jae_pos.append(f"{lbl} 지지({ss_jj})")
-    # 대운 재물 피크 (사용자 지침 준수)
-    birth_month = st.session_state.get('birth_month', 1)
-    birth_day = st.session_state.get('birth_day', 1)
-    birth_hour = st.session_state.get('birth_hour', 12)
-    birth_minute = st.session_state.get('birth_minute', 0)
-    daewoon = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender=gender)
+    # 대운 재물 피크 (사용자 지침 준수 - ChartContext 가 세션 생월/일/시/분 사용)
+    daewoon = ctx.daewoon
     peaks = [{"대운":d["str"],"나이":f"{d['시작나이']}~{d['시작나이']+9}세","연도":f"{d['시작연도']}~{d['종료연도']}","십성":TEN_GODS_MATRIX.get(ilgan,{}).get(d["cg"],"-")} for d in daewoon if TEN_GODS_MATRIX.get(ilgan,{}).get(d["cg"],"-") in ["正財","偏財","食神"]]
     # 유형 판단
     if sn=="신강(身强)" and jae_strength>=20: jtype,jstrat="적극형 - 강한 일간이 재성을 다루는 이상적 구조.","재성 운에서 과감히 행동하십시오."
@@ -10926,8 +13292,8 @@ f"",
             # 용신 오행 기반 향후 20년 황금기 계산
             _g_yong_ohs = set(o for o in yongshin_ohs if o in ("木","火","土","金","水"))
             _g_years = []
-            for _gy in range(current_year, current_year + 21):
-                _gsw = get_yearly_luck(pils, _gy)
+            for _gsw in LuckSeries.of(pils, birth_year).yearly(current_year, current_year + 21):
+                _gy = _gsw["연도"]
                 _gsw_oh = OH.get((_gsw.get("세운") or "")[:1], "")
                 if _gsw_oh in _g_yong_ohs:
                     _gage = _gy - birth_year + 1
@@ -11224,8 +13590,9 @@ f"[!] 주의 구간: {crisis_str}",
     f"",
     f"",
 ]))
-        for y in range(current_year, current_year + 3):
-            sw = get_yearly_luck(pils, y)
+        luck = LuckSeries.of(pils, birth_year)
+        for sw in luck.yearly(current_year, current_year + 3):
+            y = sw["연도"]
             dw = next((d for d in daewoon if d["시작연도"] <= y <= d["종료연도"]), None)
             dw_ss = TEN_GODS_MATRIX.get(ilgan, {}).get(dw["cg"], "-") if dw else "-"
             sw_ss = sw.get("십성_천간", "-")
@@ -11362,9 +13729,9 @@ f"향후 3년 동안 {display_name}님이 가장 중점을 두어야 할 사항:
 f"",
 f"1. 용신 {yong_kr} 강화 | 용신 오행의 색상, 음식, 방위를 일상에서 꾸준히 활용하십시오",
 f"2. 기신 차단 | 기신 오행의 요소를 생활 공간에서 최소화하십시오",
-f"3. {'적극적 투자와 도전 | 지금이 황금기의 연속입니다' if all(_get_yongshin_match(get_yearly_luck(pils,y).get('십성_천간','-'), yongshin_ohs, ilgan_oh) == 'yong' for y in range(current_year, current_year+2)) else '내실 다지기 | 지금은 준비 기간이니 실력 향상에 집중하십시오'}",
+f"3. {'적극적 투자와 도전 | 지금이 황금기의 연속입니다' if all(_get_yongshin_match(sw.get('십성_천간','-'), yongshin_ohs, ilgan_oh) == 'yong' for sw in luck.yearly(current_year, current_year+2)) else '내실 다지기 | 지금은 준비 기간이니 실력 향상에 집중하십시오'}",
 f"4. 건강 관리 | 사주의 취약한 오행 관련 기관을 정기적으로 점검하십시오",
-f"5. 인맥 관리 | {'귀인을 만날 운기이니 새로운 사람들과의 교류에 적극적으로 나서십시오' if '정인' in [get_yearly_luck(pils,y).get('십성_천간') for y in range(current_year, current_year+3)] else '신뢰 관계를 꾸준히 유지하고 새로운 파트너를 신중하게 선택하십시오'}",
+f"5. 인맥 관리 | {'귀인을 만날 운기이니 새로운 사람들과의 교류에 적극적으로 나서십시오' if '정인' in [sw.get('십성_천간') for sw in luck.yearly(current_year, current_year+3)] else '신뢰 관계를 꾸준히 유지하고 새로운 파트너를 신중하게 선택하십시오'}",
 f"",
 f"",
 ]))
@@ -11380,8 +13747,8 @@ f"",
 ]))
         try:
             month_data = []
-            for m in range(1, 13):
-                ml = get_monthly_luck(pils, current_year, m) if 'get_monthly_luck' in dir() else None
+            for ml in luck.monthly(current_year):
+                m = ml["월"]
                 if ml:
                     m_ss = ml.get("십성","")
                     m_str = ml.get("월주","")
@@ -11884,6 +14251,7 @@ def _nar_past(ctx):
 def build_rich_narrative(pils, birth_year, gender, name, section="report"):
     """각 메뉴별 5000~10000자 서술형 내러티브 생성"""
     try:
+        cc = ChartContext.of(pils, birth_year, gender=gender)
         ilgan = pils[1]["cg"]
         ilgan_idx = CG.index(ilgan) if ilgan in CG else 0
         ilgan_kr = CG_KR[ilgan_idx]
@@ -11894,13 +14262,12 @@ def build_rich_narrative(pils, birth_year, gender, name, section="report"):
         current_age = current_year - birth_year + 1
         display_name = name if name else "내담자"
 
-        strength_info = get_ilgan_strength(ilgan, pils)
+        strength_info = cc.strength
         sn = strength_info.get("신강신약", "중화(中和)")
-        gyeokguk = get_gyeokguk(pils)
+        gyeokguk = cc.gyeokguk
         gname = gyeokguk.get("격국명", "") if gyeokguk else ""
-        ys = get_yongshin(pils)
-        yongshin_ohs = ys.get("종합_용신", [])
-        if not isinstance(yongshin_ohs, list): yongshin_ohs = []
+        ys = cc.yongshin
+        yongshin_ohs = cc.yongshin_ohs
         ilgan_oh = OH.get(ilgan, "")
 
         life = build_life_analysis(pils, gender)
@@ -11908,12 +14275,10 @@ def build_rich_narrative(pils, birth_year, gender, name, section="report"):
         top_ss = [k for k, v in sorted(ss_dist.items(), key=lambda x: -x[1])][:3]
         combos = life.get("조합_결과", [])
 
-        birth_month = st.session_state.get('birth_month', 1)
-        birth_day = st.session_state.get('birth_day', 1)
-        birth_hour = st.session_state.get('birth_hour', 12)
-        birth_minute = st.session_state.get('birth_minute', 0)
-        daewoon = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender=gender)
-        cur_dw = next((d for d in daewoon if d["시작연도"] <= current_year <= d["종료연도"]), None)
+        birth_month, birth_day = cc.birth_month, cc.birth_day
+        birth_hour, birth_minute = cc.birth_hour, cc.birth_minute
+        daewoon = cc.daewoon
+        cur_dw = cc.timeline.at(current_year)
         # 일간 한자 → '甲(갑)' 형식 변환 (ILGAN_CHAR_DESC 키 형식)
         _CG_KR_MAP = {
             "甲":"갑","乙":"을","丙":"병","丁":"정","戊":"무",
@@ -11935,8 +14300,8 @@ def build_rich_narrative(pils, birth_year, gender, name, section="report"):
         gnarr = GYEOKGUK_NARRATIVE.get(gname, f"{gname}은 독특한 개성과 능력을 가진 격국입니다.")
 
 
-        sw_now = get_yearly_luck(pils, current_year)
-        sw_next = get_yearly_luck(pils, current_year + 1)
+        sw_now = cc.yearly_luck(current_year)
+        sw_next = cc.yearly_luck(current_year + 1)
 
         OH_KR_MAP = {"木":"목(木)","火":"화(火)","土":"토(土)","金":"금(金)","水":"수(水)"}
         yong_kr = " - ".join([OH_KR_MAP.get(o, o) for o in yongshin_ohs])
@@ -11986,12 +14351,12 @@ def build_rich_narrative(pils, birth_year, gender, name, section="report"):
 def menu1_report(pils, name, birth_year, gender, occupation="선택 안 함", api_key="", groq_key=""):
     """ [1. Comprehensive Report] - Pillars, Personality, Gyeokguk, Yongshin """
     try:
-        ilgan = pils[1]["cg"]
+        ctx = ChartContext.of(pils, birth_year, gender=gender)
         current_year = datetime.now().year
         current_age  = current_year - birth_year + 1
-        strength_info = get_ilgan_strength(ilgan, pils)
-        gyeokguk = get_gyeokguk(pils)
-        ys = get_yongshin(pils)
+        strength_info = ctx.strength
+        gyeokguk = ctx.gyeokguk
+        ys = ctx.yongshin
     except Exception as e:
         st.error(f"기본 데이터 계산 오류: {e}")
         return
@@ -12054,7 +14419,7 @@ def menu1_report(pils, name, birth_year, gender, occupation="선택 안 함", ap
         col_oh, col_sn = st.columns(2)
         with col_oh:
             st.markdown('<div class="gold-section">🌈 오행 분포</div>', unsafe_allow_html=True)
-            oh_strength = calc_ohaeng_strength(ilgan, pils)
+            oh_strength = ctx.ohaeng
             render_ohaeng_chart(oh_strength)
         with col_sn:
             st.markdown('<div class="gold-section">⚖️ 신강신약</div>', unsafe_allow_html=True)
@@ -12354,8 +14719,9 @@ def menu1_report(pils, name, birth_year, gender, occupation="선택 안 함", ap
     # -- 클리프행어 (미완성 서술 트릭) ----------------------
     try:
         current_year = datetime.now().year
-        turning = calc_turning_point(pils, birth_year, gender, current_year)
-        triggers = detect_event_triggers(pils, birth_year, gender, current_year)
+        life = LifeEventIndex.from_session(pils, birth_year, gender)
+        turning = life.year_turning(current_year)
+        triggers = life.year_triggers(current_year)
         high_t = [t for t in triggers if t["prob"] >= 75]
 
         teaser = ""
@@ -12364,7 +14730,7 @@ def menu1_report(pils, name, birth_year, gender, occupation="선택 안 함", ap
         elif high_t:
             teaser = f"사건 트리거 분석에서 **{high_t[0]['title']}** 패턴이 포착됐습니다. 이 흐름이 구체적으로 어떤 영역에서 발현될지,"
         else:
-            luck_s = calc_luck_score(pils, birth_year, gender, current_year)
+            luck_s = life.luck_score(current_year)
             if luck_s >= 70:
                 teaser = f"현재 운세 점수 **{luck_s}/100** - 상승기 진입 신호가 감지됩니다. 이 기회를 어떻게 활용할지,"
             else:
@@ -12399,6 +14765,7 @@ def menu1_report(pils, name, birth_year, gender, occupation="선택 안 함", ap
 
 def menu2_lifeline(pils, birth_year, gender, name="내담자", api_key="", groq_key=""):
     """2️⃣ 인생 흐름 (대운 100년) - 프리미엄 글래스모피즘 UI"""
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
     import json
 
     st.markdown(f"""
@@ -12417,18 +14784,13 @@ def menu2_lifeline(pils, birth_year, gender, name="내담자", api_key="", groq_
     </div>
 </div>""", unsafe_allow_html=True)
 
-    ilgan = pils[1]["cg"]
+    ilgan = ctx.ilgan
     current_year = datetime.now().year
-    # 대운 호출 시 실제 생년월일시 반영
-    birth_month = st.session_state.get('birth_month', 1)
-    birth_day = st.session_state.get('birth_day', 1)
-    birth_hour = st.session_state.get('birth_hour', 12)
-    birth_minute = st.session_state.get('birth_minute', 0)
-    daewoon = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender=gender)
-    ys = get_yongshin(pils)
+    daewoon = ctx.daewoon
+    ys = ctx.yongshin
     yongshin_ohs = ys.get("종합_용신",[])
     if not isinstance(yongshin_ohs, list): yongshin_ohs = []
-    ilgan_oh = OH.get(ilgan,"")
+    ilgan_oh = ctx.ilgan_oh
 
     # -- 대운 100년 타임라인 그래프 --
     st.markdown('<div class="gold-section" style="font-size:18px; font-weight:700; margin-bottom:15px">📊 大運 흐름 그래프</div>', unsafe_allow_html=True)
@@ -12592,6 +14954,7 @@ def menu3_past(pils, birth_year, gender, name="", api_key="", groq_key=""):
 
 def menu4_future3(pils, birth_year, gender, marriage_status="미혼", name="내담자", api_key="", groq_key=""):
     """4️⃣ 미래 3년 집중 분석 - 돈/직장/연애"""
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
     ilgan = pils[1]["cg"]
     current_year = datetime.now().year
     current_age  = current_year - birth_year + 1
@@ -12605,7 +14968,7 @@ def menu4_future3(pils, birth_year, gender, marriage_status="미혼", name="내
     </div>
 </div>""", unsafe_allow_html=True)
 
-    ys = get_yongshin(pils)
+    ys = ctx.yongshin
     yongshin_ohs = ys.get("종합_용신",[])
     if not isinstance(yongshin_ohs, list): yongshin_ohs = []
     ilgan_oh = OH.get(ilgan,"")
@@ -12623,14 +14986,8 @@ def menu4_future3(pils, birth_year, gender, marriage_status="미혼", name="내
 
     years_data = []
     for y in range(current_year, current_year + 3):
-        sw = get_yearly_luck(pils, y)
-        # 대운 호출 시 실제 생년월일시 반영 (사용자 지침 준수)
-        birth_month = st.session_state.get('birth_month', 1)
-        birth_day = st.session_state.get('birth_day', 1)
-        birth_hour = st.session_state.get('birth_hour', 12)
-        birth_minute = st.session_state.get('birth_minute', 0)
-        dw = next((d for d in SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender=gender)
-                   if d["시작연도"] <= y <= d["종료연도"]), None)
+        sw = ctx.yearly_luck(y)
+        dw = ctx.timeline.at(y)
         dw_ss = TEN_GODS_MATRIX.get(ilgan,{}).get(dw["cg"],"-") if dw else "-"
         sw_ss = sw.get("십성_천간", "-")
         age = y - birth_year + 1
@@ -12788,6 +15145,7 @@ def menu4_future3(pils, birth_year, gender, marriage_status="미혼", name="내
 
 def menu5_money(pils, birth_year, gender, name="내담자", api_key="", groq_key=""):
     """5️⃣ 재물/사업 특화 분석"""
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
     st.markdown("""
 <div style="background:#f5fff0;border:2px solid #2e7d3255;border-radius:12px;
             padding:14px 18px;margin-bottom:14px">
@@ -12798,7 +15156,7 @@ def menu5_money(pils, birth_year, gender, name="내담자", api_key="", groq_key
 </div>""", unsafe_allow_html=True)
 
     ilgan = pils[1]["cg"]
-    ys = get_yongshin(pils)
+    ys = ctx.yongshin
     yongshin_ohs = ys.get("종합_용신",[])
     if not isinstance(yongshin_ohs, list): yongshin_ohs = []
     ilgan_oh = OH.get(ilgan,"")
@@ -13021,16 +15379,16 @@ def menu6_relations(pils, name, birth_year, gender, marriage_status="미혼", ap
 
 def menu9_daily(pils, name, birth_year, gender, api_key="", groq_key=""):
     """9️⃣ 일일 운세 - 오늘 하루의 기운에 집중한 심플 모드"""
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
 
     ilgan   = pils[1]["cg"]
     today   = datetime.now()
     display_name = name if name else "내담자"
 
-    # -- 일진 계산 헬퍼 ------------------
+    # -- 일진 계산 헬퍼 (GanjiEngine 공통 기준) ------------------
     def get_day_pillar(dt):
-        base  = date(1924, 1, 1)
-        delta = (dt.date() - base).days if hasattr(dt, 'date') else (dt - base).days
-        return CG[delta % 10], JJ[delta % 12]
+        idx = GanjiEngine.day_index_of(dt.year, dt.month, dt.day)
+        return CG[idx % 10], JJ[idx % 12]
 
     today_cg, today_jj = get_day_pillar(today)
     today_ss = TEN_GODS_MATRIX.get(ilgan, {}).get(today_cg, "-")
@@ -13117,9 +15475,8 @@ def menu9_daily(pils, name, birth_year, gender, api_key="", groq_key=""):
     _deep = _SS_DAILY_DEEP.get(_today_ss_kr, None)
 
     if api_key or groq_key:
-        # ✅ BUG FIX: 캐시 키에 사주 4기둥을 모두 포함하여 타인과 캐시가 충돌하지 않도록 고유성 부여
-        full_saju_str = f"{pils[3]['cg']}{pils[3]['jj']}_{pils[2]['cg']}{pils[2]['jj']}_{pils[1]['cg']}{pils[1]['jj']}_{pils[0]['cg']}{pils[0]['jj']}"
-        cache_key_daily = f"DAILY_{full_saju_str}_{today.strftime('%Y%m%d')}"
+        # 정규 사주 지문 - 같은 사주끼리만 공유, 타인과 충돌 없음
+        cache_key_daily = f"DAILY_{chart_cache_key(pils, birth_year, gender)}_{today.strftime('%Y%m%d')}"
         cached_daily = get_ai_cache(cache_key_daily, "daily_ai")
         
         if not cached_daily:
@@ -13246,7 +15603,7 @@ def menu9_daily(pils, name, birth_year, gender, api_key="", groq_key=""):
 
     # -- 길한 시간 (용신 기반) ----------------
     st.markdown('<div class="gold-section" style="margin-top:20px">⏰ 오늘의 길한 시간 (용신 기반)</div>', unsafe_allow_html=True)
-    ys = get_yongshin(pils)
+    ys = ctx.yongshin
     y_ohs = ys.get("종합_용신", [])
     OH_HOUR_MAP = {"木":[("3~5시","寅(인)"),("5~7시","卯(묘)")],"火":[("9~11시","巳(사)"),("11~13시","午(오)")],"土":[("7~9시","辰(진)"),("13~15시","未(미)")],"金":[("15~17시","申(신)"),("17~19시","酉(유)")],"水":[("21~23시","亥(해)"),("23~1시","子(자)")]}
     good_hours = []
@@ -13502,7 +15859,7 @@ def menu10_monthly(pils, name, birth_year, gender, api_key="", groq_key=""):
 """, unsafe_allow_html=True)
 
     if api_key or groq_key:
-        cache_key = f"{pils[1]['cg']}_{year}{month}_monthly_ai"
+        cache_key = f"{chart_cache_key(pils, birth_year, gender)}_{year}{month}_monthly_ai"
         cached = get_ai_cache(cache_key, "monthly_ai")
 
         if not cached:
@@ -13558,18 +15915,16 @@ def menu10_monthly(pils, name, birth_year, gender, api_key="", groq_key=""):
     from datetime import date
     _, last_day = calendar.monthrange(year, month)
 
-    def get_day_pillar_local(dt):
-        base  = date(1924, 1, 1)
-        delta = (dt.date() - base).days if hasattr(dt, 'date') else (dt - base).days
-        return CG[delta % 10], JJ[delta % 12]
-
-    # 이달 전체 일진 분석
+    # 이달 전체 일진 분석 (한 달치 일주를 GanjiEngine 으로 일괄 계산)
+    month_day_idx = GanjiEngine.day_index(GanjiEngine.date_range(date(year, month, 1),
+                                                                  date(year, month, last_day)))
     all_days_data = []
     bad_days = []
     good_days = []
     for d in range(1, last_day + 1):
         dt = datetime(year, month, d)
-        cg, jj = get_day_pillar_local(dt)
+        idx = int(month_day_idx[d - 1])
+        cg, jj = CG[idx % 10], JJ[idx % 12]
         ss = TEN_GODS_MATRIX.get(ilgan, {}).get(cg, "-")
         day_info = {"date": dt, "cgjj": f"{cg}{jj}", "ss": ss, "cg": cg, "jj": jj}
         all_days_data.append(day_info)
@@ -13856,7 +16211,7 @@ def menu11_yearly(pils, name, birth_year, gender, api_key="", groq_key=""):
                                 key="yearly_year_select")
 
     if api_key or groq_key:
-        cache_key = f"{pils[1]['cg']}_{sel_year}_yearly_ai"
+        cache_key = f"{chart_cache_key(pils, birth_year, gender)}_{sel_year}_yearly_ai"
         cached_yr = get_ai_cache(cache_key, "yearly_ai")
 
         if not cached_yr:
@@ -13919,7 +16274,7 @@ def menu11_yearly(pils, name, birth_year, gender, api_key="", groq_key=""):
             "劫財":"재물 소모가 큰 달. 지출을 최소화하고 보수적으로 운영하십시오.",
             "-":"평온한 기운의 달. 루틴을 지키며 꾸준히 나아가는 것이 최선입니다.",
         }
-        _mdata = [get_monthly_luck(pils, sel_year, m) for m in range(1, 13)]
+        _mdata = LuckSeries.of(pils, birth_year).monthly(sel_year)
         _best_local  = max(_mdata, key=lambda x: _LR.get(x["길흉"], 2))
         _worst_local = min(_mdata, key=lambda x: _LR.get(x["길흉"], 2))
 
@@ -13976,7 +16331,7 @@ def menu11_yearly(pils, name, birth_year, gender, api_key="", groq_key=""):
 
     LEVEL_COLOR = {"대길":"#4caf50","길":"#8bc34a","평길":"#ffc107","평":"#9e9e9e","흉":"#f44336","흉흉":"#b71c1c"}
     LEVEL_EMOJI = {"대길":"🌟","길":"✅","평길":"🟡","평":"⬜","흉":"[!]️","흉흉":"🔴"}
-    months_data = [get_monthly_luck(pils, sel_year, m) for m in range(1, 13)]
+    months_data = LuckSeries.of(pils, birth_year).monthly(sel_year)
 
     LEVEL_RANK = {"대길":5,"길":4,"평길":3,"평":2,"흉":1,"흉흉":0}
     best_m  = max(months_data, key=lambda x: LEVEL_RANK.get(x["길흉"], 2))
@@ -14035,17 +16390,18 @@ def menu11_yearly(pils, name, birth_year, gender, api_key="", groq_key=""):
 
 def menu8_bihang(pils, name, birth_year, gender):
     """8️⃣ 특급 비방록 - 용신 기반 전통 비방 처방전"""
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
 
     # [년, 월, 일, 시] 순서에서 일간은 index 2
     ilgan = pils[1]["cg"] if pils and len(pils) > 1 else ""
-    ys = get_yongshin(pils)
+    ys = ctx.yongshin
     yongshin_ohs = ys.get("종합_용신", [])
     if not isinstance(yongshin_ohs, list):
         yongshin_ohs = []
     gishin_raw = ys.get("기신", "")
     gishin_ohs = [o for o in ["木","火","土","金","水"] if o in str(gishin_raw)]
     ilgan_oh = OH.get(ilgan, "")
-    strength_info = get_ilgan_strength(ilgan, pils)
+    strength_info = ctx.strength
     sn = strength_info["신강신약"]
     display_name = name if name else "내담자"
     current_year = datetime.now().year
@@ -14538,7 +16894,8 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
         GoalCreationEngine.extract_goal(name, user_query) # 목표 발견
         
         current_year = datetime.now().year
-        luck_score = calc_luck_score(pils, birth_year, gender, current_year)
+        ctx = ChartContext.of(pils, birth_year, gender=gender)
+        luck_score = ctx.life.luck_score(current_year)
         DestinyMatrix.calculate_sync(name, pils, luck_score)
         
         # 전환점 감지
@@ -14578,9 +16935,7 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
             import re as _re_loc
             q = query
             ilgan_loc = pils[1]["cg"] if len(pils) > 1 else "?"
-            _ss = st.session_state
-            bm = _ss.get("birth_month", 1); bd = _ss.get("birth_day", 1)
-            bh = _ss.get("birth_hour", 12); bmn = _ss.get("birth_minute", 0)
+            bm, bd, bh, bmn = ctx.birth_month, ctx.birth_day, ctx.birth_hour, ctx.birth_minute
 
             is_today = bool(_re_loc.search(r'오늘|일진|내일|이번주', q))
             is_year  = bool(_re_loc.search(r'올해|세운|금년|올해운세|2025|2026|2027', q)) or is_today
@@ -14595,7 +16950,7 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
             out = [f"허허, 어서 오게. {name}의 팔자를 내 신안(神眼)으로 살펴보겠느니라.\n"]
             try:
                 if is_year:
-                    sw    = get_yearly_luck(pils, current_year)
+                    sw    = ctx.yearly_luck(current_year)
                     sw_ss = sw.get("십성_천간",""); sw_gh = sw.get("길흉",""); sw_gan = sw.get("세운","")
                     try: tp = calc_turning_point(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
                     except Exception: tp = {}
@@ -14636,13 +16991,13 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                     elif "주요" in tp_int or "변화" in tp_int:
                         out.append(f"\n**🔄 중요한 변화 감지** 운세 변화폭 {tp_sc:+d}점 — {tp_int}\n")
                         for r in tp_rsn[:2]: out.append(f"• {r}\n")
-                    sw_n  = get_yearly_luck(pils, current_year+1)
-                    sw_n2 = get_yearly_luck(pils, current_year+2)
+                    sw_n  = ctx.yearly_luck(current_year+1)
+                    sw_n2 = ctx.yearly_luck(current_year+2)
                     out.append(f"\n**[내년 미리보기]** {current_year+1}년: {sw_n.get('세운','')} [{sw_n.get('십성_천간','')}] {sw_n.get('길흉','')}\n")
                     out.append(f"**[후년 미리보기]** {current_year+2}년: {sw_n2.get('세운','')} [{sw_n2.get('십성_천간','')}] {sw_n2.get('길흉','')}")
 
                 elif is_money:
-                    gk  = get_gyeokguk(pils); ys = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
+                    gk  = ctx.gyeokguk; ys = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
                     gkn = gk["격국명"] if gk else "미정격"
                     y1  = ys.get("용신_1순위","-"); y2 = ys.get("용신_2순위","-")
                     heui= ys.get("희신","-"); gisin = ", ".join(ys.get("기신",[]))
@@ -14665,7 +17020,7 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                     gold_ohs = {o for o in [y1,y2] if o in ("木","火","土","金","水")}
                     gold_yrs = []
                     for yr in range(current_year, current_year+11):
-                        sw_g = get_yearly_luck(pils, yr)
+                        sw_g = ctx.yearly_luck(yr)
                         if OH.get((sw_g.get("세운","")[:1]),"") in gold_ohs:
                             sw_g_ss = sw_g.get("십성_천간","")
                             star = "★★★" if sw_g_ss in ("偏財","正財","食神") else "★★" if sw_g_ss in ("正官","正印") else "★"
@@ -14684,7 +17039,7 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                     except Exception: pass
                     # 기신 대운 경고
                     try:
-                        dw_list_m2 = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmn, gender)
+                        dw_list_m2 = ctx.daewoon
                         gisin_ohs2 = set(ys.get("기신",[]))
                         gisin_dws2 = [dw for dw in dw_list_m2
                                       if OH.get(dw.get("cg",""),"") in gisin_ohs2 and dw["종료연도"] >= current_year]
@@ -14735,7 +17090,7 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
 
                     # 3. 대운에서 재성/관성운 들어오는 시기
                     try:
-                        dw_list_l = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmn, gender)
+                        dw_list_l = ctx.daewoon
                         love_dw_ss_l = {"偏財","正財"} if gender == "남" else {"偏官","正官"}
                         love_dws_l = [dw for dw in dw_list_l
                                       if TEN_GODS_MATRIX.get(ilgan_loc,{}).get(dw["cg"],"") in love_dw_ss_l
@@ -14753,7 +17108,7 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                     love_yr_ss_l = {"偏財","正財"} if gender == "남" else {"偏官","正官"}
                     love_yrs_l = []
                     for _yr_l in range(current_year, current_year + 4):
-                        _sw_l = get_yearly_luck(pils, _yr_l)
+                        _sw_l = ctx.yearly_luck(_yr_l)
                         _ss_l = _sw_l.get("십성_천간","")
                         if _ss_l in love_yr_ss_l:
                             love_yrs_l.append(f"**{_yr_l}년**({_yr_l-birth_year+1}세): {_sw_l.get('세운','')} [{_ss_l}] {_sw_l.get('길흉','')} ← 이성 인연 기운이 강하느니라!")
@@ -14762,14 +17117,14 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                         for _ly_l in love_yrs_l: out.append(f"* {_ly_l}\n")
                         out.append("이 해들에 적극적으로 인연을 찾아 나서게. 하늘이 돕는 시기니라!\n")
                     else:
-                        sw_now_l = get_yearly_luck(pils, current_year)
+                        sw_now_l = ctx.yearly_luck(current_year)
                         out.append(f"\n올해 {sw_now_l.get('세운','')} [{sw_now_l.get('십성_천간','')}] — 향후 3년은 이성 세운이 약하니 자기계발로 내실을 다지는 시기니라.\n")
 
                     # 5. 도화살 확인
                     try:
                         sinsal_l = get_special_stars(pils)
                         dohwa_l = [s for s in sinsal_l if "도화" in s.get("name","")]
-                        ss12_l = get_12sinsal(pils)
+                        ss12_l = ctx.sinsal
                         dohwa12_l = [s for s in ss12_l if "도화" in s.get("이름","") or "년살" in s.get("이름","")]
                         if dohwa_l or dohwa12_l:
                             out.append("\n**[신살 — 도화살(桃花殺)]** 도화살이 사주에 있구먼!\n이성의 인기를 한몸에 받는 매력의 기운이니라. 감정에 휩쓸려 경솔한 선택을 하지 않도록 명심하게.\n")
@@ -14781,7 +17136,7 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                     _cage_l = current_year - birth_year + 1
                     out.append(f"\n**[결혼 적령기 — 현재 {_cage_l}세]**\n")
                     try:
-                        dw2_l = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmn, gender)
+                        dw2_l = ctx.daewoon
                         love_ss2_l = {"偏財","正財"} if gender == "남" else {"偏官","正官"}
                         fut_dws_l = [dw for dw in dw2_l
                                      if TEN_GODS_MATRIX.get(ilgan_loc,{}).get(dw["cg"],"") in love_ss2_l
@@ -14795,7 +17150,7 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                                 out.append(f"**{bd2_l['시작연도']}년({bd2_l['시작나이']}세)**부터 {bd2_l['str']} **{bd2_ss_l}** 대운이 열리느니라. 그 무렵 결혼 결실이 맺어지느니라.\n")
                         else:
                             for _yr2_l in range(current_year, current_year + 10):
-                                _sw2_l = get_yearly_luck(pils, _yr2_l)
+                                _sw2_l = ctx.yearly_luck(_yr2_l)
                                 if _sw2_l.get("십성_천간","") in ({"偏財","正財"} if gender == "남" else {"偏官","正官"}):
                                     out.append(f"**{_yr2_l}년({_yr2_l-birth_year+1}세)** 세운에 인연 기운이 들어오느니라. 그 무렵 준비하게.\n")
                                     break
@@ -14820,7 +17175,7 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                         elif v <= 5: out.append(f"\n💊 **{OHN.get(o,'')}({o}) 부족({v}%):** {_OHB.get(o,'')} 계통 보강하게. 부족한 오행이 해당 장기를 약하게 만드느니라.")
                     # 현재 대운 건강 영향
                     try:
-                        dw_list_h2 = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmn, gender)
+                        dw_list_h2 = ctx.daewoon
                         cdw_h2 = next((d for d in dw_list_h2 if d["시작연도"] <= current_year <= d["종료연도"]), None)
                         if cdw_h2:
                             cdw_ss_h2 = TEN_GODS_MATRIX.get(ilgan_loc,{}).get(cdw_h2["cg"],"-")
@@ -14842,7 +17197,7 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                             out.append(f"이 대운 오행: **{OHN.get(cdw_oh_h2,'')}({cdw_oh_h2})** — {_OHB.get(cdw_oh_h2,'')} 계통에 영향을 주느니라.\n")
                     except Exception: pass
                     # 올해 세운 건강 경보
-                    sw_hlt2 = get_yearly_luck(pils, current_year)
+                    sw_hlt2 = ctx.yearly_luck(current_year)
                     sw_hlt2_ss = sw_hlt2.get("십성_천간","")
                     if sw_hlt2_ss == "偏官":
                         out.append(f"\n⚠️ 올해({current_year}년) {sw_hlt2.get('세운','')} [偏官] 세운 — 건강 사고 위험 높은 해니라. 무리한 활동·수술 신중하게.\n")
@@ -14850,7 +17205,7 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                         out.append(f"\n올해({current_year}년) {sw_hlt2.get('세운','')} [傷官] 세운 — 과로와 신경 소모가 심한 해니라. 충분한 휴식이 최우선이니라.\n")
 
                 elif is_dw:
-                    daewoon = SajuCoreEngine.get_daewoon(pils, birth_year, bm, bd, bh, bmn, gender)
+                    daewoon = ctx.daewoon
                     cdw = next((d for d in daewoon if d["시작연도"] <= current_year <= d["종료연도"]), None)
                     out.append(f"**{name}의 대운 흐름 완전 분석**\n")
                     # 용신 기반 황금기/주의기 판별
@@ -14914,7 +17269,7 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                             for d in past_dz2[:2]: out.append(f"* {d.get('age','')}: {d.get('desc','')}\n")
 
                 elif is_job:
-                    gk  = get_gyeokguk(pils)
+                    gk  = ctx.gyeokguk
                     gkn = gk["격국명"] if gk else "미정격"
                     ys2 = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
                     y1j = ys2.get("용신_1순위", "-")
@@ -14974,13 +17329,13 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                     elif "신약" in sn_j2:
                         out.append(f"\n**신약({sn_j2})** — 안정된 조직·전문직 안에서 귀인의 도움을 받는 것이 최적이니라. 창업보다 전문성 강화가 우선이니라.\n")
                     # 올해 진로 세운
-                    sw_j2 = get_yearly_luck(pils, current_year)
+                    sw_j2 = ctx.yearly_luck(current_year)
                     sw_j2_ss = sw_j2.get("십성_천간","")
                     out.append(f"\n올해({current_year}년) {sw_j2.get('세운','')} [{sw_j2_ss}] {sw_j2.get('길흉','')} — {_SWJOB2.get(sw_j2_ss, sw_j2_ss + ' 기운의 해이니 흐름을 잘 읽고 움직이게.')}\n")
                     out.append(f"\n용신 **{y1j}** 오행이 강한 해에 진로 결정을 내리면 가장 유리하느니라. 명심하게!\n")
 
                 elif is_char:
-                    gk  = get_gyeokguk(pils)
+                    gk  = ctx.gyeokguk
                     si  = get_ilgan_strength(ilgan_loc, pils)
                     gkn = gk["격국명"] if gk else "미정격"
                     sn  = si.get("신강신약", "중화")
@@ -15013,15 +17368,15 @@ def tab_ai_chat(pils, name, birth_year, gender, api_key, groq_key=""):
                     }
                     for o, v in oh_s_c2.items():
                         if v >= 35: out.append(f"\n{_OHC2.get(o,'')}\n")
-                    sw = get_yearly_luck(pils, current_year)
+                    sw = ctx.yearly_luck(current_year)
                     out.append(f"\n올해({current_year}년)는 {sw.get('세운','')} [{sw.get('십성_천간','')}] {sw.get('길흉','')} 기운이니 그 흐름을 잘 타게.\n")
 
                 else:
-                    gk  = get_gyeokguk(pils); ys = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
+                    gk  = ctx.gyeokguk; ys = get_yongshin_multilayer(pils, birth_year, gender, bm, bd, bh, bmn, current_year)
                     si  = get_ilgan_strength(ilgan_loc, pils)
                     gkn = gk["격국명"] if gk else "미정격"; sn = si["신강신약"]; sc = si.get("일간점수",50)
                     y1  = ys.get("용신_1순위","-"); heui = ys.get("희신","-"); gisin = ", ".join(ys.get("기신",[]))
-                    sw  = get_yearly_luck(pils, current_year)
+                    sw  = ctx.yearly_luck(current_year)
                     sw_ss = sw.get("십성_천간",""); sw_gan = sw.get("세운",""); sw_gh = sw.get("길흉","")
                     # 1️⃣ 천기의 낙인
                     _GKS= {"정관격":"규칙과 질서의 격국. 조직에서 권위를 얻을 팔자이니라. 공직·관리직이 천직이니라.",
@@ -15135,8 +17490,8 @@ def menu13_career(pils, name, birth_year, gender):
     """, unsafe_allow_html=True)
 
     try:
-        ilgan = pils[1]["cg"]
-        ss_list = calc_sipsung(ilgan, pils)
+        ctx = ChartContext.of(pils, birth_year, gender=gender)
+        ss_list = ctx.sipsung
         
         # 십성 카운팅
         counts = {"비겁":0, "식상":0, "재성":0, "관성":0, "인성":0}
@@ -15220,8 +17575,8 @@ def menu14_health(pils, name, birth_year, gender):
 """, unsafe_allow_html=True)
 
     try:
-        ilgan = pils[1]["cg"]
-        oh_strength = calc_ohaeng_strength(ilgan, pils)
+        ctx = ChartContext.of(pils, birth_year, gender=gender)
+        oh_strength = ctx.ohaeng
         
         # 취약 오행 찾기 (가장 낮은 것)
         weak_oh = min(oh_strength, key=oh_strength.get)
@@ -15287,8 +17642,9 @@ def menu12_manse(pils=None, birth_year=1990, gender="남"):
     </div>""", unsafe_allow_html=True)
 
     # 오늘 일진 헤더
-    today_iljin = ManseCalendarEngine.get_today_iljin()
-    today_gil   = ManseCalendarEngine.get_gil_hyung(today.year, today.month, today.day)
+    today_cal   = ManseCalendarEngine.get_year(today.year)
+    today_iljin = today_cal.iljin(today.month, today.day)
+    today_gil   = today_cal.gil_hyung(today.month, today.day)
     st.markdown(f"""
 
     <div style='background:{today_gil["bg"]};border:2px solid {today_gil["color"]};
@@ -15321,12 +17677,13 @@ def menu12_manse(pils=None, birth_year=1990, gender="남"):
                                  format_func=lambda m: f"{m}월")
 
     # 절기 배지
-    jeolgi_this = ManseCalendarEngine.get_month_jeolgi(sel_year, sel_month)
+    sel_cal     = ManseCalendarEngine.get_year(sel_year)
+    jeolgi_this = sel_cal.month_jeolgi(sel_month)
     if jeolgi_this:
         jeolgi_html = " &nbsp;".join(
             f"<span style='background:#000;color:#fff;padding:2px 8px;"
             f"border-radius:10px;font-size:11px;font-weight:700'>"
-            f"{j['day']}일 {j['name']}</span>"
+            f"{j['day']}일 {j['time_str']} {j['name']}</span>"
             for j in jeolgi_this
         )
         st.markdown(f"<div style='margin:6px 0 10px'>이달 절기: {jeolgi_html}</div>",
@@ -15334,7 +17691,7 @@ def menu12_manse(pils=None, birth_year=1990, gender="남"):
 
     # 달력 그리드
     import calendar as _cal
-    cal_data = ManseCalendarEngine.get_month_calendar(sel_year, sel_month)
+    cal_data = sel_cal.month(sel_month)
     weekdays = ["月","火","水","木","金","土","日"]
     first_wd, _ = _cal.monthrange(sel_year, sel_month)
 
@@ -15480,6 +17837,32 @@ def menu12_manse(pils=None, birth_year=1990, gender="남"):
         except Exception as e:
             st.warning(f"맞춤 길일 계산 오류: {e}")
 
+        # 기간 택일 검색 (오늘부터 N개월, 조건 + 상위 k)
+        with st.expander("🔎 기간 택일 검색 - 앞으로 여러 달 중 최길일 찾기", expanded=False):
+            c1, c2, c3 = st.columns(3)
+            with c1:
+                t_months = st.selectbox("검색 기간", [1, 3, 6, 12], index=2, format_func=lambda m: f"{m}개월",
+                                        key="taeil_months")
+            with c2:
+                t_min = st.slider("최소 점수", 45, 100, 65, step=5, key="taeil_min")
+            with c3:
+                t_weekday = st.checkbox("평일(월~금)만", key="taeil_weekday")
+            t_forbid = st.multiselect("피할 일진 십성", _TAEIL_SS_KR, default=["편관", "겁재"], key="taeil_forbid")
+            if st.button("택일 검색", key="btn_taeil_search"):
+                try:
+                    t_start = today.date()
+                    found = search_good_days(pils, t_start, t_start + timedelta(days=round(30.44 * t_months)),
+                                             k=15, min_score=t_min, weekdays_only=t_weekday, forbid_ss=t_forbid)
+                    if found:
+                        st.dataframe([{"날짜": f"{g['date']:%Y-%m-%d} ({'月火水木金土日'[g['date'].weekday()]})",
+                                       "일진": g["pillar"], "점수": g["score"], "등급": g["level"],
+                                       "근거": ", ".join(g["reasons"])} for g in found],
+                                     use_container_width=True, hide_index=True)
+                    else:
+                        st.info("조건에 맞는 날이 없습니다. 최소 점수나 제외 조건을 낮춰 보세요.")
+                except Exception as e:
+                    st.warning(f"택일 검색 오류: {e}")
+
     # -- [!]️ 사주 맞춤 조심일 경고 카드 (NEW) ----------------------
     if pils:
         st.markdown('<div class="gold-section" style="margin-top:8px">[!]️ 이번 달 당신의 사주 맞춤 조심일</div>', unsafe_allow_html=True)
@@ -15623,8 +18006,8 @@ def menu12_manse(pils=None, birth_year=1990, gender="남"):
                               else 1,
                               step=1, label_visibility="visible")
     if st.button("🔮 이 날짜의 일진 사주 분석", use_container_width=True):
-        iljin_sel = ManseCalendarEngine.get_iljin(sel_year, sel_month, int(sel_day))
-        gil_sel   = ManseCalendarEngine.get_gil_hyung(sel_year, sel_month, int(sel_day))
+        iljin_sel = sel_cal.iljin(sel_month, int(sel_day))
+        gil_sel   = sel_cal.gil_hyung(sel_month, int(sel_day))
         pils_day  = SajuCoreEngine.get_pillars(sel_year, sel_month, int(sel_day), 12, 0, gender)
         yp = pils_day[0]["str"]; mp = pils_day[2]["str"]
         dp = pils_day[1]["str"]
@@ -15650,17 +18033,16 @@ def menu12_manse(pils=None, birth_year=1990, gender="남"):
 
 
 
-@st.cache_data
 def get_total_lines():
     """파일의 전체 라인 수 (상수 반환 - 런타임 I/O 제거)"""
     return 14510
 
-@st.cache_data(ttl=86400)
 def _get_daily_briefing(date_str: str) -> dict:
     """오늘 일진 기반 한줄 운세 브리핑 (강화판)"""
     y, m, d = (int(x) for x in date_str.split("-"))
-    iljin = ManseCalendarEngine.get_iljin(y, m, d)
-    gil   = ManseCalendarEngine.get_gil_hyung(y, m, d)
+    cal   = ManseCalendarEngine.get_year(y)
+    iljin = cal.iljin(m, d)
+    gil   = cal.gil_hyung(m, d)
     cg, jj = iljin["cg"], iljin["jj"]
 
     CG_DETAIL = {
@@ -15992,6 +18374,7 @@ def main():
     if "in_marriage" not in _ss: _ss["in_marriage"] = "미혼"
     if "in_occupation" not in _ss: _ss["in_occupation"] = "선택 안 함"
     if "in_premium_correction" not in _ss: _ss["in_premium_correction"] = True # 기본 활성화 (정밀도 우선)
+    if "in_birth_place" not in _ss: _ss["in_birth_place"] = TimeCorrection.DEFAULT_PLACE
     if "form_expanded" not in _ss: _ss["form_expanded"] = True
     if "favorites" not in _ss: _ss["favorites"] = []
 
@@ -16072,8 +18455,13 @@ def main():
         premium_on = st.checkbox("- 프리미엄 보정 (KASI 기반 초단위 보정 및 경도 반영)", 
                                  value=_ss["in_premium_correction"], 
                                  key="in_premium_correction",
-                                 help="동경 127.0도(서울) 기준 경도 보정 및 한국 천문연구원(KASI) 데이터 기반 절기 초단위 보정을 적용합니다.")
+                                 help="출생지 경도·당시 표준시·서머타임 보정 및 한국 천문연구원(KASI) 데이터 기반 절기 초단위 보정을 적용합니다.")
         if premium_on:
+            _places = list(TimeCorrection.CITY_LONGITUDES)
+            if _ss.get("in_birth_place") not in _places:
+                _ss["in_birth_place"] = TimeCorrection.DEFAULT_PLACE
+            st.selectbox("출생지 (경도 보정)", _places, key="in_birth_place",
+                         help="출생지 경도와 당시 표준시/서머타임으로 진태양시를 계산합니다.")
             st.info("✅ 현재 '프리미엄 정밀 보정' 모드가 활성화되어 있습니다. 보조 홈페이지 결과와 비교해 보세요.")
 
         st.markdown("---")
@@ -16107,6 +18495,23 @@ def main():
             </div>
             """, unsafe_allow_html=True)
 
+        # 운영자 전용 (MANSE_ENGINE_ADMIN) - 캐시 비우기는 모든 세션이 공유하는 캐시에 영향
+        if ENGINE_ADMIN:
+            st.markdown("---")
+            st.markdown("**🧮 엔진 캐시 현황 (운영)**")
+            if st.checkbox("캐시 메모리/적중률 보기", key="show_cache_report"):
+                rows = engine_cache_report()
+                total_kb = sum(r["메모리KB"] for r in rows)
+                ceil_kb = sum(r["상한추정KB"] for r in rows)
+                c1, c2, c3 = st.columns(3)
+                c1.metric("현재 메모리", f"{total_kb / 1024:.1f} MB")
+                c2.metric("상한 추정", f"{ceil_kb / 1024:.1f} MB")
+                c3.metric("누적 축출/만료", f"{sum(r['축출'] for r in rows):,} / {sum(r['만료'] for r in rows):,}")
+                st.dataframe(rows, use_container_width=True, hide_index=True)
+                if st.button("🧹 엔진 캐시 비우기", key="btn_clear_engine_cache"):
+                    engine_memo_clear()
+                    st.success("엔진 캐시를 비웠습니다.")
+
     # -- 섀도우 키 저장 콜백 (양력/음력 전환 시 입력값 보존) --
     def _sv_solar():
         """양력 날짜 변경 시 섀도우 키에 백업"""
@@ -16269,6 +18674,9 @@ def main():
                 except Exception:
                     st.warning("음력 변환 오류")
                     return
+                if birth_date_solar is None:
+                    st.warning("존재하지 않는 음력 날짜입니다 (윤달 여부와 그 달의 일수를 확인해 주세요)")
+                    return
             else:
                 birth_date_solar = _ss["in_solar_date"]
 
@@ -16281,7 +18689,8 @@ def main():
                 # 프리미엄 정밀 보정 엔진 사용
                 pils = SajuPrecisionEngine.get_pillars(
                     b_year, b_month, b_day, 
-                    _ss["in_birth_hour"], _ss["in_birth_minute"], _ss["in_gender"]
+                    _ss["in_birth_hour"], _ss["in_birth_minute"], _ss["in_gender"],
+                    _ss.get("in_birth_place")
                 )
             else:
                 # 일반 표준 엔진 사용
@@ -16342,10 +18751,7 @@ def main():
         if pils:
             import urllib.parse as _upl
             _sy   = st.session_state.get("birth_year", 1990)
-            _sm   = st.session_state.get("birth_month", 1)
-            _sd   = st.session_state.get("birth_day", 1)
-            _sh   = st.session_state.get("birth_hour", 12)
-            _smin = st.session_state.get("birth_minute", 0)
+            _sm, _sd, _sh, _smin = _session_birth()
             _sg    = "f" if st.session_state.get("gender", "남") == "여" else "m"
             _sn    = _upl.quote(st.session_state.get("saju_name", ""), safe="")
             _scal  = "l" if st.session_state.get("cal_type", "양력") == "음력" else "s"
@@ -16384,21 +18790,19 @@ def main():
         occupation = st.session_state.get("occupation", "선택 안 함")
         lunar_info = st.session_state.get("lunar_info", "")
         cal_type_saved = st.session_state.get("cal_type", "양력")
-        birth_month = st.session_state.get("birth_month", 1)
-        birth_day   = st.session_state.get("birth_day", 1)
-        birth_hour2 = st.session_state.get("birth_hour", 12)
+        birth_month, birth_day, birth_hour2, _ = _session_birth()
 
         if pils:
             # -- 🧠 기억 시스템 자동 업데이트 -----------------
             try:
                 # [1] 정체 기억 업데이트 (사주 분석 시점에 1회)
-                ilgan_char  = pils[1]["cg"] if pils and len(pils) > 1 else ""
-                gyeok_data  = get_gyeokguk(pils)
+                ctx         = ChartContext.of(pils, birth_year, gender=gender)
+                ilgan_char  = ctx.ilgan
+                gyeok_data  = ctx.gyeokguk
                 gyeok_name  = gyeok_data.get("격국명", "") if gyeok_data else ""
-                str_info    = get_ilgan_strength(ilgan_char, pils)
+                str_info    = ctx.strength
                 sn_val      = str_info.get("신강신약", "") if str_info else ""
-                ys_data     = get_yongshin(pils)
-                ys_list     = ys_data.get("종합_용신", []) if ys_data else []
+                ys_list     = ctx.yongshin_ohs
                 core_trait  = f"{ilgan_char} 일간 / {sn_val} / {gyeok_name}"
                 
                 # 직장운 및 건강운 요약 정보 추출 (AI 맥락용)
@@ -16406,7 +18810,7 @@ def main():
                 health_summary = ""
                 try:
                     counts = {"비겁":0, "식상":0, "재성":0, "관성":0, "인성":0}
-                    ss_l = calc_sipsung(ilgan_char, pils)
+                    ss_l = ctx.sipsung
                     ss_n = {"비견":"비겁","겁재":"비겁","식신":"식상","상관":"식상","편재":"재성","정재":"재성","편관":"관성","정관":"관성","편인":"인성","정인":"인성"}
                     for it in ss_l:
                         if it["cg_ss"] in ss_n: counts[ss_n[it["cg_ss"]]] += 1
@@ -16414,7 +18818,7 @@ def main():
                     primary = max(counts, key=counts.get)
                     career_summary = f"{primary} 기질의 전문인"
                     
-                    o_s = calc_ohaeng_strength(ilgan_char, pils)
+                    o_s = ctx.ohaeng
                     w_o = min(o_s, key=o_s.get)
                     health_summary = f"{w_o}({OHN[w_o]}) 기운 보강 필요"
                 except Exception as e: _saju_log.debug(str(e))
@@ -16422,14 +18826,14 @@ def main():
                 SajuMemory.update_identity(ilgan_char, gyeok_name, core_trait, ys_list, career=career_summary, health=health_summary)
 
                 # [3] 흐름 기억 업데이트 (현재 대운 기반)
-                dw_list = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, _ss["in_birth_hour"], _ss["in_birth_minute"], gender)
+                dw_list = ctx.daewoon
                 cur_year = datetime.now().year
                 cur_dw = next(
                     (d for d in dw_list if d.get("시작연도", 0) <= cur_year <= d.get("종료연도", 9999)),
                     None
                 )
                 if cur_dw:
-                    turning = calc_turning_point(pils, birth_year, gender, cur_year)
+                    turning = ctx.life.year_turning(cur_year)
                     stage = turning.get("intensity", "안정기") if turning and turning.get("is_turning") else "안정기"
                     period = f"{cur_dw.get('시작연도', '')}~{cur_dw.get('종료연도', '')}"
                     SajuMemory.update_flow(stage, period, cur_dw.get("str", ""))
@@ -16604,6 +19008,7 @@ def main():
 # ==========================================================
 def menu15_12unsung(pils, name, birth_year, gender):
     """🌟 12운성 심층 분석 리포트"""
+    ctx = ChartContext.of(pils, birth_year, gender=gender)
     st.markdown("""
 <div style="background:linear-gradient(135deg, #1f1c2c, #928dab);border-radius:16px;
             padding:20px 24px;margin-bottom:20px;color:#fff;text-align:center;box-shadow: 0 4px 12px rgba(0,0,0,0.4)">
@@ -16611,8 +19016,7 @@ def menu15_12unsung(pils, name, birth_year, gender):
     <div style="font-size:13px;color:#eee;margin-top:6px">인간의 생로병사를 자연의 순환에 빗대어 풀어내는 인생의 나침반</div>
 </div>""", unsafe_allow_html=True)
 
-    ilgan = pils[1]["cg"]
-    unsung_list = calc_12unsung(ilgan, pils)
+    unsung_list = ctx.unsung
     
     _UNSUNG_DESC = {
         "장생": {"title": "🌱 장생 (長生)", "nature": "새로운 시작, 순수함, 호기심, 창조적 에너지, 보호받는 기운", "detail": "마치 갓 태어난 아기처럼 순수하고 호기심이 많으며 주변의 사랑과 보호를 받는 시기/기운입니다. 새로운 일을 시작하는 데 매우 유리하며 창조적인 아이디어가 샘솟습니다. 타인에게 호감을 주며 후원자를 만나기 쉽습니다.", "caution": "순수함이 지나쳐 타인에게 속거나 상처받기 쉽고, 의존적인 성향이 나타날 수 있으니 독립심을 기르는 것이 필요합니다."},
@@ -16951,11 +19355,8 @@ def menu_pdf(pils, birth_year, gender, name="내담자", birth_hour_str=""):
                       size=11, color=(0.2,0.2,0.2))
             y -= 3*mm
 
+            ctx          = ChartContext.of(pils, birth_year, gender=gender)
             ilgan        = pils[1]["cg"]
-            birth_month  = st.session_state.get("birth_month", 1)
-            birth_day    = st.session_state.get("birth_day", 1)
-            birth_hour   = st.session_state.get("birth_hour", 12)
-            birth_minute = st.session_state.get("birth_minute", 0)
 
             # == 1. 사주 기본 정보 ==
             if include_basic:
@@ -16979,7 +19380,7 @@ def menu_pdf(pils, birth_year, gender, name="내담자", birth_hour_str=""):
                 y = write(c, f"오행 분포: {oh_str}", y, size=10)
 
                 # ── 오행 분포 바 차트 ──
-                _oh_s    = calc_ohaeng_strength(pils[1]["cg"], pils)
+                _oh_s    = ctx.ohaeng
                 _oh_ord  = ["木", "火", "土", "金", "水"]
                 _oh_rgb  = {"木":(0.18,0.65,0.18),"火":(0.90,0.22,0.22),
                             "土":(0.85,0.55,0.10),"金":(0.55,0.55,0.55),"水":(0.13,0.53,0.87)}
@@ -17009,9 +19410,9 @@ def menu_pdf(pils, birth_year, gender, name="내담자", birth_hour_str=""):
             # == 2. 용신/격국 상세 분석 ==
             if include_yongshin:
                 y = section_title(c, "용신 / 격국 / 신강신약 — 천명의 설계도", y)
-                _gk = get_gyeokguk(pils)
+                _gk = ctx.gyeokguk
                 _ys_ml = get_yongshin_multilayer(pils, birth_year, gender, _dt.now().year)
-                _si = get_ilgan_strength(ilgan, pils)
+                _si = ctx.strength
                 _gkname = _gk["격국명"] if _gk else "미정격"
                 _gkgrade = _gk.get("격의_등급", "") if _gk else ""
                 _sn = _si["신강신약"]
@@ -17098,7 +19499,7 @@ def menu_pdf(pils, birth_year, gender, name="내담자", birth_hour_str=""):
                     _cy_gold = _dt.now().year
                     _gold_years = []
                     for _gy in range(_cy_gold, _cy_gold + 21):
-                        _gsw = get_yearly_luck(pils, _gy)
+                        _gsw = ctx.yearly_luck(_gy)
                         _gsw_cg = (_gsw.get("세운") or "")[:1]
                         _gsw_oh = OH.get(_gsw_cg, "")
                         if _gsw_oh in _gold_yong_ohs:
@@ -17145,7 +19546,7 @@ def menu_pdf(pils, birth_year, gender, name="내담자", birth_hour_str=""):
                 import re as _re2
                 try:
                     # 1순위: AI 캐시에서 과거 분석 텍스트 가져오기
-                    _sk = pils_to_cache_key(pils)
+                    _sk = chart_cache_key(pils, birth_year, gender)
                     _past_ai = get_ai_cache(_sk, "past") or ""
                     if _past_ai:
                         _past_clean = _re2.sub(r'<[^>]+>', '', _past_ai)
@@ -17233,8 +19634,8 @@ def menu_pdf(pils, birth_year, gender, name="내담자", birth_hour_str=""):
             if include_dw:
                 y = section_title(c, "대운 흐름 (10년 단위)", y)
                 current_year = _dt.now().year
-                daewoon = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender)
-                ys2 = get_yongshin(pils)
+                daewoon = ctx.daewoon
+                ys2 = ctx.yongshin
                 yongshin_ohs = ys2.get("종합_용신", [])
                 ilgan_oh = OH.get(ilgan, "")
                 for dw in daewoon[:10]:
@@ -17306,13 +19707,13 @@ def menu_pdf(pils, birth_year, gender, name="내담자", birth_hour_str=""):
                 _cage = _cy - birth_year + 1
                 y = section_title(c, f"현재 운세 — {_cy}년 ({_cage}세) 지금 이 순간", y)
                 try:
-                    _daewoon2 = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender)
+                    _daewoon2 = ctx.daewoon
                     _cdw = next((d for d in _daewoon2 if d["시작연도"] <= _cy <= d["종료연도"]), None)
-                    _sw_c  = get_yearly_luck(pils, _cy)
-                    _sw_n  = get_yearly_luck(pils, _cy + 1)
-                    _sw_n2 = get_yearly_luck(pils, _cy + 2)
-                    _tp    = calc_turning_point(pils, birth_year, gender, _cy)
-                    _ys_c  = get_yongshin(pils)
+                    _sw_c  = ctx.yearly_luck(_cy)
+                    _sw_n  = ctx.yearly_luck(_cy + 1)
+                    _sw_n2 = ctx.yearly_luck(_cy + 2)
+                    _tp    = ctx.life.year_turning(_cy)
+                    _ys_c  = ctx.yongshin
                     _yohs  = _ys_c.get("종합_용신", [])
                     _ioh   = OH.get(ilgan, "")
                     _cdw_ss = TEN_GODS_MATRIX.get(ilgan, {}).get(_cdw["cg"], "-") if _cdw else "-"
@@ -17400,8 +19801,8 @@ def menu_pdf(pils, birth_year, gender, name="내담자", birth_hour_str=""):
                 _cy2 = _dt.now().year
                 y = section_title(c, f"미래 5년 운세 — {_cy2+1}년~{_cy2+5}년 흐름", y)
                 try:
-                    _daewoon3 = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender)
-                    _ys3 = get_yongshin(pils)
+                    _daewoon3 = ctx.daewoon
+                    _ys3 = ctx.yongshin
                     _yohs3 = _ys3.get("종합_용신", [])
                     _ioh3  = OH.get(ilgan, "")
                     _GOOD_SS = {"正財","食神","正官","正印","偏財"}
@@ -17423,7 +19824,7 @@ def menu_pdf(pils, birth_year, gender, name="내담자", birth_hour_str=""):
 
                     for _fy in range(_cy2 + 1, _cy2 + 6):
                         _fage = _fy - birth_year + 1
-                        _fsw = get_yearly_luck(pils, _fy)
+                        _fsw = ctx.yearly_luck(_fy)
                         _fsw_ss = _fsw.get("십성_천간", "-")
                         _fsw_gilhung = _fsw.get("길흉", "")
                         _fdw = next((d for d in _daewoon3 if d["시작연도"] <= _fy <= d["종료연도"]), None)
@@ -17456,7 +19857,7 @@ def menu_pdf(pils, birth_year, gender, name="내담자", birth_hour_str=""):
             if include_sinsal:
                 y = section_title(c, "신살 분석", y)
                 try:
-                    _sin12 = get_12sinsal(pils)
+                    _sin12 = ctx.sinsal
                     _extra = get_extra_sinsal(pils)
                     _all_sins = _sin12 + _extra
                     if _all_sins:
@@ -17500,7 +19901,7 @@ def menu_pdf(pils, birth_year, gender, name="내담자", birth_hour_str=""):
             if include_fortune:
                 y = section_title(c, "만신 종합 천명풀이 — 전문 사주 분석", y)
                 try:
-                    _saju_key = pils_to_cache_key(pils)
+                    _saju_key = chart_cache_key(pils, birth_year, gender)
                     # 캐시 우선 (prophet > general > lifeline)
                     _ai_raw = (get_ai_cache(_saju_key, "prophet") or
                                get_ai_cache(_saju_key, "general") or
@@ -17529,12 +19930,12 @@ def menu_pdf(pils, birth_year, gender, name="내담자", birth_hour_str=""):
             if include_advice:
                 y = section_title(c, "처방 — 만신이 내리는 핵심 조언", y)
                 try:
-                    _adv_dw_list = SajuCoreEngine.get_daewoon(pils, birth_year, birth_month, birth_day, birth_hour, birth_minute, gender)
+                    _adv_dw_list = ctx.daewoon
                     _adv_dw = next((dw for dw in _adv_dw_list if dw["시작연도"] <= _dt.now().year <= dw["종료연도"]), None)
-                    _adv_ys = get_yongshin(pils)
+                    _adv_ys = ctx.yongshin
                     _adv_yohs = _adv_ys.get("종합_용신", [])
                     _adv_ioh  = OH.get(ilgan, "")
-                    _adv_sw   = get_yearly_luck(pils, _dt.now().year)
+                    _adv_sw   = ctx.yearly_luck(_dt.now().year)
                     _adv_sw_ss = _adv_sw.get("십성_천간", "-")
                     _adv_ys_ml = get_yongshin_multilayer(pils, birth_year, gender, _dt.now().year)
 
@@ -0,0 +1,9 @@
+import logging
+import os
+import sys
+
+# manse.py 는 패키지가 아닌 단일 모듈 -> 저장소 루트를 import 경로에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# streamlit bare 모드 경고(ScriptRunContext 없음) 억제
+logging.getLogger("streamlit").setLevel(logging.ERROR)
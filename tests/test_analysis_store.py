@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+import build_tables
+import manse
+from manse import AnalysisStore
+
+N_BUILT = 26     # 사주 번호 0..25 만 담은 작은 저장소
+
+
+def _shape(v):
+    """값과 컨테이너 타입까지 비교하기 위한 구조"""
+    if isinstance(v, dict):
+        return type(v), {k: _shape(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return type(v), [_shape(x) for x in v]
+    return type(v), v
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """tmp_path/analysis_store 에 N_BUILT 건 저장소 생성 후 _DATA_DIR 을 그쪽으로"""
+    out = tmp_path / AnalysisStore.DIR_NAME
+    out.mkdir()
+    cols = {name: build_tables._StoreColumn(str(out), name) for name in AnalysisStore.FUNCTIONS}
+    for i in range(N_BUILT):
+        for name, v in AnalysisStore.compute(AnalysisStore.chart_at(i).pils).items():
+            cols[name].add(AnalysisStore.encode(v))
+    for col in cols.values():
+        col.close()
+    AnalysisStore.write_meta(str(out), N_BUILT)
+    monkeypatch.setattr(manse, "_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(AnalysisStore, "_cols", None)
+    return tmp_path
+
+
+def _fetch_all(pils):
+    ilgan = pils[1]["cg"]
+    out = {}
+    for name in AnalysisStore.FUNCTIONS:
+        fn = getattr(manse, name)
+        args = (ilgan, pils) if name in AnalysisStore._ILGAN_ARG else (pils,)
+        out[name] = AnalysisStore.fetch(name, pils, lambda: fn(*args))
+    return out
+
+
+def test_hit_and_miss_return_same_values_and_types(store, monkeypatch):
+    charts = [AnalysisStore.chart_at(i).pils for i in range(N_BUILT)]
+    assert all(AnalysisStore.get(name, charts[0]) is not None for name in AnalysisStore.FUNCTIONS)
+    hits = [_fetch_all(p) for p in charts]
+
+    monkeypatch.setattr(manse, "_DATA_DIR", os.path.join(str(store), "empty"))
+    monkeypatch.setattr(AnalysisStore, "_cols", None)
+    assert AnalysisStore.get(AnalysisStore.FUNCTIONS[0], charts[0]) is None
+    misses = [_fetch_all(p) for p in charts]
+
+    for hit, miss in zip(hits, misses):
+        for name in AnalysisStore.FUNCTIONS:
+            assert _shape(hit[name]) == _shape(miss[name]), name
+
+
+def test_hits_are_read_only_and_skip_compute(store):
+    pils = AnalysisStore.chart_at(3).pils
+
+    def compute():
+        raise AssertionError("저장소 적중인데 compute 호출")
+    s = AnalysisStore.fetch("get_ilgan_strength", pils, compute)
+    with pytest.raises(TypeError):
+        s["일간점수"] = 0
+    with pytest.raises(TypeError):
+        s["oh_strength"]["木"] = 0
+    with pytest.raises(TypeError):
+        AnalysisStore.fetch("calc_sipsung", pils, compute).append({})
+
+
+def test_charts_outside_the_store_are_computed(store):
+    pils = AnalysisStore.chart_at(N_BUILT).pils
+    assert AnalysisStore.get("get_gongmang", pils) is None
+    gm = AnalysisStore.fetch("get_gongmang", pils, lambda: manse.get_gongmang(pils))
+    assert isinstance(gm["공망_지지"], list)        # 튜플도 저장 형식(리스트)으로 통일
+    assert list(gm["공망_지지"]) == list(manse.get_gongmang(pils)["공망_지지"])
@@ -0,0 +1,140 @@
+import copy
+import json
+import pickle
+
+import pytest
+
+import manse
+
+
+@pytest.fixture
+def memo():
+    """테스트 전용 EngineMemo 생성기 (호출 횟수 기록, 끝나면 registry 에서 제거)"""
+    made = []
+
+    def make(fn, maxsize=4, ttl=None):
+        calls = []
+
+        def wrapped(*args, **kwargs):
+            calls.append(args)
+            return fn(*args, **kwargs)
+        wrapped.__name__ = f"_test_{fn.__name__}_{len(made)}"
+        m = manse.EngineMemo(wrapped, maxsize=maxsize, ttl=ttl)
+        made.append(m)
+        return m, calls
+
+    yield make
+    for m in made:
+        manse.EngineMemo.registry.pop(m.__name__, None)
+
+
+def _pils(*birth):
+    return [dict(p) for p in manse.SajuCoreEngine.get_pillars(*birth)]
+
+
+def _annotated(pils):
+    """get_pillars 표기("甲") -> 주석 표기("甲(갑)")"""
+    return [{"cg": f"{p['cg']}({manse.CG_KR[manse.CG.index(p['cg'])]})",
+             "jj": f"{p['jj']}({manse.JJ_KR[manse.JJ.index(p['jj'])]})",
+             "str": p["str"]} for p in pils]
+
+
+def test_hit_returns_same_object_without_recomputing(memo):
+    m, calls = memo(lambda x: {"v": [x]})
+    a = m(1)
+    b = m(1)
+    assert a is b
+    assert len(calls) == 1
+    assert (m.hits, m.misses) == (1, 1)
+
+
+def test_lru_evicts_oldest(memo):
+    m, calls = memo(lambda x: x * 2, maxsize=2)
+    for x in (1, 2, 1, 3):      # 1 을 최근에 썼으므로 3 이 들어올 때 2 가 축출
+        m(x)
+    assert m.evictions == 1
+    m(1)
+    m(2)
+    assert [c[0] for c in calls] == [1, 2, 3, 2]
+
+
+def test_ttl_expiry(memo, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(manse.time, "monotonic", lambda: now[0])
+    m, calls = memo(lambda x: x, ttl=60)
+    m(1)
+    now[0] += 59
+    m(1)
+    assert len(calls) == 1
+    now[0] += 2
+    m(1)
+    assert len(calls) == 2
+    assert m.expirations == 1
+
+
+def test_results_are_frozen_recursively(memo):
+    m, _ = memo(lambda: {"a": [1, {"b": 2}], "s": {3}})
+    v = m()
+    with pytest.raises(TypeError):
+        v["a"] = 0
+    with pytest.raises(TypeError):
+        v["a"].append(0)
+    with pytest.raises(TypeError):
+        v["a"][1]["b"] = 0
+    assert isinstance(v["s"], frozenset)
+    # 사본은 수정 가능하고 메모에 영향 없음
+    d = dict(v)
+    d["a"] = 0
+    assert m()["a"] == [1, {"b": 2}]
+
+
+def test_frozen_results_serialize_as_plain_types(memo):
+    m, _ = memo(lambda: {"a": [1, {"b": 2}]})
+    v = m()
+    assert json.loads(json.dumps(v)) == {"a": [1, {"b": 2}]}
+    back = pickle.loads(pickle.dumps(v))
+    assert type(back) is dict and type(back["a"]) is list
+    back["a"].append(3)
+
+
+def test_pils_key_is_fingerprint(memo):
+    m, calls = memo(lambda pils: pils[1]["cg"])
+    pils = _pils(1990, 5, 1, 10, 0)
+    m(pils)
+    m(copy.deepcopy(pils))                  # 같은 내용의 다른 리스트 -> 적중
+    assert len(calls) == 1
+    m(_annotated(pils))                     # 표기가 다르면 다른 키
+    assert len(calls) == 2
+    assert manse.pils_fingerprint(pils) != manse.pils_fingerprint(_annotated(pils))
+
+
+def test_unparseable_pils_bypass_the_cache(memo):
+    m, calls = memo(lambda pils: len(pils))
+    m([{"cg": "?", "jj": "?"}])
+    m([{"cg": "?", "jj": "?"}])
+    assert len(calls) == 2
+    assert m.bypass == 2 and len(m._cache) == 0
+
+
+def test_unhashable_args_bypass_the_cache(memo):
+    m, calls = memo(lambda d: sorted(d))
+    m({"a": 1})
+    m({"a": 1})
+    assert len(calls) == 2 and m.bypass == 2
+
+
+@pytest.mark.parametrize("birth", [(1990, 5, 1, 10, 0), (1985, 11, 23, 23, 30), (2001, 2, 4, 6, 15)])
+def test_memoized_engines_match_direct_computation(birth):
+    """engine_memo 결과 == st.cache_data 시절처럼 매번 새로 계산한 결과 (값과 JSON 표현 모두)"""
+    pils = _pils(*birth)
+    ilgan = pils[1]["cg"]
+    for fn, args in ((manse.get_yongshin, (pils,)), (manse.get_gyeokguk, (pils,)),
+                     (manse.get_ilgan_strength, (ilgan, pils)), (manse.calc_ohaeng_strength, (ilgan, pils)),
+                     (manse.calc_sipsung, (ilgan, pils)), (manse.get_12sinsal, (pils,)),
+                     (manse.get_yearly_luck, (pils, 2026)), (manse.get_monthly_luck, (pils, 2026, 3))):
+        fresh = fn.__wrapped__(*copy.deepcopy(args))
+        memoized = fn(*args)
+        assert memoized == fresh, fn.__name__
+        assert json.dumps(memoized, ensure_ascii=False, sort_keys=True, default=str) == \
+            json.dumps(fresh, ensure_ascii=False, sort_keys=True, default=str), fn.__name__
+        assert fn(*args) is memoized
@@ -0,0 +1,97 @@
+import random
+from collections import OrderedDict
+
+import numpy as np
+import pytest
+
+import manse
+from manse import GroupGunghap, GunghapPool
+
+
+def _charts(n, seed):
+    rng = random.Random(seed)
+    return [manse.SajuCoreEngine.get_pillars(rng.randint(1940, 2010), rng.randint(1, 12), rng.randint(1, 28),
+                                             rng.randint(0, 23), 0, rng.choice(["남", "여"])) for _ in range(n)]
+
+
+def _annotated(pils):
+    """get_pillars 표기("甲") -> 주석 표기("甲(갑)")"""
+    return [{"cg": f"{p['cg']}({manse.CG_KR[manse.CG.index(p['cg'])]})",
+             "jj": f"{p['jj']}({manse.JJ_KR[manse.JJ.index(p['jj'])]})",
+             "str": p["str"]} for p in pils]
+
+
+CHARTS = _charts(40, seed=7)
+
+
+@pytest.fixture
+def fresh_group_cache(monkeypatch):
+    monkeypatch.setattr(GroupGunghap, "_cache", OrderedDict())
+    monkeypatch.setattr(GroupGunghap, "_counters", {"적중": 0, "실패": 0, "축출": 0})
+
+
+def test_pool_scores_match_pairwise_calc_gunghap():
+    pool = GunghapPool.from_pils_list(CHARTS)
+    for a in CHARTS:
+        got = pool.scores(a)["총점"].tolist()
+        assert got == [manse.calc_gunghap(a, b)["총점"] for b in CHARTS]
+
+
+def test_pool_accepts_annotated_pils_and_row_subset():
+    pool = GunghapPool.from_pils_list([_annotated(p) for p in CHARTS])
+    idx = np.array([3, 0, 17, 39])
+    a = CHARTS[5]
+    assert pool.scores(_annotated(a), idx)["총점"].tolist() == \
+        [manse.calc_gunghap(a, CHARTS[i])["총점"] for i in idx.tolist()]
+
+
+
+def test_rank_is_stable_top_k_of_pairwise_scores():
+    pool = GunghapPool.from_pils_list(CHARTS, ids=[f"c{i}" for i in range(len(CHARTS))])
+    a = CHARTS[11]
+    totals = [manse.calc_gunghap(a, b)["총점"] for b in CHARTS]
+    expect = sorted(range(len(CHARTS)), key=lambda i: -totals[i])
+    expect = [i for i in expect if i != 2][:8]
+    got = pool.rank(a, k=8, exclude_ids=["c2"])
+    assert [g["id"] for g in got] == [f"c{i}" for i in expect]
+    assert [g["총점"] for g in got] == [totals[i] for i in expect]
+    assert [g["순위"] for g in got] == list(range(1, 9))
+
+
+def test_calc_gunghap_total_is_symmetric():
+    """GroupGunghap 이 순서 없는 쌍으로 캐시하는 전제"""
+    for i, a in enumerate(CHARTS):
+        for b in CHARTS[i + 1:]:
+            assert manse.calc_gunghap(a, b)["총점"] == manse.calc_gunghap(b, a)["총점"]
+
+
+def test_pair_key_is_order_free():
+    codes = [manse.Chart.from_pils(p).pils_code for p in CHARTS[:10]]
+    for a in codes:
+        for b in codes:
+            assert GroupGunghap._pair_key(a, b) == GroupGunghap._pair_key(b, a)
+
+
+def test_matrix_matches_calc_gunghap_and_reuses_swapped_pairs(fresh_group_cache):
+    a, b, c = CHARTS[:3]
+    df = GroupGunghap.matrix([a, b, c], ["A", "B", "C"])
+    for (x, px), (y, py) in [(("A", a), ("B", b)), (("A", a), ("C", c)), (("B", b), ("C", c))]:
+        expect = manse.calc_gunghap(px, py)["총점"]
+        assert df.loc[x, y] == df.loc[y, x] == expect
+    assert np.isnan(np.diag(df.values)).all()
+
+    missed = GroupGunghap._counters["실패"]
+    swapped = GroupGunghap.matrix([_annotated(c), b, a], ["C", "B", "A"])    # 역순 + 다른 표기 -> 전부 캐시 적중
+    assert GroupGunghap._counters["실패"] == missed
+    assert GroupGunghap._counters["적중"] == 6
+    assert swapped.loc[["A", "B", "C"], ["A", "B", "C"]].equals(df)
+
+
+def test_matrix_duplicates_and_eviction(fresh_group_cache, monkeypatch):
+    monkeypatch.setattr(GroupGunghap, "CACHE_SIZE", 5)
+    members = CHARTS[:4] + [CHARTS[0]]
+    df = GroupGunghap.matrix(members, ["가", "나", "다", "라", "가"])
+    assert list(df.index) == ["가", "나", "다", "라", "가(2)"]
+    assert df.loc["가", "가(2)"] == manse.calc_gunghap(CHARTS[0], CHARTS[0])["총점"]
+    assert len(GroupGunghap._cache) == 5
+    assert GroupGunghap._counters["축출"] == 10 - 5     # 고유 4명 -> 대각 포함 10쌍
@@ -0,0 +1,50 @@
+import manse
+from manse import LifeEventIndex
+
+BIRTH = (1990, 5, 1, 10, 0, "남")
+
+
+def _index():
+    pils = manse.SajuCoreEngine.get_pillars(*BIRTH)
+    return pils, LifeEventIndex(pils, *BIRTH[:5], BIRTH[5])
+
+
+def _filled(idx):
+    return [idx.first_year + k for k, t in enumerate(idx.triggers) if t is not None]
+
+
+def test_years_are_built_on_demand():
+    _, idx = _index()
+    assert _filled(idx) == []
+    idx.year_triggers(2026)
+    idx.year_turning(2027)
+    idx.luck_score(2030)                    # 점수는 미리 계산된 배열 -> 연도 생성 없음
+    assert _filled(idx) == [2026, 2027]
+    assert idx.year_triggers(2026) is idx.year_triggers(2026)
+
+
+def test_query_builds_only_the_requested_window():
+    _, idx = _index()
+    idx.query(2020, 2025)
+    idx.turning_years(0, 2030, 2032)
+    assert _filled(idx) == [2020, 2021, 2022, 2023, 2024, 2030, 2031]
+
+
+def test_matches_per_year_computation():
+    pils, idx = _index()
+    tl = manse.DaewoonTimeline.of(pils, *BIRTH[:5], BIRTH[5])
+    yong = manse._yongshin_list(manse.get_yongshin(pils))
+    for y in range(BIRTH[0], BIRTH[0] + LifeEventIndex.N_YEARS, 7):
+        trig = manse._year_event_triggers(pils, tl, yong, y)
+        scores = [manse.calc_luck_score(pils, BIRTH[0], BIRTH[5], *BIRTH[1:5], target_year=t) for t in (y - 1, y, y + 1)]
+        assert idx.year_triggers(y) == trig
+        assert idx.year_turning(y) == manse._year_turning_point(pils, tl, yong, y, *scores, trig)
+        assert idx.luck_score(y) == scores[1]
+
+
+def test_query_orders_by_year_then_probability():
+    _, idx = _index()
+    rows = idx.query(2000, 2060, min_prob=50)
+    assert rows == sorted(rows, key=lambda r: (r["연도"], -r["prob"]))
+    assert all(r["prob"] >= 50 for r in rows)
+    assert rows == [r for r in idx.query() if 2000 <= r["연도"] < 2060 and r["prob"] >= 50]
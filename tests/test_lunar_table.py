@@ -0,0 +1,45 @@
+from datetime import date, timedelta
+
+import pytest
+
+import manse
+from manse import LunarTable
+
+
+def test_round_trip_every_day_in_range():
+    """테이블 범위 전체: 양력 -> 음력 -> 양력 이 원래 날짜로 돌아옴"""
+    LunarTable.leap_month(LunarTable.FIRST_YEAR)    # 인덱스 생성
+    d = date.fromordinal(LunarTable._ny_ord[0])
+    end = date.fromordinal(LunarTable._ny_ord[-1])
+    while d < end:
+        assert LunarTable.to_solar(*LunarTable.to_lunar(d)) == d, d
+        d += timedelta(days=1)
+
+
+@pytest.mark.parametrize("args", [
+    (2023, 0, 1), (2023, 13, 1),            # 없는 월
+    (2023, 1, 0), (2023, 1, 31),            # 없는 일
+    (2024, 1, 1, True),                     # 윤달 없는 해에 윤달 지정
+    (2023, 3, 1, True),                     # 2023 은 윤2월 -> 윤3월 없음
+])
+def test_nonexistent_dates_return_none(args):
+    assert LunarTable.to_solar(*args) is None
+    assert manse.lunar_to_solar(*args) is None
+
+
+def test_small_month_has_no_day_30():
+    year = 2023
+    for month in range(1, 13):
+        last = LunarTable.to_solar(year, month, 29)
+        if LunarTable.to_lunar(last + timedelta(days=1))[1:3] == (month, 30):
+            assert LunarTable.to_solar(year, month, 30) == last + timedelta(days=1)
+        else:
+            assert LunarTable.to_solar(year, month, 30) is None
+
+
+def test_leap_month_is_accepted():
+    assert LunarTable.leap_month(2023) == 2
+    regular = LunarTable.to_solar(2023, 2, 1)
+    leap = LunarTable.to_solar(2023, 2, 1, True)
+    assert leap > regular
+    assert LunarTable.to_lunar(leap) == (2023, 2, 1, True)
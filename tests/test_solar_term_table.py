@@ -0,0 +1,20 @@
+import manse
+from manse import SolarTermTable
+
+
+def test_missing_table_is_computed_in_memory_without_writing(tmp_path, monkeypatch):
+    """astro 파일이 없으면 메모리에서 계산만 하고 데이터 디렉터리에 쓰지 않음"""
+    monkeypatch.setattr(manse, "_DATA_DIR", str(tmp_path))
+    for attr in ("_minutes", "_first_year", "_n_years", "kasi_count"):
+        monkeypatch.setattr(SolarTermTable, attr, getattr(SolarTermTable, attr))
+    SolarTermTable._minutes = None
+    minutes = SolarTermTable.load()
+    assert list(minutes) == SolarTermTable.compute()
+    assert SolarTermTable.kasi_count == 0
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_pack_unpack_round_trip():
+    minutes = [SolarTermTable.MISSING, 0, 123456] + list(range(21))
+    first_year, arr = SolarTermTable.unpack(SolarTermTable.pack(2000, minutes))
+    assert first_year == 2000 and list(arr) == minutes
@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+
+import pytest
+
+import manse
+from manse import JJ, CG, SIPSUNG_LIST
+
+START, END = date(2025, 1, 1), date(2025, 12, 31)
+BIRTHS = [(1990, 5, 1, 10, 0, "남"), (1985, 11, 23, 23, 30, "여"), (2001, 2, 4, 6, 15, "남"),
+          (1972, 8, 15, 4, 0, "여"), (1964, 12, 31, 18, 45, "남")]
+
+
+def _pils(b):
+    return manse.SajuCoreEngine.get_pillars(*b)
+
+
+def _per_day(pils, start, end):
+    """user-019 이전 get_good_days 의 하루 단위 루프를 임의 구간으로 (필터 전 전체 날짜)"""
+    ilgan = manse.cg_index(pils[1]["cg"]); il_jj = manse.jj_index(pils[1]["jj"])
+    gui_mask = manse.GUIIN_MASK[ilgan]
+    gm = manse.get_gongmang(pils); bad_mask = manse.jj_mask(j for j in gm["공망_지지"] if j)
+    sam_hap = [(m, name) for m, (name, oh, desc) in manse.SAM_HAP_MASKS if m >> il_jj & 1]
+    out = []
+    d = start
+    while d <= end:
+        g = manse.GanjiEngine.day_index_of(d.year, d.month, d.day)
+        dj, dc = g % 12, g % 10
+        score = 50; reasons = []
+        if gui_mask >> dj & 1: score += 25; reasons.append("천을귀인일 🌟")
+        if bad_mask >> dj & 1: score -= 30; reasons.append("공망일 [!]️")
+        if manse.JJ_REL[il_jj, dj] & manse.REL_CHUNG: score -= 20; reasons.append("일주충일 [!]️")
+        for m, name in sam_hap:
+            if m >> dj & 1: score += 15; reasons.append(f"삼합{name}일 -"); break
+        ss = int(manse.TEN_GOD_IDX[ilgan, dc]); ss_name = SIPSUNG_LIST[ss]
+        if ss in (2, 5, 7, 9): score += 10; reasons.append(f"{ss_name}일 -")
+        elif ss in (6, 1): score -= 15; reasons.append(f"{ss_name}일 [!]️")
+        level = "- 길일 - 🌟최길" if score >= 80 else "-길" if score >= 65 else "〇보통" if score >= 45 else "[-]주의"
+        out.append({"date": d, "day": d.day, "jj": JJ[dj], "cg": CG[dc], "pillar": CG[dc] + JJ[dj],
+                    "score": score, "level": level, "reasons": reasons, "ss": ss_name})
+        d += timedelta(days=1)
+    return out
+
+
+@pytest.mark.parametrize("birth", BIRTHS)
+def test_search_matches_per_day_loop(birth):
+    pils = _pils(birth)
+    ref = [r for r in _per_day(pils, START, END) if r["score"] >= 60]
+    ref.sort(key=lambda r: -r["score"])                 # 안정 정렬 -> 동점은 날짜순
+    assert manse.search_good_days(pils, START, END, k=20) == ref[:20]
+    assert manse.search_good_days(pils, START, END, k=10_000) == ref
+
+
+@pytest.mark.parametrize("birth", BIRTHS[:2])
+def test_search_filters_match_per_day_loop(birth):
+    pils = _pils(birth)
+    exclude = [date(2025, 3, d) for d in range(1, 32)]
+    ref = [r for r in _per_day(pils, START, END)
+           if r["score"] >= 45 and r["date"].weekday() < 5 and r["date"] not in exclude
+           and r["ss"] not in ("偏官", "劫財")]
+    ref.sort(key=lambda r: -r["score"])
+    got = manse.search_good_days(pils, START, END, k=10_000, min_score=45, weekdays_only=True,
+                                 exclude=exclude, forbid_ss=["편관", "劫財"])
+    assert got == ref
+    only = manse.search_good_days(pils, START, END, k=10_000, min_score=0, require_ss=["정재"])
+    assert {r["ss"] for r in only} <= {"正財"}
+    assert len(only) == sum(r["ss"] == "正財" for r in _per_day(pils, START, END))
+
+
+def test_get_good_days_is_one_month_search():
+    pils = _pils(BIRTHS[0])
+    ref = [r for r in _per_day(pils, date(2025, 2, 1), date(2025, 2, 28)) if r["score"] >= 60]
+    ref.sort(key=lambda r: -r["score"])
+    assert manse.get_good_days(pils, 2025, 2) == ref[:10]
+
+
+@pytest.mark.parametrize("agg", ["min", "mean"])
+@pytest.mark.parametrize("other", [BIRTHS[2], (1992, 6, 13, 12, 0, "여")], ids=["삼합", "일지충"])
+def test_joint_search_matches_per_day_loop(agg, other):
+    a, b = _pils(BIRTHS[0]), _pils(other)
+    ja, jb = manse.jj_index(a[1]["jj"]), manse.jj_index(b[1]["jj"])
+    per_a, per_b = _per_day(a, START, END), _per_day(b, START, END)
+    ref, bonuses = [], []
+    for ra, rb in zip(per_a, per_b):
+        dj = JJ.index(ra["jj"])
+        bonus = 0
+        if ja != jb and dj not in (ja, jb) and \
+                any({ja, jb, dj} == {JJ.index(j) for j in k} for k in manse.SAM_HAP_MAP):
+            bonus += 10
+        if manse.JJ_REL[ja, jb] & manse.REL_CHUNG and \
+                (manse.JJ_REL[ja, dj] | manse.JJ_REL[jb, dj]) & manse.REL_HAP:
+            bonus += 5
+        bonuses.append(bonus)
+        base = min(ra["score"], rb["score"]) if agg == "min" else (ra["score"] + rb["score"]) / 2
+        score = int(round(min(100, max(0, base + bonus))))
+        if score >= 60:
+            ref.append((ra["date"], score, {"A": ra["score"], "B": rb["score"]}))
+    ref.sort(key=lambda r: -r[1])
+    assert any(bonuses)                                 # 짝 가감이 실제로 적용되는 조합
+    got = manse.search_joint_days([a, b], START, END, k=10_000, agg=agg, names=["A", "B"])
+    assert [(g["date"], g["score"], g["scores"]) for g in got] == ref